@@ -3,12 +3,22 @@
 import logging
 import os
 import traceback
-from typing import Any, Dict
+from typing import Any, Dict, List
 
-from ssm_utils import get_parameter_value
+from channel_registry import Channel, get_channel_registry, parse_topic_url
+from ssm_utils import get_parameter_value, prefetch_parameters
+from stage_metrics import timed_handler
 
 WEBSUB_HMAC_SECRET_PARAMETER_NAME = os.environ["WEBSUB_HMAC_SECRET_PARAMETER_NAME"]
-YOUTUBE_CHANNEL_ID_PARAMETER_NAME = os.environ["YOUTUBE_CHANNEL_ID_PARAMETER_NAME"]
+
+# チャンネルのレジストリのバックエンド(parameterの場合のみチャンネルIDのパラメータを使用する)
+CHANNEL_REGISTRY_BACKEND = os.environ.get("CHANNEL_REGISTRY_BACKEND", "parameter")
+YOUTUBE_CHANNEL_ID_PARAMETER_NAME = os.environ.get(
+    "YOUTUBE_CHANNEL_ID_PARAMETER_NAME", ""
+)
+
+# チャンネルごとの設定がない場合のサブスクリプションの有効期間(秒)
+DEFAULT_LEASE_SECONDS = 828000
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -30,25 +40,39 @@ def vetify_query_params(query_params: Dict[str, str]) -> str | None:
     if query_params.get("hub.mode") != "subscribe":
         return f"Bad Request: Invalid hub.mode: {query_params.get('hub.mode')}"
 
+    # 検証に使用するパラメータをまとめて取得し、SSMの呼び出しを1回にまとめる
+    if query_params.get("hub.secret") or query_params.get("hub.topic"):
+        parameter_names: List[str] = [WEBSUB_HMAC_SECRET_PARAMETER_NAME]
+        if CHANNEL_REGISTRY_BACKEND == "parameter":
+            parameter_names.append(YOUTUBE_CHANNEL_ID_PARAMETER_NAME)
+        prefetch_parameters(parameter_names)
+
     if query_params.get("hub.secret") and query_params.get(
         "hub.secret"
     ) != get_parameter_value(WEBSUB_HMAC_SECRET_PARAMETER_NAME):
         return f"Bad Request: Invalid hub.secret: {query_params.get('hub.secret')}"
 
-    if query_params.get("hub.topic") and query_params.get("hub.topic") != (
-        f"https://www.youtube.com/xml/feeds/videos.xml?"
-        f"channel_id={get_parameter_value(YOUTUBE_CHANNEL_ID_PARAMETER_NAME)}"
-    ):
-        return f"Bad Request: Unexpected topic URL: {query_params.get('hub.topic')}"
+    # トピックURLのチャンネルIDでレジストリを参照し、監視するチャンネルかどうかを判定する
+    channel: Channel | None = None
+    if query_params.get("hub.topic"):
+        channel_id: str | None = parse_topic_url(query_params["hub.topic"])
+        if channel_id is not None:
+            channel = get_channel_registry().get_channel(channel_id)
+        if channel is None or not channel.enabled:
+            return f"Bad Request: Unexpected topic URL: {query_params.get('hub.topic')}"
 
     if query_params.get("hub.lease_seconds"):
         lease_seconds = query_params.get("hub.lease_seconds")
-        if not lease_seconds.isdigit() or int(lease_seconds) != 828000:
+        expected_lease_seconds: int = (
+            channel.lease_seconds if channel is not None else None
+        ) or DEFAULT_LEASE_SECONDS
+        if not lease_seconds.isdigit() or int(lease_seconds) != expected_lease_seconds:
             return f"Bad Request: Invalid hub.lease_seconds: {lease_seconds}"
 
     return None
 
 
+@timed_handler
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     WebSubでのYouTubeライブ配信サブスクリプション登録を確認するLambda関数ハンドラー
@@ -0,0 +1,66 @@
+"""AWSサービスのクライアントを遅延生成するユーティリティ関数"""
+
+import threading
+from typing import Any, Dict
+
+from circuit_breaker import get_circuit_breaker, guard_client
+from stage_metrics import instrument_client
+
+# 生成済のクライアント(サービス名 -> クライアント)
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(service_name: str) -> Any:
+    """
+    AWSサービスのクライアントを取得する
+    初回呼び出し時にboto3をインポートしてクライアントを生成し、以降は同じクライアントを返す
+
+    Args:
+        service_name (str): AWSサービス名(例: ssm, dynamodb, sns)
+
+    Returns:
+        Any: boto3のクライアント
+    """
+    client: Any | None = _clients.get(service_name)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(service_name)
+        if client is None:
+            # boto3のインポートはコールドスタート時間の大半を占めるため、初回使用時まで遅延させる
+            import boto3  # pylint: disable=import-outside-toplevel
+
+            # API呼び出しの所要時間をサービスごとのステージとして計測する
+            client = instrument_client(boto3.client(service_name))
+            _clients[service_name] = client
+    return client
+
+
+def get_guarded_client(service_name: str) -> Any:
+    """
+    サーキットブレーカーを介して呼び出すAWSサービスのクライアントを取得する
+    サーキットブレーカーがオープンの場合は、API呼び出しがCircuitOpenErrorを送出する
+
+    Args:
+        service_name (str): AWSサービス名(例: dynamodb, sns)
+
+    Returns:
+        Any: boto3のクライアント
+    """
+    return guard_client(get_client(service_name), get_circuit_breaker(service_name))
+
+
+def is_conditional_check_failed(error: Exception) -> bool:
+    """
+    DynamoDBの条件付き書き込みの条件を満たさなかったことによる例外かどうかを判定する
+
+    Args:
+        error (Exception): boto3の例外
+
+    Returns:
+        bool: 条件を満たさなかった場合True、それ以外の場合False
+    """
+    response: Dict[str, Any] = getattr(error, "response", {})
+    return response.get("Error", {}).get("Code") == "ConditionalCheckFailedException"
@@ -0,0 +1,261 @@
+"""監視するYouTubeチャンネルのレジストリの実装
+
+環境変数CHANNEL_REGISTRY_BACKENDで以下のいずれかを選択する:
+- parameter: Parameter Storeの1つのパラメータ(環境変数YOUTUBE_CHANNEL_ID_PARAMETER_NAME)に
+             保存したチャンネルのみを監視する(デフォルト、単一チャンネルの構成)
+- dynamodb: DynamoDBのテーブル(環境変数CHANNEL_REGISTRY_TABLE)に登録したチャンネルを監視する
+- local: 環境変数CHANNEL_REGISTRY_LOCAL_CHANNEL_IDS(カンマ区切り)のチャンネルを監視する
+         (ローカル開発・テスト・負荷試験用)
+"""
+
+import os
+import re
+import threading
+from typing import Any, Dict, List, NamedTuple, Protocol
+
+from aws_clients import get_guarded_client
+from lru_ttl_cache import LruTtlCache
+from ssm_utils import get_parameter_value
+
+# Google PubSubHubbub Hubに登録するトピックURLの接頭辞(チャンネルIDを付加する)
+TOPIC_URL_PREFIX = "https://www.youtube.com/xml/feeds/videos.xml?channel_id="
+
+# チャンネルIDとして有効な文字列
+CHANNEL_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+# DynamoDBのテーブルから取得したチャンネルをキャッシュするエントリー数の上限と有効期間(秒)
+CHANNEL_CACHE_MAX_ENTRIES = int(os.environ.get("CHANNEL_CACHE_MAX_ENTRIES", "1024"))
+CHANNEL_CACHE_TTL_SECONDS = float(os.environ.get("CHANNEL_CACHE_TTL_SECONDS", "300"))
+
+
+class Channel(NamedTuple):
+    """監視するYouTubeチャンネルとチャンネルごとの設定"""
+
+    # チャンネルID
+    channel_id: str
+    # 監視するかどうか(Falseの場合はサブスクリプションを登録せず、プッシュ通知も無視する)
+    enabled: bool = True
+    # サブスクリプションの有効期間(秒)、Noneの場合はデフォルト値
+    lease_seconds: int | None = None
+    # チャンネル名(ログ出力用)
+    name: str = ""
+
+
+# 登録されていないチャンネルのキャッシュ(LruTtlCacheはNoneを保存できないため)
+_NOT_REGISTERED = Channel(channel_id="", enabled=False)
+
+
+class ChannelRegistry(Protocol):
+    """チャンネルのレジストリのインターフェース"""
+
+    def get_channel(self, channel_id: str) -> Channel | None:
+        """
+        チャンネルIDからチャンネルを取得する
+
+        Returns:
+            Channel | None: チャンネル、登録されていない場合はNone
+        """
+
+    def list_channels(self) -> List[Channel]:
+        """
+        登録されているすべてのチャンネルを取得する
+
+        Returns:
+            List[Channel]: チャンネル
+        """
+
+
+class ParameterChannelRegistry:
+    """Parameter Storeの1つのパラメータに保存したチャンネルのみを登録済とするレジストリ"""
+
+    def __init__(self, parameter_name: str) -> None:
+        self.parameter_name: str = parameter_name
+
+    def get_channel(self, channel_id: str) -> Channel | None:
+        """パラメータのチャンネルIDと一致する場合のみチャンネルを返す"""
+        if channel_id != get_parameter_value(self.parameter_name):
+            return None
+        return Channel(channel_id)
+
+    def list_channels(self) -> List[Channel]:
+        """パラメータのチャンネルを返す"""
+        return [Channel(get_parameter_value(self.parameter_name))]
+
+
+class DynamoDBChannelRegistry:
+    """
+    DynamoDBのテーブルに登録したチャンネルのレジストリ
+    チャンネルIDをパーティションキーとし、チャンネルごとにGetItemで取得してキャッシュするため、
+    登録数に関わらずプッシュ通知ごとの参照はO(1)となる
+    """
+
+    def __init__(
+        self, table_name: str, cache_max_entries: int, cache_ttl_seconds: float
+    ) -> None:
+        self.table_name: str = table_name
+        self.cache_ttl_seconds: float = cache_ttl_seconds
+        self.cache = LruTtlCache(cache_max_entries)
+
+    def get_channel(self, channel_id: str) -> Channel | None:
+        """チャンネルをキャッシュ、またはGetItemで取得する(登録されていないこともキャッシュする)"""
+        cached: Channel | None = self.cache.get(channel_id)
+        if cached is None:
+            response: Dict[str, Any] = get_guarded_client("dynamodb").get_item(
+                TableName=self.table_name, Key={"channel_id": {"S": channel_id}}
+            )
+            item: Dict[str, Any] | None = response.get("Item")
+            cached = _item_to_channel(item) if item else _NOT_REGISTERED
+            self.cache.put(channel_id, cached, self.cache_ttl_seconds)
+        return None if cached is _NOT_REGISTERED else cached
+
+    def list_channels(self) -> List[Channel]:
+        """
+        すべてのチャンネルをScanで取得する
+        ページごとのScanをサーキットブレーカーを介して呼び出すため、ページネーターは使用しない
+        """
+        channels: List[Channel] = []
+        params: Dict[str, Any] = {"TableName": self.table_name}
+        while True:
+            page: Dict[str, Any] = get_guarded_client("dynamodb").scan(**params)
+            for item in page.get("Items", []):
+                channel: Channel = _item_to_channel(item)
+                self.cache.put(channel.channel_id, channel, self.cache_ttl_seconds)
+                channels.append(channel)
+            if "LastEvaluatedKey" not in page:
+                return channels
+            params["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
+
+class LocalChannelRegistry:
+    """プロセス内に保持したチャンネルのレジストリ"""
+
+    def __init__(self, channels: List[Channel]) -> None:
+        self.channels: Dict[str, Channel] = {c.channel_id: c for c in channels}
+
+    def get_channel(self, channel_id: str) -> Channel | None:
+        """保持したチャンネルを返す"""
+        return self.channels.get(channel_id)
+
+    def list_channels(self) -> List[Channel]:
+        """保持したすべてのチャンネルを返す"""
+        return list(self.channels.values())
+
+
+def build_topic_url(channel_id: str) -> str:
+    """
+    チャンネルIDからGoogle PubSubHubbub Hubに登録するトピックURLを生成する
+
+    Args:
+        channel_id (str): チャンネルID
+
+    Returns:
+        str: トピックURL
+    """
+    return f"{TOPIC_URL_PREFIX}{channel_id}"
+
+
+def parse_topic_url(topic_url: str) -> str | None:
+    """
+    トピックURLからチャンネルIDを取得する
+
+    Args:
+        topic_url (str): トピックURL
+
+    Returns:
+        str | None: チャンネルID、YouTubeチャンネルのトピックURLでない場合はNone
+    """
+    if not topic_url.startswith(TOPIC_URL_PREFIX):
+        return None
+    channel_id: str = topic_url[len(TOPIC_URL_PREFIX) :]
+    if not CHANNEL_ID_PATTERN.fullmatch(channel_id):
+        return None
+    return channel_id
+
+
+def _item_to_channel(item: Dict[str, Any]) -> Channel:
+    """
+    DynamoDBの項目をチャンネルに変換する
+
+    Args:
+        item (Dict[str, Any]): DynamoDBの項目
+
+    Returns:
+        Channel: チャンネル
+    """
+    return Channel(
+        channel_id=item["channel_id"]["S"],
+        enabled=item.get("enabled", {}).get("BOOL", True),
+        lease_seconds=(
+            int(item["lease_seconds"]["N"]) if "lease_seconds" in item else None
+        ),
+        name=item.get("name", {}).get("S", ""),
+    )
+
+
+# 生成済のレジストリ(バックエンド名 -> レジストリ)
+_registries: Dict[str, ChannelRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_channel_registry() -> ChannelRegistry:
+    """
+    環境変数CHANNEL_REGISTRY_BACKENDで選択したレジストリを取得する
+    初回呼び出し時に生成し、以降は同じレジストリを返す
+
+    Returns:
+        ChannelRegistry: レジストリ
+
+    Raises:
+        ValueError: CHANNEL_REGISTRY_BACKENDが不正な場合
+    """
+    backend_name: str = os.environ.get("CHANNEL_REGISTRY_BACKEND", "parameter")
+    registry: ChannelRegistry | None = _registries.get(backend_name)
+    if registry is not None:
+        return registry
+
+    with _registries_lock:
+        registry = _registries.get(backend_name)
+        if registry is None:
+            if backend_name == "parameter":
+                registry = ParameterChannelRegistry(
+                    os.environ["YOUTUBE_CHANNEL_ID_PARAMETER_NAME"]
+                )
+            elif backend_name == "dynamodb":
+                registry = DynamoDBChannelRegistry(
+                    os.environ["CHANNEL_REGISTRY_TABLE"],
+                    cache_max_entries=CHANNEL_CACHE_MAX_ENTRIES,
+                    cache_ttl_seconds=CHANNEL_CACHE_TTL_SECONDS,
+                )
+            elif backend_name == "local":
+                registry = LocalChannelRegistry(
+                    [
+                        Channel(channel_id.strip())
+                        for channel_id in os.environ.get(
+                            "CHANNEL_REGISTRY_LOCAL_CHANNEL_IDS", ""
+                        ).split(",")
+                        if channel_id.strip()
+                    ]
+                )
+            else:
+                raise ValueError(
+                    f"Unsupported CHANNEL_REGISTRY_BACKEND: {backend_name}"
+                )
+            _registries[backend_name] = registry
+    return registry
+
+
+def register_channel_registry(
+    backend_name: str, registry: ChannelRegistry | None
+) -> None:
+    """
+    CHANNEL_REGISTRY_BACKENDで選択できるレジストリを登録する(テスト・ベンチマーク用)
+
+    Args:
+        backend_name (str): バックエンド名
+        registry (ChannelRegistry | None): レジストリ、Noneの場合は登録を解除し、
+                                           次回取得時に生成し直す
+    """
+    if registry is None:
+        _registries.pop(backend_name, None)
+    else:
+        _registries[backend_name] = registry
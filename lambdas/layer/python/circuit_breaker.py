@@ -0,0 +1,265 @@
+"""依存サービスごとのサーキットブレーカー
+
+連続して失敗した依存サービスへの呼び出しを一定時間遮断し(オープン)、
+タイムアウトや再試行を待たずに即座に失敗させる
+遮断時間の経過後は一部の呼び出しのみを試行し(ハーフオープン)、成功した場合に遮断を解除する(クローズ)
+
+環境変数で以下を設定する(依存サービス名を大文字にした個別の設定が優先される):
+- CIRCUIT_BREAKER_ENABLED: サーキットブレーカーを使用するかどうか(デフォルト true)
+- CIRCUIT_BREAKER_[NAME_]FAILURE_THRESHOLD: オープンにする連続失敗回数(デフォルト 5)
+- CIRCUIT_BREAKER_[NAME_]RECOVERY_SECONDS: ハーフオープンにするまでの遮断時間(デフォルト 30 秒)
+- CIRCUIT_BREAKER_[NAME_]HALF_OPEN_MAX_CALLS: ハーフオープン時に同時に試行する呼び出し数(デフォルト 1)
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, TypeVar
+
+from metrics_utils import put_metric
+
+T = TypeVar("T")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# 依存サービスの障害とみなすAWSサービスのエラーコード(HTTPステータスコード5xx以外)
+THROTTLING_ERROR_CODES = frozenset(
+    [
+        "ProvisionedThroughputExceededException",
+        "RequestLimitExceeded",
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+    ]
+)
+
+
+class CircuitOpenError(Exception):
+    """サーキットブレーカーがオープンのため、依存サービスを呼び出さなかった場合の例外"""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(f"Circuit breaker is open: {name}")
+        self.name: str = name
+
+
+class CircuitBreaker:  # pylint: disable=too-many-instance-attributes
+    """依存サービスごとのサーキットブレーカー"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        recovery_seconds: float,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        """
+        Args:
+            name (str): 依存サービス名
+            failure_threshold (int): オープンにする連続失敗回数
+            recovery_seconds (float): オープンからハーフオープンにするまでの遮断時間(秒)
+            half_open_max_calls (int): ハーフオープン時に同時に試行する呼び出し数
+        """
+        self.name: str = name
+        self.failure_threshold: int = failure_threshold
+        self.recovery_seconds: float = recovery_seconds
+        self.half_open_max_calls: int = half_open_max_calls
+        self.state: str = STATE_CLOSED
+        self.failures: int = 0
+        self.opened_at: float = 0.0
+        self.half_open_calls: int = 0
+        self._lock = threading.Lock()
+
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        サーキットブレーカーを介して依存サービスを呼び出す
+
+        Args:
+            func (Callable[..., T]): 依存サービスを呼び出す関数
+            *args: funcの引数
+            **kwargs: funcのキーワード引数
+
+        Returns:
+            T: funcの戻り値
+
+        Raises:
+            CircuitOpenError: オープンのため呼び出さなかった場合
+        """
+        self.before_call()
+        try:
+            result: T = func(*args, **kwargs)
+        except Exception as e:
+            if is_dependency_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def before_call(self) -> None:
+        """
+        依存サービスを呼び出せるかどうかを判定する
+        遮断時間を経過したオープンの場合はハーフオープンにする
+
+        Raises:
+            CircuitOpenError: オープンか、ハーフオープンで試行中の呼び出し数が上限に達している場合
+        """
+        with self._lock:
+            if self.state == STATE_OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_seconds:
+                    raise CircuitOpenError(self.name)
+                self.state = STATE_HALF_OPEN
+                self.half_open_calls = 0
+            if self.state == STATE_HALF_OPEN:
+                if self.half_open_calls >= self.half_open_max_calls:
+                    raise CircuitOpenError(self.name)
+                self.half_open_calls += 1
+
+    def record_success(self) -> None:
+        """依存サービスの呼び出しの成功を記録し、クローズにする"""
+        with self._lock:
+            self.state = STATE_CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        """
+        依存サービスの呼び出しの失敗を記録する
+        ハーフオープンでの試行に失敗した場合か、連続失敗回数が閾値に達した場合はオープンにする
+        """
+        with self._lock:
+            self.failures += 1
+            if self.state == STATE_HALF_OPEN or (
+                self.state == STATE_CLOSED and self.failures >= self.failure_threshold
+            ):
+                self.state = STATE_OPEN
+                self.opened_at = time.monotonic()
+                put_metric(
+                    "CircuitBreakerOpened",
+                    1,
+                    dimensions={
+                        "FunctionName": os.environ.get(
+                            "AWS_LAMBDA_FUNCTION_NAME", "local"
+                        ),
+                        "Dependency": self.name,
+                    },
+                )
+
+
+class _GuardedClient:  # pylint: disable=too-few-public-methods
+    """メソッドの呼び出しをサーキットブレーカーを介して行うクライアントのプロキシ"""
+
+    def __init__(self, client: Any, breaker: CircuitBreaker) -> None:
+        self._client = client
+        self._breaker = breaker
+
+    def __getattr__(self, name: str) -> Any:
+        attr: Any = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def guarded(*args: Any, **kwargs: Any) -> Any:
+            return self._breaker.call(attr, *args, **kwargs)
+
+        return guarded
+
+
+def guard_client(client: Any, breaker: CircuitBreaker | None) -> Any:
+    """
+    クライアントのメソッドの呼び出しをサーキットブレーカーを介して行うようにする
+
+    Args:
+        client (Any): boto3のクライアント等
+        breaker (CircuitBreaker | None): サーキットブレーカー、Noneの場合はそのまま返す
+
+    Returns:
+        Any: サーキットブレーカーを介して呼び出すクライアント
+    """
+    if breaker is None:
+        return client
+    return _GuardedClient(client, breaker)
+
+
+def is_dependency_failure(error: Exception) -> bool:
+    """
+    依存サービスの障害による例外かどうかを判定する
+    タイムアウト・接続エラー・HTTPステータスコード5xx・スロットリングを障害とみなし、
+    条件付き書き込みの失敗等のリクエストに起因するエラーは障害とみなさない
+
+    Args:
+        error (Exception): 依存サービスの呼び出しで発生した例外
+
+    Returns:
+        bool: 依存サービスの障害の場合True、それ以外の場合False
+    """
+    response: Any = getattr(error, "response", None)
+    if isinstance(response, dict):
+        # boto3の例外
+        status: int = response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        code: str = response.get("Error", {}).get("Code", "")
+        return status >= 500 or code in THROTTLING_ERROR_CODES
+    status_code: int | None = getattr(response, "status_code", None)
+    if status_code is not None:
+        # requestsの例外
+        return status_code >= 500 or status_code == 429
+    return True
+
+
+# 生成済のサーキットブレーカー(依存サービス名 -> サーキットブレーカー)
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker | None:
+    """
+    依存サービスのサーキットブレーカーを取得する
+    初回呼び出し時に環境変数の設定で生成し、以降は同じサーキットブレーカーを返す
+
+    Args:
+        name (str): 依存サービス名(例: youtube, sns, dynamodb)
+
+    Returns:
+        CircuitBreaker | None: サーキットブレーカー、使用しない場合はNone
+    """
+    if os.environ.get("CIRCUIT_BREAKER_ENABLED", "true").lower() != "true":
+        return None
+    breaker: CircuitBreaker | None = _breakers.get(name)
+    if breaker is not None:
+        return breaker
+
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=int(_get_setting(name, "FAILURE_THRESHOLD", "5")),
+                recovery_seconds=float(_get_setting(name, "RECOVERY_SECONDS", "30")),
+                half_open_max_calls=int(_get_setting(name, "HALF_OPEN_MAX_CALLS", "1")),
+            )
+            _breakers[name] = breaker
+    return breaker
+
+
+def reset_circuit_breakers() -> None:
+    """生成済のサーキットブレーカーを破棄する(テスト・ベンチマーク用)"""
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def _get_setting(name: str, key: str, default: str) -> str:
+    """
+    サーキットブレーカーの設定を環境変数から取得する
+
+    Args:
+        name (str): 依存サービス名
+        key (str): 設定名
+        default (str): デフォルト値
+
+    Returns:
+        str: 依存サービスごとの設定、共通の設定、デフォルト値の順に最初に存在する値
+    """
+    return os.environ.get(
+        f"CIRCUIT_BREAKER_{name.upper()}_{key}",
+        os.environ.get(f"CIRCUIT_BREAKER_{key}", default),
+    )
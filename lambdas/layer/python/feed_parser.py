@@ -0,0 +1,158 @@
+"""WebSubでプッシュ通知されるAtomフィードのストリーミングパーサー
+
+公開エンドポイントで受信する任意のペイロードを解析するため、以下の制限を設ける:
+- 本文のサイズ、要素の深さ、entry数の上限
+- DOCTYPE宣言の禁止(エンティティの宣言・展開、外部エンティティの参照を防ぐ)
+ツリーは構築せず、entryごとに必要な要素のテキストのみを収集する
+"""
+
+import logging
+import os
+from typing import Dict, List, NamedTuple
+from xml.parsers import expat
+
+logger = logging.getLogger()
+
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+YT_NAMESPACE = "http://www.youtube.com/xml/schemas/2015"
+TOMBSTONES_NAMESPACE = "http://purl.org/atompub/tombstones/1.0"
+
+# 削除・非公開にされた動画のat:deleted-entryのref属性の接頭辞
+DELETED_ENTRY_REF_PREFIX = "yt:video:"
+
+# 本文のサイズの上限(バイト)
+FEED_MAX_BODY_BYTES = int(os.environ.get("FEED_MAX_BODY_BYTES", "262144"))
+
+# 要素の深さの上限
+FEED_MAX_DEPTH = int(os.environ.get("FEED_MAX_DEPTH", "16"))
+
+# 解析するentry数の上限、上限に達した時点で解析を打ち切る
+FEED_MAX_ENTRIES = int(os.environ.get("FEED_MAX_ENTRIES", "50"))
+
+# パーサーに一度に渡すバイト数
+FEED_CHUNK_BYTES = 16384
+
+# entry直下の収集する要素(名前空間付きの要素名 -> 解析結果のキー)
+_ENTRY_FIELDS: Dict[str, str] = {
+    f"{YT_NAMESPACE} videoId": "video_id",
+    f"{YT_NAMESPACE} channelId": "channel_id",
+    f"{ATOM_NAMESPACE} title": "title",
+}
+
+
+class FeedLimitError(ValueError):
+    """Atomフィードが解析の制限を超えた場合の例外"""
+
+
+class Feed(NamedTuple):
+    """Atomフィードの解析結果"""
+
+    # entryごとの解析結果(video_id, channel_id, title)、要素が存在しない場合はキーを含めない
+    entries: List[Dict[str, str]]
+    # at:deleted-entry(削除・非公開にされた動画)のビデオID
+    deleted_video_ids: List[str]
+
+
+class _StopParsing(Exception):
+    """必要な要素をすべて収集し、以降の解析を打ち切る場合の例外"""
+
+
+class _FeedHandler:
+    """expatのイベントを受け取り、entryごとに必要な要素のテキストを収集する"""
+
+    def __init__(self) -> None:
+        self.depth: int = 0
+        self.entries: List[Dict[str, str]] = []
+        self.deleted_video_ids: List[str] = []
+        self.entry: Dict[str, str] | None = None
+        self.field: str | None = None
+        self.text: List[str] = []
+
+    def start_element(self, name: str, attributes: Dict[str, str]) -> None:
+        """要素の開始"""
+        self.depth += 1
+        if self.depth > FEED_MAX_DEPTH:
+            raise FeedLimitError(f"XML depth exceeds {FEED_MAX_DEPTH}")
+
+        # feed直下のentry・at:deleted-entry、entry直下の未収集の要素のみを対象とする
+        if self.depth == 2 and name == f"{ATOM_NAMESPACE} entry":
+            self.entry = {}
+        elif self.depth == 2 and name == f"{TOMBSTONES_NAMESPACE} deleted-entry":
+            ref: str = attributes.get("ref", "")
+            if ref.startswith(DELETED_ENTRY_REF_PREFIX):
+                self.deleted_video_ids.append(ref[len(DELETED_ENTRY_REF_PREFIX) :])
+        elif (
+            self.depth == 3
+            and self.entry is not None
+            and _ENTRY_FIELDS.get(name) not in (None, *self.entry)
+        ):
+            self.field = _ENTRY_FIELDS[name]
+            self.text = []
+
+    def end_element(self, _name: str) -> None:
+        """要素の終了"""
+        if self.depth == 3 and self.field is not None:
+            self.entry[self.field] = "".join(self.text)
+            self.field = None
+        elif self.depth == 2 and self.entry is not None:
+            self.entries.append(self.entry)
+            self.entry = None
+            if len(self.entries) >= FEED_MAX_ENTRIES:
+                logger.warning(
+                    "Feed reached %d entries, ignoring the rest", FEED_MAX_ENTRIES
+                )
+                raise _StopParsing()
+        elif self.depth == 1:
+            raise _StopParsing()
+        self.depth -= 1
+
+    def character_data(self, data: str) -> None:
+        """テキスト"""
+        if self.field is not None:
+            self.text.append(data)
+
+    def reject_doctype(self, *_args: object) -> None:
+        """DOCTYPE宣言・エンティティ宣言を拒否する"""
+        raise FeedLimitError("DOCTYPE is not allowed")
+
+
+def parse_feed(body: bytes) -> Feed:
+    """
+    Atomフィードの本文を先頭から順に解析し、entryごとにビデオID・チャンネルID・タイトルを、
+    at:deleted-entryごとにビデオIDを取得する
+    ルート要素の終了、またはentry数が上限に達した時点で以降の解析を打ち切る
+
+    Args:
+        body (bytes): Atomフィードの本文
+
+    Returns:
+        Feed: 解析結果
+
+    Raises:
+        FeedLimitError: 解析の制限を超えた場合
+        ValueError: XMLとして不正な場合
+    """
+    if len(body) > FEED_MAX_BODY_BYTES:
+        raise FeedLimitError(f"XML body exceeds {FEED_MAX_BODY_BYTES} bytes")
+
+    handler = _FeedHandler()
+    parser = expat.ParserCreate(namespace_separator=" ")
+    parser.SetParamEntityParsing(expat.XML_PARAM_ENTITY_PARSING_NEVER)
+    parser.StartDoctypeDeclHandler = handler.reject_doctype
+    parser.EntityDeclHandler = handler.reject_doctype
+    parser.StartElementHandler = handler.start_element
+    parser.EndElementHandler = handler.end_element
+    parser.CharacterDataHandler = handler.character_data
+
+    # 本文をコピーせずに分割してパーサーに渡す
+    view = memoryview(body)
+    try:
+        for offset in range(0, len(view), FEED_CHUNK_BYTES):
+            parser.Parse(view[offset : offset + FEED_CHUNK_BYTES], False)
+        parser.Parse(b"", True)
+    except _StopParsing:
+        pass
+    except expat.ExpatError as e:
+        raise ValueError(f"Invalid XML: {e}") from e
+
+    return Feed(handler.entries, handler.deleted_video_ids)
@@ -0,0 +1,99 @@
+"""WebSubのHMACシークレットのローテーション用のユーティリティ関数"""
+
+import json
+import logging
+import time
+from typing import Any, Dict
+
+from parameter_backends import ParameterNotFoundError
+from ssm_utils import DEFAULT_CACHE_TTL_SECONDS, get_parameter_value
+
+logger = logging.getLogger()
+
+
+def get_current_hmac_secret(
+    parameter_name: str, ttl_seconds: float | None = None
+) -> str | None:
+    """
+    現在のHMACシークレットを取得する
+
+    Args:
+        parameter_name (str): 現在のHMACシークレットのパラメータ名
+        ttl_seconds (float | None): キャッシュ有効期間(秒)、Noneの場合はデフォルト値
+
+    Returns:
+        str | None: 現在のHMACシークレット、パラメータが存在しない場合はNone
+    """
+    return _get_parameter_value_or_none(parameter_name, ttl_seconds)
+
+
+def get_previous_hmac_secret(
+    parameter_name: str, ttl_seconds: float | None = None
+) -> str | None:
+    """
+    ローテーション前のHMACシークレットを、並行利用期間内の場合のみ取得する
+    パラメータは初回のローテーションまで存在しないため、ttl_secondsで再取得を求められても、
+    存在しないことはデフォルトのキャッシュ有効期間の間キャッシュする
+
+    Args:
+        parameter_name (str): ローテーション前のHMACシークレットのパラメータ名
+        ttl_seconds (float | None): キャッシュ有効期間(秒)、Noneの場合はデフォルト値
+
+    Returns:
+        str | None: ローテーション前のHMACシークレット、
+                    パラメータが存在しないか並行利用期間を過ぎた場合はNone
+    """
+    value: str | None = _get_parameter_value_or_none(
+        parameter_name, ttl_seconds, DEFAULT_CACHE_TTL_SECONDS
+    )
+    if value is None:
+        return None
+
+    try:
+        previous: Dict[str, Any] = json.loads(value)
+        secret: str = previous["secret"]
+        expires_at: int = int(previous["expires_at"])
+    except (ValueError, TypeError, KeyError):
+        logger.warning("Invalid previous HMAC secret format: %s", parameter_name)
+        return None
+
+    if time.time() >= expires_at:
+        return None
+    return secret
+
+
+def encode_previous_hmac_secret(secret: str, expires_at: int) -> str:
+    """
+    ローテーション前のHMACシークレットを、並行利用期間の期限とともにパラメータ値に変換する
+
+    Args:
+        secret (str): ローテーション前のHMACシークレット
+        expires_at (int): 並行利用期間の期限(Unix timestamp 形式)
+
+    Returns:
+        str: パラメータ値(JSON形式)
+    """
+    return json.dumps({"secret": secret, "expires_at": expires_at})
+
+
+def _get_parameter_value_or_none(
+    parameter_name: str,
+    ttl_seconds: float | None,
+    not_found_ttl_seconds: float | None = None,
+) -> str | None:
+    """
+    パラメータ値を取得し、パラメータが存在しない場合はNoneを返す
+
+    Args:
+        parameter_name (str): パラメータ名
+        ttl_seconds (float | None): キャッシュ有効期間(秒)、Noneの場合はデフォルト値
+        not_found_ttl_seconds (float | None):
+            パラメータが存在しないことのキャッシュ有効期間(秒)、Noneの場合はttl_seconds
+
+    Returns:
+        str | None: パラメータ値、パラメータが存在しない場合はNone
+    """
+    try:
+        return get_parameter_value(parameter_name, ttl_seconds, not_found_ttl_seconds)
+    except ParameterNotFoundError:
+        return None
@@ -0,0 +1,96 @@
+"""ウォームコンテナ間で再利用するHTTPセッションのユーティリティ関数"""
+
+import os
+from functools import lru_cache
+from typing import Any, Tuple
+
+# コネクションプールのサイズ(ホストごとの最大接続数)
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "10"))
+
+# 接続タイムアウト(秒)
+HTTP_CONNECT_TIMEOUT_SECONDS = float(
+    os.environ.get("HTTP_CONNECT_TIMEOUT_SECONDS", "3.05")
+)
+
+# 読み込みタイムアウト(秒)
+HTTP_READ_TIMEOUT_SECONDS = float(os.environ.get("HTTP_READ_TIMEOUT_SECONDS", "10"))
+
+# gzip圧縮されたレスポンスを要求するかどうか
+HTTP_ACCEPT_GZIP = os.environ.get("HTTP_ACCEPT_GZIP", "true").lower() == "true"
+
+
+@lru_cache(maxsize=1)
+def get_http_session() -> Any:
+    """
+    HTTPセッションを取得する
+    初回呼び出し時にrequestsをインポートしてセッションを生成し、以降は同じセッションを返す
+    同じホストへの接続はKeep-Aliveで再利用し、TCP・TLSのハンドシェイクを省略する
+
+    Returns:
+        Any: requestsのセッション
+    """
+    # requestsのインポートはコールドスタート時間を要するため、初回使用時まで遅延させる
+    import requests  # pylint: disable=import-outside-toplevel
+    from requests.adapters import HTTPAdapter  # pylint: disable=import-outside-toplevel
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_MAXSIZE, pool_maxsize=HTTP_POOL_MAXSIZE
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    # Google APIはUser-Agentに"gzip"を含む場合のみgzip圧縮したレスポンスを返す
+    # gzipを要求しない場合は、展開の処理を省くため非圧縮のレスポンスを要求する
+    if HTTP_ACCEPT_GZIP:
+        session.headers["Accept-Encoding"] = "gzip"
+        session.headers["User-Agent"] = "YTLiveMetaData/1.0 (gzip)"
+    else:
+        session.headers["Accept-Encoding"] = "identity"
+    return session
+
+
+def http_get(url: str, **kwargs: Any) -> Any:
+    """
+    HTTPセッションでGETリクエストを送信する
+
+    Args:
+        url (str): URL
+        **kwargs: requests.Session.getの引数、timeoutを省略した場合はデフォルト値
+
+    Returns:
+        Any: requestsのレスポンス
+    """
+    kwargs.setdefault("timeout", get_http_timeout())
+    return get_http_session().get(url, **kwargs)
+
+
+def http_post(url: str, **kwargs: Any) -> Any:
+    """
+    HTTPセッションでPOSTリクエストを送信する
+
+    Args:
+        url (str): URL
+        **kwargs: requests.Session.postの引数、timeoutを省略した場合はデフォルト値
+
+    Returns:
+        Any: requestsのレスポンス
+    """
+    kwargs.setdefault("timeout", get_http_timeout())
+    return get_http_session().post(url, **kwargs)
+
+
+def get_http_timeout(read_timeout: float | None = None) -> Tuple[float, float]:
+    """
+    HTTPリクエストのタイムアウトを取得する
+
+    Args:
+        read_timeout (float | None): 読み込みタイムアウト(秒)、Noneの場合はデフォルト値
+
+    Returns:
+        Tuple[float, float]: (接続タイムアウト(秒), 読み込みタイムアウト(秒))
+    """
+    return (
+        HTTP_CONNECT_TIMEOUT_SECONDS,
+        HTTP_READ_TIMEOUT_SECONDS if read_timeout is None else read_timeout,
+    )
@@ -0,0 +1,85 @@
+"""エントリー数の上限と、エントリーごとの有効期間をもつプロセス内のLRUキャッシュ"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Dict, Tuple
+
+
+class LruTtlCache:
+    """
+    エントリー数の上限と、エントリーごとの有効期間をもつプロセス内のLRUキャッシュ
+    ウォームコンテナ間で共有し、上限を超えた場合は最も長く参照されていないエントリーを破棄する
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        """
+        Args:
+            max_entries (int): エントリー数の上限、0以下の場合はキャッシュしない
+        """
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        # キー -> (値, 有効期限(time.monotonic()基準))
+        self._entries: OrderedDict[Hashable, Tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        """
+        有効期間内のエントリーの値を取得し、ヒット数・ミス数を記録する
+
+        Args:
+            key (Hashable): キー
+
+        Returns:
+            Any | None: 有効期間内のエントリーの値、存在しないか有効期間切れの場合はNone
+        """
+        with self._lock:
+            entry: Tuple[Any, float] | None = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, ttl_seconds: float) -> None:
+        """
+        エントリーを有効期間とともに保存する
+
+        Args:
+            key (Hashable): キー
+            value (Any): 値(Noneは保存できない)
+            ttl_seconds (float): 有効期間(秒)、0以下の場合は保存しない
+        """
+        if self.max_entries <= 0 or ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """すべてのエントリーを破棄し、ヒット数・ミス数をリセットする"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        キャッシュの統計情報を取得する
+
+        Returns:
+            Dict[str, int]: エントリー数、ヒット数、ミス数
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,132 @@
+"""Amazon CloudWatch Embedded Metric Format(EMF)でメトリクスを出力するユーティリティ関数"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Protocol, Tuple
+
+# メトリクスの名前空間
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "YTLiveMetaData")
+
+
+class MetricCollector(Protocol):  # pylint: disable=too-few-public-methods
+    """ハンドラーの呼び出し中のメトリクスを、終了時にまとめて出力するために記録する記録先"""
+
+    def record_metric(self, metric_name: str, value: float, unit: str) -> None:
+        """
+        関数名のみをディメンションとするメトリクスを記録する
+
+        Args:
+            metric_name (str): メトリクス名
+            value (float): 値
+            unit (str): 単位
+        """
+
+
+class _ActiveCollector:  # pylint: disable=too-few-public-methods
+    """呼び出し中のハンドラーのメトリクスの記録先"""
+
+    # stage_metricsのtimed_handlerが、ハンドラーの呼び出し中のみ設定する
+    # スレッドプールのスレッドからも記録できるようにするため、モジュールで共有する
+    current: MetricCollector | None = None
+
+
+def set_metric_collector(collector: MetricCollector | None) -> None:
+    """
+    関数名のみをディメンションとするメトリクスを、標準出力に書き込まずに記録する記録先を設定する
+
+    Args:
+        collector (MetricCollector | None): 記録先、Noneの場合は標準出力に書き込む
+    """
+    _ActiveCollector.current = collector
+
+
+def put_metric(
+    metric_name: str,
+    value: float,
+    unit: str = "Count",
+    dimensions: Dict[str, str] | None = None,
+) -> None:
+    """
+    メトリクスをEMF形式で標準出力に書き込む
+    Lambda関数の標準出力はCloudWatch Logsに送られ、CloudWatchがメトリクスとして抽出する
+    ハンドラーの呼び出し中は、ディメンションを指定しない場合は記録先に記録し、
+    ハンドラーの終了時にステージごとの所要時間とともに1行で出力する
+
+    Args:
+        metric_name (str): メトリクス名
+        value (float): 値
+        unit (str): 単位(例: Count, Milliseconds)
+        dimensions (Dict[str, str] | None): ディメンション、Noneの場合は関数名のみ
+    """
+    put_metrics({metric_name: (value, unit)}, dimensions)
+
+
+def put_metrics(
+    metrics: Dict[str, Tuple[float, str]],
+    dimensions: Dict[str, str] | None = None,
+    properties: Dict[str, Any] | None = None,
+    function_metrics: Dict[str, Tuple[float | List[float], str]] | None = None,
+) -> None:
+    """
+    同じディメンションの複数のメトリクスをEMF形式の1行で標準出力に書き込む
+    ハンドラーの呼び出し中は、ディメンション・検索用の値を指定しない場合は記録先に記録し、
+    ハンドラーの終了時にステージごとの所要時間とともに1行で出力する
+
+    Args:
+        metrics (Dict[str, Tuple[float, str]]): メトリクス名 -> (値, 単位)
+        dimensions (Dict[str, str] | None): ディメンション、Noneの場合は関数名のみ
+        properties (Dict[str, Any] | None): メトリクスとして抽出しない、
+            CloudWatch Logs Insightsで検索するための値
+        function_metrics (Dict[str, Tuple[float | List[float], str]] | None):
+            dimensionsとは別に、関数名のみをディメンションとして同じ行に出力するメトリクス
+            (メトリクス名 -> (値または値のリスト, 単位))
+    """
+    collector: MetricCollector | None = _ActiveCollector.current
+    if collector is not None and dimensions is None and properties is None:
+        for metric_name, (value, unit) in metrics.items():
+            collector.record_metric(metric_name, value, unit)
+        return
+
+    dimension_values: Dict[str, str] = dimensions or {
+        "FunctionName": os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "local")
+    }
+    directives: List[Dict[str, Any]] = [
+        {
+            "Namespace": METRICS_NAMESPACE,
+            "Dimensions": [list(dimension_values)],
+            "Metrics": [
+                {"Name": metric_name, "Unit": unit}
+                for metric_name, (_, unit) in metrics.items()
+            ],
+        }
+    ]
+    if function_metrics:
+        directives.append(
+            {
+                "Namespace": METRICS_NAMESPACE,
+                "Dimensions": [["FunctionName"]],
+                "Metrics": [
+                    {"Name": metric_name, "Unit": unit}
+                    for metric_name, (_, unit) in function_metrics.items()
+                ],
+            }
+        )
+    print(
+        json.dumps(
+            {
+                "_aws": {
+                    "Timestamp": int(time.time() * 1000),
+                    "CloudWatchMetrics": directives,
+                },
+                **(properties or {}),
+                **{
+                    metric_name: value
+                    for metric_name, (value, _) in (function_metrics or {}).items()
+                },
+                **dimension_values,
+                **{metric_name: value for metric_name, (value, _) in metrics.items()},
+            }
+        ),
+        flush=True,
+    )
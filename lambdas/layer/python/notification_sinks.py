@@ -0,0 +1,379 @@
+"""通知先(シンク)と、すべての通知先に並行して通知するディスパッチャーの実装
+
+環境変数NOTIFICATION_SINKS(カンマ区切り)で、SMSに加えて以下の通知先を選択する:
+- webhook: パラメータ(環境変数NOTIFICATION_WEBHOOK_URL_PARAMETER_NAME)のURLにJSONをPOSTする
+- sns_topic: SNSトピック(環境変数NOTIFICATION_TOPIC_ARN)に発行する
+- memory: プロセス内のリストに保持する(ローカル開発・テスト・負荷試験用)
+
+SMSは通知に失敗した場合に呼び出し元が再試行する必須の通知先とし、呼び出し元のスレッドで送信する
+その他の通知先はスレッドプールでSMSと並行に送信し、SMSの送信後に通知先ごとのタイムアウトまで完了を待機する
+Lambda関数の応答後は実行環境が凍結されるため、応答後に送信を続けることはしない
+その他の通知先は失敗してもログとメトリクスに記録するのみとし、遅い通知先がSMSを遅延させることはない
+
+通知先ごとの設定は、通知先名を大文字にした個別の環境変数が優先される:
+- NOTIFICATION_SINK_[NAME_]TIMEOUT_SECONDS: タイムアウト(デフォルト 5 秒)
+- NOTIFICATION_SINK_[NAME_]MAX_ATTEMPTS: 最大試行回数(デフォルト 2 回、
+  SMSはSNSクライアントが再試行するためデフォルト 1 回)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Protocol, Tuple
+
+from aws_clients import get_guarded_client
+from circuit_breaker import CircuitOpenError
+from http_session import get_http_timeout, http_post
+from metrics_utils import put_metric
+from sms_fanout import publish_sms
+from ssm_utils import get_parameter_value
+from stage_metrics import stage
+
+logger = logging.getLogger()
+
+# 必須でない通知先に並行して送信する上限
+NOTIFICATION_DISPATCH_CONCURRENCY = int(
+    os.environ.get("NOTIFICATION_DISPATCH_CONCURRENCY", "4")
+)
+
+# 再試行の初回待機時間(秒)
+RETRY_BASE_DELAY_SECONDS = 0.2
+
+# SNSトピックに発行するメッセージの件名の上限(文字数)
+SNS_SUBJECT_MAX_LENGTH = 100
+
+# ウォームコンテナ間で共有するスレッドプール(スレッドは必要になった時点で生成される)
+_executor = ThreadPoolExecutor(
+    max_workers=NOTIFICATION_DISPATCH_CONCURRENCY, thread_name_prefix="notification"
+)
+
+
+class Notification(NamedTuple):
+    """通知内容"""
+
+    # 件名(SNSトピックの件名等)
+    subject: str
+    # 本文(SMSのメッセージ等)
+    message: str
+    # 構造化した通知内容(Webhookに送信するJSON等)
+    data: Dict[str, str]
+
+
+class NotificationSink(Protocol):  # pylint: disable=too-few-public-methods
+    """通知先のインターフェース"""
+
+    def send(self, notification: Notification, timeout_seconds: float) -> None:
+        """
+        通知する
+
+        Args:
+            notification (Notification): 通知内容
+            timeout_seconds (float): タイムアウト(秒)
+
+        Raises:
+            Exception: 通知に失敗した場合
+        """
+
+
+class SmsSink:  # pylint: disable=too-few-public-methods
+    """通知先のすべての電話番号にSMS通知する通知先"""
+
+    def __init__(
+        self,
+        get_phone_numbers: Callable[[], List[str]],
+        get_sns_client: Callable[[], Any],
+    ) -> None:
+        """
+        Args:
+            get_phone_numbers (Callable[[], List[str]]): 通知先の電話番号を取得する関数
+            get_sns_client (Callable[[], Any]): SNSクライアントを取得する関数
+        """
+        self.get_phone_numbers = get_phone_numbers
+        self.get_sns_client = get_sns_client
+
+    def send(self, notification: Notification, timeout_seconds: float) -> None:
+        """本文をSMS通知する(タイムアウトはSNSクライアントの設定に従う)"""
+        publish_sms(
+            self.get_sns_client(), self.get_phone_numbers(), notification.message
+        )
+
+
+class WebhookSink:  # pylint: disable=too-few-public-methods
+    """HTTPSのWebhookに構造化した通知内容をJSONでPOSTする通知先"""
+
+    def __init__(self, url_parameter_name: str) -> None:
+        """
+        Args:
+            url_parameter_name (str): WebhookのURLを保存したパラメータ名
+        """
+        self.url_parameter_name: str = url_parameter_name
+
+    def send(self, notification: Notification, timeout_seconds: float) -> None:
+        """構造化した通知内容をPOSTし、2xx以外の場合は例外を送出する"""
+        url: str = get_parameter_value(self.url_parameter_name)
+        with stage("Webhook"):
+            response = http_post(
+                url,
+                data=json.dumps(
+                    {"subject": notification.subject, **notification.data},
+                    ensure_ascii=False,
+                ).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                timeout=get_http_timeout(timeout_seconds),
+            )
+            response.raise_for_status()
+
+
+class SnsTopicSink:  # pylint: disable=too-few-public-methods
+    """SNSトピックに発行する通知先"""
+
+    def __init__(self, topic_arn: str) -> None:
+        """
+        Args:
+            topic_arn (str): SNSトピックのARN
+        """
+        self.topic_arn: str = topic_arn
+
+    def send(self, notification: Notification, timeout_seconds: float) -> None:
+        """件名・本文を、SMSと共通のサーキットブレーカーを介して発行する"""
+        get_guarded_client("sns").publish(
+            TopicArn=self.topic_arn,
+            Subject=notification.subject[:SNS_SUBJECT_MAX_LENGTH] or "YTLiveMetaData",
+            Message=notification.message,
+        )
+
+
+class InMemorySink:  # pylint: disable=too-few-public-methods
+    """プロセス内のリストに通知内容を保持する通知先"""
+
+    def __init__(self) -> None:
+        self.notifications: List[Notification] = []
+        self._lock = threading.Lock()
+
+    def send(self, notification: Notification, timeout_seconds: float) -> None:
+        """通知内容を保持する"""
+        with self._lock:
+            self.notifications.append(notification)
+
+
+class SinkPolicy(NamedTuple):
+    """通知先ごとの送信設定"""
+
+    # 通知先名(ログ・メトリクスのディメンション)
+    name: str
+    # タイムアウト(秒)
+    timeout_seconds: float
+    # 最大試行回数
+    max_attempts: int
+    # 必須の通知先かどうか(失敗した場合に例外を送出する)
+    required: bool
+
+
+class NotificationDispatcher:  # pylint: disable=too-few-public-methods
+    """すべての通知先に並行して通知するディスパッチャー"""
+
+    def __init__(self, sinks: List[Tuple[NotificationSink, SinkPolicy]]) -> None:
+        """
+        Args:
+            sinks (List[Tuple[NotificationSink, SinkPolicy]]): 通知先と送信設定
+        """
+        self.sinks: List[Tuple[NotificationSink, SinkPolicy]] = sinks
+
+    def dispatch(self, notification: Notification) -> Dict[str, Exception]:
+        """
+        すべての通知先に通知する
+        必須でない通知先をスレッドプールで送信しながら、必須の通知先を呼び出し元のスレッドで
+        送信し、その後に必須でない通知先の完了を通知先ごとのタイムアウトまで待機する
+        タイムアウトまでに完了しない通知先は失敗として記録する
+
+        Args:
+            notification (Notification): 通知内容
+
+        Returns:
+            Dict[str, Exception]: 通知に失敗した必須でない通知先名 -> 例外
+
+        Raises:
+            Exception: 必須の通知先への通知に失敗した場合
+        """
+        now: float = time.monotonic()
+        futures: List[Tuple[SinkPolicy, float, Future]] = [
+            (
+                policy,
+                now + policy.timeout_seconds,
+                _executor.submit(
+                    _send_with_retry,
+                    sink,
+                    policy,
+                    notification,
+                    now + policy.timeout_seconds,
+                ),
+            )
+            for sink, policy in self.sinks
+            if not policy.required
+        ]
+        for sink, policy in self.sinks:
+            if policy.required:
+                _send_with_retry(
+                    sink,
+                    policy,
+                    notification,
+                    time.monotonic() + policy.timeout_seconds,
+                )
+
+        failed: Dict[str, Exception] = {}
+        for policy, deadline, future in futures:
+            try:
+                future.result(timeout=max(deadline - time.monotonic(), 0))
+            except TimeoutError:
+                # 未開始の送信は取り消し、応答後に送信を開始しないようにする
+                future.cancel()
+                failed[policy.name] = TimeoutError(
+                    f"Notification sink timed out: {policy.name}"
+                )
+            except Exception as e:
+                failed[policy.name] = e
+        for name, e in failed.items():
+            logger.warning("Failed to notify %s: %s", name, e)
+            put_metric(
+                "NotificationSinkFailed",
+                1,
+                dimensions={
+                    "FunctionName": os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "local"),
+                    "Sink": name,
+                },
+            )
+        return failed
+
+
+def _send_with_retry(
+    sink: NotificationSink,
+    policy: SinkPolicy,
+    notification: Notification,
+    deadline: float,
+) -> None:
+    """
+    タイムアウトまでの間、指数バックオフで再試行しながら通知する
+    サーキットブレーカーがオープンの場合は再試行しない
+
+    Args:
+        sink (NotificationSink): 通知先
+        policy (SinkPolicy): 送信設定
+        notification (Notification): 通知内容
+        deadline (float): タイムアウトの期限(time.monotonic()の値)
+
+    Raises:
+        Exception: 最大試行回数に達した場合、またはタイムアウトまでに再試行できない場合
+    """
+    for attempt in range(policy.max_attempts):
+        try:
+            sink.send(notification, max(deadline - time.monotonic(), 0.001))
+            return
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            delay: float = RETRY_BASE_DELAY_SECONDS * (2**attempt)
+            if (
+                attempt + 1 >= policy.max_attempts
+                or time.monotonic() + delay >= deadline
+            ):
+                raise
+            logger.warning(
+                "Retrying notification to %s in %.1f seconds: %s",
+                policy.name,
+                delay,
+                e,
+            )
+            time.sleep(delay)
+
+
+# register_notification_sinkで登録した通知先(通知先名 -> 通知先)
+_registered_sinks: Dict[str, NotificationSink] = {}
+
+
+def create_notification_dispatcher(
+    sms_sink: NotificationSink,
+) -> NotificationDispatcher:
+    """
+    SMSと、環境変数NOTIFICATION_SINKSで選択した通知先に通知するディスパッチャーを生成する
+
+    Args:
+        sms_sink (NotificationSink): SMSの通知先(呼び出し元の電話番号・SNSクライアントを使用する)
+
+    Returns:
+        NotificationDispatcher: ディスパッチャー
+
+    Raises:
+        ValueError: NOTIFICATION_SINKSに未対応の通知先が含まれる場合
+    """
+    sinks: List[Tuple[NotificationSink, SinkPolicy]] = [
+        (
+            _registered_sinks.get("sms", sms_sink),
+            _get_policy("sms", required=True, default_max_attempts="1"),
+        )
+    ]
+    for name in os.environ.get("NOTIFICATION_SINKS", "").split(","):
+        name = name.strip()
+        if not name or name == "sms":
+            continue
+        sink: NotificationSink | None = _registered_sinks.get(name)
+        if sink is None:
+            if name == "webhook":
+                sink = WebhookSink(
+                    os.environ["NOTIFICATION_WEBHOOK_URL_PARAMETER_NAME"]
+                )
+            elif name == "sns_topic":
+                sink = SnsTopicSink(os.environ["NOTIFICATION_TOPIC_ARN"])
+            elif name == "memory":
+                sink = InMemorySink()
+            else:
+                raise ValueError(f"Unsupported notification sink: {name}")
+        sinks.append((sink, _get_policy(name, required=False)))
+    return NotificationDispatcher(sinks)
+
+
+def register_notification_sink(name: str, sink: NotificationSink | None) -> None:
+    """
+    NOTIFICATION_SINKSで選択できる通知先を登録する(テスト・ベンチマーク用)
+    smsを登録した場合は、呼び出し元のSMSの通知先の代わりに使用する
+    登録はcreate_notification_dispatcherの呼び出し時に反映される
+
+    Args:
+        name (str): 通知先名
+        sink (NotificationSink | None): 通知先、Noneの場合は登録を解除する
+    """
+    if sink is None:
+        _registered_sinks.pop(name, None)
+    else:
+        _registered_sinks[name] = sink
+
+
+def _get_policy(
+    name: str, required: bool, default_max_attempts: str = "2"
+) -> SinkPolicy:
+    """
+    通知先の送信設定を環境変数から取得する
+
+    Args:
+        name (str): 通知先名
+        required (bool): 必須の通知先かどうか
+        default_max_attempts (str): 最大試行回数のデフォルト値
+
+    Returns:
+        SinkPolicy: 通知先ごとの設定、共通の設定、デフォルト値の順に最初に存在する値の送信設定
+    """
+
+    def get_setting(key: str, default: str) -> str:
+        return os.environ.get(
+            f"NOTIFICATION_SINK_{name.upper()}_{key}",
+            os.environ.get(f"NOTIFICATION_SINK_{key}", default),
+        )
+
+    return SinkPolicy(
+        name=name,
+        timeout_seconds=float(get_setting("TIMEOUT_SECONDS", "5")),
+        max_attempts=int(get_setting("MAX_ATTEMPTS", default_max_attempts)),
+        required=required,
+    )
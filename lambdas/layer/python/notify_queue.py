@@ -0,0 +1,180 @@
+"""HMAC署名検証済のプッシュ通知を非同期に処理するためのキューの実装
+
+環境変数NOTIFY_QUEUE_BACKENDで以下のいずれかを選択する:
+- sqs: Amazon SQSのキュー(環境変数NOTIFY_QUEUE_URL)に送信する(デフォルト)
+- local: プロセス内のキューに保持する(ローカル開発・テスト・負荷試験用)
+"""
+
+import base64
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Protocol
+
+from aws_clients import get_client
+
+# 本文をBase64エンコードして送信したことを示すメッセージ属性
+CONTENT_ENCODING_ATTRIBUTE = "ContentEncoding"
+
+
+class NotifyQueueError(Exception):
+    """キューへの送信に失敗した場合の例外"""
+
+
+class NotifyQueue(Protocol):  # pylint: disable=too-few-public-methods
+    """プッシュ通知のキューのインターフェース"""
+
+    def send(self, body: bytes) -> None:
+        """
+        プッシュ通知の本文をキューに送信する
+
+        Raises:
+            NotifyQueueError: 送信に失敗した場合
+        """
+
+
+class SqsNotifyQueue:  # pylint: disable=too-few-public-methods
+    """Amazon SQSのキューに送信するキュー"""
+
+    def __init__(self, queue_url: str) -> None:
+        self.queue_url: str = queue_url
+
+    def send(self, body: bytes) -> None:
+        """
+        プッシュ通知の本文をSendMessageで送信する
+        SQSのメッセージ本文は文字列のみのため、UTF-8でデコードできない本文は
+        Base64エンコードしてメッセージ属性で示す
+        """
+        kwargs: Dict[str, Any] = {}
+        try:
+            message_body: str = body.decode("utf-8")
+        except UnicodeDecodeError:
+            message_body = base64.b64encode(body).decode("ascii")
+            kwargs["MessageAttributes"] = {
+                CONTENT_ENCODING_ATTRIBUTE: {
+                    "DataType": "String",
+                    "StringValue": "base64",
+                }
+            }
+        try:
+            get_client("sqs").send_message(
+                QueueUrl=self.queue_url, MessageBody=message_body, **kwargs
+            )
+        except Exception as e:
+            raise NotifyQueueError(str(e)) from e
+
+
+class LocalNotifyQueue:
+    """
+    プロセス内のキューに保持するキュー
+    保持した本文はreceive_eventでSQSイベントと同じ形式で取り出し、
+    SQSをイベントソースとするLambda関数ハンドラーにそのまま渡せる
+    """
+
+    def __init__(self) -> None:
+        self.bodies: Deque[bytes] = deque()
+        self.sequence: int = 0
+        self.lock = threading.Lock()
+
+    def send(self, body: bytes) -> None:
+        """プッシュ通知の本文をプロセス内に保持する"""
+        with self.lock:
+            self.bodies.append(body)
+
+    def receive_event(self, max_messages: int = 10) -> Dict[str, Any]:
+        """
+        保持した本文を古い順に取り出し、SQSイベントの形式に変換する
+
+        Args:
+            max_messages (int): 取り出す本文の最大数
+
+        Returns:
+            dict: SQSイベント(取り出す本文がない場合はRecordsが空)
+        """
+        records: List[Dict[str, Any]] = []
+        with self.lock:
+            while self.bodies and len(records) < max_messages:
+                self.sequence += 1
+                records.append(
+                    {
+                        "messageId": f"local-{self.sequence}",
+                        "body": base64.b64encode(self.bodies.popleft()).decode("ascii"),
+                        "messageAttributes": {
+                            CONTENT_ENCODING_ATTRIBUTE: {
+                                "dataType": "String",
+                                "stringValue": "base64",
+                            }
+                        },
+                        "eventSource": "aws:sqs",
+                    }
+                )
+        return {"Records": records}
+
+
+def decode_record_body(record: Dict[str, Any]) -> bytes:
+    """
+    SQSイベントのレコードから、送信したプッシュ通知の本文をバイト列として取得する
+
+    Args:
+        record (dict): SQSイベントのレコード
+
+    Returns:
+        bytes: プッシュ通知の本文
+    """
+    encoding: str | None = (
+        record.get("messageAttributes", {})
+        .get(CONTENT_ENCODING_ATTRIBUTE, {})
+        .get("stringValue")
+    )
+    if encoding == "base64":
+        return base64.b64decode(record["body"])
+    return record["body"].encode("utf-8")
+
+
+# 生成済のキュー(バックエンド名 -> キュー)
+_queues: Dict[str, NotifyQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_notify_queue() -> NotifyQueue:
+    """
+    環境変数NOTIFY_QUEUE_BACKENDで選択したキューを取得する
+    初回呼び出し時に生成し、以降は同じキューを返す
+
+    Returns:
+        NotifyQueue: キュー
+
+    Raises:
+        ValueError: NOTIFY_QUEUE_BACKENDが不正な場合
+    """
+    backend_name: str = os.environ.get("NOTIFY_QUEUE_BACKEND", "sqs")
+    queue: NotifyQueue | None = _queues.get(backend_name)
+    if queue is not None:
+        return queue
+
+    with _queues_lock:
+        queue = _queues.get(backend_name)
+        if queue is None:
+            if backend_name == "sqs":
+                queue = SqsNotifyQueue(os.environ["NOTIFY_QUEUE_URL"])
+            elif backend_name == "local":
+                queue = LocalNotifyQueue()
+            else:
+                raise ValueError(f"Unsupported NOTIFY_QUEUE_BACKEND: {backend_name}")
+            _queues[backend_name] = queue
+    return queue
+
+
+def register_notify_queue(backend_name: str, queue: NotifyQueue | None) -> None:
+    """
+    NOTIFY_QUEUE_BACKENDで選択できるキューを登録する(テスト・ベンチマーク用)
+
+    Args:
+        backend_name (str): バックエンド名
+        queue (NotifyQueue | None): キュー、Noneの場合は登録を解除し、
+                                    次回取得時に生成し直す
+    """
+    if queue is None:
+        _queues.pop(backend_name, None)
+    else:
+        _queues[backend_name] = queue
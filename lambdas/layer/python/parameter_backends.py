@@ -0,0 +1,293 @@
+"""パラメータの取得元(バックエンド)の実装
+
+環境変数SSM_PARAMETER_BACKENDで以下のいずれかを選択する:
+- ssm: boto3のSSMクライアントで直接取得する(デフォルト)
+- extension: AWS Parameters and Secrets Lambda Extensionのローカルキャッシュから取得する
+- local: JSONファイル・環境変数から取得する(ローカル開発・負荷試験用)
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Protocol, Tuple
+
+from aws_clients import get_client
+
+
+class ParameterBackendError(Exception):
+    """パラメータの取得・保存に失敗した場合の例外"""
+
+
+class ParameterNotFoundError(ParameterBackendError):
+    """パラメータが存在しない場合の例外"""
+
+
+class ParameterBackend(Protocol):
+    """パラメータの取得元のインターフェース"""
+
+    def get_parameter(self, name: str) -> str:
+        """
+        パラメータ値を取得する
+
+        Raises:
+            ParameterNotFoundError: パラメータが存在しない場合
+            ParameterBackendError: 取得に失敗した場合
+        """
+
+    def get_parameters(self, names: List[str]) -> Dict[str, str]:
+        """
+        複数のパラメータ値をまとめて取得する(存在しないパラメータは結果に含めない)
+
+        Raises:
+            ParameterBackendError: 取得に失敗した場合
+        """
+
+    def get_parameters_by_path(self, path: str) -> Dict[str, str]:
+        """
+        指定したパス配下のパラメータ値をまとめて取得する
+
+        Raises:
+            ParameterBackendError: 取得に失敗した場合
+        """
+
+    def put_parameter(self, name: str, value: str) -> None:
+        """
+        パラメータ値をSecureStringとして保存する
+
+        Raises:
+            ParameterBackendError: 保存に失敗した場合
+        """
+
+
+class SsmParameterBackend:
+    """boto3のSSMクライアントで直接取得するバックエンド"""
+
+    def get_parameter(self, name: str) -> str:
+        """パラメータ値をGetParameterで取得する"""
+        try:
+            response: Dict[str, Any] = get_client("ssm").get_parameter(
+                Name=name, WithDecryption=True
+            )
+        except _botocore_errors() as e:
+            raise _to_backend_error(e) from e
+        return response["Parameter"]["Value"]
+
+    def get_parameters(self, names: List[str]) -> Dict[str, str]:
+        """複数のパラメータ値をGetParametersで取得する(最大10件)"""
+        try:
+            response: Dict[str, Any] = get_client("ssm").get_parameters(
+                Names=names, WithDecryption=True
+            )
+        except _botocore_errors() as e:
+            raise _to_backend_error(e) from e
+        return {p["Name"]: p["Value"] for p in response.get("Parameters", [])}
+
+    def get_parameters_by_path(self, path: str) -> Dict[str, str]:
+        """指定したパス配下のパラメータ値をGetParametersByPathで取得する"""
+        values: Dict[str, str] = {}
+        try:
+            for page in (
+                get_client("ssm")
+                .get_paginator("get_parameters_by_path")
+                .paginate(Path=path, Recursive=True, WithDecryption=True)
+            ):
+                for parameter in page.get("Parameters", []):
+                    values[parameter["Name"]] = parameter["Value"]
+        except _botocore_errors() as e:
+            raise _to_backend_error(e) from e
+        return values
+
+    def put_parameter(self, name: str, value: str) -> None:
+        """パラメータ値をPutParameterで保存する"""
+        try:
+            get_client("ssm").put_parameter(
+                Name=name, Value=value, Type="SecureString", Overwrite=True
+            )
+        except _botocore_errors() as e:
+            raise _to_backend_error(e) from e
+
+
+class ExtensionParameterBackend(SsmParameterBackend):
+    """
+    AWS Parameters and Secrets Lambda Extensionのローカルキャッシュから取得するバックエンド
+    拡張機能が対応していないパス指定の取得・保存はSSMクライアントで行う
+    """
+
+    def __init__(self, port: int, timeout: float) -> None:
+        self.endpoint: str = f"http://localhost:{port}/systemsmanager/parameters/get"
+        self.timeout: float = timeout
+
+    def get_parameter(self, name: str) -> str:
+        """パラメータ値を拡張機能のHTTPエンドポイントから取得する"""
+        # urllib.requestのインポートはコールドスタート時間を要するため、使用時まで遅延させる
+        import urllib.error  # pylint: disable=import-outside-toplevel
+        import urllib.parse  # pylint: disable=import-outside-toplevel
+        import urllib.request  # pylint: disable=import-outside-toplevel
+
+        query: str = urllib.parse.urlencode({"name": name, "withDecryption": "true"})
+        request = urllib.request.Request(
+            f"{self.endpoint}?{query}",
+            headers={
+                "X-Aws-Parameters-Secrets-Token": os.environ.get(
+                    "AWS_SESSION_TOKEN", ""
+                )
+            },
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body: Dict[str, Any] = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            message: str = e.read().decode("utf-8", errors="replace")
+            if e.code == 404 or "ParameterNotFound" in message:
+                raise ParameterNotFoundError(name) from e
+            raise ParameterBackendError(f"{e.code}: {message}") from e
+        except (urllib.error.URLError, TimeoutError, ValueError) as e:
+            raise ParameterBackendError(str(e)) from e
+        return body["Parameter"]["Value"]
+
+    def get_parameters(self, names: List[str]) -> Dict[str, str]:
+        """拡張機能は一括取得に対応していないため、パラメータごとに取得する"""
+        values: Dict[str, str] = {}
+        for name in names:
+            try:
+                values[name] = self.get_parameter(name)
+            except ParameterNotFoundError:
+                continue
+        return values
+
+
+class LocalParameterBackend:
+    """
+    JSONファイル・環境変数から取得するバックエンド
+    JSONファイル({パラメータ名: 値})を優先し、存在しない場合はパラメータ名を
+    環境変数名に変換して参照する(例: /ytlivemetadata/phone_number -> YTLIVEMETADATA_PHONE_NUMBER)
+    保存した値はプロセス内でのみ保持する
+    """
+
+    def __init__(self, file_path: str | None) -> None:
+        self.values: Dict[str, str] = {}
+        if file_path:
+            with open(file_path, encoding="utf-8") as f:
+                self.values.update(json.load(f))
+
+    def get_parameter(self, name: str) -> str:
+        """パラメータ値をJSONファイル・環境変数から取得する"""
+        if name in self.values:
+            return self.values[name]
+        env_name: str = re.sub(r"[^0-9A-Za-z]+", "_", name).strip("_").upper()
+        if env_name in os.environ:
+            return os.environ[env_name]
+        raise ParameterNotFoundError(name)
+
+    def get_parameters(self, names: List[str]) -> Dict[str, str]:
+        """複数のパラメータ値を取得する"""
+        values: Dict[str, str] = {}
+        for name in names:
+            try:
+                values[name] = self.get_parameter(name)
+            except ParameterNotFoundError:
+                continue
+        return values
+
+    def get_parameters_by_path(self, path: str) -> Dict[str, str]:
+        """JSONファイル・保存済の値のうち、指定したパス配下のパラメータ値を取得する"""
+        return {k: v for k, v in self.values.items() if k.startswith(path)}
+
+    def put_parameter(self, name: str, value: str) -> None:
+        """パラメータ値をプロセス内に保存する"""
+        self.values[name] = value
+
+
+# 生成済のバックエンド(バックエンド名 -> バックエンド)
+_backends: Dict[str, ParameterBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_parameter_backend() -> ParameterBackend:
+    """
+    環境変数SSM_PARAMETER_BACKENDで選択したバックエンドを取得する
+    初回呼び出し時に生成し、以降は同じバックエンドを返す
+
+    Returns:
+        ParameterBackend: バックエンド
+
+    Raises:
+        ValueError: SSM_PARAMETER_BACKENDが不正な場合
+    """
+    backend_name: str = os.environ.get("SSM_PARAMETER_BACKEND", "ssm")
+    backend: ParameterBackend | None = _backends.get(backend_name)
+    if backend is not None:
+        return backend
+
+    with _backends_lock:
+        backend = _backends.get(backend_name)
+        if backend is None:
+            if backend_name == "ssm":
+                backend = SsmParameterBackend()
+            elif backend_name == "extension":
+                backend = ExtensionParameterBackend(
+                    port=int(
+                        os.environ.get("PARAMETERS_SECRETS_EXTENSION_HTTP_PORT", "2773")
+                    ),
+                    timeout=float(
+                        os.environ.get("SSM_PARAMETER_EXTENSION_TIMEOUT_SECONDS", "1")
+                    ),
+                )
+            elif backend_name == "local":
+                backend = LocalParameterBackend(
+                    os.environ.get("SSM_PARAMETER_LOCAL_FILE")
+                )
+            else:
+                raise ValueError(f"Unsupported SSM_PARAMETER_BACKEND: {backend_name}")
+            _backends[backend_name] = backend
+    return backend
+
+
+def register_parameter_backend(
+    backend_name: str, backend: ParameterBackend | None
+) -> None:
+    """
+    SSM_PARAMETER_BACKENDで選択できるバックエンドを登録する(テスト・ベンチマーク用)
+
+    Args:
+        backend_name (str): バックエンド名
+        backend (ParameterBackend | None): バックエンド、Noneの場合は登録を解除し、
+                                           次回取得時に生成し直す
+    """
+    if backend is None:
+        _backends.pop(backend_name, None)
+    else:
+        _backends[backend_name] = backend
+
+
+def _botocore_errors() -> Tuple[type, ...]:
+    """
+    boto3が送出する例外クラスを取得する
+    botocoreのインポートはコールドスタート時間を要するため、例外の発生時まで遅延させる
+
+    Returns:
+        Tuple[type, ...]: boto3が送出する例外クラス
+    """
+    from botocore.exceptions import (  # pylint: disable=import-outside-toplevel
+        BotoCoreError,
+        ClientError,
+    )
+
+    return (BotoCoreError, ClientError)
+
+
+def _to_backend_error(error: Exception) -> ParameterBackendError:
+    """
+    boto3の例外をバックエンド共通の例外に変換する
+
+    Args:
+        error (Exception): boto3の例外
+
+    Returns:
+        ParameterBackendError: バックエンド共通の例外
+    """
+    response: Dict[str, Any] = getattr(error, "response", {})
+    if response.get("Error", {}).get("Code") == "ParameterNotFound":
+        return ParameterNotFoundError(str(error))
+    return ParameterBackendError(str(error))
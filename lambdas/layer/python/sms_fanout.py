@@ -0,0 +1,133 @@
+"""複数の電話番号へのSMS通知の並行送信
+
+通知先の電話番号は、Parameter Storeの1つのパラメータにカンマ区切りで保存する
+(StringList、またはカンマ区切りの値のSecureString、1つの電話番号のみの場合は従来の値のまま)
+電話番号ごとのPublishを同時実行数を制限して並行に呼び出し、通知先を追加しても
+送信時間が比例して増えず、一部の電話番号への送信に失敗しても他の電話番号への送信を継続する
+"""
+
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple
+
+from metrics_utils import put_metric
+
+logger = logging.getLogger()
+
+# 電話番号ごとのPublishを同時に呼び出す上限
+SMS_FANOUT_CONCURRENCY = int(os.environ.get("SMS_FANOUT_CONCURRENCY", "10"))
+
+# ウォームコンテナ間で共有するスレッドプール(スレッドは必要になった時点で生成される)
+_executor = ThreadPoolExecutor(
+    max_workers=SMS_FANOUT_CONCURRENCY, thread_name_prefix="sms_fanout"
+)
+
+
+class SmsFanoutResult(NamedTuple):
+    """電話番号ごとのSMS通知の送信結果"""
+
+    # 送信に成功した電話番号
+    sent: List[str]
+    # 送信に失敗した電話番号 -> 例外
+    failed: Dict[str, Exception]
+
+
+def parse_phone_numbers(value: str) -> List[str]:
+    """
+    パラメータ値から通知先の電話番号を取得する
+
+    Args:
+        value (str): カンマ区切りの電話番号
+
+    Returns:
+        List[str]: 前後の空白・重複を除いた電話番号(パラメータ値での順序)
+    """
+    return list(
+        dict.fromkeys(
+            phone_number.strip()
+            for phone_number in value.split(",")
+            if phone_number.strip()
+        )
+    )
+
+
+def mask_phone_number(phone_number: str) -> str:
+    """
+    ログに出力するために電話番号の末尾4桁以外を伏せる
+
+    Args:
+        phone_number (str): 電話番号
+
+    Returns:
+        str: 末尾4桁以外を*にした電話番号
+    """
+    return "*" * max(len(phone_number) - 4, 0) + phone_number[-4:]
+
+
+def publish_sms(
+    sns_client: Any, phone_numbers: List[str], message: str
+) -> SmsFanoutResult:
+    """
+    複数の電話番号にSMS通知を並行に送信する
+    1つの電話番号のみの場合はスレッドプールを使用せずに送信する
+
+    Args:
+        sns_client (Any): SNSクライアント(サーキットブレーカーを介したクライアントを含む)
+        phone_numbers (List[str]): 通知先の電話番号
+        message (str): SMS通知メッセージ
+
+    Returns:
+        SmsFanoutResult: 電話番号ごとの送信結果
+
+    Raises:
+        ValueError: 通知先の電話番号が存在しない場合
+        Exception: すべての電話番号への送信に失敗した場合(最初の電話番号の例外)
+    """
+    if not phone_numbers:
+        raise ValueError("No phone number to send SMS")
+
+    errors: Dict[str, Exception | None] = {}
+    if len(phone_numbers) == 1:
+        errors[phone_numbers[0]] = _publish(sns_client, phone_numbers[0], message)
+    else:
+        futures: Dict[str, Future] = {
+            phone_number: _executor.submit(_publish, sns_client, phone_number, message)
+            for phone_number in phone_numbers
+        }
+        errors = {
+            phone_number: future.result() for phone_number, future in futures.items()
+        }
+
+    result = SmsFanoutResult(
+        sent=[phone_number for phone_number, e in errors.items() if e is None],
+        failed={phone_number: e for phone_number, e in errors.items() if e is not None},
+    )
+    if result.failed:
+        for phone_number, e in result.failed.items():
+            logger.error(
+                "Failed to send SMS to %s: %s", mask_phone_number(phone_number), e
+            )
+        put_metric("SmsPublishFailed", len(result.failed))
+        if not result.sent:
+            raise next(iter(result.failed.values()))
+    return result
+
+
+def _publish(sns_client: Any, phone_number: str, message: str) -> Exception | None:
+    """
+    1つの電話番号にSMS通知を送信する
+
+    Args:
+        sns_client (Any): SNSクライアント
+        phone_number (str): 電話番号
+        message (str): SMS通知メッセージ
+
+    Returns:
+        Exception | None: 送信に失敗した場合は例外、成功した場合はNone
+    """
+    try:
+        sns_client.publish(PhoneNumber=phone_number, Message=message)
+    except Exception as e:
+        return e
+    return None
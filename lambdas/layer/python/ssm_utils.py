@@ -1,24 +1,201 @@
 """AWS Systems Manager Parameter Store用のユーティリティ関数"""
 
-from typing import Dict
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Tuple
 
-import boto3
+from parameter_backends import (
+    ParameterBackendError,
+    ParameterNotFoundError,
+    get_parameter_backend,
+)
 
-# SSMクライアントの初期化
-ssm_client = boto3.client("ssm")
+logger = logging.getLogger()
 
+# パラメータ値のキャッシュ有効期間(秒)のデフォルト値
+DEFAULT_CACHE_TTL_SECONDS = float(
+    os.environ.get("SSM_PARAMETER_CACHE_TTL_SECONDS", "300")
+)
 
-def get_parameter_value(parameter_name: str) -> str:
+# GetParametersで一度に取得できるパラメータ数の上限
+GET_PARAMETERS_BATCH_SIZE = 10
+
+# ウォームコンテナ間で共有するパラメータ値のキャッシュ(パラメータ名 -> (値, 取得時刻))
+# 値がNoneの場合は、パラメータが存在しないことをキャッシュしている
+_parameter_cache: Dict[str, Tuple[str | None, float]] = {}
+
+
+def get_parameter_value(
+    parameter_name: str,
+    ttl_seconds: float | None = None,
+    not_found_ttl_seconds: float | None = None,
+) -> str:
     """
     AWS Systems Manager Parameter Store からパラメータ値を取得する
+    有効期間内のキャッシュがあればそれを返し、取得元がエラーを返した場合は
+    最後に取得できた値を返す
+    パラメータが存在しないこともキャッシュし、有効期間内は取得元を呼び出さない
+
+    Args:
+        parameter_name (str): パラメータ名
+        ttl_seconds (float | None): キャッシュ有効期間(秒)、Noneの場合はデフォルト値
+        not_found_ttl_seconds (float | None):
+            パラメータが存在しないことのキャッシュ有効期間(秒)、Noneの場合はttl_seconds
+
+    Returns:
+        str: パラメータ値
+
+    Raises:
+        ParameterNotFoundError: パラメータが存在しない場合
+        ParameterBackendError: 取得元がエラーを返し、キャッシュも存在しない場合
+    """
+    ttl: float = DEFAULT_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    now: float = time.monotonic()
+
+    # 有効期間内のキャッシュが存在する場合はそれを返す
+    cached: Tuple[str | None, float] | None = _parameter_cache.get(parameter_name)
+    if cached is not None and cached[0] is None and not_found_ttl_seconds is not None:
+        ttl = not_found_ttl_seconds
+    if _is_fresh(cached, ttl, now):
+        return _cached_value(parameter_name, cached)
+
+    try:
+        value: str = get_parameter_backend().get_parameter(parameter_name)
+    except ParameterNotFoundError:
+        _parameter_cache[parameter_name] = (None, now)
+        raise
+    except ParameterBackendError:
+        # スロットリング等で取得できない場合は最後に取得できた値を返す
+        if cached is None:
+            raise
+        logger.warning(
+            "Failed to get parameter %s, serving stale cached value", parameter_name
+        )
+        return _cached_value(parameter_name, cached)
+
+    _parameter_cache[parameter_name] = (value, now)
+    return value
+
+
+def prefetch_parameters(
+    parameter_names: Iterable[str], ttl_seconds: float | None = None
+) -> None:
+    """
+    複数のパラメータをGetParametersでまとめて取得してキャッシュする
+    有効期間内のキャッシュが存在するパラメータは取得しない
+    存在しないパラメータは、存在しないことを有効期間の間キャッシュする
+    取得に失敗したパラメータは、get_parameter_valueの呼び出し時に個別に取得される
+
+    Args:
+        parameter_names (Iterable[str]): パラメータ名
+        ttl_seconds (float | None): キャッシュ有効期間(秒)、Noneの場合はデフォルト値
+    """
+    ttl: float = DEFAULT_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    now: float = time.monotonic()
+
+    # 重複を除き、有効期間内のキャッシュが存在しないパラメータのみを取得対象とする
+    stale_names: List[str] = [
+        name
+        for name in dict.fromkeys(parameter_names)
+        if not _is_fresh(_parameter_cache.get(name), ttl, now)
+    ]
+
+    # GetParametersの上限件数ごとにまとめて取得
+    for i in range(0, len(stale_names), GET_PARAMETERS_BATCH_SIZE):
+        batch: List[str] = stale_names[i : i + GET_PARAMETERS_BATCH_SIZE]
+        try:
+            values: Dict[str, str] = get_parameter_backend().get_parameters(batch)
+        except ParameterBackendError:
+            logger.warning("Failed to prefetch parameters: %s", batch)
+            continue
+
+        for name, value in values.items():
+            _parameter_cache[name] = (value, now)
+        missing_names: List[str] = [name for name in batch if name not in values]
+        for name in missing_names:
+            _parameter_cache[name] = (None, now)
+        if missing_names:
+            logger.warning("Invalid parameters: %s", missing_names)
+
+
+def prefetch_parameters_by_path(path: str) -> None:
+    """
+    指定したパス配下のパラメータをGetParametersByPathでまとめて取得してキャッシュする
+    取得に失敗したパラメータは、get_parameter_valueの呼び出し時に個別に取得される
+
+    Args:
+        path (str): パラメータのパス(例: /ytlivemetadata/)
+    """
+    now: float = time.monotonic()
+    try:
+        values: Dict[str, str] = get_parameter_backend().get_parameters_by_path(path)
+    except ParameterBackendError:
+        logger.warning("Failed to prefetch parameters by path: %s", path)
+        return
+
+    for name, value in values.items():
+        _parameter_cache[name] = (value, now)
+
+
+def put_parameter_value(parameter_name: str, value: str) -> None:
+    """
+    AWS Systems Manager Parameter Store にパラメータ値をSecureStringとして保存し、
+    キャッシュも更新する
+
+    Args:
+        parameter_name (str): パラメータ名
+        value (str): パラメータ値
+
+    Raises:
+        ParameterBackendError: 保存に失敗した場合
+    """
+    get_parameter_backend().put_parameter(parameter_name, value)
+    _parameter_cache[parameter_name] = (value, time.monotonic())
+
+
+def invalidate_parameter_cache(parameter_name: str | None = None) -> None:
+    """
+    パラメータ値のキャッシュを破棄する
+
+    Args:
+        parameter_name (str | None): パラメータ名、Noneの場合はすべてのキャッシュを破棄
+    """
+    if parameter_name is None:
+        _parameter_cache.clear()
+    else:
+        _parameter_cache.pop(parameter_name, None)
+
+
+def _cached_value(parameter_name: str, cached: Tuple[str | None, float]) -> str:
+    """
+    キャッシュしたパラメータ値を返す
 
     Args:
         parameter_name (str): パラメータ名
+        cached (Tuple[str | None, float]): キャッシュ(値, 取得時刻)
 
     Returns:
         str: パラメータ値
+
+    Raises:
+        ParameterNotFoundError: パラメータが存在しないことをキャッシュしている場合
+    """
+    if cached[0] is None:
+        raise ParameterNotFoundError(parameter_name)
+    return cached[0]
+
+
+def _is_fresh(cached: Tuple[str | None, float] | None, ttl: float, now: float) -> bool:
+    """
+    キャッシュが有効期間内かどうかを判定する
+
+    Args:
+        cached (Tuple[str | None, float] | None): キャッシュ(値, 取得時刻)
+        ttl (float): キャッシュ有効期間(秒)
+        now (float): 現在時刻
+
+    Returns:
+        bool: 有効期間内の場合True、キャッシュが存在しないか有効期間切れの場合False
     """
-    response: Dict[str, Dict[str, str]] = ssm_client.get_parameter(
-        Name=parameter_name, WithDecryption=True
-    )
-    return response["Parameter"]["Value"]
+    return cached is not None and now - cached[1] < ttl
@@ -0,0 +1,267 @@
+"""Lambda関数の処理段階(ステージ)ごとの所要時間をEMF形式で出力するユーティリティ関数
+
+ハンドラーの呼び出し中に計測したステージ(HMAC署名検証・XMLデータの解析・SSM・YouTube・
+DynamoDB・SNS等)ごとの所要時間・失敗回数を集計し、ハンドラーの終了時に
+1回の呼び出しにつき1行のEMFとしてまとめて標準出力に書き込む
+呼び出し中にmetrics_utilsのput_metricで出力したメトリクス(ディメンションの指定なし)も
+同じ行に含め、関数名のみをディメンションとして出力する
+EMFのディメンションの値は1行で1つのみのため、ステージはメトリクス名
+(例: YouTubeDuration, SNSErrors)で区別し、ディメンションは関数名・ハンドラー名とする
+計測のためのAPI呼び出しは行わない
+"""
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from metrics_utils import put_metrics, set_metric_collector
+
+# ステージごとの所要時間のメトリクスを出力するかどうか
+STAGE_METRICS_ENABLED = (
+    os.environ.get("STAGE_METRICS_ENABLED", "true").strip().lower() == "true"
+)
+
+# boto3のリクエストコンテキストに計測開始時の情報を保存するキー
+_CONTEXT_KEY = "stage_metrics"
+
+
+class _Invocation:
+    """1回のハンドラーの呼び出しで計測したステージごとの所要時間"""
+
+    # 呼び出し中のハンドラーの計測結果
+    # Lambda関数の実行環境は同時に1つの呼び出しのみを処理し、スレッドプールのスレッドからも
+    # 記録できるようにするため、スレッドごとではなくモジュールで共有する
+    current: "_Invocation | None" = None
+
+    def __init__(self, handler_name: str) -> None:
+        self.handler_name: str = handler_name
+        self.started_at: float = time.perf_counter()
+        # ステージ名 -> [所要時間の合計(ミリ秒), 呼び出し回数, 失敗回数]
+        self.stages: Dict[str, List[float]] = {}
+        # メトリクス名 -> (値のリスト, 単位)
+        self.metrics: Dict[str, Tuple[List[float], str]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage_name: str, duration_ms: float, failed: bool) -> None:
+        """
+        ステージの所要時間を記録する
+        スレッドプールで並行実行したステージの所要時間は合計する
+
+        Args:
+            stage_name (str): ステージ名
+            duration_ms (float): 所要時間(ミリ秒)
+            failed (bool): 失敗した場合True
+        """
+        with self._lock:
+            totals: List[float] = self.stages.setdefault(stage_name, [0.0, 0, 0])
+            totals[0] += duration_ms
+            totals[1] += 1
+            totals[2] += int(failed)
+
+    def record_metric(self, metric_name: str, value: float, unit: str) -> None:
+        """
+        put_metricで出力したメトリクスを記録する
+        同じメトリクスを複数回出力した場合は、値のリストとして出力する
+
+        Args:
+            metric_name (str): メトリクス名
+            value (float): 値
+            unit (str): 単位
+        """
+        with self._lock:
+            self.metrics.setdefault(metric_name, ([], unit))[0].append(value)
+
+    def flush(self, failed: bool) -> None:
+        """
+        記録したステージごとの所要時間・失敗回数をEMF形式の1行で出力する
+
+        Args:
+            failed (bool): ハンドラーが失敗した場合True
+        """
+        metrics: Dict[str, Tuple[float, str]] = {
+            "HandlerDuration": (
+                round((time.perf_counter() - self.started_at) * 1000, 3),
+                "Milliseconds",
+            ),
+            "HandlerErrors": (int(failed), "Count"),
+        }
+        with self._lock:
+            stages: Dict[str, List[float]] = dict(self.stages)
+            function_metrics: Dict[str, Tuple[float | List[float], str]] = {
+                metric_name: (values[0] if len(values) == 1 else list(values), unit)
+                for metric_name, (values, unit) in self.metrics.items()
+            }
+        for stage_name, (duration_ms, _, errors) in stages.items():
+            metrics[f"{stage_name}Duration"] = (round(duration_ms, 3), "Milliseconds")
+            metrics[f"{stage_name}Errors"] = (errors, "Count")
+        put_metrics(
+            metrics,
+            dimensions={
+                "FunctionName": os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "local"),
+                "Handler": self.handler_name,
+            },
+            properties={
+                "StageCalls": {
+                    stage_name: int(calls)
+                    for stage_name, (_, calls, _) in stages.items()
+                }
+            },
+            function_metrics=function_metrics,
+        )
+
+
+@contextmanager
+def stage(stage_name: str) -> Iterator[None]:
+    """
+    withブロックの所要時間をステージの所要時間として記録する
+    例外が送出された場合は失敗として記録し、例外はそのまま送出する
+    ハンドラーの呼び出し中でない場合は何も記録しない
+
+    Args:
+        stage_name (str): ステージ名(例: HMAC, Parse, YouTube)
+
+    Yields:
+        None
+    """
+    invocation: _Invocation | None = _Invocation.current
+    if invocation is None:
+        yield
+        return
+
+    started_at: float = time.perf_counter()
+    failed: bool = True
+    try:
+        yield
+        failed = False
+    finally:
+        invocation.record(stage_name, (time.perf_counter() - started_at) * 1000, failed)
+
+
+def timed_handler(
+    handler: Callable[[Dict[str, Any], Any], Dict[str, Any]],
+) -> Callable[[Dict[str, Any], Any], Dict[str, Any]]:
+    """
+    ハンドラーの呼び出しごとにステージごとの所要時間を計測し、終了時にEMF形式で出力する
+    例外が送出された場合、ステータスコードが5xxの場合、
+    部分的なバッチレスポンスに失敗したメッセージがある場合は、ハンドラーの失敗とみなす
+
+    Args:
+        handler (Callable): Lambda関数のハンドラー
+
+    Returns:
+        Callable: 計測するハンドラー
+    """
+
+    @functools.wraps(handler)
+    def wrapper(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+        if not STAGE_METRICS_ENABLED:
+            return handler(event, context)
+
+        invocation = _Invocation(handler.__name__)
+        _Invocation.current = invocation
+        set_metric_collector(invocation)
+        failed: bool = True
+        try:
+            response: Dict[str, Any] = handler(event, context)
+            failed = _is_failed_response(response)
+            return response
+        finally:
+            _Invocation.current = None
+            set_metric_collector(None)
+            invocation.flush(failed)
+
+    return wrapper
+
+
+def instrument_client(client: Any) -> Any:
+    """
+    boto3のクライアントのAPI呼び出しの所要時間を、サービス名(例: SSM, DynamoDB, SNS)を
+    ステージ名として記録するようにする
+    再試行を含む1回のAPI呼び出しの所要時間を記録し、
+    エラーレスポンス・例外の場合は失敗として記録する
+
+    Args:
+        client (Any): boto3のクライアント
+
+    Returns:
+        Any: 引数のクライアント
+    """
+    stage_name: str = str(client.meta.service_model.service_id)
+    events: Any = client.meta.events
+    # botocore.stub.Stubber等のbefore-callで応答するハンドラーより前に開始時刻を保存するため、
+    # パラメータの構築前に計測を開始する
+    events.register(
+        "before-parameter-build", functools.partial(_on_before_call, stage_name)
+    )
+    events.register("after-call", _on_after_call)
+    events.register("after-call-error", _on_after_call_error)
+    return client
+
+
+def _on_before_call(stage_name: str, context: Dict[str, Any], **_kwargs: Any) -> None:
+    """
+    boto3のAPI呼び出しの開始時に、呼び出し中のハンドラーの計測結果と開始時刻を保存する
+
+    Args:
+        stage_name (str): ステージ名
+        context (Dict[str, Any]): boto3のリクエストコンテキスト
+    """
+    invocation: _Invocation | None = _Invocation.current
+    if invocation is not None:
+        context[_CONTEXT_KEY] = (invocation, stage_name, time.perf_counter())
+
+
+def _on_after_call(http_response: Any, context: Dict[str, Any], **_kwargs: Any) -> None:
+    """
+    boto3のAPI呼び出しがレスポンスを受信した時に所要時間を記録する
+
+    Args:
+        http_response (Any): HTTPレスポンス
+        context (Dict[str, Any]): boto3のリクエストコンテキスト
+    """
+    _record_call(context, http_response.status_code >= 300)
+
+
+def _on_after_call_error(context: Dict[str, Any], **_kwargs: Any) -> None:
+    """
+    boto3のAPI呼び出しが例外で終了した時に失敗として所要時間を記録する
+
+    Args:
+        context (Dict[str, Any]): boto3のリクエストコンテキスト
+    """
+    _record_call(context, True)
+
+
+def _record_call(context: Dict[str, Any], failed: bool) -> None:
+    """
+    boto3のAPI呼び出しの所要時間を、開始時に呼び出し中だったハンドラーの計測結果に記録する
+
+    Args:
+        context (Dict[str, Any]): boto3のリクエストコンテキスト
+        failed (bool): 失敗した場合True
+    """
+    started: Tuple[_Invocation, str, float] | None = context.pop(_CONTEXT_KEY, None)
+    if started is not None:
+        invocation, stage_name, started_at = started
+        invocation.record(stage_name, (time.perf_counter() - started_at) * 1000, failed)
+
+
+def _is_failed_response(response: Any) -> bool:
+    """
+    ハンドラーのレスポンスが失敗を表すかどうかを判定する
+
+    Args:
+        response (Any): ハンドラーのレスポンス
+
+    Returns:
+        bool: ステータスコードが5xx、または失敗したメッセージがある場合True
+    """
+    if not isinstance(response, dict):
+        return False
+    status_code: Any = response.get("statusCode")
+    return (isinstance(status_code, int) and status_code >= 500) or bool(
+        response.get("batchItemFailures")
+    )
@@ -0,0 +1,210 @@
+"""YouTube Data API v3のクオーター消費量の管理と、呼び出し頻度の制限を行うユーティリティ
+
+クオーター消費量は日ごとにDynamoDBの項目で全コンテナ間で共有し、
+コンテナ内では一定量・一定時間ごとにまとめてDynamoDBに反映する(残りが少ない場合は毎回反映する)
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from aws_clients import get_client, is_conditional_check_failed
+from metrics_utils import put_metric
+
+logger = logging.getLogger()
+
+# クオーターがリセットされる太平洋時間(夏時間は考慮せず、UTC-8とする)
+QUOTA_RESET_TIMEZONE = timezone(timedelta(hours=-8))
+
+# クオーター消費量を記録するDynamoDBの項目のパーティションキーの接頭辞
+QUOTA_KEY_PREFIX = "quota#"
+
+# クオーター消費量を記録するDynamoDBの項目の有効期間(秒)
+QUOTA_ITEM_TTL_SECONDS = 2 * 24 * 60 * 60
+
+
+class QuotaExceededError(Exception):
+    """1日のクオーターの予算を使い切った場合の例外"""
+
+
+class RateLimitedError(Exception):
+    """呼び出し頻度の上限を超えた場合の例外"""
+
+
+class TokenBucket:  # pylint: disable=too-few-public-methods
+    """
+    トークンバケットによる呼び出し頻度の制限
+    1秒あたりrate_per_second個のトークンを上限capacity個まで補充し、呼び出しごとに消費する
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float) -> None:
+        self.rate_per_second: float = rate_per_second
+        self.capacity: float = capacity
+        self.tokens: float = capacity
+        self.updated_at: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """
+        トークンを消費する
+
+        Args:
+            tokens (float): 消費するトークン数
+
+        Returns:
+            bool: 消費できた場合True、トークンが不足している場合False
+        """
+        with self._lock:
+            now: float = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + max(now - self.updated_at, 0) * self.rate_per_second,
+            )
+            self.updated_at = now
+            if self.tokens < tokens:
+                return False
+            self.tokens -= tokens
+            return True
+
+
+class QuotaTracker:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """
+    YouTube Data API v3の1日のクオーター消費量を管理する
+    全コンテナの消費量の合計が予算を超える呼び出しを拒否し、
+    残りが予約分を下回った場合は優先度の低い呼び出しを拒否する
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        table_name: str,
+        daily_units: int,
+        reserve_units: int,
+        sync_units: int,
+        sync_interval_seconds: float,
+        bucket: TokenBucket | None = None,
+    ) -> None:
+        """
+        Args:
+            table_name (str): クオーター消費量を記録するDynamoDBのテーブル名
+            daily_units (int): 1日のクオーターの予算、0以下の場合は管理しない
+            reserve_units (int): 優先度の低い呼び出しに使用しない予約分
+            sync_units (int): DynamoDBにまとめて反映するコンテナ内の消費量
+            sync_interval_seconds (float): DynamoDBにまとめて反映する間隔(秒)
+            bucket (TokenBucket | None): 呼び出し頻度の制限、Noneの場合は制限しない
+        """
+        self.table_name: str = table_name
+        self.daily_units: int = daily_units
+        self.reserve_units: int = reserve_units
+        self.sync_units: int = sync_units
+        self.sync_interval_seconds: float = sync_interval_seconds
+        self.bucket: TokenBucket | None = bucket
+        self.day: str = _quota_day()
+        # 最後にDynamoDBから取得した全コンテナの消費量
+        self.shared_units: int = 0
+        # DynamoDBに未反映のコンテナ内の消費量
+        self.pending_units: int = 0
+        self.synced_at: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, units: int = 1, low_priority: bool = False) -> None:
+        """
+        クオーターを消費する
+
+        Args:
+            units (int): 消費するクオーター
+            low_priority (bool): 優先度の低い呼び出しの場合True
+
+        Raises:
+            RateLimitedError: 呼び出し頻度の上限を超えた場合
+            QuotaExceededError: 予算(優先度の低い呼び出しの場合は予約分を除く予算)を超える場合
+        """
+        if self.bucket is not None and not self.bucket.try_acquire(units):
+            raise RateLimitedError("YouTube Data API v3 rate limit exceeded")
+        if self.daily_units <= 0:
+            return
+
+        with self._lock:
+            # 日付が変わった場合はクオーターがリセットされている
+            day: str = _quota_day()
+            if day != self.day:
+                self.day, self.shared_units, self.pending_units = day, 0, 0
+
+            # コンテナ内の消費量の見積もりは全コンテナの消費量の下限のため、
+            # 見積もりで予算を超える場合はDynamoDBを参照せずに拒否する
+            limit: int = self.daily_units - (self.reserve_units if low_priority else 0)
+            estimate: int = self.shared_units + self.pending_units + units
+            if estimate > limit:
+                raise QuotaExceededError(
+                    f"YouTube Data API v3 quota budget exceeded: {estimate}/{limit}"
+                )
+
+            # 残りが予約分を下回る場合は、予算を超えないように毎回条件付きで反映する
+            self.pending_units += units
+            if estimate > self.daily_units - self.reserve_units:
+                self._sync(strict=True)
+            elif (
+                self.pending_units >= self.sync_units
+                or time.monotonic() - self.synced_at >= self.sync_interval_seconds
+            ):
+                self._sync(strict=False)
+
+    def _sync(self, strict: bool) -> None:
+        """
+        コンテナ内の消費量をDynamoDBに反映し、全コンテナの消費量を取得する
+        DynamoDBへの反映に失敗した場合は、次回の反映時に再度反映する
+
+        Args:
+            strict (bool): 予算を超えないように条件付きで反映する場合True
+
+        Raises:
+            QuotaExceededError: 条件付きで反映した結果、予算を超える場合
+        """
+        values: Dict[str, Any] = {
+            ":units": {"N": str(self.pending_units)},
+            ":ttl": {"N": str(int(time.time()) + QUOTA_ITEM_TTL_SECONDS)},
+        }
+        kwargs: Dict[str, Any] = {}
+        if strict:
+            values[":max_units_used"] = {
+                "N": str(self.daily_units - self.pending_units)
+            }
+            kwargs["ConditionExpression"] = (
+                "attribute_not_exists(units_used) OR units_used <= :max_units_used"
+            )
+        try:
+            response: Dict[str, Any] = get_client("dynamodb").update_item(
+                TableName=self.table_name,
+                Key={"video_id": {"S": f"{QUOTA_KEY_PREFIX}{self.day}"}},
+                UpdateExpression="ADD units_used :units SET #ttl = :ttl",
+                ExpressionAttributeNames={"#ttl": "ttl"},
+                ExpressionAttributeValues=values,
+                ReturnValues="UPDATED_NEW",
+                **kwargs,
+            )
+        except Exception as e:
+            self.synced_at = time.monotonic()
+            if strict and is_conditional_check_failed(e):
+                # 他のコンテナの消費により予算を使い切っている
+                self.shared_units, self.pending_units = self.daily_units, 0
+                raise QuotaExceededError(
+                    "YouTube Data API v3 quota budget exceeded"
+                ) from e
+            logger.warning("Failed to sync YouTube Data API v3 quota usage: %s", e)
+            return
+
+        self.shared_units = int(response["Attributes"]["units_used"]["N"])
+        self.pending_units = 0
+        self.synced_at = time.monotonic()
+        put_metric("YouTubeQuotaUsed", self.shared_units)
+
+
+def _quota_day() -> str:
+    """
+    クオーターがリセットされる太平洋時間での現在の日付を取得する
+
+    Returns:
+        str: 日付(YYYY-MM-DD形式)
+    """
+    return datetime.now(QUOTA_RESET_TIMEZONE).strftime("%Y-%m-%d")
@@ -1,17 +1,43 @@
 """WebSubでのYouTubeライブ配信通知情報をもとにSMS通知を送信する"""
 
+# pylint: disable=too-many-lines
+
+import base64
 import hashlib
 import hmac
 import logging
 import os
 import time
 import traceback
-from typing import Any, Dict, List
-from xml.etree.ElementTree import Element, fromstring
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Tuple
 
-import boto3
-import requests
-from ssm_utils import get_parameter_value
+from aws_clients import get_guarded_client, is_conditional_check_failed
+from channel_registry import Channel, get_channel_registry
+from circuit_breaker import CircuitBreaker, CircuitOpenError, get_circuit_breaker
+from feed_parser import Feed, parse_feed
+from hmac_secret_utils import get_current_hmac_secret, get_previous_hmac_secret
+from http_session import http_get
+from lru_ttl_cache import LruTtlCache
+from metrics_utils import put_metric, put_metrics
+from notification_sinks import (
+    Notification,
+    NotificationDispatcher,
+    SmsSink,
+    create_notification_dispatcher,
+)
+from notify_queue import decode_record_body, get_notify_queue
+from sms_fanout import parse_phone_numbers
+from ssm_utils import get_parameter_value, prefetch_parameters
+from stage_metrics import stage, timed_handler
+from youtube_quota import (
+    QuotaExceededError,
+    QuotaTracker,
+    RateLimitedError,
+    TokenBucket,
+)
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -19,18 +45,174 @@ logger.setLevel(logging.INFO)
 DYNAMODB_TABLE = os.environ["DYNAMODB_TABLE"]
 SMS_PHONE_NUMBER_PARAMETER_NAME = os.environ["SMS_PHONE_NUMBER_PARAMETER_NAME"]
 WEBSUB_HMAC_SECRET_PARAMETER_NAME = os.environ["WEBSUB_HMAC_SECRET_PARAMETER_NAME"]
+WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME = os.environ[
+    "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME"
+]
 YOUTUBE_API_KEY_PARAMETER_NAME = os.environ["YOUTUBE_API_KEY_PARAMETER_NAME"]
 
-dynamodb_client = boto3.client("dynamodb")
-sns_client = boto3.client("sns")
+# 監視するチャンネルのレジストリのバックエンド(channel_registry参照)
+# parameter(単一チャンネルの構成)以外の場合は、監視しないチャンネルの動画を除外する
+CHANNEL_REGISTRY_BACKEND = os.environ.get("CHANNEL_REGISTRY_BACKEND", "parameter")
+
+# 通知済判定をYouTube Data API v3の実行前に行うかどうか
+# 通知済の動画へのプッシュ通知(配信中のタイトル・説明の編集等)でAPIの呼び出しを省略できる
+CHECK_NOTIFIED_BEFORE_LIVE_CHECK = (
+    os.environ.get("CHECK_NOTIFIED_BEFORE_LIVE_CHECK", "true").lower() == "true"
+)
+
+# 互いに独立したI/O処理(通知済判定・ライブ配信判定・電話番号の取得)を並行実行するかどうか
+CONCURRENT_STAGES = os.environ.get("CONCURRENT_STAGES", "false").lower() == "true"
+
+# 削除・非公開にされた動画の通知を受信した場合に、DynamoDBに記録するかどうか
+RECORD_DELETED_VIDEOS = (
+    os.environ.get("RECORD_DELETED_VIDEOS", "false").lower() == "true"
+)
+
+# HMAC署名検証済のプッシュ通知をキューに送信して即座に応答し、
+# 以降の処理をキューをイベントソースとするLambda関数(queue_handler)で非同期に行うかどうか
+ASYNC_PROCESSING = os.environ.get("ASYNC_PROCESSING", "false").lower() == "true"
+
+# ライブ配信予定(upcoming)の動画を記録し、開始予定日時の前後に定期的に再判定するかどうか
+# Hubがライブ配信の開始後に再度プッシュ通知しなくても、再判定でSMS通知できる
+RECHECK_UPCOMING = os.environ.get("RECHECK_UPCOMING", "true").lower() == "true"
+
+# ライブ配信予定の動画を最初に再判定する、開始予定日時の前の時間(秒)
+UPCOMING_RECHECK_LEAD_SECONDS = int(
+    os.environ.get("UPCOMING_RECHECK_LEAD_SECONDS", "60")
+)
+
+# ライブ配信予定の動画を再判定する最短間隔(秒)
+UPCOMING_RECHECK_INTERVAL_SECONDS = int(
+    os.environ.get("UPCOMING_RECHECK_INTERVAL_SECONDS", "60")
+)
+
+# ライブ配信予定の動画の再判定を打ち切る、開始予定日時の後の時間(秒)
+UPCOMING_RECHECK_WINDOW_SECONDS = int(
+    os.environ.get("UPCOMING_RECHECK_WINDOW_SECONDS", "3600")
+)
+
+# 再判定対象のライブ配信予定の動画を、次回の再判定日時の順に取得するDynamoDBのインデックス
+# 再判定対象の項目のみがrecheck_status属性を持つスパースインデックスとする
+RECHECK_INDEX_NAME = "recheck-index"
+RECHECK_STATUS_UPCOMING = "upcoming"
+
+# ライブ配信判定の結果をウォームコンテナ内でキャッシュするエントリー数の上限(0の場合はキャッシュしない)
+# Hubが同じ動画を数秒おきにプッシュ通知した場合に、YouTube Data API v3の呼び出しを省略できる
+VIDEO_STATUS_CACHE_MAX_ENTRIES = int(
+    os.environ.get("VIDEO_STATUS_CACHE_MAX_ENTRIES", "256")
+)
+
+# ライブ配信判定の結果(liveBroadcastContent)ごとのキャッシュ有効期間(秒)
+# ライブ配信予定の動画はライブ配信の開始を検知できるように短くする
+VIDEO_STATUS_CACHE_TTL_SECONDS: Dict[str, float] = {
+    "live": float(os.environ.get("VIDEO_STATUS_CACHE_TTL_LIVE_SECONDS", "300")),
+    "upcoming": float(os.environ.get("VIDEO_STATUS_CACHE_TTL_UPCOMING_SECONDS", "15")),
+    "none": float(os.environ.get("VIDEO_STATUS_CACHE_TTL_NONE_SECONDS", "300")),
+}
+
+# ウォームコンテナ間で共有するライブ配信判定の結果のキャッシュ
+# (ビデオID -> (サムネイル画像URL、開始予定日時))
+_video_status_cache = LruTtlCache(VIDEO_STATUS_CACHE_MAX_ENTRIES)
+
+# ウォームコンテナ内でSMS通知を送信した動画のキャッシュ(ビデオID -> True)
+# Hubが同じ動画を再度プッシュ通知した場合に、DynamoDBでの通知済判定を省略する
+_notified_video_cache = LruTtlCache(VIDEO_STATUS_CACHE_MAX_ENTRIES)
+
+# DynamoDBの項目の有効期間(秒)
+# 有効期間を過ぎた項目はDynamoDBのTTLで自動削除され、テーブルが際限なく増大しない
+ITEM_TTL_SECONDS = int(os.environ.get("ITEM_TTL_SECONDS", "2592000"))
+
+# YouTube Data API v3の1日のクオーターの予算(0の場合は管理しない)と、
+# 残りが少ない場合にライブ配信予定の動画の再判定に使用しない予約分
+YOUTUBE_QUOTA_DAILY_UNITS = int(os.environ.get("YOUTUBE_QUOTA_DAILY_UNITS", "10000"))
+YOUTUBE_QUOTA_RESERVE_UNITS = int(os.environ.get("YOUTUBE_QUOTA_RESERVE_UNITS", "1000"))
+
+# コンテナ内のクオーター消費量をDynamoDBにまとめて反映する消費量と間隔(秒)
+YOUTUBE_QUOTA_SYNC_UNITS = int(os.environ.get("YOUTUBE_QUOTA_SYNC_UNITS", "10"))
+YOUTUBE_QUOTA_SYNC_INTERVAL_SECONDS = float(
+    os.environ.get("YOUTUBE_QUOTA_SYNC_INTERVAL_SECONDS", "60")
+)
+
+# コンテナごとのYouTube Data API v3の呼び出し頻度の上限(1秒あたりの回数、連続して呼び出せる回数)
+YOUTUBE_API_RATE_PER_SECOND = float(os.environ.get("YOUTUBE_API_RATE_PER_SECOND", "5"))
+YOUTUBE_API_BURST = float(os.environ.get("YOUTUBE_API_BURST", "10"))
+
+# ウォームコンテナ間で共有するYouTube Data API v3のクオーター消費量の管理
+_youtube_quota = QuotaTracker(
+    DYNAMODB_TABLE,
+    daily_units=YOUTUBE_QUOTA_DAILY_UNITS,
+    reserve_units=YOUTUBE_QUOTA_RESERVE_UNITS,
+    sync_units=YOUTUBE_QUOTA_SYNC_UNITS,
+    sync_interval_seconds=YOUTUBE_QUOTA_SYNC_INTERVAL_SECONDS,
+    bucket=TokenBucket(YOUTUBE_API_RATE_PER_SECOND, YOUTUBE_API_BURST),
+)
+
+# 並行実行用のスレッドプール(ウォームコンテナ間で再利用する)
+_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="post_notify")
+
+# videos.listで一度に取得できる動画数の上限
+VIDEOS_LIST_MAX_RESULTS = 50
+
+# videos.listの1回の呼び出しで消費するクオーター
+VIDEOS_LIST_QUOTA_UNITS = 1
 
+# videos.listのpartごとに、ライブ配信判定に使用するフィールドのみを取得するfieldsパラメーター
+# 概要欄・タグ等を除外し、レスポンスの転送量とJSONのデコード時間を削減する
+# 該当する動画がない場合もレスポンスを判別できるように、pageInfo/totalResultsを含める
+VIDEOS_LIST_FIELDS: Dict[str, str] = {
+    "snippet": (
+        "pageInfo/totalResults,"
+        "items(id,snippet(liveBroadcastContent,thumbnails(high/url,medium/url,default/url)))"
+    ),
+    "snippet,liveStreamingDetails": (
+        "pageInfo/totalResults,"
+        "items(id,snippet(liveBroadcastContent,thumbnails(high/url,medium/url,default/url)),"
+        "liveStreamingDetails/scheduledStartTime)"
+    ),
+}
 
-def verify_hmac_signature(event: Dict[str, Any]) -> str | None:
+# videos.listのレスポンスをETagとともにウォームコンテナ内でキャッシュするエントリー数の上限と有効期間(秒)
+# 同じ動画を再度判定する際にIf-None-Matchを送信し、変更がない場合(304)はキャッシュしたレスポンスを使用する
+VIDEOS_ETAG_CACHE_MAX_ENTRIES = int(
+    os.environ.get("VIDEOS_ETAG_CACHE_MAX_ENTRIES", "256")
+)
+VIDEOS_ETAG_CACHE_TTL_SECONDS = float(
+    os.environ.get("VIDEOS_ETAG_CACHE_TTL_SECONDS", "3600")
+)
+
+# ウォームコンテナ間で共有するvideos.listのレスポンスのキャッシュ
+# ((part, ビデオID) -> (ETag, レスポンスのJSON))
+_videos_etag_cache = LruTtlCache(VIDEOS_ETAG_CACHE_MAX_ENTRIES)
+
+# HMAC署名検証に失敗した場合に、HMACシークレットを再取得する最短間隔(秒)
+HMAC_SECRET_REFRESH_INTERVAL_SECONDS = 30
+
+
+def get_raw_body(event: Dict[str, Any]) -> bytes:
+    """
+    API Gatewayイベントから本文をバイト列として取得する
+
+    Args:
+        event (dict): API Gatewayイベント
+
+    Returns:
+        bytes: 本文
+    """
+    body: str = event.get("body") or ""
+    if event.get("isBase64Encoded"):
+        return base64.b64decode(body)
+    return body.encode("utf-8")
+
+
+def verify_hmac_signature(
+    event: Dict[str, Any], body: bytes | None = None
+) -> str | None:
     """
     Google PubSubHubbub Hubからのプッシュ通知のHMAC署名を検証する
 
     Args:
         event (dict): API Gatewayイベント
+        body (bytes | None): 本文、Noneの場合はAPI Gatewayイベントから取得
 
     Returns:
         str | None: 検証成功時はNone、失敗時はエラーメッセージ
@@ -42,92 +224,281 @@ def verify_hmac_signature(event: Dict[str, Any]) -> str | None:
     if not signature:
         return "Missing X-Hub-Signature header"
 
-    hmac_secret: str = get_parameter_value(WEBSUB_HMAC_SECRET_PARAMETER_NAME)
-
     # 署名の形式を解析し、サポートされているアルゴリズムかをチェック
     method, sig = signature.split("=", 1)
     if method not in ["sha1", "sha256", "sha384", "sha512"]:
         return f"Unsupported signature method: {method}"
 
-    # HMACを計算してセキュアに比較
-    expected_signature: str = hmac.new(
-        hmac_secret.encode("utf-8"),
-        event.get("body", "").encode("utf-8"),
-        getattr(hashlib, method),
-    ).hexdigest()
-    if not hmac.compare_digest(sig, expected_signature):
-        return "HMAC signature verification failed"
+    # 現在のHMACシークレット、ローテーション前のHMACシークレットの順にHMACを計算してセキュアに比較
+    # いずれも一致しない場合は、HMACシークレットがローテーションされた可能性があるため、
+    # キャッシュが再取得間隔より古ければSSMから再取得して再度比較する
+    if body is None:
+        body = get_raw_body(event)
+    for ttl_seconds in [None, HMAC_SECRET_REFRESH_INTERVAL_SECONDS]:
+        for hmac_secret in iter_hmac_secrets(ttl_seconds):
+            mac: hmac.HMAC = get_keyed_hmac(hmac_secret, method).copy()
+            mac.update(body)
+            if hmac.compare_digest(sig, mac.hexdigest()):
+                return None
 
-    return None
+    return "HMAC signature verification failed"
 
 
-def parse_websub_xml(xml_content: str) -> Dict[str, str]:
+def iter_hmac_secrets(ttl_seconds: float | None) -> Iterator[str]:
     """
-    WebSubプッシュ通知のXMLコンテンツを解析する
+    HMAC署名検証に使用するHMACシークレットを、現在のもの、ローテーション前のものの順に返す
+    ローテーション前のHMACシークレットは、現在のHMACシークレットで検証に失敗した場合のみ取得する
 
     Args:
-        xml_content (str): XMLコンテンツ
+        ttl_seconds (float | None): キャッシュ有効期間(秒)、Noneの場合はデフォルト値
+
+    Yields:
+        str: HMACシークレット
+    """
+    current_secret: str | None = get_current_hmac_secret(
+        WEBSUB_HMAC_SECRET_PARAMETER_NAME, ttl_seconds
+    )
+    if current_secret is not None:
+        yield current_secret
+
+    previous_secret: str | None = get_previous_hmac_secret(
+        WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME, ttl_seconds
+    )
+    if previous_secret is not None:
+        yield previous_secret
+
+
+@lru_cache(maxsize=16)
+def get_keyed_hmac(hmac_secret: str, method: str) -> hmac.HMAC:
+    """
+    HMACシークレットとアルゴリズムごとに、鍵の導出を済ませたHMACオブジェクトを取得する
+    呼び出し元は返り値をcopy()してから使用すること
+
+    Args:
+        hmac_secret (str): HMACシークレット
+        method (str): ハッシュアルゴリズム名(sha1, sha256, sha384, sha512)
 
     Returns:
-        Dict[str, str]: 解析結果(ビデオID、動画タイトル、動画URL)
+        hmac.HMAC: メッセージ未入力のHMACオブジェクト
     """
-    root: Element = fromstring(xml_content)
-    namespaces: Dict[str, str] = {
-        "atom": "http://www.w3.org/2005/Atom",
-        "yt": "http://www.youtube.com/xml/schemas/2015",
-    }
+    return hmac.new(hmac_secret.encode("utf-8"), digestmod=getattr(hashlib, method))
+
 
-    # entryを検索
-    entry: Element | None = root.find("atom:entry", namespaces)
-    if entry is None:
+def parse_websub_xml(body: bytes) -> Tuple[List[Dict[str, str]], List[str]]:
+    """
+    WebSubプッシュ通知のXMLコンテンツを、本文のバイト列のままストリーミングで解析する
+    1つのプッシュ通知に複数のentryが含まれる場合はすべて返す
+    ビデオIDが重複するentryは、最初のentryのみ返す
+
+    Args:
+        body (bytes): XMLコンテンツ
+
+    Returns:
+        Tuple[List[Dict[str, str]], List[str]]:
+            entryごとの解析結果(ビデオID、動画タイトル、動画URL、存在する場合はチャンネルID)、
+            削除・非公開にされた動画(at:deleted-entry)のビデオID
+    """
+    feed: Feed = parse_feed(body)
+    if not feed.entries and not feed.deleted_video_ids:
         raise ValueError("No entry found in XML")
 
-    # ビデオIDを取得
-    video_id_element: Element | None = entry.find("yt:videoId", namespaces)
-    if video_id_element is None:
-        raise ValueError("No videoId found in XML")
-    video_id: str = video_id_element.text
-
-    # タイトルを取得
-    title_element: Element | None = entry.find("atom:title", namespaces)
-    if title_element is None:
-        raise ValueError("No title found in XML")
-    title: str = title_element.text
-
-    return {
-        "video_id": video_id,
-        "title": title,
-        "url": f"https://www.youtube.com/watch?v={video_id}",
-    }
+    video_data_list: Dict[str, Dict[str, str]] = {}
+    for entry in feed.entries:
+        if "video_id" not in entry:
+            raise ValueError("No videoId found in XML")
+        if "title" not in entry:
+            raise ValueError("No title found in XML")
+
+        video_data: Dict[str, str] = {
+            "video_id": entry["video_id"],
+            "title": entry["title"],
+            "url": build_video_url(entry["video_id"]),
+        }
+        if "channel_id" in entry:
+            video_data["channel_id"] = entry["channel_id"]
+        video_data_list.setdefault(entry["video_id"], video_data)
+
+    return list(video_data_list.values()), feed.deleted_video_ids
+
+
+def build_video_url(video_id: str) -> str:
+    """
+    ビデオIDから動画URLを生成する
+    動画URLはビデオIDから導出できるため、DynamoDBには保存せずに読み込み時に生成する
+
+    Args:
+        video_id (str): ビデオID
+
+    Returns:
+        str: 動画URL
+    """
+    return f"https://www.youtube.com/watch?v={video_id}"
 
 
-def check_if_live_streaming(video_id: str) -> str | None:
+def check_if_live_streaming(
+    video_ids: List[str],
+    scheduled_start_times: Dict[str, int] | None = None,
+    low_priority: bool = False,
+) -> Dict[str, str | None]:
     """
     YouTube Data API v3を使用して現在ライブ配信中かどうかを判定し、
     ライブ配信中の場合はサムネイル画像URLを取得する
+    最大50件のビデオIDを1回のvideos.listでまとめて判定する
+    判定結果はliveBroadcastContentごとの有効期間でキャッシュし、
+    有効期間内の動画はAPIを実行せずにキャッシュの判定結果を返す
 
     Args:
-        video_id (str): ビデオID
+        video_ids (List[str]): ビデオID
+        scheduled_start_times (Dict[str, int] | None):
+            指定した場合は、ライブ配信予定の動画の開始予定日時(Unix timestamp 形式)を
+            ビデオIDごとに格納する
+        low_priority (bool): クオーターの残りが少ない場合に判定しない優先度の低い判定の場合True
+
+    Returns:
+        Dict[str, str | None]: ビデオIDごとの判定結果、
+                               現在ライブ配信中の場合はサムネイル画像URL(取得できない場合は空文字列)、
+                               ライブ配信中でないか動画が存在しない場合はNone
+
+    Raises:
+        RateLimitedError: YouTube Data API v3の呼び出し頻度の上限を超えた場合
+        QuotaExceededError: YouTube Data API v3のクオーターの予算を超える場合
+    """
+    # キャッシュ済の動画はキャッシュの判定結果を使用し、それ以外の動画のみAPIで判定する
+    thumbnail_urls: Dict[str, str | None] = {}
+    uncached_video_ids: List[str] = []
+    for video_id in video_ids:
+        cached: Tuple[str | None, int | None] | None = _video_status_cache.get(video_id)
+        if cached is None:
+            uncached_video_ids.append(video_id)
+            continue
+        thumbnail_urls[video_id] = cached[0]
+        if scheduled_start_times is not None and cached[1] is not None:
+            scheduled_start_times[video_id] = cached[1]
+    # 通知済判定でのAPI実行の省略(YouTubeApiCallsSaved)と区別して、キャッシュのヒット率を記録する
+    if video_ids:
+        put_metrics(
+            {
+                "VideoStatusCacheHits": (
+                    len(video_ids) - len(uncached_video_ids),
+                    "Count",
+                ),
+                "VideoStatusCacheMisses": (len(uncached_video_ids), "Count"),
+            }
+        )
+
+    for i in range(0, len(uncached_video_ids), VIDEOS_LIST_MAX_RESULTS):
+        batch: List[str] = uncached_video_ids[i : i + VIDEOS_LIST_MAX_RESULTS]
+        _youtube_quota.acquire(VIDEOS_LIST_QUOTA_UNITS, low_priority=low_priority)
+
+        # YouTube Data API v3を実行したレスポンスから動画情報を取得
+        part: str = (
+            "snippet"
+            if scheduled_start_times is None
+            else "snippet,liveStreamingDetails"
+        )
+        body: Dict[str, Any] = get_videos(
+            {
+                "part": part,
+                "id": ",".join(batch),
+                "fields": VIDEOS_LIST_FIELDS[part],
+                "key": get_parameter_value(YOUTUBE_API_KEY_PARAMETER_NAME),
+            }
+        )
+        # fieldsを指定したレスポンスは、該当する動画がない場合にitemsを含まない
+        items: List[Dict[str, Any]] | None = body.get("items")
+        if items is None and "pageInfo" in body:
+            items = []
+        if items is None:
+            raise ValueError("Video not found")
+        for item in items:
+            thumbnail_urls[item["id"]] = get_live_thumbnail_url(item)
+            scheduled_start_time: int | None = get_scheduled_start_time(item)
+            if scheduled_start_times is not None and scheduled_start_time is not None:
+                scheduled_start_times[item["id"]] = scheduled_start_time
+            _video_status_cache.put(
+                item["id"],
+                (thumbnail_urls[item["id"]], scheduled_start_time),
+                VIDEO_STATUS_CACHE_TTL_SECONDS.get(
+                    item["snippet"]["liveBroadcastContent"],
+                    VIDEO_STATUS_CACHE_TTL_SECONDS["none"],
+                ),
+            )
+
+        # 削除・非公開等でレスポンスに含まれない動画はライブ配信中でないとみなす
+        for video_id in batch:
+            if video_id not in thumbnail_urls:
+                logger.warning("Video not found: %s", video_id)
+                thumbnail_urls[video_id] = None
+                _video_status_cache.put(
+                    video_id, (None, None), VIDEO_STATUS_CACHE_TTL_SECONDS["none"]
+                )
+
+    return thumbnail_urls
+
+
+def get_videos(params: Dict[str, str]) -> Dict[str, Any]:
+    """
+    YouTube Data API v3のvideos.listを実行する
+    ウォームコンテナ間で共有するHTTPセッションで接続を再利用し、
+    サーキットブレーカーを介して呼び出す
+    ビデオIDが1件の場合のみ、同じpart・ビデオIDのレスポンスをキャッシュしている場合は
+    If-None-Matchを送信し、変更がない場合(304)はキャッシュしたレスポンスを返す
+
+    Args:
+        params (Dict[str, str]): クエリパラメーター
+
+    Returns:
+        Dict[str, Any]: レスポンスのJSON
+
+    Raises:
+        CircuitOpenError: YouTube Data API v3のサーキットブレーカーがオープンの場合
+    """
+    # ETagはレスポンス全体に対するものであり、複数件のレスポンスのETagは
+    # ビデオIDの組み合わせが一致しない限り再利用できないため、1件の場合のみキャッシュする
+    cache_key: Tuple[str, str] | None = (
+        None if "," in params["id"] else (params["part"], params["id"])
+    )
+    cached: Tuple[str, Dict[str, Any]] | None = (
+        _videos_etag_cache.get(cache_key) if cache_key is not None else None
+    )
+
+    def request() -> Dict[str, Any]:
+        response: Any = http_get(
+            "https://www.googleapis.com/youtube/v3/videos",
+            params=params,
+            headers={"If-None-Match": cached[0]} if cached is not None else {},
+        )
+        if response.status_code == 304 and cached is not None:
+            put_metric("YouTubeNotModified", 1)
+            return cached[1]
+        response.raise_for_status()
+        body: Dict[str, Any] = response.json()
+        etag: str | None = response.headers.get("ETag")
+        if etag and cache_key is not None:
+            _videos_etag_cache.put(
+                cache_key, (etag, body), VIDEOS_ETAG_CACHE_TTL_SECONDS
+            )
+        return body
+
+    breaker: CircuitBreaker | None = get_circuit_breaker("youtube")
+    with stage("YouTube"):
+        if breaker is None:
+            return request()
+        return breaker.call(request)
+
+
+def get_live_thumbnail_url(item: Dict[str, Any]) -> str | None:
+    """
+    videos.listのレスポンスの動画情報から、現在ライブ配信中の場合はサムネイル画像URLを取得する
+
+    Args:
+        item (Dict[str, Any]): videos.listのレスポンスのitems要素
 
     Returns:
         str | None: 現在ライブ配信中の場合はサムネイル画像URL(取得できない場合は空文字列)、
                     ライブ配信中でない場合はNone
     """
-    # YouTube Data API v3を実行したレスポンスから動画情報を取得
-    response: requests.Response = requests.get(
-        "https://www.googleapis.com/youtube/v3/videos",
-        params={
-            "part": "snippet",
-            "id": video_id,
-            "key": get_parameter_value(YOUTUBE_API_KEY_PARAMETER_NAME),
-        },
-        timeout=10,
-    )
-    response.raise_for_status()
-    items: List[Dict[str, Any]] | None = response.json().get("items")
-    if items is None:
-        raise ValueError("Video not found")
-    snippet: Dict[str, Any] | None = items[0].get("snippet")
+    snippet: Dict[str, Any] | None = item.get("snippet")
     if snippet is None:
         raise ValueError("snippet not found")
 
@@ -153,9 +524,40 @@ def check_if_live_streaming(video_id: str) -> str | None:
     return None
 
 
+def get_scheduled_start_time(item: Dict[str, Any]) -> int | None:
+    """
+    videos.listのレスポンスの動画情報から、ライブ配信予定の場合は開始予定日時を取得する
+
+    Args:
+        item (Dict[str, Any]): videos.listのレスポンスのitems要素
+
+    Returns:
+        int | None: ライブ配信予定の場合は開始予定日時(Unix timestamp 形式)、
+                    ライブ配信予定でないか開始予定日時を取得できない場合はNone
+    """
+    if item.get("snippet", {}).get("liveBroadcastContent") != "upcoming":
+        return None
+
+    scheduled_start_time: str | None = item.get("liveStreamingDetails", {}).get(
+        "scheduledStartTime"
+    )
+    if not scheduled_start_time:
+        return None
+    try:
+        return int(
+            datetime.fromisoformat(
+                scheduled_start_time.replace("Z", "+00:00")
+            ).timestamp()
+        )
+    except ValueError:
+        logger.warning("Invalid scheduledStartTime: %s", scheduled_start_time)
+        return None
+
+
 def check_if_notified(video_id: str) -> bool:
     """
     DynamoDBで通知済かどうかを判定する
+    ウォームコンテナ内でSMS通知を送信した動画は、DynamoDBを参照せずに通知済と判定する
 
     Args:
         video_id (str): ビデオID
@@ -163,8 +565,11 @@ def check_if_notified(video_id: str) -> bool:
     Returns:
         bool: 通知済の場合True、未通知の場合False
     """
+    if _notified_video_cache.get(video_id) is not None:
+        return True
+
     # DynamoDBから項目を取得し、項目が存在しない場合は未通知として判定
-    response: Dict[str, Any] | None = dynamodb_client.get_item(
+    response: Dict[str, Any] | None = get_guarded_client("dynamodb").get_item(
         TableName=DYNAMODB_TABLE, Key={"video_id": {"S": video_id}}, ConsistentRead=True
     )
     if response is None or "Item" not in response:
@@ -174,64 +579,536 @@ def check_if_notified(video_id: str) -> bool:
     return response["Item"].get("is_notified", {}).get("BOOL", False)
 
 
-def record_notified(video_id: str, title: str, url: str, thumbnail_url: str) -> None:
+def claim_video(video_id: str, title: str, thumbnail_url: str) -> Dict[str, Any] | None:
     """
-    DynamoDBに通知済として記録する
+    DynamoDBへの1回の条件付き書き込みで、動画のSMS通知を行う権利(クレーム)を獲得し、
+    同時に通知済として有効期限とともに記録する
+    未通知の場合のみ獲得できるため、同じ動画のプッシュ通知を並行して受信してもSMS通知は1回のみとなる
+    通知済の記録はSMS通知の前に行い、SMS通知に失敗した場合のみrelease_claimで取り消すため、
+    SMS通知の後に記録に失敗したり異常終了したりしても、Hubの再送で重複してSMS通知しない
+    項目を小さく保つため、ビデオIDから導出できる動画URLと、空のサムネイル画像URLは保存しない
 
     Args:
         video_id (str): ビデオID
         title (str): 配信タイトル
-        url (str): 動画URL
         thumbnail_url (str): サムネイル画像URL
+
+    Returns:
+        Dict[str, Any] | None: 獲得できた場合は獲得前の項目の属性(項目が存在しない場合は空)、
+                               通知済または他の実行が獲得済の場合はNone
     """
-    update_expression: str = (
-        "SET notified_timestamp = :notified_timestamp, "
-        "is_notified = :is_notified, "
-        "title = :title, "
-        "#url = :url, "
-        "thumbnail_url = :thumbnail_url"
-    )
-    expression_attribute_names: Dict[str, str] = {"#url": "url"}
+    now: int = int(time.time())
+    set_expressions: List[str] = [
+        "notified_timestamp = :notified_timestamp",
+        "is_notified = :is_notified",
+        "title = :title",
+        "#ttl = :ttl",
+    ]
     expression_attribute_values: Dict[str, Any] = {
-        ":notified_timestamp": {"N": str(int(time.time()))},
+        ":notified_timestamp": {"N": str(now)},
         ":is_notified": {"BOOL": True},
         ":title": {"S": title},
-        ":url": {"S": url},
-        ":thumbnail_url": {"S": thumbnail_url},
+        ":ttl": {"N": str(now + ITEM_TTL_SECONDS)},
+        ":false": {"BOOL": False},
     }
-    dynamodb_client.update_item(
+    if thumbnail_url:
+        set_expressions.append("thumbnail_url = :thumbnail_url")
+        expression_attribute_values[":thumbnail_url"] = {"S": thumbnail_url}
+
+    try:
+        response: Dict[str, Any] | None = get_guarded_client("dynamodb").update_item(
+            TableName=DYNAMODB_TABLE,
+            Key={"video_id": {"S": video_id}},
+            UpdateExpression=f"SET {', '.join(set_expressions)}",
+            ConditionExpression=(
+                "attribute_not_exists(is_notified) OR is_notified = :false"
+            ),
+            ExpressionAttributeNames={"#ttl": "ttl"},
+            ExpressionAttributeValues=expression_attribute_values,
+            ReturnValues="ALL_OLD",
+        )
+    except Exception as e:
+        if not is_conditional_check_failed(e):
+            raise
+        logger.info("Video already notified or being notified: %s", video_id)
+        return None
+    return (response or {}).get("Attributes", {})
+
+
+def release_claim(video_id: str) -> None:
+    """
+    SMS通知に失敗した場合に、Hubの再送時に再度クレームを獲得できるように、
+    DynamoDBのクレーム・通知済の記録を取り消す
+
+    Args:
+        video_id (str): ビデオID
+    """
+    get_guarded_client("dynamodb").update_item(
         TableName=DYNAMODB_TABLE,
         Key={"video_id": {"S": video_id}},
-        UpdateExpression=update_expression,
-        ExpressionAttributeNames=expression_attribute_names,
-        ExpressionAttributeValues=expression_attribute_values,
+        UpdateExpression=("SET is_notified = :is_notified REMOVE notified_timestamp"),
+        ExpressionAttributeValues={":is_notified": {"BOOL": False}},
+    )
+
+
+def record_deleted(video_id: str) -> None:
+    """
+    DynamoDBの項目が存在する場合に、削除・非公開にされた動画として記録する
+    項目が存在しない(通知していない)動画の項目は作成しない
+
+    Args:
+        video_id (str): ビデオID
+    """
+    try:
+        get_guarded_client("dynamodb").update_item(
+            TableName=DYNAMODB_TABLE,
+            Key={"video_id": {"S": video_id}},
+            UpdateExpression="SET deleted_timestamp = :deleted_timestamp",
+            ConditionExpression="attribute_exists(video_id)",
+            ExpressionAttributeValues={
+                ":deleted_timestamp": {"N": str(int(time.time()))}
+            },
+        )
+    except Exception as e:
+        if not is_conditional_check_failed(e):
+            raise
+        logger.info("Deleted video was not notified: %s", video_id)
+
+
+def schedule_recheck(video_data: Dict[str, str], scheduled_start_time: int) -> None:
+    """
+    ライブ配信予定の動画を、次回の再判定日時とともにDynamoDBに記録する
+    開始予定日時の前までは再判定せず、以降は最短間隔ごとに再判定し、
+    開始予定日時から一定時間を過ぎた場合は再判定を打ち切る
+    通知済の動画は記録しない
+
+    Args:
+        video_data (Dict[str, str]): 解析結果(ビデオID、動画タイトル、動画URL)
+        scheduled_start_time (int): 開始予定日時(Unix timestamp 形式)
+    """
+    video_id: str = video_data["video_id"]
+    now: int = int(time.time())
+    if now >= scheduled_start_time + UPCOMING_RECHECK_WINDOW_SECONDS:
+        logger.info("Upcoming video did not start in time: %s", video_id)
+        cancel_recheck(video_id)
+        return
+
+    next_check_at: int = max(
+        scheduled_start_time - UPCOMING_RECHECK_LEAD_SECONDS,
+        now + UPCOMING_RECHECK_INTERVAL_SECONDS,
+    )
+    try:
+        get_guarded_client("dynamodb").update_item(
+            TableName=DYNAMODB_TABLE,
+            Key={"video_id": {"S": video_id}},
+            UpdateExpression=(
+                "SET title = :title, "
+                "scheduled_start_time = :scheduled_start_time, "
+                "next_check_at = :next_check_at, "
+                "recheck_status = :recheck_status, "
+                "#ttl = :ttl"
+            ),
+            ConditionExpression=(
+                "attribute_not_exists(is_notified) OR is_notified = :false"
+            ),
+            ExpressionAttributeNames={"#ttl": "ttl"},
+            ExpressionAttributeValues={
+                ":title": {"S": video_data["title"]},
+                ":scheduled_start_time": {"N": str(scheduled_start_time)},
+                ":next_check_at": {"N": str(next_check_at)},
+                ":recheck_status": {"S": RECHECK_STATUS_UPCOMING},
+                ":ttl": {"N": str(now + ITEM_TTL_SECONDS)},
+                ":false": {"BOOL": False},
+            },
+        )
+    except Exception as e:
+        if not is_conditional_check_failed(e):
+            raise
+        logger.info("Upcoming video already notified: %s", video_id)
+        return
+    logger.info("Scheduled recheck for video %s at %d", video_id, next_check_at)
+
+
+def cancel_recheck(video_id: str) -> None:
+    """
+    DynamoDBの項目が存在する場合に、再判定の対象から除外する
+
+    Args:
+        video_id (str): ビデオID
+    """
+    try:
+        get_guarded_client("dynamodb").update_item(
+            TableName=DYNAMODB_TABLE,
+            Key={"video_id": {"S": video_id}},
+            UpdateExpression=(
+                "REMOVE recheck_status, next_check_at, scheduled_start_time"
+            ),
+            ConditionExpression="attribute_exists(video_id)",
+        )
+    except Exception as e:
+        if not is_conditional_check_failed(e):
+            raise
+
+
+def get_due_upcoming_videos(now: int) -> List[Dict[str, str]]:
+    """
+    次回の再判定日時を過ぎたライブ配信予定の動画を、再判定日時の古い順にDynamoDBから取得する
+    1回のvideos.listでまとめて判定できる件数を上限とする
+
+    Args:
+        now (int): 現在日時(Unix timestamp 形式)
+
+    Returns:
+        List[Dict[str, str]]: 動画ごとのビデオID、動画タイトル、動画URL
+    """
+    response: Dict[str, Any] = get_guarded_client("dynamodb").query(
+        TableName=DYNAMODB_TABLE,
+        IndexName=RECHECK_INDEX_NAME,
+        KeyConditionExpression=(
+            "recheck_status = :recheck_status AND next_check_at <= :now"
+        ),
+        ExpressionAttributeValues={
+            ":recheck_status": {"S": RECHECK_STATUS_UPCOMING},
+            ":now": {"N": str(now)},
+        },
+        Limit=VIDEOS_LIST_MAX_RESULTS,
+    )
+    return [
+        {
+            "video_id": item["video_id"]["S"],
+            "title": item["title"]["S"],
+            "url": build_video_url(item["video_id"]["S"]),
+        }
+        for item in response.get("Items", [])
+    ]
+
+
+@lru_cache(maxsize=1)
+def get_notification_dispatcher() -> NotificationDispatcher:
+    """
+    SMSと、環境変数NOTIFICATION_SINKSで選択した通知先に通知するディスパッチャーを取得する
+    初回呼び出し時に生成し、以降は同じディスパッチャーを返す
+
+    Returns:
+        NotificationDispatcher: ディスパッチャー
+    """
+    return create_notification_dispatcher(
+        SmsSink(
+            lambda: parse_phone_numbers(
+                get_parameter_value(SMS_PHONE_NUMBER_PARAMETER_NAME)
+            ),
+            lambda: get_guarded_client("sns"),
+        )
     )
 
 
 def send_sms_notification(title: str, url: str, thumbnail_url: str) -> None:
     """
-    SNSを使用してライブ配信情報をSMS通知する
+    SNSを使用してライブ配信情報を、通知先のすべての電話番号に並行してSMS通知する
+    一部の電話番号への送信に失敗した場合は、Hubの再送で送信済の電話番号に重複して
+    SMS通知しないよう、エラーログを出力して正常終了する
+    Webhook等の追加の通知先にもSMSと並行して通知し、失敗してもSMS通知の結果には影響しない
 
     Args:
         title (str): 配信タイトル
         url (str): 動画URL
         thumbnail_url (str): サムネイル画像URL
-    """
-    phone_number: str = get_parameter_value(SMS_PHONE_NUMBER_PARAMETER_NAME)
 
+    Raises:
+        Exception: すべての電話番号への送信に失敗した場合
+    """
     # 配信タイトル、動画URL、サムネイル画像URLをまとめて送信
     # サムネイル画像URLを取得できない(空文字列である)場合はそれを含めない
     if thumbnail_url:
-        sns_client.publish(
-            PhoneNumber=phone_number, Message=f"{title}\n\n{url}\n\n{thumbnail_url}"
-        )
+        message: str = f"{title}\n\n{url}\n\n{thumbnail_url}"
     else:
-        sns_client.publish(PhoneNumber=phone_number, Message=f"{title}\n\n{url}")
+        message = f"{title}\n\n{url}"
+    get_notification_dispatcher().dispatch(
+        Notification(
+            subject=title,
+            message=message,
+            data={"title": title, "url": url, "thumbnail_url": thumbnail_url},
+        )
+    )
+
 
+def record_deleted_videos(video_ids: List[str]) -> None:
+    """
+    削除・非公開にされた動画をDynamoDBに記録する
+    記録に失敗してもHubが再送しないように、エラーログを出力して処理を継続する
 
+    Args:
+        video_ids (List[str]): ビデオID
+    """
+    for video_id in video_ids:
+        try:
+            record_deleted(video_id)
+        except Exception:
+            logger.error("Failed to record deleted video %s", video_id)
+            logger.error(traceback.format_exc())
+
+
+def notify_sequentially(video_data_list: List[Dict[str, str]]) -> None:
+    """
+    entryごとの通知済判定・ライブ配信判定・クレームの獲得(通知済記録)・SMS通知を順に行う
+    ライブ配信判定はすべてのentryをまとめて1回で行う
+
+    Args:
+        video_data_list (List[Dict[str, str]]): entryごとの解析結果(ビデオID、動画タイトル、動画URL)
+    """
+    # 通知済のentryは除外(重複SMS通知防止)
+    # YouTube Data API v3の実行前に判定し、すべて通知済の場合は省略できたAPIの呼び出しを
+    # メトリクスに記録してここで正常終了
+    pending: List[Dict[str, str]] = video_data_list
+    if CHECK_NOTIFIED_BEFORE_LIVE_CHECK:
+        pending = [
+            video_data
+            for video_data in video_data_list
+            if not _is_notified(video_data["video_id"])
+        ]
+        if not pending:
+            put_metric("YouTubeApiCallsSaved", 1)
+            return
+
+    # 現在ライブ配信中のentryのサムネイル画像URLをまとめて取得
+    scheduled_start_times: Dict[str, int] | None = {} if RECHECK_UPCOMING else None
+    thumbnail_urls: Dict[str, str | None] = check_if_live_streaming(
+        [video_data["video_id"] for video_data in pending],
+        scheduled_start_times=scheduled_start_times,
+    )
+
+    notify_live_videos(pending, thumbnail_urls, scheduled_start_times or {})
+
+
+def notify_live_videos(
+    video_data_list: List[Dict[str, str]],
+    thumbnail_urls: Dict[str, str | None],
+    scheduled_start_times: Dict[str, int],
+    rechecking: bool = False,
+) -> None:
+    """
+    ライブ配信判定の結果をもとに、ライブ配信中のentryのクレームの獲得(通知済記録)・SMS通知を
+    順に行い、ライブ配信予定のentryは再判定の対象として記録する
+
+    Args:
+        video_data_list (List[Dict[str, str]]): entryごとの解析結果(ビデオID、動画タイトル、動画URL)
+        thumbnail_urls (Dict[str, str | None]): ビデオIDごとのライブ配信判定の結果
+        scheduled_start_times (Dict[str, int]): ライブ配信予定の動画の開始予定日時
+        rechecking (bool): 再判定の対象の動画を再判定している場合True
+    """
+    for video_data in video_data_list:
+        # ライブ配信中でないentryはスキップし、ライブ配信予定の場合は再判定の対象として記録
+        thumbnail_url: str | None = thumbnail_urls.get(video_data["video_id"])
+        if thumbnail_url is None:
+            logger.info("Video is not a live stream: %s", video_data)
+            if video_data["video_id"] in scheduled_start_times:
+                schedule_recheck(
+                    video_data, scheduled_start_times[video_data["video_id"]]
+                )
+            continue
+        video_data["thumbnail_url"] = thumbnail_url
+        logger.info("video_data: %s", video_data)
+        claim_and_notify(video_data, thumbnail_url, rechecking)
+
+
+def notify_concurrently(video_data_list: List[Dict[str, str]]) -> None:
+    """
+    互いに独立したI/O処理を並行実行して、entryごとの通知済判定・ライブ配信判定を行い、
+    クレームの獲得(通知済記録)・SMS通知を行う
+    ライブ配信判定はすべてのentryをまとめて1回で行う
+    並行実行した処理の例外は呼び出し元に送出する
+
+    Args:
+        video_data_list (List[Dict[str, str]]): entryごとの解析結果(ビデオID、動画タイトル、動画URL)
+    """
+    video_ids: List[str] = [video_data["video_id"] for video_data in video_data_list]
+
+    # entryごとの通知済判定、まとめたライブ配信判定、電話番号の取得(キャッシュ)を並行実行
+    notified_futures: Dict[str, Future] = {
+        video_id: _executor.submit(check_if_notified, video_id)
+        for video_id in video_ids
+    }
+    scheduled_start_times: Dict[str, int] | None = {} if RECHECK_UPCOMING else None
+    live_future: Future = _executor.submit(
+        check_if_live_streaming, video_ids, scheduled_start_times=scheduled_start_times
+    )
+    phone_future: Future = _executor.submit(
+        get_parameter_value, SMS_PHONE_NUMBER_PARAMETER_NAME
+    )
+
+    # 通知済のentryは、ライブ配信判定の結果(例外を含む)によらず除外(重複SMS通知防止)
+    pending: List[Dict[str, str]] = []
+    for video_data in video_data_list:
+        if notified_futures[video_data["video_id"]].result():
+            logger.info("Video already notified, skipping: %s", video_data["video_id"])
+        else:
+            pending.append(video_data)
+    if not pending:
+        return
+
+    # ライブ配信中でないentryはスキップ
+    # 開始予定日時はライブ配信判定の完了後に参照する
+    thumbnail_urls: Dict[str, str | None] = live_future.result()
+    phone_future.result()
+    for video_data in pending:
+        # ライブ配信予定のentryは再判定の対象として記録
+        thumbnail_url: str | None = thumbnail_urls.get(video_data["video_id"])
+        if thumbnail_url is None:
+            logger.info("Video is not a live stream: %s", video_data)
+            if video_data["video_id"] in (scheduled_start_times or {}):
+                schedule_recheck(
+                    video_data, scheduled_start_times[video_data["video_id"]]
+                )
+            continue
+
+        claim_and_notify(video_data, thumbnail_url)
+
+
+def claim_and_notify(
+    video_data: Dict[str, str], thumbnail_url: str, rechecking: bool = False
+) -> None:
+    """
+    ライブ配信中の動画のクレームを獲得して通知済として記録し、SMS通知を送信する
+    クレームを獲得できない動画は、通知済または他の実行がSMS通知中のためスキップする
+    SMS通知に失敗した場合は、Hubの再送時に通知されるようにクレームを解放して例外を送出する
+    再判定の対象として記録していた動画は、SMS通知の後に再判定の対象から除外する
+
+    Args:
+        video_data (Dict[str, str]): 解析結果(ビデオID、動画タイトル、動画URL)
+        thumbnail_url (str): サムネイル画像URL
+        rechecking (bool): 再判定の対象の動画を再判定している場合True
+    """
+    video_id: str = video_data["video_id"]
+    previous_item: Dict[str, Any] | None = claim_video(
+        video_id, video_data["title"], thumbnail_url
+    )
+    if previous_item is None:
+        # 再判定の対象のまま通知済の動画は、通知した実行での除外に失敗しているため、
+        # 毎回の再判定でクオーターを消費しないよう再判定の対象から除外する
+        if rechecking:
+            _cancel_recheck_after_notified(video_id)
+        return
+
+    try:
+        send_sms_notification(video_data["title"], video_data["url"], thumbnail_url)
+    except Exception:
+        release_claim(video_id)
+        raise
+    logger.info("SMS notification sent for video %s", video_id)
+    _notified_video_cache.put(video_id, True, ITEM_TTL_SECONDS)
+
+    if "recheck_status" in previous_item:
+        _cancel_recheck_after_notified(video_id)
+
+
+def _cancel_recheck_after_notified(video_id: str) -> None:
+    """
+    通知済の動画を再判定の対象から除外する
+    通知済の記録はクレームの獲得時に済んでいるため、除外に失敗しても重複してSMS通知することはなく、
+    ログを出力して次回の再判定で再度除外する
+
+    Args:
+        video_id (str): ビデオID
+    """
+    try:
+        cancel_recheck(video_id)
+    except Exception:
+        logger.error("Failed to cancel recheck for video %s", video_id)
+        logger.error(traceback.format_exc())
+
+
+def _is_notified(video_id: str) -> bool:
+    """
+    通知済かどうかを判定し、通知済の場合はログを出力する
+
+    Args:
+        video_id (str): ビデオID
+
+    Returns:
+        bool: 通知済の場合True、未通知の場合False
+    """
+    if check_if_notified(video_id):
+        logger.info("Video already notified, skipping: %s", video_id)
+        return True
+    return False
+
+
+def filter_monitored_channels(
+    video_data_list: List[Dict[str, str]],
+) -> List[Dict[str, str]]:
+    """
+    監視しない(無効化・登録解除した)チャンネルの動画を除外する
+    Hubはサブスクリプションの有効期間が切れるまでプッシュ通知を続けるため、
+    レジストリで無効化したチャンネルの通知を即座に止める
+
+    Args:
+        video_data_list (List[Dict[str, str]]): entryごとの解析結果
+
+    Returns:
+        List[Dict[str, str]]: 監視するチャンネルの動画の解析結果
+    """
+    if CHANNEL_REGISTRY_BACKEND == "parameter":
+        return video_data_list
+
+    registry = get_channel_registry()
+    monitored: List[Dict[str, str]] = []
+    for video_data in video_data_list:
+        channel: Channel | None = (
+            registry.get_channel(video_data["channel_id"])
+            if "channel_id" in video_data
+            else None
+        )
+        if channel is None or not channel.enabled:
+            logger.info("Ignored video of unmonitored channel: %s", video_data)
+            continue
+        monitored.append(video_data)
+    return monitored
+
+
+def process_notification(body: bytes) -> None:
+    """
+    HMAC署名検証済のプッシュ通知のXMLデータを解析し、ライブ配信中の動画をSMS通知する
+
+    Args:
+        body (bytes): HMAC署名検証済のプッシュ通知の本文
+    """
+    # プッシュ通知内容のXMLデータを解析
+    with stage("Parse"):
+        video_data_list, deleted_video_ids = parse_websub_xml(body)
+    logger.info("video_data_list: %s", video_data_list)
+
+    # 削除・非公開にされた動画の通知(at:deleted-entry)は、Hubが再送しないように
+    # 以降の処理を行わずに正常終了する(設定時はDynamoDBに記録する)
+    if deleted_video_ids:
+        logger.info("Deleted entries: %s", deleted_video_ids)
+        if RECORD_DELETED_VIDEOS:
+            record_deleted_videos(deleted_video_ids)
+    video_data_list = filter_monitored_channels(video_data_list)
+    if not video_data_list:
+        return
+
+    # 監視するチャンネルの動画が含まれる場合のみ、通知に使用するパラメータをまとめて取得する
+    prefetch_parameters(
+        [YOUTUBE_API_KEY_PARAMETER_NAME, SMS_PHONE_NUMBER_PARAMETER_NAME]
+    )
+
+    # 独立したI/O処理を並行実行するか、順に実行する
+    # クオーターの予算を使い切った場合は、Hubが再送しても判定できないため通知せずに終了する
+    try:
+        if CONCURRENT_STAGES:
+            notify_concurrently(video_data_list)
+        else:
+            notify_sequentially(video_data_list)
+    except QuotaExceededError as e:
+        logger.warning("Skipped live streaming check: %s", e)
+        put_metric("YouTubeQuotaDegraded", 1)
+
+
+@timed_handler
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     WebSubでのYouTubeライブ配信通知情報をもとにSMS通知を送信するLambda関数のハンドラー
+    非同期処理時は、HMAC署名検証済の本文をキューに送信して即座に応答する
 
     Args:
         event (dict): API Gatewayイベント
@@ -241,8 +1118,21 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         dict: レスポンス
     """
     try:
+        # HMAC署名検証に使用するパラメータのみを先にまとめて取得し、
+        # 署名が不正なリクエストでそれ以外のパラメータを取得しないようにする
+        prefetch_parameters(
+            [
+                WEBSUB_HMAC_SECRET_PARAMETER_NAME,
+                WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME,
+            ]
+        )
+
+        # 本文はデコードせずにバイト列のまま、HMAC署名検証とXMLデータの解析に使用する
+        body: bytes = get_raw_body(event)
+
         # Google PubSubHubbub Hubからのプッシュ通知のHMAC署名を検証
-        verify_result: str | None = verify_hmac_signature(event)
+        with stage("HMAC"):
+            verify_result: str | None = verify_hmac_signature(event, body)
         if verify_result:
             logger.error("HMAC verification failed: %s", verify_result)
             return {
@@ -250,48 +1140,141 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 "body": verify_result,
             }
 
-        # プッシュ通知内容のXMLデータを解析
-        video_data: Dict[str, str] = parse_websub_xml(event.get("body", ""))
-        logger.info("video_data: %s", video_data)
-
-        # 現在ライブ配信中の場合はサムネイル画像URLを取得し、それ以外の場合はここで正常終了
-        thumbnail_url: str | None = check_if_live_streaming(video_data["video_id"])
-        if thumbnail_url is None:
-            logger.info("Video is not a live stream: %s", video_data)
+        # 非同期処理時は、HMAC署名検証済の本文をキューに送信して即座に応答する
+        if ASYNC_PROCESSING:
+            get_notify_queue().send(body)
             return {
-                "statusCode": 200,
-                "body": "OK",
+                "statusCode": 202,
+                "body": "Accepted",
             }
-        video_data["thumbnail_url"] = thumbnail_url
-        logger.info("video_data: %s", video_data)
 
-        # 通知済の場合はここで正常終了(重複SMS通知防止)
-        if check_if_notified(video_data["video_id"]):
-            logger.info("Video already notified, skipping: %s", video_data["video_id"])
-            return {
-                "statusCode": 200,
-                "body": "OK",
-            }
+        process_notification(body)
+
+        return {
+            "statusCode": 200,
+            "body": "OK",
+        }
+    except CircuitOpenError as e:
+        # 依存サービスの障害時は、タイムアウトを待たずにHubに時間をおいて再送させる
+        logger.warning("%s", e)
+        return {
+            "statusCode": 503,
+            "body": "Service Unavailable",
+        }
+    except RateLimitedError:
+        # 呼び出し頻度の上限を超えた場合は、Hubに時間をおいて再送させる
+        logger.warning("YouTube Data API v3 rate limit exceeded")
+        return {
+            "statusCode": 429,
+            "body": "Too Many Requests",
+        }
+    except Exception:
+        logger.error(traceback.format_exc())
+        return {
+            "statusCode": 500,
+            "body": "Internal Server Error",
+        }
+
+
+@timed_handler
+def queue_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    キューに送信されたHMAC署名検証済のプッシュ通知をもとにSMS通知を送信するLambda関数のハンドラー
+    処理に失敗したメッセージのみを再試行させるため、部分的なバッチレスポンスを返す
+
+    Args:
+        event (dict): SQSイベント
+        context: Lambda実行コンテキスト
+
+    Returns:
+        dict: 部分的なバッチレスポンス(処理に失敗したメッセージID)
+    """
+    batch_item_failures: List[Dict[str, str]] = []
+    for record in event.get("Records", []):
+        try:
+            process_notification(decode_record_body(record))
+        except Exception:
+            logger.error("Failed to process message %s", record.get("messageId"))
+            logger.error(traceback.format_exc())
+            batch_item_failures.append({"itemIdentifier": record["messageId"]})
+
+    return {"batchItemFailures": batch_item_failures}
+
+
+def recheck_upcoming_videos() -> int:
+    """
+    次回の再判定日時を過ぎたライブ配信予定の動画をまとめて再判定し、
+    ライブ配信中の動画をSMS通知する
+    引き続きライブ配信予定の動画は次回の再判定日時を更新し、
+    ライブ配信予定でなくなった動画(配信の取り消し・削除等)は再判定の対象から除外する
+
+    Returns:
+        int: 再判定した動画数
+    """
+    video_data_list: List[Dict[str, str]] = get_due_upcoming_videos(int(time.time()))
+    if not video_data_list:
+        return 0
+    logger.info("Rechecking upcoming videos: %s", video_data_list)
 
-        # SMS通知の送信
-        send_sms_notification(
-            video_data["title"], video_data["url"], video_data["thumbnail_url"]
+    # クオーターの残りが少ない場合は、プッシュ通知の判定を優先して再判定を見送る
+    # 見送った動画は次回の再判定日時を更新しないため、次回以降に再判定する
+    scheduled_start_times: Dict[str, int] = {}
+    try:
+        thumbnail_urls: Dict[str, str | None] = check_if_live_streaming(
+            [video_data["video_id"] for video_data in video_data_list],
+            scheduled_start_times=scheduled_start_times,
+            low_priority=True,
         )
-        logger.info("SMS notification sent for video %s", video_data["video_id"])
-
-        # 通知済として記録
-        record_notified(
-            video_data["video_id"],
-            video_data["title"],
-            video_data["url"],
-            video_data["thumbnail_url"],
+    except (QuotaExceededError, RateLimitedError) as e:
+        logger.warning("Skipped rechecking upcoming videos: %s", e)
+        put_metric("YouTubeQuotaDegraded", 1)
+        return 0
+    for video_data in video_data_list:
+        video_id: str = video_data["video_id"]
+        if (
+            thumbnail_urls.get(video_id) is None
+            and video_id not in scheduled_start_times
+        ):
+            cancel_recheck(video_id)
+
+    notify_live_videos(
+        video_data_list, thumbnail_urls, scheduled_start_times, rechecking=True
+    )
+    return len(video_data_list)
+
+
+@timed_handler
+def recheck_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    ライブ配信予定の動画を定期的に再判定してSMS通知を送信するLambda関数のハンドラー
+
+    Args:
+        event (dict): EventBridgeイベント
+        context: Lambda実行コンテキスト
+
+    Returns:
+        dict: レスポンス
+    """
+    try:
+        # 使用するパラメータをまとめて取得し、SSMの呼び出しを1回にまとめる
+        prefetch_parameters(
+            [YOUTUBE_API_KEY_PARAMETER_NAME, SMS_PHONE_NUMBER_PARAMETER_NAME]
         )
-        logger.info("Recorded notified for video %s", video_data["video_id"])
+
+        rechecked: int = recheck_upcoming_videos()
+        logger.info("Rechecked %d upcoming videos", rechecked)
 
         return {
             "statusCode": 200,
             "body": "OK",
         }
+    except CircuitOpenError as e:
+        # 依存サービスの障害時は、次回の実行で再判定する
+        logger.warning("%s", e)
+        return {
+            "statusCode": 503,
+            "body": "Service Unavailable",
+        }
     except Exception:
         logger.error(traceback.format_exc())
         return {
@@ -3,18 +3,25 @@
 import logging
 import os
 import traceback
+from functools import lru_cache
 from typing import Any, Dict
 
-import boto3
+from aws_clients import get_client
+from notification_sinks import (
+    Notification,
+    NotificationDispatcher,
+    SmsSink,
+    create_notification_dispatcher,
+)
+from sms_fanout import parse_phone_numbers
 from ssm_utils import get_parameter_value
+from stage_metrics import timed_handler
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 SMS_PHONE_NUMBER_PARAMETER_NAME = os.environ["SMS_PHONE_NUMBER_PARAMETER_NAME"]
 
-sns_client = boto3.client("sns")
-
 
 def build_message(detail: Dict[str, Any]) -> str:
     """
@@ -36,17 +43,46 @@ def build_message(detail: Dict[str, Any]) -> str:
     )
 
 
+@lru_cache(maxsize=1)
+def get_notification_dispatcher() -> NotificationDispatcher:
+    """
+    SMSと、環境変数NOTIFICATION_SINKSで選択した通知先に通知するディスパッチャーを取得する
+    初回呼び出し時に生成し、以降は同じディスパッチャーを返す
+
+    Returns:
+        NotificationDispatcher: ディスパッチャー
+    """
+    return create_notification_dispatcher(
+        SmsSink(
+            lambda: parse_phone_numbers(
+                get_parameter_value(SMS_PHONE_NUMBER_PARAMETER_NAME)
+            ),
+            lambda: get_client("sns"),
+        )
+    )
+
+
 def send_failure_sms(message: str) -> None:
     """
-    SNSを使用してパイプライン失敗をSMS通知する
+    SNSを使用してパイプライン失敗を、通知先のすべての電話番号に並行してSMS通知する
+    Webhook等の追加の通知先にもSMSと並行して通知する
 
     Args:
         message (str): SMS通知メッセージ
+
+    Raises:
+        Exception: すべての電話番号への送信に失敗した場合
     """
-    phone_number: str = get_parameter_value(SMS_PHONE_NUMBER_PARAMETER_NAME)
-    sns_client.publish(PhoneNumber=phone_number, Message=message)
+    get_notification_dispatcher().dispatch(
+        Notification(
+            subject="[CI/CD] Pipeline stage failed",
+            message=message,
+            data={"message": message},
+        )
+    )
 
 
+@timed_handler
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     CodePipelineのステージ失敗をSMS通知するLambda関数のハンドラー
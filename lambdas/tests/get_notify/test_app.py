@@ -1,7 +1,7 @@
 """WebSubでのYouTubeライブ配信サブスクリプション登録を確認するユニットテスト"""
 
 import os
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 # pylint: disable=import-outside-toplevel,too-few-public-methods
 
@@ -13,15 +13,42 @@ from unittest.mock import patch
         "YOUTUBE_CHANNEL_ID_PARAMETER_NAME": "test-channel-id-param",
     },
 )
+@patch("lambdas.get_notify.app.prefetch_parameters", Mock())
 class TestVerifyQueryParams:
     """vetify_query_params関数のテスト"""
 
+    def setup_method(self):
+        """チャンネルのレジストリに、test_channel_id・有効期間を指定したチャンネル・
+        監視しないチャンネルを登録する"""
+        from channel_registry import (
+            Channel,
+            LocalChannelRegistry,
+            register_channel_registry,
+        )
+
+        registry = LocalChannelRegistry(
+            [
+                Channel("test_channel_id"),
+                Channel("custom_lease_channel_id", lease_seconds=432000),
+                Channel("disabled_channel_id", enabled=False),
+            ]
+        )
+        register_channel_registry("parameter", registry)
+        register_channel_registry("dynamodb", registry)
+
+    def teardown_method(self):
+        """登録したチャンネルのレジストリを解除する"""
+        from channel_registry import register_channel_registry
+
+        register_channel_registry("parameter", None)
+        register_channel_registry("dynamodb", None)
+
     def test_verify_query_params_success(self):
         """クエリパラメータ検証の成功テスト"""
         from lambdas.get_notify.app import vetify_query_params
 
         with patch("lambdas.get_notify.app.get_parameter_value") as mock_get_parameter:
-            mock_get_parameter.side_effect = ["test_secret", "test_channel_id"]
+            mock_get_parameter.return_value = "test_secret"
 
             query_params = {
                 "hub.challenge": "test_challenge",
@@ -76,7 +103,7 @@ class TestVerifyQueryParams:
         from lambdas.get_notify.app import vetify_query_params
 
         with patch("lambdas.get_notify.app.get_parameter_value") as mock_get_parameter:
-            mock_get_parameter.side_effect = ["test_secret", "test_channel_id"]
+            mock_get_parameter.return_value = "test_secret"
 
             query_params = {
                 "hub.challenge": "test_challenge",
@@ -100,7 +127,7 @@ class TestVerifyQueryParams:
         from lambdas.get_notify.app import vetify_query_params
 
         with patch("lambdas.get_notify.app.get_parameter_value") as mock_get_parameter:
-            mock_get_parameter.side_effect = ["test_secret", "test_channel_id"]
+            mock_get_parameter.return_value = "test_secret"
 
             query_params = {
                 "hub.challenge": "test_challenge",
@@ -120,7 +147,7 @@ class TestVerifyQueryParams:
         from lambdas.get_notify.app import vetify_query_params
 
         with patch("lambdas.get_notify.app.get_parameter_value") as mock_get_parameter:
-            mock_get_parameter.side_effect = ["test_secret", "test_channel_id"]
+            mock_get_parameter.return_value = "test_secret"
 
             query_params = {
                 "hub.challenge": "test_challenge",
@@ -135,6 +162,99 @@ class TestVerifyQueryParams:
             result = vetify_query_params(query_params)
             assert result == "Bad Request: Invalid hub.lease_seconds: 123456"
 
+    def test_verify_query_params_disabled_channel(self):
+        """監視しないチャンネルのトピックURLの場合のテスト"""
+        # Given: 監視しない(enabled=False)チャンネルのトピックURL
+        from lambdas.get_notify.app import vetify_query_params
+
+        with patch("lambdas.get_notify.app.get_parameter_value") as mock_get_parameter:
+            mock_get_parameter.return_value = "test_secret"
+
+            query_params = {
+                "hub.challenge": "test_challenge",
+                "hub.mode": "subscribe",
+                "hub.topic": (
+                    "https://www.youtube.com/xml/feeds/videos.xml?"
+                    "channel_id=disabled_channel_id"
+                ),
+            }
+
+            # When/Then: 登録されていないチャンネルと同様に検証に失敗する
+            assert vetify_query_params(query_params) == (
+                "Bad Request: Unexpected topic URL: "
+                "https://www.youtube.com/xml/feeds/videos.xml?"
+                "channel_id=disabled_channel_id"
+            )
+
+    def test_verify_query_params_malformed_topic(self):
+        """チャンネルIDとして不正なトピックURLの場合のテスト"""
+        # Given: チャンネルIDの後に別のクエリパラメータが続くトピックURL
+        from lambdas.get_notify.app import vetify_query_params
+
+        with patch("lambdas.get_notify.app.get_parameter_value") as mock_get_parameter:
+            mock_get_parameter.return_value = "test_secret"
+
+            query_params = {
+                "hub.challenge": "test_challenge",
+                "hub.mode": "subscribe",
+                "hub.topic": (
+                    "https://www.youtube.com/xml/feeds/videos.xml?"
+                    "channel_id=test_channel_id&x=1"
+                ),
+            }
+
+            # When/Then: 検証に失敗する
+            assert vetify_query_params(query_params).startswith(
+                "Bad Request: Unexpected topic URL: "
+            )
+
+    def test_verify_query_params_channel_lease_seconds(self):
+        """チャンネルごとのサブスクリプションの有効期間のテスト"""
+        # Given: 有効期間432000秒を指定したチャンネル
+        from lambdas.get_notify.app import vetify_query_params
+
+        with patch("lambdas.get_notify.app.get_parameter_value") as mock_get_parameter:
+            mock_get_parameter.return_value = "test_secret"
+
+            def verify(lease_seconds):
+                return vetify_query_params(
+                    {
+                        "hub.challenge": "test_challenge",
+                        "hub.mode": "subscribe",
+                        "hub.topic": (
+                            "https://www.youtube.com/xml/feeds/videos.xml?"
+                            "channel_id=custom_lease_channel_id"
+                        ),
+                        "hub.lease_seconds": lease_seconds,
+                    }
+                )
+
+            # When/Then: チャンネルごとの有効期間のみ検証に成功する
+            assert verify("432000") is None
+            assert verify("828000") == "Bad Request: Invalid hub.lease_seconds: 828000"
+
+    @patch("lambdas.get_notify.app.CHANNEL_REGISTRY_BACKEND", "dynamodb")
+    def test_verify_query_params_prefetch_without_channel_parameter(self):
+        """チャンネルIDのパラメータを使用しないバックエンドの場合のテスト"""
+        # Given: DynamoDBのレジストリを使用する
+        from lambdas.get_notify.app import vetify_query_params
+
+        with patch("lambdas.get_notify.app.prefetch_parameters") as mock_prefetch:
+            with patch("lambdas.get_notify.app.get_parameter_value") as mock_param:
+                mock_param.return_value = "test_secret"
+
+                # When: 検証する
+                vetify_query_params(
+                    {
+                        "hub.challenge": "test_challenge",
+                        "hub.mode": "subscribe",
+                        "hub.secret": "test_secret",
+                    }
+                )
+
+                # Then: HMACシークレットのみを取得する
+                mock_prefetch.assert_called_once_with(["test-hmac-secret-param"])
+
 
 @patch.dict(
     os.environ,
@@ -0,0 +1,84 @@
+"""AWSサービスのクライアントを遅延生成するユーティリティ関数のユニットテスト"""
+
+from unittest.mock import Mock, patch
+
+# pylint: disable=import-outside-toplevel,import-error,too-few-public-methods
+
+
+class TestGetClient:
+    """get_client関数のテスト"""
+
+    def setup_method(self):
+        """各テストの前に生成済のクライアントを破棄する"""
+        import aws_clients
+
+        aws_clients._clients.clear()  # pylint: disable=protected-access
+
+    def test_get_client_creates_client(self):
+        """初回呼び出しでクライアントを生成する場合のテスト"""
+        # Given: 生成済のクライアントが存在しない
+        from aws_clients import get_client
+
+        with patch("boto3.client") as mock_boto3_client:
+            # When: クライアントを取得する
+            result = get_client("sns")
+
+            # Then: boto3でクライアントが生成される
+            assert result is mock_boto3_client.return_value
+            mock_boto3_client.assert_called_once_with("sns")
+
+    def test_get_client_memoized(self):
+        """同じサービスのクライアントを再取得する場合のテスト"""
+        # Given: 生成済のクライアント
+        from aws_clients import get_client
+
+        with patch("boto3.client") as mock_boto3_client:
+            first = get_client("dynamodb")
+
+            # When: 同じサービスのクライアントを再取得する
+            second = get_client("dynamodb")
+
+            # Then: 同じクライアントが返り、生成は1回のみ
+            assert first is second
+            mock_boto3_client.assert_called_once_with("dynamodb")
+
+    def test_get_client_per_service(self):
+        """異なるサービスのクライアントを取得する場合のテスト"""
+        # Given: 生成済のクライアントが存在しない
+        from aws_clients import get_client
+
+        with patch("boto3.client") as mock_boto3_client:
+            mock_boto3_client.side_effect = lambda service_name: Mock(
+                service_name=service_name
+            )
+
+            # When: 異なるサービスのクライアントを取得する
+            ssm = get_client("ssm")
+            sns = get_client("sns")
+
+            # Then: サービスごとにクライアントが生成される
+            assert (ssm.service_name, sns.service_name) == ("ssm", "sns")
+            assert mock_boto3_client.call_count == 2
+
+
+class TestIsConditionalCheckFailed:
+    """is_conditional_check_failed関数のテスト"""
+
+    def test_is_conditional_check_failed(self):
+        """条件付き書き込みの条件を満たさなかった例外を判定するテスト"""
+        # Given: 条件付き書き込みの失敗・その他のboto3の例外・boto3以外の例外
+        from aws_clients import is_conditional_check_failed
+        from botocore.exceptions import ClientError
+
+        conditional = ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem"
+        )
+        throttled = ClientError(
+            {"Error": {"Code": "ProvisionedThroughputExceededException"}},
+            "UpdateItem",
+        )
+
+        # When/Then: 条件付き書き込みの失敗のみTrueとなる
+        assert is_conditional_check_failed(conditional)
+        assert not is_conditional_check_failed(throttled)
+        assert not is_conditional_check_failed(ValueError("error"))
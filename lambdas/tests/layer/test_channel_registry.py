@@ -0,0 +1,201 @@
+"""channel_registryのユニットテスト"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+# pylint: disable=import-outside-toplevel,import-error,too-few-public-methods
+
+
+class TestTopicUrl:
+    """build_topic_url・parse_topic_url関数のテスト"""
+
+    def test_build_and_parse_topic_url(self):
+        """トピックURLの生成と解析のテスト"""
+        # Given: チャンネルID
+        from channel_registry import build_topic_url, parse_topic_url
+
+        # When: トピックURLを生成して解析する
+        topic_url = build_topic_url("UC_test-channel")
+
+        # Then: 元のチャンネルIDが返る
+        assert topic_url == (
+            "https://www.youtube.com/xml/feeds/videos.xml?channel_id=UC_test-channel"
+        )
+        assert parse_topic_url(topic_url) == "UC_test-channel"
+
+    @pytest.mark.parametrize(
+        "topic_url",
+        [
+            "https://example.com/feeds/videos.xml?channel_id=UC_test",
+            "https://www.youtube.com/xml/feeds/videos.xml?channel_id=",
+            "https://www.youtube.com/xml/feeds/videos.xml?channel_id=UC_test&x=1",
+        ],
+    )
+    def test_parse_topic_url_invalid(self, topic_url):
+        """YouTubeチャンネルのトピックURLでない場合のテスト"""
+        from channel_registry import parse_topic_url
+
+        # When/Then: Noneが返る
+        assert parse_topic_url(topic_url) is None
+
+
+class TestParameterChannelRegistry:
+    """ParameterChannelRegistryクラスのテスト"""
+
+    def test_get_channel(self):
+        """パラメータのチャンネルIDと一致する場合のみ返すテスト"""
+        # Given: パラメータにchannel_aが保存されている
+        from channel_registry import Channel, ParameterChannelRegistry
+
+        with patch("channel_registry.get_parameter_value") as mock_get_parameter:
+            mock_get_parameter.return_value = "channel_a"
+            registry = ParameterChannelRegistry("test-channel-id-param")
+
+            # When/Then: 一致するチャンネルのみ返る
+            assert registry.get_channel("channel_a") == Channel("channel_a")
+            assert registry.get_channel("channel_b") is None
+            assert registry.list_channels() == [Channel("channel_a")]
+            mock_get_parameter.assert_called_with("test-channel-id-param")
+
+
+class TestDynamoDBChannelRegistry:
+    """DynamoDBChannelRegistryクラスのテスト"""
+
+    def test_get_channel_cached(self):
+        """GetItemで取得したチャンネルをキャッシュするテスト"""
+        # Given: 有効期間を指定したチャンネルが登録されている
+        from channel_registry import Channel, DynamoDBChannelRegistry
+
+        with patch("channel_registry.get_guarded_client") as mock_get_client:
+            mock_get_item = mock_get_client.return_value.get_item
+            mock_get_item.return_value = {
+                "Item": {
+                    "channel_id": {"S": "channel_a"},
+                    "lease_seconds": {"N": "432000"},
+                    "name": {"S": "Channel A"},
+                }
+            }
+            registry = DynamoDBChannelRegistry(
+                "test-channels-table", cache_max_entries=8, cache_ttl_seconds=60
+            )
+
+            # When: 2回取得する
+            first = registry.get_channel("channel_a")
+            second = registry.get_channel("channel_a")
+
+            # Then: GetItemは1回のみ実行される
+            assert first == second == Channel("channel_a", True, 432000, "Channel A")
+            mock_get_item.assert_called_once_with(
+                TableName="test-channels-table",
+                Key={"channel_id": {"S": "channel_a"}},
+            )
+
+    def test_get_channel_not_registered(self):
+        """登録されていないチャンネルもキャッシュするテスト"""
+        # Given: チャンネルが登録されていない
+        from channel_registry import DynamoDBChannelRegistry
+
+        with patch("channel_registry.get_guarded_client") as mock_get_client:
+            mock_get_item = mock_get_client.return_value.get_item
+            mock_get_item.return_value = {}
+            registry = DynamoDBChannelRegistry(
+                "test-channels-table", cache_max_entries=8, cache_ttl_seconds=60
+            )
+
+            # When/Then: Noneが返り、2回目はGetItemを実行しない
+            assert registry.get_channel("unknown") is None
+            assert registry.get_channel("unknown") is None
+            mock_get_item.assert_called_once()
+
+    def test_list_channels(self):
+        """すべてのチャンネルをScanで取得するテスト"""
+        # Given: 2ページに分かれて2チャンネルが登録されている
+        from channel_registry import Channel, DynamoDBChannelRegistry
+
+        with patch("channel_registry.get_guarded_client") as mock_get_client:
+            mock_scan = mock_get_client.return_value.scan
+            mock_scan.side_effect = [
+                {
+                    "Items": [{"channel_id": {"S": "channel_a"}}],
+                    "LastEvaluatedKey": {"channel_id": {"S": "channel_a"}},
+                },
+                {
+                    "Items": [
+                        {"channel_id": {"S": "channel_b"}, "enabled": {"BOOL": False}}
+                    ]
+                },
+            ]
+            registry = DynamoDBChannelRegistry(
+                "test-channels-table", cache_max_entries=8, cache_ttl_seconds=60
+            )
+
+            # When: すべてのチャンネルを取得する
+            channels = registry.list_channels()
+
+            # Then: すべてのページのチャンネルが返り、キャッシュされる
+            assert channels == [Channel("channel_a"), Channel("channel_b", False)]
+            assert registry.get_channel("channel_b") == Channel("channel_b", False)
+            mock_get_client.return_value.get_item.assert_not_called()
+            assert mock_scan.call_args_list[1][1] == {
+                "TableName": "test-channels-table",
+                "ExclusiveStartKey": {"channel_id": {"S": "channel_a"}},
+            }
+
+
+class TestGetChannelRegistry:
+    """get_channel_registry関数のテスト"""
+
+    def teardown_method(self):
+        """生成したレジストリを破棄する"""
+        from channel_registry import register_channel_registry
+
+        for backend_name in ("parameter", "dynamodb", "local"):
+            register_channel_registry(backend_name, None)
+
+    @patch.dict(
+        os.environ,
+        {
+            "CHANNEL_REGISTRY_BACKEND": "local",
+            "CHANNEL_REGISTRY_LOCAL_CHANNEL_IDS": "channel_a, channel_b,",
+        },
+    )
+    def test_get_channel_registry_local(self):
+        """localバックエンドのテスト"""
+        # Given: カンマ区切りのチャンネルID
+        from channel_registry import Channel, get_channel_registry
+
+        # When: レジストリを2回取得する
+        registry = get_channel_registry()
+
+        # Then: 同じレジストリが返り、空白を除いたチャンネルが登録されている
+        assert get_channel_registry() is registry
+        assert registry.list_channels() == [Channel("channel_a"), Channel("channel_b")]
+
+    @patch.dict(
+        os.environ,
+        {
+            "CHANNEL_REGISTRY_BACKEND": "dynamodb",
+            "CHANNEL_REGISTRY_TABLE": "test-channels-table",
+        },
+    )
+    def test_get_channel_registry_dynamodb(self):
+        """dynamodbバックエンドのテスト"""
+        from channel_registry import DynamoDBChannelRegistry, get_channel_registry
+
+        # When: レジストリを取得する
+        registry = get_channel_registry()
+
+        # Then: 環境変数のテーブルのレジストリが返る
+        assert isinstance(registry, DynamoDBChannelRegistry)
+        assert registry.table_name == "test-channels-table"
+
+    @patch.dict(os.environ, {"CHANNEL_REGISTRY_BACKEND": "unknown"})
+    def test_get_channel_registry_unsupported(self):
+        """未対応のバックエンドの場合のテスト"""
+        from channel_registry import get_channel_registry
+
+        # When/Then: ValueErrorが送出される
+        with pytest.raises(ValueError, match="Unsupported CHANNEL_REGISTRY_BACKEND"):
+            get_channel_registry()
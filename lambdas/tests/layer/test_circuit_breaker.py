@@ -0,0 +1,226 @@
+"""circuit_breakerのユニットテスト"""
+
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+
+# pylint: disable=import-outside-toplevel,import-error,too-few-public-methods
+
+
+def _client_error(code, status):
+    """boto3の例外を模した例外を生成する"""
+    error = Exception(code)
+    error.response = {
+        "Error": {"Code": code},
+        "ResponseMetadata": {"HTTPStatusCode": status},
+    }
+    return error
+
+
+class TestCircuitBreaker:
+    """CircuitBreakerクラスのテスト"""
+
+    def test_call_opens_after_threshold(self):
+        """連続失敗回数が閾値に達した場合にオープンにするテスト"""
+        # Given: 連続2回の失敗でオープンにする
+        from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+        breaker = CircuitBreaker("test", failure_threshold=2, recovery_seconds=30)
+        func = Mock(side_effect=TimeoutError("timeout"))
+
+        with patch("circuit_breaker.put_metric") as mock_put_metric:
+            # When: 2回失敗した後に呼び出す
+            for _ in range(2):
+                with pytest.raises(TimeoutError):
+                    breaker.call(func)
+
+            # Then: 依存サービスを呼び出さずにCircuitOpenErrorが送出される
+            with pytest.raises(CircuitOpenError, match="test"):
+                breaker.call(func)
+            assert func.call_count == 2
+            assert breaker.state == "open"
+            mock_put_metric.assert_called_once_with(
+                "CircuitBreakerOpened",
+                1,
+                dimensions={"FunctionName": "local", "Dependency": "test"},
+            )
+
+    def test_call_success_resets_failures(self):
+        """成功した場合に連続失敗回数をリセットするテスト"""
+        # Given: 連続2回の失敗でオープンにする
+        from circuit_breaker import CircuitBreaker
+
+        breaker = CircuitBreaker("test", failure_threshold=2, recovery_seconds=30)
+        failing = Mock(side_effect=TimeoutError("timeout"))
+
+        # When: 失敗・成功・失敗の順に呼び出す
+        with pytest.raises(TimeoutError):
+            breaker.call(failing)
+        assert breaker.call(Mock(return_value="ok")) == "ok"
+        with pytest.raises(TimeoutError):
+            breaker.call(failing)
+
+        # Then: 連続していないためクローズのまま
+        assert breaker.state == "closed"
+        assert breaker.failures == 1
+
+    def test_call_ignores_client_errors(self):
+        """リクエストに起因するエラーを失敗とみなさないテスト"""
+        # Given: 連続1回の失敗でオープンにする
+        from circuit_breaker import CircuitBreaker
+
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_seconds=30)
+        func = Mock(side_effect=_client_error("ConditionalCheckFailedException", 400))
+
+        # When: 条件付き書き込みの失敗が発生する
+        with pytest.raises(Exception, match="ConditionalCheckFailedException"):
+            breaker.call(func)
+
+        # Then: クローズのまま
+        assert breaker.state == "closed"
+
+    def test_half_open_probe(self):
+        """遮断時間の経過後に一部の呼び出しのみを試行するテスト"""
+        # Given: 遮断時間30秒でオープンになっている
+        from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+        with patch("circuit_breaker.time.monotonic") as mock_monotonic:
+            mock_monotonic.return_value = 100.0
+            breaker = CircuitBreaker("test", failure_threshold=1, recovery_seconds=30)
+            with patch("circuit_breaker.put_metric"):
+                with pytest.raises(TimeoutError):
+                    breaker.call(Mock(side_effect=TimeoutError("timeout")))
+
+            # When: 遮断時間の経過後に、試行中に別の呼び出しを行う
+            mock_monotonic.return_value = 130.0
+            breaker.before_call()
+            with pytest.raises(CircuitOpenError):
+                breaker.before_call()
+
+            # Then: 試行に成功するとクローズになる
+            breaker.record_success()
+            assert breaker.state == "closed"
+            assert breaker.call(Mock(return_value="ok")) == "ok"
+
+    def test_half_open_probe_failure(self):
+        """ハーフオープンでの試行に失敗した場合のテスト"""
+        # Given: 遮断時間30秒、連続5回の失敗でオープンにする
+        from circuit_breaker import CircuitBreaker
+
+        with patch("circuit_breaker.time.monotonic") as mock_monotonic:
+            mock_monotonic.return_value = 100.0
+            breaker = CircuitBreaker("test", failure_threshold=5, recovery_seconds=30)
+            breaker.state, breaker.opened_at = "open", 100.0
+
+            # When: 遮断時間の経過後の試行に失敗する
+            mock_monotonic.return_value = 130.0
+            with patch("circuit_breaker.put_metric"):
+                with pytest.raises(TimeoutError):
+                    breaker.call(Mock(side_effect=TimeoutError("timeout")))
+
+            # Then: 閾値に関わらず再度オープンになる
+            assert breaker.state == "open"
+            assert breaker.opened_at == 130.0
+
+
+class TestGuardClient:
+    """guard_client関数のテスト"""
+
+    def test_guard_client(self):
+        """メソッドの呼び出しをサーキットブレーカーを介して行うテスト"""
+        # Given: オープンのサーキットブレーカー
+        from circuit_breaker import CircuitBreaker, CircuitOpenError, guard_client
+
+        client = Mock()
+        client.meta = "meta"
+        client.get_item.return_value = {"Item": {}}
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_seconds=30)
+        guarded = guard_client(client, breaker)
+
+        # When/Then: クローズの場合はそのまま呼び出し、メソッド以外はそのまま返す
+        assert guarded.get_item(Key="a") == {"Item": {}}
+        client.get_item.assert_called_once_with(Key="a")
+        assert guarded.meta == "meta"
+
+        # When/Then: オープンの場合は呼び出さない
+        breaker.state, breaker.opened_at = "open", float("inf")
+        with pytest.raises(CircuitOpenError):
+            guarded.get_item(Key="b")
+        assert client.get_item.call_count == 1
+
+    def test_guard_client_disabled(self):
+        """サーキットブレーカーを使用しない場合のテスト"""
+        # Given/When/Then: クライアントがそのまま返る
+        from circuit_breaker import guard_client
+
+        client = Mock()
+        assert guard_client(client, None) is client
+
+
+class TestIsDependencyFailure:
+    """is_dependency_failure関数のテスト"""
+
+    @pytest.mark.parametrize(
+        "error,expected",
+        [
+            (TimeoutError("timeout"), True),
+            (_client_error("InternalServerError", 500), True),
+            (_client_error("ThrottlingException", 400), True),
+            (_client_error("ConditionalCheckFailedException", 400), False),
+            (Mock(response=Mock(status_code=503)), True),
+            (Mock(response=Mock(status_code=429)), True),
+            (Mock(response=Mock(status_code=403)), False),
+        ],
+    )
+    def test_is_dependency_failure(self, error, expected):
+        """依存サービスの障害かどうかを判定するテスト"""
+        from circuit_breaker import is_dependency_failure
+
+        assert is_dependency_failure(error) is expected
+
+
+class TestGetCircuitBreaker:
+    """get_circuit_breaker関数のテスト"""
+
+    def setup_method(self):
+        """生成済のサーキットブレーカーを破棄する"""
+        from circuit_breaker import reset_circuit_breakers
+
+        reset_circuit_breakers()
+
+    def teardown_method(self):
+        """テストで生成したサーキットブレーカーを破棄する"""
+        from circuit_breaker import reset_circuit_breakers
+
+        reset_circuit_breakers()
+
+    @patch.dict(
+        os.environ,
+        {
+            "CIRCUIT_BREAKER_FAILURE_THRESHOLD": "3",
+            "CIRCUIT_BREAKER_SNS_FAILURE_THRESHOLD": "2",
+            "CIRCUIT_BREAKER_SNS_RECOVERY_SECONDS": "10",
+        },
+    )
+    def test_get_circuit_breaker_settings(self):
+        """依存サービスごとの設定を優先するテスト"""
+        # Given/When: 共通の設定と、snsの個別の設定がある
+        from circuit_breaker import get_circuit_breaker
+
+        sns = get_circuit_breaker("sns")
+        dynamodb = get_circuit_breaker("dynamodb")
+
+        # Then: 個別の設定、共通の設定、デフォルト値の順に使用し、同じものを返す
+        assert (sns.failure_threshold, sns.recovery_seconds) == (2, 10.0)
+        assert (dynamodb.failure_threshold, dynamodb.recovery_seconds) == (3, 30.0)
+        assert dynamodb.half_open_max_calls == 1
+        assert get_circuit_breaker("sns") is sns
+
+    @patch.dict(os.environ, {"CIRCUIT_BREAKER_ENABLED": "false"})
+    def test_get_circuit_breaker_disabled(self):
+        """サーキットブレーカーを使用しない場合のテスト"""
+        # Given/When/Then: Noneが返る
+        from circuit_breaker import get_circuit_breaker
+
+        assert get_circuit_breaker("sns") is None
@@ -0,0 +1,185 @@
+"""feed_parserのユニットテスト"""
+
+from unittest.mock import patch
+
+import pytest
+
+# pylint: disable=import-outside-toplevel,import-error
+
+FEED_HEADER = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<feed xmlns="http://www.w3.org/2005/Atom"'
+    b' xmlns:yt="http://www.youtube.com/xml/schemas/2015">'
+    b"<title>YouTube video feed</title>"
+)
+
+
+def _entry(video_id: str, title: str) -> bytes:
+    """entry要素を生成する"""
+    return (
+        f"<entry><id>yt:video:{video_id}</id><yt:videoId>{video_id}</yt:videoId>"
+        f"<title>{title}</title><author><name>channel</name></author></entry>"
+    ).encode("utf-8")
+
+
+class TestParseFeed:
+    """parse_feed関数のテスト"""
+
+    def test_parse_feed_success(self):
+        """entryごとにビデオID・タイトルを取得するテスト"""
+        # Given: 2つのentryを含むフィード
+        from feed_parser import parse_feed
+
+        body = FEED_HEADER + _entry("video_a", "タイトルA") + _entry("video_b", "B")
+        body += b"</feed>"
+
+        # When: 解析する
+        result = parse_feed(body).entries
+
+        # Then: feed直下のtitleは含まず、entryごとの値が返る
+        assert result == [
+            {"video_id": "video_a", "title": "タイトルA"},
+            {"video_id": "video_b", "title": "B"},
+        ]
+
+    def test_parse_feed_channel_id(self):
+        """entryごとにチャンネルIDを取得するテスト"""
+        # Given: yt:channelIdを含むentry
+        from feed_parser import parse_feed
+
+        body = (
+            FEED_HEADER
+            + b"<entry><yt:videoId>video_a</yt:videoId>"
+            + b"<yt:channelId>channel_a</yt:channelId><title>A</title></entry>"
+            + b"</feed>"
+        )
+
+        # When: 解析する
+        result = parse_feed(body).entries
+
+        # Then: チャンネルIDを含む値が返る
+        assert result == [
+            {"video_id": "video_a", "channel_id": "channel_a", "title": "A"}
+        ]
+
+    def test_parse_feed_chunk_boundary(self):
+        """要素がチャンクの境界をまたぐ場合のテスト"""
+        # Given: 7バイトずつパーサーに渡す設定
+        from feed_parser import parse_feed
+
+        body = FEED_HEADER + _entry("video_a", "タイトルA") + b"</feed>"
+
+        with patch("feed_parser.FEED_CHUNK_BYTES", 7):
+            # When: 解析する
+            result = parse_feed(body).entries
+
+            # Then: テキストが分割されても正しく取得できる
+            assert result == [{"video_id": "video_a", "title": "タイトルA"}]
+
+    def test_parse_feed_missing_fields(self):
+        """entryに必要な要素が存在しない場合のテスト"""
+        # Given: videoIdのないentry
+        from feed_parser import parse_feed
+
+        body = FEED_HEADER + b"<entry><title>T</title></entry></feed>"
+
+        # When/Then: video_idのキーを含まない結果が返る
+        assert parse_feed(body).entries == [{"title": "T"}]
+
+    def test_parse_feed_stops_after_root(self):
+        """ルート要素の終了後は解析しないテスト"""
+        # Given: ルート要素の後に不正なデータが続くフィード
+        from feed_parser import parse_feed
+
+        body = FEED_HEADER + _entry("video_a", "A") + b"</feed><<<invalid"
+
+        # When/Then: 例外を送出せずに解析結果が返る
+        assert parse_feed(body).entries == [{"video_id": "video_a", "title": "A"}]
+
+    def test_parse_feed_max_entries(self):
+        """entry数が上限に達した場合に解析を打ち切るテスト"""
+        # Given: entry数の上限が2で、3つ目以降は不正なデータのフィード
+        from feed_parser import parse_feed
+
+        body = FEED_HEADER + _entry("video_a", "A") + _entry("video_b", "B")
+        body += b"<entry><<<invalid"
+
+        with patch("feed_parser.FEED_MAX_ENTRIES", 2):
+            # When: 解析する
+            result = parse_feed(body).entries
+
+            # Then: 上限までのentryが返る
+            assert [entry["video_id"] for entry in result] == ["video_a", "video_b"]
+
+    def test_parse_feed_max_body_bytes(self):
+        """本文のサイズが上限を超える場合のテスト"""
+        # Given: 本文のサイズの上限が100バイト
+        from feed_parser import FeedLimitError, parse_feed
+
+        body = FEED_HEADER + _entry("video_a", "A") + b"</feed>"
+
+        with patch("feed_parser.FEED_MAX_BODY_BYTES", 100):
+            # When/Then: FeedLimitErrorが送出される
+            with pytest.raises(FeedLimitError, match="exceeds 100 bytes"):
+                parse_feed(body)
+
+    def test_parse_feed_max_depth(self):
+        """要素の深さが上限を超える場合のテスト"""
+        # Given: 深さ20の要素を含むフィード
+        from feed_parser import FeedLimitError, parse_feed
+
+        body = FEED_HEADER + b"<a>" * 19 + b"</a>" * 19 + b"</feed>"
+
+        # When/Then: FeedLimitErrorが送出される
+        with pytest.raises(FeedLimitError, match="depth exceeds 16"):
+            parse_feed(body)
+
+    def test_parse_feed_reject_doctype(self):
+        """DOCTYPE宣言を含む場合のテスト"""
+        # Given: エンティティを多重に展開するDOCTYPE宣言を含むフィード
+        from feed_parser import FeedLimitError, parse_feed
+
+        body = (
+            b'<?xml version="1.0"?>'
+            b'<!DOCTYPE feed [<!ENTITY a "aaaaaaaaaa">'
+            b'<!ENTITY b "&a;&a;&a;&a;&a;&a;&a;&a;&a;&a;">]>'
+            b'<feed xmlns="http://www.w3.org/2005/Atom"><title>&b;</title></feed>'
+        )
+
+        # When/Then: エンティティを展開せずにFeedLimitErrorが送出される
+        with pytest.raises(FeedLimitError, match="DOCTYPE is not allowed"):
+            parse_feed(body)
+
+    def test_parse_feed_invalid_xml(self):
+        """XMLとして不正な場合のテスト"""
+        # Given: 要素が閉じていないフィード
+        from feed_parser import parse_feed
+
+        body = FEED_HEADER + b"<entry>"
+
+        # When/Then: ValueErrorが送出される
+        with pytest.raises(ValueError, match="Invalid XML"):
+            parse_feed(body)
+
+    def test_parse_feed_deleted_entry(self):
+        """at:deleted-entryのビデオIDを取得するテスト"""
+        # Given: 削除・非公開にされた動画のフィード
+        from feed_parser import parse_feed
+
+        body = (
+            b'<?xml version="1.0" encoding="UTF-8"?>'
+            b'<feed xmlns:at="http://purl.org/atompub/tombstones/1.0"'
+            b' xmlns="http://www.w3.org/2005/Atom">'
+            b'<at:deleted-entry ref="yt:video:video_a"'
+            b' when="2025-01-01T00:00:00+00:00">'
+            b'<link href="https://www.youtube.com/watch?v=video_a"/>'
+            b"<at:by><name>channel</name></at:by>"
+            b"</at:deleted-entry></feed>"
+        )
+
+        # When: 解析する
+        result = parse_feed(body)
+
+        # Then: entryはなく、削除されたビデオIDが返る
+        assert result.entries == []
+        assert result.deleted_video_ids == ["video_a"]
@@ -0,0 +1,173 @@
+"""WebSubのHMACシークレットのローテーション用のユーティリティ関数のユニットテスト"""
+
+from unittest.mock import patch
+
+import pytest
+from parameter_backends import ParameterBackendError, ParameterNotFoundError
+
+# pylint: disable=import-outside-toplevel,import-error,too-few-public-methods
+
+
+class TestGetCurrentHmacSecret:
+    """get_current_hmac_secret関数のテスト"""
+
+    def test_get_current_hmac_secret_success(self):
+        """現在のHMACシークレットが存在する場合のテスト"""
+        # Given: パラメータが存在する
+        from hmac_secret_utils import get_current_hmac_secret
+
+        with patch("hmac_secret_utils.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "current_secret"
+
+            # When: 取得する
+            result = get_current_hmac_secret("secret_param", 30)
+
+            # Then: パラメータ値が返る
+            assert result == "current_secret"
+            mock_get_param.assert_called_once_with("secret_param", 30, None)
+
+    def test_get_current_hmac_secret_not_found(self):
+        """パラメータが存在しない場合のテスト"""
+        # Given: パラメータが存在しない
+        from hmac_secret_utils import get_current_hmac_secret
+
+        with patch("hmac_secret_utils.get_parameter_value") as mock_get_param:
+            mock_get_param.side_effect = ParameterNotFoundError("not found")
+
+            # When: 取得する
+            result = get_current_hmac_secret("secret_param")
+
+            # Then: Noneが返る
+            assert result is None
+
+    def test_get_current_hmac_secret_other_error(self):
+        """パラメータが存在しない以外のエラーの場合のテスト"""
+        # Given: アクセス拒否を返す取得元
+        from hmac_secret_utils import get_current_hmac_secret
+
+        with patch("hmac_secret_utils.get_parameter_value") as mock_get_param:
+            mock_get_param.side_effect = ParameterBackendError("AccessDenied")
+
+            # When/Then: 例外が伝播する
+            with pytest.raises(ParameterBackendError, match="AccessDenied"):
+                get_current_hmac_secret("secret_param")
+
+
+class TestGetPreviousHmacSecret:
+    """get_previous_hmac_secret関数のテスト"""
+
+    def test_get_previous_hmac_secret_within_overlap(self):
+        """並行利用期間内の場合のテスト"""
+        # Given: 期限前のローテーション前のHMACシークレット
+        from hmac_secret_utils import get_previous_hmac_secret
+
+        with patch("hmac_secret_utils.get_parameter_value") as mock_get_param:
+            with patch("hmac_secret_utils.time.time") as mock_time:
+                mock_get_param.return_value = (
+                    '{"secret": "previous_secret", "expires_at": 1000}'
+                )
+                mock_time.return_value = 999
+
+                # When: 取得する
+                result = get_previous_hmac_secret("previous_param")
+
+                # Then: ローテーション前のHMACシークレットが返る
+                assert result == "previous_secret"
+
+    def test_get_previous_hmac_secret_expired(self):
+        """並行利用期間の期限ちょうどの場合のテスト"""
+        # Given: 期限ちょうどのローテーション前のHMACシークレット
+        from hmac_secret_utils import get_previous_hmac_secret
+
+        with patch("hmac_secret_utils.get_parameter_value") as mock_get_param:
+            with patch("hmac_secret_utils.time.time") as mock_time:
+                mock_get_param.return_value = (
+                    '{"secret": "previous_secret", "expires_at": 1000}'
+                )
+                mock_time.return_value = 1000
+
+                # When: 取得する
+                result = get_previous_hmac_secret("previous_param")
+
+                # Then: Noneが返る
+                assert result is None
+
+    def test_get_previous_hmac_secret_not_found(self):
+        """パラメータが存在しない場合のテスト"""
+        # Given: パラメータが存在しない
+        from hmac_secret_utils import get_previous_hmac_secret
+
+        with patch("hmac_secret_utils.get_parameter_value") as mock_get_param:
+            mock_get_param.side_effect = ParameterNotFoundError("not found")
+
+            # When: 取得する
+            result = get_previous_hmac_secret("previous_param")
+
+            # Then: Noneが返る
+            assert result is None
+
+    def test_get_previous_hmac_secret_not_found_cached(self):
+        """パラメータが存在しないことを、再取得の要求時もキャッシュから返すテスト"""
+        # Given: パラメータが存在しない取得元
+        from hmac_secret_utils import get_previous_hmac_secret
+        from ssm_utils import invalidate_parameter_cache
+
+        invalidate_parameter_cache()
+        with patch("ssm_utils.get_parameter_backend") as mock_get_backend:
+            mock_backend = mock_get_backend.return_value
+            mock_backend.get_parameter.side_effect = ParameterNotFoundError("not found")
+
+            # When: 通常の取得後に、キャッシュ有効期間0秒で再取得する
+            results = [
+                get_previous_hmac_secret("previous_param"),
+                get_previous_hmac_secret("previous_param", 0),
+            ]
+
+            # Then: いずれもNoneが返り、取得元は1回のみ呼び出される
+            assert results == [None, None]
+            mock_backend.get_parameter.assert_called_once_with("previous_param")
+        invalidate_parameter_cache()
+
+    @pytest.mark.parametrize(
+        "value",
+        ["not json", '{"secret": "s"}', '{"expires_at": 1}', "[]", ""],
+    )
+    def test_get_previous_hmac_secret_invalid_format(self, value):
+        """パラメータ値の形式が不正な場合のテスト"""
+        # Given: 不正な形式のパラメータ値
+        from hmac_secret_utils import get_previous_hmac_secret
+
+        with patch("hmac_secret_utils.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = value
+
+            # When: 取得する
+            result = get_previous_hmac_secret("previous_param")
+
+            # Then: Noneが返る
+            assert result is None
+
+
+class TestEncodePreviousHmacSecret:
+    """encode_previous_hmac_secret関数のテスト"""
+
+    def test_encode_previous_hmac_secret_round_trip(self):
+        """変換したパラメータ値を取得できるテスト"""
+        # Given: ローテーション前のHMACシークレットと期限
+        from hmac_secret_utils import (
+            encode_previous_hmac_secret,
+            get_previous_hmac_secret,
+        )
+
+        value = encode_previous_hmac_secret("previous_secret", 2000)
+
+        with patch("hmac_secret_utils.get_parameter_value") as mock_get_param:
+            with patch("hmac_secret_utils.time.time") as mock_time:
+                mock_get_param.return_value = value
+                mock_time.return_value = 1999
+
+                # When: 取得する
+                result = get_previous_hmac_secret("previous_param")
+
+                # Then: 元のHMACシークレットが返る
+                assert value == '{"secret": "previous_secret", "expires_at": 2000}'
+                assert result == "previous_secret"
@@ -0,0 +1,100 @@
+"""http_sessionのユニットテスト"""
+
+from unittest.mock import patch
+
+# pylint: disable=import-outside-toplevel,import-error
+
+
+class TestGetHttpSession:
+    """get_http_session関数のテスト"""
+
+    def setup_method(self):
+        """各テストの前に生成済のセッションを破棄する"""
+        from http_session import get_http_session
+
+        get_http_session.cache_clear()
+
+    def test_get_http_session_reused(self):
+        """同じセッションを再利用するテスト"""
+        # Given/When: セッションを2回取得する
+        from http_session import get_http_session
+
+        first = get_http_session()
+        second = get_http_session()
+
+        # Then: 同じセッションが返る
+        assert first is second
+
+    def test_get_http_session_pool_size(self):
+        """コネクションプールのサイズのテスト"""
+        # Given: プールサイズを4に設定
+        from http_session import get_http_session
+
+        with patch("http_session.HTTP_POOL_MAXSIZE", 4):
+            # When: セッションを取得する
+            session = get_http_session()
+
+            # Then: HTTPSのアダプターのプールサイズが4である
+            adapter = session.get_adapter("https://www.googleapis.com/")
+            assert adapter._pool_maxsize == 4  # pylint: disable=protected-access
+
+    def test_get_http_session_gzip(self):
+        """gzip圧縮を要求する場合のテスト"""
+        # Given: gzip圧縮を要求する設定
+        from http_session import get_http_session
+
+        with patch("http_session.HTTP_ACCEPT_GZIP", True):
+            # When: セッションを取得する
+            session = get_http_session()
+
+            # Then: Accept-EncodingとUser-Agentでgzipを要求する
+            assert session.headers["Accept-Encoding"] == "gzip"
+            assert "gzip" in session.headers["User-Agent"]
+
+    def test_get_http_session_no_gzip(self):
+        """gzip圧縮を要求しない場合のテスト"""
+        # Given: gzip圧縮を要求しない設定
+        from http_session import get_http_session
+
+        with patch("http_session.HTTP_ACCEPT_GZIP", False):
+            # When: セッションを取得する
+            session = get_http_session()
+
+            # Then: 非圧縮のレスポンスを要求する
+            assert session.headers["Accept-Encoding"] == "identity"
+
+
+class TestHttpRequest:
+    """http_get・http_post関数のテスト"""
+
+    def test_http_get_default_timeout(self):
+        """タイムアウトを省略した場合のテスト"""
+        # Given: HTTPセッション
+        from http_session import http_get
+
+        with patch("http_session.get_http_session") as mock_get_session:
+            with patch("http_session.HTTP_CONNECT_TIMEOUT_SECONDS", 3.05):
+                with patch("http_session.HTTP_READ_TIMEOUT_SECONDS", 10):
+                    # When: タイムアウトを省略してGETリクエストを送信する
+                    http_get("https://example.com", params={"id": "1"})
+
+                    # Then: デフォルトの接続・読み込みタイムアウトで送信する
+                    mock_get_session.return_value.get.assert_called_once_with(
+                        "https://example.com", params={"id": "1"}, timeout=(3.05, 10)
+                    )
+
+    def test_http_post_custom_timeout(self):
+        """タイムアウトを指定した場合のテスト"""
+        # Given: HTTPセッション
+        from http_session import get_http_timeout, http_post
+
+        with patch("http_session.get_http_session") as mock_get_session:
+            # When: 読み込みタイムアウトを指定してPOSTリクエストを送信する
+            timeout = get_http_timeout(30)
+            http_post("https://example.com", data="a=b", timeout=timeout)
+
+            # Then: 指定したタイムアウトで送信する
+            assert timeout[1] == 30
+            mock_get_session.return_value.post.assert_called_once_with(
+                "https://example.com", data="a=b", timeout=timeout
+            )
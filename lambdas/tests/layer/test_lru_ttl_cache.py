@@ -0,0 +1,81 @@
+"""lru_ttl_cacheのユニットテスト"""
+
+from unittest.mock import patch
+
+# pylint: disable=import-outside-toplevel,import-error
+
+
+class TestLruTtlCache:
+    """LruTtlCacheクラスのテスト"""
+
+    def test_get_hit_and_miss(self):
+        """有効期間内のエントリーを取得するテスト"""
+        # Given: 有効期間10秒のエントリー
+        from lru_ttl_cache import LruTtlCache
+
+        cache = LruTtlCache(max_entries=2)
+        with patch("lru_ttl_cache.time.monotonic") as mock_monotonic:
+            mock_monotonic.return_value = 100.0
+            cache.put("a", "value_a", 10)
+
+            # When: 有効期間内・有効期間切れ・存在しないキーを取得する
+            mock_monotonic.return_value = 109.9
+            hit = cache.get("a")
+            missing = cache.get("b")
+            mock_monotonic.return_value = 110.0
+            expired = cache.get("a")
+
+            # Then: 有効期間内のみ値が返り、ヒット数・ミス数が記録される
+            assert hit == "value_a"
+            assert missing is None
+            assert expired is None
+            assert cache.stats() == {"entries": 0, "hits": 1, "misses": 2}
+
+    def test_put_evicts_least_recently_used(self):
+        """上限を超えた場合に最も長く参照されていないエントリーを破棄するテスト"""
+        # Given: 上限2件のキャッシュに2件保存し、aを参照する
+        from lru_ttl_cache import LruTtlCache
+
+        cache = LruTtlCache(max_entries=2)
+        cache.put("a", 1, 60)
+        cache.put("b", 2, 60)
+        cache.get("a")
+
+        # When: 3件目を保存する
+        cache.put("c", 3, 60)
+
+        # Then: 最も長く参照されていないbが破棄される
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_put_disabled(self):
+        """上限または有効期間が0の場合のテスト"""
+        # Given: 上限0件のキャッシュと、上限1件のキャッシュ
+        from lru_ttl_cache import LruTtlCache
+
+        disabled = LruTtlCache(max_entries=0)
+        enabled = LruTtlCache(max_entries=1)
+
+        # When: 保存する
+        disabled.put("a", 1, 60)
+        enabled.put("a", 1, 0)
+
+        # Then: いずれも保存されない
+        assert disabled.get("a") is None
+        assert enabled.get("a") is None
+
+    def test_clear(self):
+        """すべてのエントリーを破棄するテスト"""
+        # Given: 1件保存して参照する
+        from lru_ttl_cache import LruTtlCache
+
+        cache = LruTtlCache(max_entries=1)
+        cache.put("a", 1, 60)
+        cache.get("a")
+
+        # When: 破棄する
+        cache.clear()
+
+        # Then: エントリー・ヒット数・ミス数がリセットされる
+        assert cache.stats() == {"entries": 0, "hits": 0, "misses": 0}
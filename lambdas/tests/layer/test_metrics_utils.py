@@ -0,0 +1,78 @@
+"""metrics_utilsのユニットテスト"""
+
+import json
+import os
+from unittest.mock import patch
+
+# pylint: disable=import-outside-toplevel,import-error,too-few-public-methods
+
+
+class TestPutMetric:
+    """put_metric関数のテスト"""
+
+    @patch.dict(os.environ, {"AWS_LAMBDA_FUNCTION_NAME": "test-function"})
+    def test_put_metric_default_dimensions(self, capsys):
+        """デフォルトのディメンションでのメトリクス出力テスト"""
+        # Given: Lambda関数名が設定されている
+        from metrics_utils import put_metric
+
+        # When: メトリクスを出力する
+        put_metric("TestMetric", 1)
+
+        # Then: 関数名をディメンションとするEMF形式の1行が出力される
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 1
+        emf = json.loads(lines[0])
+        assert emf["_aws"]["CloudWatchMetrics"] == [
+            {
+                "Namespace": "YTLiveMetaData",
+                "Dimensions": [["FunctionName"]],
+                "Metrics": [{"Name": "TestMetric", "Unit": "Count"}],
+            }
+        ]
+        assert emf["FunctionName"] == "test-function"
+        assert emf["TestMetric"] == 1
+
+    def test_put_metric_custom_dimensions(self, capsys):
+        """ディメンション・単位を指定したメトリクス出力テスト"""
+        # Given/When: ディメンション・単位を指定してメトリクスを出力する
+        from metrics_utils import put_metric
+
+        put_metric("Latency", 12.5, "Milliseconds", {"Stage": "youtube"})
+
+        # Then: 指定したディメンション・単位で出力される
+        emf = json.loads(capsys.readouterr().out)
+        assert emf["_aws"]["CloudWatchMetrics"][0]["Dimensions"] == [["Stage"]]
+        assert emf["_aws"]["CloudWatchMetrics"][0]["Metrics"] == [
+            {"Name": "Latency", "Unit": "Milliseconds"}
+        ]
+        assert emf["Stage"] == "youtube"
+        assert emf["Latency"] == 12.5
+
+
+class TestPutMetrics:
+    """put_metrics関数のテスト"""
+
+    def test_put_metrics(self, capsys):
+        """複数のメトリクスを1行で出力するテスト"""
+        # Given/When: 単位の異なる2つのメトリクスと検索用の値を出力する
+        from metrics_utils import put_metrics
+
+        put_metrics(
+            {"HMACDuration": (1.5, "Milliseconds"), "HMACErrors": (0, "Count")},
+            dimensions={"FunctionName": "test-function", "Handler": "lambda_handler"},
+            properties={"StageCalls": {"HMAC": 1}},
+        )
+
+        # Then: 1つのディメンションのセットで2つのメトリクスが出力される
+        emf = json.loads(capsys.readouterr().out)
+        assert emf["_aws"]["CloudWatchMetrics"][0]["Dimensions"] == [
+            ["FunctionName", "Handler"]
+        ]
+        assert emf["_aws"]["CloudWatchMetrics"][0]["Metrics"] == [
+            {"Name": "HMACDuration", "Unit": "Milliseconds"},
+            {"Name": "HMACErrors", "Unit": "Count"},
+        ]
+        assert emf["HMACDuration"] == 1.5
+        assert emf["HMACErrors"] == 0
+        assert emf["StageCalls"] == {"HMAC": 1}
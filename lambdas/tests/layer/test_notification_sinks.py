@@ -0,0 +1,275 @@
+"""notification_sinksのユニットテスト"""
+
+import json
+import os
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+# pylint: disable=import-outside-toplevel,import-error,too-few-public-methods
+
+
+def _notification():
+    """テスト用の通知内容を生成する"""
+    from notification_sinks import Notification
+
+    return Notification(
+        subject="Test Title",
+        message="Test Title\n\nhttps://example.com/video",
+        data={"title": "Test Title", "url": "https://example.com/video"},
+    )
+
+
+def _policy(name, required=False, timeout_seconds=1.0, max_attempts=1):
+    """テスト用の送信設定を生成する"""
+    from notification_sinks import SinkPolicy
+
+    return SinkPolicy(name, timeout_seconds, max_attempts, required)
+
+
+class TestNotificationDispatcher:
+    """NotificationDispatcherクラスのテスト"""
+
+    def test_dispatch_all_sinks(self):
+        """すべての通知先に通知するテスト"""
+        # Given: 必須の通知先と必須でない通知先
+        from notification_sinks import InMemorySink, NotificationDispatcher
+
+        required_sink = InMemorySink()
+        optional_sink = InMemorySink()
+        dispatcher = NotificationDispatcher(
+            [
+                (required_sink, _policy("sms", required=True)),
+                (optional_sink, _policy("memory")),
+            ]
+        )
+
+        # When: 通知する
+        failed = dispatcher.dispatch(_notification())
+
+        # Then: すべての通知先に同じ通知内容が届く
+        assert not failed
+        assert required_sink.notifications == [_notification()]
+        assert optional_sink.notifications == [_notification()]
+
+    def test_dispatch_slow_sink_does_not_delay_required(self):
+        """遅い通知先が必須の通知先を遅延させず、タイムアウトまで待機するテスト"""
+        # Given: 解放されるまで完了しない、タイムアウト0.3秒の必須でない通知先
+        from notification_sinks import InMemorySink, NotificationDispatcher
+
+        release = threading.Event()
+        sent_at = []
+
+        slow_sink = Mock()
+        slow_sink.send.side_effect = lambda *_args: release.wait(5)
+        required_sink = Mock()
+        required_sink.send.side_effect = lambda *_args: sent_at.append(time.monotonic())
+        dispatcher = NotificationDispatcher(
+            [
+                (slow_sink, _policy("webhook", timeout_seconds=0.3)),
+                (required_sink, _policy("sms", required=True)),
+                (InMemorySink(), _policy("memory")),
+            ]
+        )
+
+        try:
+            with patch("notification_sinks.put_metric") as mock_put_metric:
+                # When: 通知する
+                started_at = time.monotonic()
+                failed = dispatcher.dispatch(_notification())
+                elapsed = time.monotonic() - started_at
+
+                # Then: 必須の通知先は遅い通知先を待たずに送信され、
+                # 遅い通知先はタイムアウトまで待機して、応答前に失敗として記録される
+                assert sent_at[0] - started_at < 0.2
+                assert 0.3 <= elapsed < 1
+                assert list(failed) == ["webhook"]
+                assert isinstance(failed["webhook"], TimeoutError)
+                mock_put_metric.assert_called_once()
+                assert mock_put_metric.call_args[0][0] == "NotificationSinkFailed"
+                assert mock_put_metric.call_args[1]["dimensions"]["Sink"] == "webhook"
+        finally:
+            release.set()
+
+    def test_dispatch_optional_failure(self):
+        """必須でない通知先への通知に失敗した場合のテスト"""
+        # Given: 即座に失敗する必須でない通知先
+        from notification_sinks import NotificationDispatcher
+
+        failing_sink = Mock()
+        failing_sink.send.side_effect = ConnectionError("webhook error")
+        required_sink = Mock()
+        dispatcher = NotificationDispatcher(
+            [
+                (failing_sink, _policy("webhook")),
+                (required_sink, _policy("sms", required=True)),
+            ]
+        )
+
+        with patch("notification_sinks.put_metric") as mock_put_metric:
+            # When: 通知する
+            failed = dispatcher.dispatch(_notification())
+
+            # Then: 必須の通知先には送信され、失敗した通知先を返して記録する
+            required_sink.send.assert_called_once()
+            assert list(failed) == ["webhook"]
+            assert isinstance(failed["webhook"], ConnectionError)
+            mock_put_metric.assert_called_once()
+            assert mock_put_metric.call_args[1]["dimensions"]["Sink"] == "webhook"
+
+    def test_dispatch_required_failure(self):
+        """必須の通知先への通知に失敗した場合のテスト"""
+        # Given: 必須の通知先が失敗する
+        from notification_sinks import NotificationDispatcher
+
+        required_sink = Mock()
+        required_sink.send.side_effect = Exception("SNS error")
+        dispatcher = NotificationDispatcher(
+            [(required_sink, _policy("sms", required=True))]
+        )
+
+        # When/Then: 例外が送出される
+        with pytest.raises(Exception, match="SNS error"):
+            dispatcher.dispatch(_notification())
+
+    def test_dispatch_retry(self):
+        """失敗した通知先を再試行するテスト"""
+        # Given: 1回目のみ失敗する、最大2回試行する通知先
+        from notification_sinks import NotificationDispatcher
+
+        sink = Mock()
+        sink.send.side_effect = [Exception("temporary error"), None]
+        dispatcher = NotificationDispatcher(
+            [(sink, _policy("webhook", timeout_seconds=5, max_attempts=2))]
+        )
+
+        with patch("notification_sinks.time.sleep") as mock_sleep:
+            # When: 通知する
+            failed = dispatcher.dispatch(_notification())
+
+            # Then: 待機後に再試行して成功する
+            assert not failed
+            assert sink.send.call_count == 2
+            mock_sleep.assert_called_once_with(0.2)
+
+    def test_dispatch_circuit_open_no_retry(self):
+        """サーキットブレーカーがオープンの場合は再試行しないテスト"""
+        # Given: サーキットブレーカーがオープンの必須の通知先
+        from circuit_breaker import CircuitOpenError
+        from notification_sinks import NotificationDispatcher
+
+        sink = Mock()
+        sink.send.side_effect = CircuitOpenError("sns")
+        dispatcher = NotificationDispatcher(
+            [(sink, _policy("sms", required=True, max_attempts=3))]
+        )
+
+        # When/Then: 再試行せずにCircuitOpenErrorが送出される
+        with pytest.raises(CircuitOpenError):
+            dispatcher.dispatch(_notification())
+        sink.send.assert_called_once()
+
+
+class TestSinks:
+    """通知先の実装のテスト"""
+
+    def test_webhook_sink(self):
+        """WebhookにJSONをPOSTするテスト"""
+        # Given: パラメータに保存したWebhookのURL
+        from notification_sinks import WebhookSink
+
+        with patch("notification_sinks.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "https://example.com/webhook"
+            with patch("notification_sinks.http_post") as mock_http_post:
+                # When: 通知する
+                WebhookSink("test-webhook-url-param").send(_notification(), 2.0)
+
+                # Then: 構造化した通知内容をタイムアウトを指定してPOSTする
+                args, kwargs = mock_http_post.call_args
+                assert args == ("https://example.com/webhook",)
+                assert json.loads(kwargs["data"]) == {
+                    "subject": "Test Title",
+                    "title": "Test Title",
+                    "url": "https://example.com/video",
+                }
+                assert kwargs["timeout"][1] == 2.0
+                mock_http_post.return_value.raise_for_status.assert_called_once()
+
+    def test_sns_topic_sink(self):
+        """SNSトピックに発行するテスト"""
+        # Given: 件名が100文字を超える通知内容
+        from notification_sinks import Notification, SnsTopicSink
+
+        notification = Notification(subject="a" * 150, message="message", data={})
+
+        with patch("notification_sinks.get_guarded_client") as mock_get_client:
+            # When: 通知する
+            SnsTopicSink("arn:aws:sns:ap-northeast-1:123456789012:test").send(
+                notification, 5.0
+            )
+
+            # Then: 件名を100文字に切り詰めて発行する
+            mock_get_client.return_value.publish.assert_called_once_with(
+                TopicArn="arn:aws:sns:ap-northeast-1:123456789012:test",
+                Subject="a" * 100,
+                Message="message",
+            )
+
+
+class TestCreateNotificationDispatcher:
+    """create_notification_dispatcher関数のテスト"""
+
+    def teardown_method(self):
+        """登録した通知先を解除する"""
+        from notification_sinks import register_notification_sink
+
+        register_notification_sink("memory", None)
+
+    @patch.dict(
+        os.environ,
+        {
+            "NOTIFICATION_SINKS": "sms, memory, sns_topic",
+            "NOTIFICATION_TOPIC_ARN": "arn:aws:sns:ap-northeast-1:123456789012:test",
+            "NOTIFICATION_SINK_TIMEOUT_SECONDS": "3",
+            "NOTIFICATION_SINK_MEMORY_TIMEOUT_SECONDS": "1",
+        },
+    )
+    def test_create_notification_dispatcher(self):
+        """環境変数で選択した通知先のテスト"""
+        # Given: 登録したメモリの通知先
+        from notification_sinks import (
+            InMemorySink,
+            SnsTopicSink,
+            create_notification_dispatcher,
+            register_notification_sink,
+        )
+
+        memory_sink = InMemorySink()
+        register_notification_sink("memory", memory_sink)
+        sms_sink = Mock()
+
+        # When: ディスパッチャーを生成する
+        dispatcher = create_notification_dispatcher(sms_sink)
+
+        # Then: SMSを必須とし、通知先ごとの設定が優先される
+        sinks = dispatcher.sinks
+        assert [policy.name for _, policy in sinks] == ["sms", "memory", "sns_topic"]
+        assert sinks[0][0] is sms_sink
+        assert sinks[0][1].required is True
+        assert sinks[0][1].max_attempts == 1
+        assert sinks[1][0] is memory_sink
+        assert sinks[1][1].timeout_seconds == 1
+        assert isinstance(sinks[2][0], SnsTopicSink)
+        assert sinks[2][1].timeout_seconds == 3
+        assert sinks[2][1].max_attempts == 2
+
+    @patch.dict(os.environ, {"NOTIFICATION_SINKS": "email"})
+    def test_create_notification_dispatcher_unsupported(self):
+        """未対応の通知先の場合のテスト"""
+        from notification_sinks import create_notification_dispatcher
+
+        # When/Then: ValueErrorが送出される
+        with pytest.raises(ValueError, match="Unsupported notification sink: email"):
+            create_notification_dispatcher(Mock())
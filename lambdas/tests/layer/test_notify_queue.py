@@ -0,0 +1,155 @@
+"""HMAC署名検証済のプッシュ通知を非同期に処理するためのキューのユニットテスト"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+# pylint: disable=import-outside-toplevel,import-error,too-few-public-methods
+
+
+class TestSqsNotifyQueue:
+    """SqsNotifyQueueクラスのテスト"""
+
+    def test_send_utf8(self):
+        """UTF-8の本文を送信するテスト"""
+        # Given: UTF-8の本文
+        from notify_queue import SqsNotifyQueue
+
+        with patch("notify_queue.get_client") as mock_get_client:
+            # When: 送信する
+            SqsNotifyQueue("https://sqs/queue").send("<feed>日本語</feed>".encode())
+
+            # Then: 本文をそのまま文字列で送信する
+            mock_get_client.assert_called_once_with("sqs")
+            mock_get_client.return_value.send_message.assert_called_once_with(
+                QueueUrl="https://sqs/queue", MessageBody="<feed>日本語</feed>"
+            )
+
+    def test_send_binary(self):
+        """UTF-8でデコードできない本文を送信するテスト"""
+        # Given: UTF-8でデコードできない本文
+        from notify_queue import SqsNotifyQueue
+
+        with patch("notify_queue.get_client") as mock_get_client:
+            # When: 送信する
+            SqsNotifyQueue("https://sqs/queue").send(b"\xff\xfe")
+
+            # Then: Base64エンコードしてメッセージ属性で示す
+            mock_get_client.return_value.send_message.assert_called_once_with(
+                QueueUrl="https://sqs/queue",
+                MessageBody="//4=",
+                MessageAttributes={
+                    "ContentEncoding": {"DataType": "String", "StringValue": "base64"}
+                },
+            )
+
+    def test_send_failure(self):
+        """送信に失敗した場合のテスト"""
+        # Given: SendMessageが失敗する
+        from notify_queue import NotifyQueueError, SqsNotifyQueue
+
+        with patch("notify_queue.get_client") as mock_get_client:
+            mock_get_client.return_value.send_message.side_effect = Exception("error")
+
+            # When/Then: NotifyQueueErrorが送出される
+            with pytest.raises(NotifyQueueError, match="error"):
+                SqsNotifyQueue("https://sqs/queue").send(b"<feed/>")
+
+
+class TestLocalNotifyQueue:
+    """LocalNotifyQueueクラスのテスト"""
+
+    def test_receive_event(self):
+        """保持した本文をSQSイベントの形式で取り出すテスト"""
+        # Given: 3件の本文を保持する
+        from notify_queue import LocalNotifyQueue, decode_record_body
+
+        queue = LocalNotifyQueue()
+        for body in [b"a", b"\xff", b"c"]:
+            queue.send(body)
+
+        # When: 最大2件ずつ取り出す
+        first = queue.receive_event(max_messages=2)
+        second = queue.receive_event(max_messages=2)
+        third = queue.receive_event(max_messages=2)
+
+        # Then: 古い順に取り出され、元の本文に復元できる
+        assert [decode_record_body(r) for r in first["Records"]] == [b"a", b"\xff"]
+        assert [decode_record_body(r) for r in second["Records"]] == [b"c"]
+        assert third == {"Records": []}
+        assert [r["messageId"] for r in first["Records"] + second["Records"]] == [
+            "local-1",
+            "local-2",
+            "local-3",
+        ]
+
+
+class TestDecodeRecordBody:
+    """decode_record_body関数のテスト"""
+
+    def test_decode_record_body_text(self):
+        """文字列で送信した本文を取得するテスト"""
+        # Given/When/Then: UTF-8のバイト列が返る
+        from notify_queue import decode_record_body
+
+        assert decode_record_body({"body": "<feed>日本語</feed>"}) == (
+            "<feed>日本語</feed>".encode()
+        )
+
+    def test_decode_record_body_base64(self):
+        """Base64エンコードして送信した本文を取得するテスト"""
+        # Given/When/Then: デコードしたバイト列が返る
+        from notify_queue import decode_record_body
+
+        record = {
+            "body": "//4=",
+            "messageAttributes": {
+                "ContentEncoding": {"dataType": "String", "stringValue": "base64"}
+            },
+        }
+        assert decode_record_body(record) == b"\xff\xfe"
+
+
+class TestGetNotifyQueue:
+    """get_notify_queue関数のテスト"""
+
+    def setup_method(self):
+        """生成済のキューを破棄する"""
+        from notify_queue import register_notify_queue
+
+        for backend_name in ["sqs", "local"]:
+            register_notify_queue(backend_name, None)
+
+    @patch.dict(
+        os.environ,
+        {"NOTIFY_QUEUE_BACKEND": "sqs", "NOTIFY_QUEUE_URL": "https://sqs/queue"},
+    )
+    def test_get_notify_queue_sqs(self):
+        """SQSのキューを取得するテスト"""
+        # Given/When: sqsを選択して2回取得する
+        from notify_queue import SqsNotifyQueue, get_notify_queue
+
+        queue = get_notify_queue()
+
+        # Then: 同じSQSのキューが返る
+        assert isinstance(queue, SqsNotifyQueue)
+        assert queue.queue_url == "https://sqs/queue"
+        assert get_notify_queue() is queue
+
+    @patch.dict(os.environ, {"NOTIFY_QUEUE_BACKEND": "local"})
+    def test_get_notify_queue_local(self):
+        """プロセス内のキューを取得するテスト"""
+        # Given/When/Then: localを選択するとプロセス内のキューが返る
+        from notify_queue import LocalNotifyQueue, get_notify_queue
+
+        assert isinstance(get_notify_queue(), LocalNotifyQueue)
+
+    @patch.dict(os.environ, {"NOTIFY_QUEUE_BACKEND": "unknown"})
+    def test_get_notify_queue_unsupported(self):
+        """不正なバックエンド名のテスト"""
+        # Given/When/Then: ValueErrorが送出される
+        from notify_queue import get_notify_queue
+
+        with pytest.raises(ValueError, match="unknown"):
+            get_notify_queue()
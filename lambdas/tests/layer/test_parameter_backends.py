@@ -0,0 +1,311 @@
+"""パラメータの取得元(バックエンド)のユニットテスト"""
+
+import io
+import json
+import os
+import urllib.error
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+# pylint: disable=import-outside-toplevel,import-error,too-few-public-methods
+
+
+def _client_error(code: str) -> ClientError:
+    """指定したエラーコードのClientErrorを生成する"""
+    return ClientError({"Error": {"Code": code, "Message": code}}, "GetParameter")
+
+
+def _http_error(code: int, body: str) -> urllib.error.HTTPError:
+    """指定したステータスコード・本文のHTTPErrorを生成する"""
+    return urllib.error.HTTPError(
+        "http://localhost", code, "error", {}, io.BytesIO(body.encode("utf-8"))
+    )
+
+
+class TestSsmParameterBackend:
+    """SsmParameterBackendクラスのテスト"""
+
+    def test_get_parameter_success(self):
+        """パラメータ取得の成功テスト"""
+        # Given: GetParameterが値を返す
+        from parameter_backends import SsmParameterBackend
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_get_client.return_value.get_parameter.return_value = {
+                "Parameter": {"Value": "value"}
+            }
+
+            # When: 取得する
+            result = SsmParameterBackend().get_parameter("param")
+
+            # Then: 復号した値が返る
+            assert result == "value"
+            mock_get_client.return_value.get_parameter.assert_called_once_with(
+                Name="param", WithDecryption=True
+            )
+
+    def test_get_parameter_not_found(self):
+        """パラメータが存在しない場合のテスト"""
+        # Given: GetParameterがParameterNotFoundを返す
+        from parameter_backends import ParameterNotFoundError, SsmParameterBackend
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_get_client.return_value.get_parameter.side_effect = _client_error(
+                "ParameterNotFound"
+            )
+
+            # When/Then: ParameterNotFoundErrorが送出される
+            with pytest.raises(ParameterNotFoundError, match="ParameterNotFound"):
+                SsmParameterBackend().get_parameter("param")
+
+    def test_get_parameter_throttled(self):
+        """スロットリングされた場合のテスト"""
+        # Given: GetParameterがThrottlingExceptionを返す
+        from parameter_backends import (
+            ParameterBackendError,
+            ParameterNotFoundError,
+            SsmParameterBackend,
+        )
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_get_client.return_value.get_parameter.side_effect = _client_error(
+                "ThrottlingException"
+            )
+
+            # When/Then: ParameterNotFoundError以外のParameterBackendErrorが送出される
+            with pytest.raises(ParameterBackendError) as exc_info:
+                SsmParameterBackend().get_parameter("param")
+            assert not isinstance(exc_info.value, ParameterNotFoundError)
+
+    def test_put_parameter_failure(self):
+        """パラメータ保存が失敗した場合のテスト"""
+        # Given: PutParameterがAccessDeniedExceptionを返す
+        from parameter_backends import ParameterBackendError, SsmParameterBackend
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_get_client.return_value.put_parameter.side_effect = _client_error(
+                "AccessDeniedException"
+            )
+
+            # When/Then: ParameterBackendErrorが送出される
+            with pytest.raises(ParameterBackendError, match="AccessDeniedException"):
+                SsmParameterBackend().put_parameter("param", "value")
+
+
+@patch.dict(os.environ, {"AWS_SESSION_TOKEN": "test-session-token"})
+class TestExtensionParameterBackend:
+    """ExtensionParameterBackendクラスのテスト"""
+
+    def test_get_parameter_success(self):
+        """拡張機能からのパラメータ取得の成功テスト"""
+        # Given: 拡張機能がGetParameterと同じ形式のJSONを返す
+        from parameter_backends import ExtensionParameterBackend
+
+        response = MagicMock()
+        response.__enter__.return_value.read.return_value = json.dumps(
+            {"Parameter": {"Name": "/app/param", "Value": "value"}}
+        ).encode("utf-8")
+
+        with patch("urllib.request.urlopen") as mock_urlopen:
+            mock_urlopen.return_value = response
+
+            # When: 取得する
+            result = ExtensionParameterBackend(port=2773, timeout=1).get_parameter(
+                "/app/param"
+            )
+
+            # Then: 値が返り、セッショントークンをヘッダーに付与して呼び出す
+            assert result == "value"
+            request = mock_urlopen.call_args[0][0]
+            assert request.full_url == (
+                "http://localhost:2773/systemsmanager/parameters/get"
+                "?name=%2Fapp%2Fparam&withDecryption=true"
+            )
+            assert request.get_header("X-aws-parameters-secrets-token") == (
+                "test-session-token"
+            )
+            assert mock_urlopen.call_args[1] == {"timeout": 1}
+
+    def test_get_parameter_not_found(self):
+        """拡張機能がパラメータなしを返す場合のテスト"""
+        # Given: 拡張機能が400とParameterNotFoundを返す
+        from parameter_backends import ExtensionParameterBackend, ParameterNotFoundError
+
+        with patch("urllib.request.urlopen") as mock_urlopen:
+            mock_urlopen.side_effect = _http_error(400, "ParameterNotFound")
+
+            # When/Then: ParameterNotFoundErrorが送出される
+            with pytest.raises(ParameterNotFoundError):
+                ExtensionParameterBackend(port=2773, timeout=1).get_parameter("param")
+
+    def test_get_parameter_http_error(self):
+        """拡張機能がエラーを返す場合のテスト"""
+        # Given: 拡張機能が500を返す
+        from parameter_backends import (
+            ExtensionParameterBackend,
+            ParameterBackendError,
+            ParameterNotFoundError,
+        )
+
+        with patch("urllib.request.urlopen") as mock_urlopen:
+            mock_urlopen.side_effect = _http_error(500, "internal error")
+
+            # When/Then: ParameterNotFoundError以外のParameterBackendErrorが送出される
+            with pytest.raises(ParameterBackendError, match="500") as exc_info:
+                ExtensionParameterBackend(port=2773, timeout=1).get_parameter("param")
+            assert not isinstance(exc_info.value, ParameterNotFoundError)
+
+    def test_get_parameter_connection_error(self):
+        """拡張機能に接続できない場合のテスト"""
+        # Given: 拡張機能が起動していない
+        from parameter_backends import ExtensionParameterBackend, ParameterBackendError
+
+        with patch("urllib.request.urlopen") as mock_urlopen:
+            mock_urlopen.side_effect = urllib.error.URLError("Connection refused")
+
+            # When/Then: ParameterBackendErrorが送出される
+            with pytest.raises(ParameterBackendError, match="Connection refused"):
+                ExtensionParameterBackend(port=2773, timeout=1).get_parameter("param")
+
+    def test_get_parameters_skips_not_found(self):
+        """一括取得で存在しないパラメータが含まれる場合のテスト"""
+        # Given: param_bのみ存在しない
+        from parameter_backends import ExtensionParameterBackend, ParameterNotFoundError
+
+        backend = ExtensionParameterBackend(port=2773, timeout=1)
+        with patch.object(backend, "get_parameter") as mock_get_parameter:
+            mock_get_parameter.side_effect = ["value_a", ParameterNotFoundError("b")]
+
+            # When: 一括取得する
+            result = backend.get_parameters(["param_a", "param_b"])
+
+            # Then: 存在するパラメータのみ返る
+            assert result == {"param_a": "value_a"}
+
+
+class TestLocalParameterBackend:
+    """LocalParameterBackendクラスのテスト"""
+
+    def test_get_parameter_from_file(self, tmp_path):
+        """JSONファイルからの取得テスト"""
+        # Given: パラメータを定義したJSONファイル
+        from parameter_backends import LocalParameterBackend
+
+        file_path = tmp_path / "parameters.json"
+        file_path.write_text(json.dumps({"/app/param": "file_value"}))
+
+        # When: 取得する
+        backend = LocalParameterBackend(str(file_path))
+
+        # Then: JSONファイルの値が返る
+        assert backend.get_parameter("/app/param") == "file_value"
+        assert backend.get_parameters_by_path("/app/") == {"/app/param": "file_value"}
+
+    @patch.dict(os.environ, {"YTLIVEMETADATA_PHONE_NUMBER": "+810000000000"})
+    def test_get_parameter_from_env(self):
+        """環境変数からの取得テスト"""
+        # Given: パラメータ名を変換した環境変数
+        from parameter_backends import LocalParameterBackend
+
+        # When: 取得する
+        result = LocalParameterBackend(None).get_parameter(
+            "/ytlivemetadata/phone_number"
+        )
+
+        # Then: 環境変数の値が返る
+        assert result == "+810000000000"
+
+    def test_get_parameter_not_found(self):
+        """パラメータが存在しない場合のテスト"""
+        # Given: 空のバックエンド
+        from parameter_backends import LocalParameterBackend, ParameterNotFoundError
+
+        # When/Then: ParameterNotFoundErrorが送出される
+        with pytest.raises(ParameterNotFoundError):
+            LocalParameterBackend(None).get_parameter("/app/missing_parameter")
+
+    def test_put_parameter(self):
+        """保存した値を取得するテスト"""
+        # Given: 空のバックエンド
+        from parameter_backends import LocalParameterBackend
+
+        backend = LocalParameterBackend(None)
+
+        # When: 保存した後に一括取得する
+        backend.put_parameter("/app/param", "saved")
+        result = backend.get_parameters(["/app/param", "/app/missing_parameter"])
+
+        # Then: 保存した値のみ返る
+        assert result == {"/app/param": "saved"}
+
+
+class TestGetParameterBackend:
+    """get_parameter_backend関数のテスト"""
+
+    def setup_method(self):
+        """各テストの前に生成済のバックエンドを破棄する"""
+        from parameter_backends import register_parameter_backend
+
+        for name in ["ssm", "extension", "local", "custom"]:
+            register_parameter_backend(name, None)
+
+    @pytest.mark.parametrize(
+        "backend_name,class_name",
+        [
+            ("ssm", "SsmParameterBackend"),
+            ("extension", "ExtensionParameterBackend"),
+            ("local", "LocalParameterBackend"),
+        ],
+    )
+    def test_get_parameter_backend_by_env(self, backend_name, class_name):
+        """環境変数でバックエンドを選択するテスト"""
+        # Given: SSM_PARAMETER_BACKENDを設定
+        import parameter_backends
+
+        with patch.dict(os.environ, {"SSM_PARAMETER_BACKEND": backend_name}):
+            # When: バックエンドを2回取得する
+            first = parameter_backends.get_parameter_backend()
+            second = parameter_backends.get_parameter_backend()
+
+            # Then: 指定したバックエンドが返り、2回目は同じインスタンスが返る
+            assert isinstance(first, getattr(parameter_backends, class_name))
+            assert first is second
+
+    def test_get_parameter_backend_default(self):
+        """環境変数が未設定の場合のテスト"""
+        # Given: SSM_PARAMETER_BACKENDが未設定
+        from parameter_backends import SsmParameterBackend, get_parameter_backend
+
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("SSM_PARAMETER_BACKEND", None)
+
+            # When/Then: SSMのバックエンドが返る
+            assert isinstance(get_parameter_backend(), SsmParameterBackend)
+
+    def test_get_parameter_backend_invalid(self):
+        """環境変数が不正な場合のテスト"""
+        # Given: 不正なSSM_PARAMETER_BACKEND
+        from parameter_backends import get_parameter_backend
+
+        with patch.dict(os.environ, {"SSM_PARAMETER_BACKEND": "invalid"}):
+            # When/Then: ValueErrorが送出される
+            with pytest.raises(ValueError, match="Unsupported SSM_PARAMETER_BACKEND"):
+                get_parameter_backend()
+
+    def test_register_parameter_backend(self):
+        """登録したバックエンドを選択するテスト"""
+        # Given: customとして登録したバックエンド
+        from parameter_backends import (
+            LocalParameterBackend,
+            get_parameter_backend,
+            register_parameter_backend,
+        )
+
+        backend = LocalParameterBackend(None)
+        register_parameter_backend("custom", backend)
+
+        with patch.dict(os.environ, {"SSM_PARAMETER_BACKEND": "custom"}):
+            # When/Then: 登録したバックエンドが返る
+            assert get_parameter_backend() is backend
@@ -0,0 +1,118 @@
+"""sms_fanoutのユニットテスト"""
+
+import threading
+from unittest.mock import Mock, call, patch
+
+import pytest
+
+# pylint: disable=import-outside-toplevel,import-error
+
+
+class TestParsePhoneNumbers:
+    """parse_phone_numbers関数のテスト"""
+
+    def test_parse_phone_numbers(self):
+        """カンマ区切りの電話番号のテスト"""
+        from sms_fanout import parse_phone_numbers
+
+        # When/Then: 空白・空要素・重複を除き、順序を維持する
+        assert parse_phone_numbers("+8180, +8190,,+8180 ") == ["+8180", "+8190"]
+        assert parse_phone_numbers("+818012345678") == ["+818012345678"]
+        assert not parse_phone_numbers("")
+
+    def test_mask_phone_number(self):
+        """電話番号の末尾4桁以外を伏せるテスト"""
+        from sms_fanout import mask_phone_number
+
+        assert mask_phone_number("+818012345678") == "*********5678"
+        assert mask_phone_number("123") == "123"
+
+
+class TestPublishSms:
+    """publish_sms関数のテスト"""
+
+    def test_publish_sms_single(self):
+        """1つの電話番号に送信するテスト"""
+        # Given: 1つの電話番号
+        from sms_fanout import publish_sms
+
+        sns_client = Mock()
+        with patch("sms_fanout._executor") as mock_executor:
+            # When: 送信する
+            result = publish_sms(sns_client, ["+818012345678"], "message")
+
+            # Then: スレッドプールを使用せずに送信する
+            sns_client.publish.assert_called_once_with(
+                PhoneNumber="+818012345678", Message="message"
+            )
+            mock_executor.submit.assert_not_called()
+            assert result.sent == ["+818012345678"]
+            assert not result.failed
+
+    def test_publish_sms_concurrent(self):
+        """複数の電話番号に並行して送信するテスト"""
+        # Given: 3つの電話番号と、3つの送信がそろうまで待機するSNSクライアント
+        from sms_fanout import publish_sms
+
+        barrier = threading.Barrier(3, timeout=5)
+        sns_client = Mock()
+        sns_client.publish.side_effect = lambda **_kwargs: barrier.wait()
+
+        # When: 送信する
+        result = publish_sms(sns_client, ["+8101", "+8102", "+8103"], "message")
+
+        # Then: すべての電話番号に同時に送信する
+        assert result.sent == ["+8101", "+8102", "+8103"]
+        sns_client.publish.assert_has_calls(
+            [
+                call(PhoneNumber="+8101", Message="message"),
+                call(PhoneNumber="+8102", Message="message"),
+                call(PhoneNumber="+8103", Message="message"),
+            ],
+            any_order=True,
+        )
+
+    def test_publish_sms_partial_failure(self):
+        """一部の電話番号への送信に失敗した場合のテスト"""
+        # Given: +8102への送信のみ失敗する
+        from sms_fanout import publish_sms
+
+        error = Exception("Invalid parameter")
+
+        def publish(PhoneNumber, **_kwargs):  # pylint: disable=invalid-name
+            if PhoneNumber == "+8102":
+                raise error
+
+        sns_client = Mock()
+        sns_client.publish.side_effect = publish
+
+        with patch("sms_fanout.put_metric") as mock_put_metric:
+            # When: 送信する
+            result = publish_sms(sns_client, ["+8101", "+8102", "+8103"], "message")
+
+            # Then: 他の電話番号への送信を継続し、失敗した電話番号を記録する
+            assert result.sent == ["+8101", "+8103"]
+            assert result.failed == {"+8102": error}
+            mock_put_metric.assert_called_once_with("SmsPublishFailed", 1)
+
+    def test_publish_sms_all_failed(self):
+        """すべての電話番号への送信に失敗した場合のテスト"""
+        # Given: すべての送信が失敗する
+        from sms_fanout import publish_sms
+
+        sns_client = Mock()
+        sns_client.publish.side_effect = Exception("SNS error")
+
+        with patch("sms_fanout.put_metric") as mock_put_metric:
+            # When/Then: 例外が送出される
+            with pytest.raises(Exception, match="SNS error"):
+                publish_sms(sns_client, ["+8101", "+8102"], "message")
+            mock_put_metric.assert_called_once_with("SmsPublishFailed", 2)
+
+    def test_publish_sms_no_phone_number(self):
+        """通知先の電話番号が存在しない場合のテスト"""
+        from sms_fanout import publish_sms
+
+        # When/Then: ValueErrorが送出される
+        with pytest.raises(ValueError, match="No phone number"):
+            publish_sms(Mock(), [], "message")
@@ -2,17 +2,28 @@
 
 from unittest.mock import patch
 
+import pytest
+from botocore.exceptions import ClientError
+from parameter_backends import ParameterBackendError, ParameterNotFoundError
+
 # pylint: disable=import-outside-toplevel,import-error
 
 
 class TestGetParameterValue:
     """get_parameter_value関数のテスト"""
 
+    def setup_method(self):
+        """各テストの前にパラメータ値のキャッシュを破棄する"""
+        from ssm_utils import invalidate_parameter_cache
+
+        invalidate_parameter_cache()
+
     def test_get_parameter_value_success(self):
         """パラメータ取得の成功テスト"""
         from ssm_utils import get_parameter_value
 
-        with patch("ssm_utils.ssm_client") as mock_ssm_client:
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
             mock_ssm_client.get_parameter.return_value = {
                 "Parameter": {"Value": "test_value"}
             }
@@ -28,7 +39,8 @@ class TestGetParameterValue:
         """暗号化パラメータ取得の成功テスト"""
         from ssm_utils import get_parameter_value
 
-        with patch("ssm_utils.ssm_client") as mock_ssm_client:
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
             mock_ssm_client.get_parameter.return_value = {
                 "Parameter": {"Value": "encrypted_test_value"}
             }
@@ -44,7 +56,8 @@ class TestGetParameterValue:
         """異なるパラメータ名での取得テスト"""
         from ssm_utils import get_parameter_value
 
-        with patch("ssm_utils.ssm_client") as mock_ssm_client:
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
             # 複数回の呼び出しで異なる値を返す
             mock_ssm_client.get_parameter.side_effect = [
                 {"Parameter": {"Value": "value1"}},
@@ -57,3 +70,442 @@ class TestGetParameterValue:
             assert result1 == "value1"
             assert result2 == "value2"
             assert mock_ssm_client.get_parameter.call_count == 2
+
+    def test_get_parameter_value_cache_hit(self):
+        """有効期間内のキャッシュが存在する場合のテスト"""
+        # Given: 一度取得済のパラメータ
+        from ssm_utils import get_parameter_value
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            mock_ssm_client.get_parameter.return_value = {
+                "Parameter": {"Value": "cached_value"}
+            }
+            get_parameter_value("cached_param")
+
+            # When: 同じパラメータを再度取得する
+            result = get_parameter_value("cached_param")
+
+            # Then: SSMを呼ばずにキャッシュの値が返る
+            assert result == "cached_value"
+            assert mock_ssm_client.get_parameter.call_count == 1
+
+    def test_get_parameter_value_cache_expired(self):
+        """キャッシュの有効期間が切れた場合のテスト"""
+        # Given: 有効期間を過ぎたキャッシュ
+        from ssm_utils import get_parameter_value
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            with patch("ssm_utils.time.monotonic") as mock_monotonic:
+                mock_ssm_client.get_parameter.side_effect = [
+                    {"Parameter": {"Value": "old_value"}},
+                    {"Parameter": {"Value": "new_value"}},
+                ]
+                mock_monotonic.side_effect = [0.0, 10.0]
+                get_parameter_value("expiring_param", ttl_seconds=10)
+
+                # When: 有効期間ちょうどの時刻に再取得する
+                result = get_parameter_value("expiring_param", ttl_seconds=10)
+
+                # Then: SSMから再取得した値が返る
+                assert result == "new_value"
+                assert mock_ssm_client.get_parameter.call_count == 2
+
+    def test_get_parameter_value_ttl_zero(self):
+        """キャッシュ有効期間が0の場合のテスト"""
+        # Given: 有効期間0で取得済のパラメータ
+        from ssm_utils import get_parameter_value
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            mock_ssm_client.get_parameter.return_value = {
+                "Parameter": {"Value": "value"}
+            }
+            get_parameter_value("no_cache_param", ttl_seconds=0)
+
+            # When: 有効期間0で再取得する
+            get_parameter_value("no_cache_param", ttl_seconds=0)
+
+            # Then: 毎回SSMから取得する
+            assert mock_ssm_client.get_parameter.call_count == 2
+
+    def test_get_parameter_value_stale_on_error(self):
+        """SSMがエラーを返し、キャッシュが存在する場合のテスト"""
+        # Given: 有効期間切れのキャッシュとスロットリングを返すSSM
+        from ssm_utils import get_parameter_value
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            mock_ssm_client.get_parameter.side_effect = [
+                {"Parameter": {"Value": "stale_value"}},
+                ClientError(
+                    {"Error": {"Code": "ThrottlingException", "Message": "Rate"}},
+                    "GetParameter",
+                ),
+            ]
+            get_parameter_value("stale_param", ttl_seconds=0)
+
+            # When: 再取得する
+            result = get_parameter_value("stale_param", ttl_seconds=0)
+
+            # Then: 最後に取得できた値が返る
+            assert result == "stale_value"
+
+    def test_get_parameter_value_error_without_cache(self):
+        """SSMがエラーを返し、キャッシュが存在しない場合のテスト"""
+        # Given: スロットリングを返すSSM
+        from ssm_utils import get_parameter_value
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            mock_ssm_client.get_parameter.side_effect = ClientError(
+                {"Error": {"Code": "ThrottlingException", "Message": "Rate"}},
+                "GetParameter",
+            )
+
+            # When/Then: 例外が伝播する
+            with pytest.raises(ParameterBackendError, match="ThrottlingException"):
+                get_parameter_value("missing_param")
+
+    def test_get_parameter_value_not_found_cached(self):
+        """パラメータが存在しない場合に、存在しないことをキャッシュするテスト"""
+        # Given: ParameterNotFoundを返すSSM
+        from ssm_utils import get_parameter_value
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            mock_ssm_client.get_parameter.side_effect = ClientError(
+                {"Error": {"Code": "ParameterNotFound", "Message": "Not found"}},
+                "GetParameter",
+            )
+
+            # When/Then: 2回取得しても、いずれもParameterNotFoundErrorが送出される
+            for _ in range(2):
+                with pytest.raises(ParameterNotFoundError):
+                    get_parameter_value("missing_param")
+
+            # Then: 有効期間内はSSMを再度呼び出さない
+            mock_ssm_client.get_parameter.assert_called_once()
+
+    def test_get_parameter_value_not_found_cache_expired(self):
+        """存在しないことのキャッシュが有効期間切れの場合のテスト"""
+        # Given: 1回目はParameterNotFound、2回目は値を返すSSM
+        from ssm_utils import get_parameter_value
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            mock_ssm_client.get_parameter.side_effect = [
+                ClientError(
+                    {"Error": {"Code": "ParameterNotFound", "Message": "Not found"}},
+                    "GetParameter",
+                ),
+                {"Parameter": {"Value": "created_value"}},
+            ]
+            with pytest.raises(ParameterNotFoundError):
+                get_parameter_value("created_param", ttl_seconds=0)
+
+            # When: 有効期間切れの後に再取得する
+            result = get_parameter_value("created_param", ttl_seconds=0)
+
+            # Then: 作成されたパラメータ値が返る
+            assert result == "created_value"
+
+
+class TestPutParameterValue:
+    """put_parameter_value関数のテスト"""
+
+    def setup_method(self):
+        """各テストの前にパラメータ値のキャッシュを破棄する"""
+        from ssm_utils import invalidate_parameter_cache
+
+        invalidate_parameter_cache()
+
+    def test_put_parameter_value_success(self):
+        """パラメータ保存の成功テスト"""
+        # Given: 取得済のパラメータ
+        from ssm_utils import get_parameter_value, put_parameter_value
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            mock_ssm_client.get_parameter.return_value = {
+                "Parameter": {"Value": "old_value"}
+            }
+            get_parameter_value("secret_param")
+
+            # When: パラメータを保存した後に参照する
+            put_parameter_value("secret_param", "new_value")
+            result = get_parameter_value("secret_param")
+
+            # Then: SecureStringとして保存され、キャッシュも更新される
+            mock_ssm_client.put_parameter.assert_called_once_with(
+                Name="secret_param",
+                Value="new_value",
+                Type="SecureString",
+                Overwrite=True,
+            )
+            assert result == "new_value"
+            assert mock_ssm_client.get_parameter.call_count == 1
+
+    def test_put_parameter_value_failure(self):
+        """パラメータ保存が失敗した場合のテスト"""
+        # Given: PutParameterがエラーを返す
+        from ssm_utils import get_parameter_value, put_parameter_value
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            mock_ssm_client.put_parameter.side_effect = ClientError(
+                {"Error": {"Code": "AccessDeniedException", "Message": "Denied"}},
+                "PutParameter",
+            )
+            mock_ssm_client.get_parameter.return_value = {
+                "Parameter": {"Value": "current_value"}
+            }
+
+            # When/Then: 例外が伝播し、キャッシュは更新されない
+            with pytest.raises(ParameterBackendError, match="AccessDeniedException"):
+                put_parameter_value("secret_param", "new_value")
+            assert get_parameter_value("secret_param") == "current_value"
+
+
+class TestInvalidateParameterCache:
+    """invalidate_parameter_cache関数のテスト"""
+
+    def setup_method(self):
+        """各テストの前にパラメータ値のキャッシュを破棄する"""
+        from ssm_utils import invalidate_parameter_cache
+
+        invalidate_parameter_cache()
+
+    def test_invalidate_parameter_cache_single(self):
+        """特定のパラメータのキャッシュを破棄する場合のテスト"""
+        # Given: 2つのパラメータを取得済
+        from ssm_utils import get_parameter_value, invalidate_parameter_cache
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            mock_ssm_client.get_parameter.return_value = {
+                "Parameter": {"Value": "value"}
+            }
+            get_parameter_value("param_a")
+            get_parameter_value("param_b")
+
+            # When: param_aのキャッシュのみ破棄して再取得する
+            invalidate_parameter_cache("param_a")
+            get_parameter_value("param_a")
+            get_parameter_value("param_b")
+
+            # Then: param_aのみSSMから再取得する
+            assert mock_ssm_client.get_parameter.call_count == 3
+
+    def test_invalidate_parameter_cache_all(self):
+        """すべてのキャッシュを破棄する場合のテスト"""
+        # Given: 2つのパラメータを取得済
+        from ssm_utils import get_parameter_value, invalidate_parameter_cache
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            mock_ssm_client.get_parameter.return_value = {
+                "Parameter": {"Value": "value"}
+            }
+            get_parameter_value("param_a")
+            get_parameter_value("param_b")
+
+            # When: すべてのキャッシュを破棄して再取得する
+            invalidate_parameter_cache()
+            get_parameter_value("param_a")
+            get_parameter_value("param_b")
+
+            # Then: 両方SSMから再取得する
+            assert mock_ssm_client.get_parameter.call_count == 4
+
+    def test_invalidate_parameter_cache_unknown_name(self):
+        """キャッシュに存在しないパラメータ名を指定した場合のテスト"""
+        # Given: 空のキャッシュ
+        from ssm_utils import invalidate_parameter_cache
+
+        # When/Then: 例外は発生しない
+        invalidate_parameter_cache("unknown_param")
+
+
+class TestPrefetchParameters:
+    """prefetch_parameters関数のテスト"""
+
+    def setup_method(self):
+        """各テストの前にパラメータ値のキャッシュを破棄する"""
+        from ssm_utils import invalidate_parameter_cache
+
+        invalidate_parameter_cache()
+
+    def test_prefetch_parameters_success(self):
+        """複数のパラメータをまとめて取得する場合のテスト"""
+        # Given: GetParametersが2つのパラメータを返す
+        from ssm_utils import get_parameter_value, prefetch_parameters
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            mock_ssm_client.get_parameters.return_value = {
+                "Parameters": [
+                    {"Name": "param_a", "Value": "value_a"},
+                    {"Name": "param_b", "Value": "value_b"},
+                ],
+                "InvalidParameters": [],
+            }
+
+            # When: まとめて取得した後に個別に参照する
+            prefetch_parameters(["param_a", "param_b"])
+            result_a = get_parameter_value("param_a")
+            result_b = get_parameter_value("param_b")
+
+            # Then: GetParametersは1回のみ呼ばれ、GetParameterは呼ばれない
+            assert (result_a, result_b) == ("value_a", "value_b")
+            mock_ssm_client.get_parameters.assert_called_once_with(
+                Names=["param_a", "param_b"], WithDecryption=True
+            )
+            mock_ssm_client.get_parameter.assert_not_called()
+
+    def test_prefetch_parameters_batches_of_ten(self):
+        """パラメータ数がGetParametersの上限を超える場合のテスト"""
+        # Given: 11個のパラメータ名
+        from ssm_utils import prefetch_parameters
+
+        names = [f"param_{i}" for i in range(11)]
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            mock_ssm_client.get_parameters.return_value = {"Parameters": []}
+
+            # When: まとめて取得する
+            prefetch_parameters(names)
+
+            # Then: 10個と1個の2回に分けて取得する
+            calls = mock_ssm_client.get_parameters.call_args_list
+            assert [len(call[1]["Names"]) for call in calls] == [10, 1]
+
+    def test_prefetch_parameters_skips_fresh_and_duplicates(self):
+        """有効期間内のキャッシュや重複がある場合のテスト"""
+        # Given: param_aは取得済
+        from ssm_utils import get_parameter_value, prefetch_parameters
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            mock_ssm_client.get_parameter.return_value = {
+                "Parameter": {"Value": "value_a"}
+            }
+            mock_ssm_client.get_parameters.return_value = {"Parameters": []}
+            get_parameter_value("param_a")
+
+            # When: 重複を含むパラメータ名でまとめて取得する
+            prefetch_parameters(["param_a", "param_b", "param_b"])
+
+            # Then: 未取得のparam_bのみ1回取得する
+            mock_ssm_client.get_parameters.assert_called_once_with(
+                Names=["param_b"], WithDecryption=True
+            )
+
+    def test_prefetch_parameters_empty(self):
+        """パラメータ名が空の場合のテスト"""
+        # Given: 空のパラメータ名リスト
+        from ssm_utils import prefetch_parameters
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            # When: まとめて取得する
+            prefetch_parameters([])
+
+            # Then: SSMは呼ばれない
+            mock_ssm_client.get_parameters.assert_not_called()
+
+    def test_prefetch_parameters_invalid_parameters(self):
+        """存在しないパラメータが含まれる場合のテスト"""
+        # Given: GetParametersがparam_bを無効として返す
+        from ssm_utils import get_parameter_value, prefetch_parameters
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            mock_ssm_client.get_parameters.return_value = {
+                "Parameters": [{"Name": "param_a", "Value": "value_a"}],
+                "InvalidParameters": ["param_b"],
+            }
+
+            # When: まとめて取得した後に、再度まとめて取得して個別に参照する
+            prefetch_parameters(["param_a", "param_b"])
+            prefetch_parameters(["param_a", "param_b"])
+
+            # Then: 無効なパラメータは存在しないことをキャッシュし、SSMを再度呼び出さない
+            with pytest.raises(ParameterNotFoundError):
+                get_parameter_value("param_b")
+            mock_ssm_client.get_parameters.assert_called_once()
+            mock_ssm_client.get_parameter.assert_not_called()
+
+    def test_prefetch_parameters_error(self):
+        """GetParametersがエラーを返す場合のテスト"""
+        # Given: GetParametersがスロットリングを返す
+        from ssm_utils import get_parameter_value, prefetch_parameters
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            mock_ssm_client.get_parameters.side_effect = ClientError(
+                {"Error": {"Code": "ThrottlingException", "Message": "Rate"}},
+                "GetParameters",
+            )
+            mock_ssm_client.get_parameter.return_value = {
+                "Parameter": {"Value": "value_a"}
+            }
+
+            # When: まとめて取得した後に個別に参照する
+            prefetch_parameters(["param_a"])
+            result = get_parameter_value("param_a")
+
+            # Then: 例外は伝播せず、GetParameterで個別に取得する
+            assert result == "value_a"
+            mock_ssm_client.get_parameter.assert_called_once()
+
+
+class TestPrefetchParametersByPath:
+    """prefetch_parameters_by_path関数のテスト"""
+
+    def setup_method(self):
+        """各テストの前にパラメータ値のキャッシュを破棄する"""
+        from ssm_utils import invalidate_parameter_cache
+
+        invalidate_parameter_cache()
+
+    def test_prefetch_parameters_by_path_success(self):
+        """パス配下のパラメータを複数ページで取得する場合のテスト"""
+        # Given: 2ページに分かれたGetParametersByPathのレスポンス
+        from ssm_utils import get_parameter_value, prefetch_parameters_by_path
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            paginator = mock_ssm_client.get_paginator.return_value
+            paginator.paginate.return_value = [
+                {"Parameters": [{"Name": "/app/a", "Value": "value_a"}]},
+                {"Parameters": [{"Name": "/app/b", "Value": "value_b"}]},
+            ]
+
+            # When: パス配下をまとめて取得した後に個別に参照する
+            prefetch_parameters_by_path("/app/")
+            result = get_parameter_value("/app/b")
+
+            # Then: GetParameterは呼ばれない
+            assert result == "value_b"
+            paginator.paginate.assert_called_once_with(
+                Path="/app/", Recursive=True, WithDecryption=True
+            )
+            mock_ssm_client.get_parameter.assert_not_called()
+
+    def test_prefetch_parameters_by_path_error(self):
+        """GetParametersByPathがエラーを返す場合のテスト"""
+        # Given: GetParametersByPathがアクセス拒否を返す
+        from ssm_utils import prefetch_parameters_by_path
+
+        with patch("parameter_backends.get_client") as mock_get_client:
+            mock_ssm_client = mock_get_client.return_value
+            paginator = mock_ssm_client.get_paginator.return_value
+            paginator.paginate.side_effect = ClientError(
+                {"Error": {"Code": "AccessDeniedException", "Message": "Denied"}},
+                "GetParametersByPath",
+            )
+
+            # When/Then: 例外は伝播しない
+            prefetch_parameters_by_path("/app/")
@@ -0,0 +1,201 @@
+"""stage_metricsのユニットテスト"""
+
+import json
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+# pylint: disable=import-outside-toplevel,import-error,too-few-public-methods
+
+
+def _read_emf(capsys):
+    """標準出力に書き込まれたEMFが1行のみであることを確認して返す"""
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    return json.loads(lines[0])
+
+
+class TestTimedHandler:
+    """timed_handler関数・stage関数のテスト"""
+
+    @patch.dict(os.environ, {"AWS_LAMBDA_FUNCTION_NAME": "test-function"})
+    def test_timed_handler(self, capsys):
+        """ステージごとの所要時間を1行のEMFで出力するテスト"""
+        # Given: メインスレッドと別スレッドでステージを実行するハンドラー
+        from stage_metrics import stage, timed_handler
+
+        @timed_handler
+        def handler(_event, _context):
+            with stage("HMAC"):
+                pass
+
+            def publish():
+                with stage("SNS"):
+                    pass
+
+            thread = threading.Thread(target=publish)
+            thread.start()
+            thread.join()
+            publish()
+            return {"statusCode": 200}
+
+        # When: ハンドラーを呼び出す
+        response = handler({}, None)
+
+        # Then: 関数名・ハンドラー名をディメンションとし、ステージごとのメトリクスを出力する
+        assert response == {"statusCode": 200}
+        emf = _read_emf(capsys)
+        directive = emf["_aws"]["CloudWatchMetrics"][0]
+        assert directive["Dimensions"] == [["FunctionName", "Handler"]]
+        assert [metric["Name"] for metric in directive["Metrics"]] == [
+            "HandlerDuration",
+            "HandlerErrors",
+            "HMACDuration",
+            "HMACErrors",
+            "SNSDuration",
+            "SNSErrors",
+        ]
+        assert emf["FunctionName"] == "test-function"
+        assert emf["Handler"] == "handler"
+        assert emf["HandlerErrors"] == 0
+        assert emf["HMACDuration"] >= 0
+        assert emf["SNSErrors"] == 0
+        assert emf["StageCalls"] == {"HMAC": 1, "SNS": 2}
+
+    def test_timed_handler_failed(self, capsys):
+        """ステージ・ハンドラーが失敗した場合のテスト"""
+        # Given: YouTubeのステージで例外が送出されるハンドラー
+        from stage_metrics import stage, timed_handler
+
+        @timed_handler
+        def handler(_event, _context):
+            with stage("YouTube"):
+                raise ValueError("YouTube error")
+
+        # When/Then: 例外はそのまま送出され、失敗として出力する
+        with pytest.raises(ValueError, match="YouTube error"):
+            handler({}, None)
+        emf = _read_emf(capsys)
+        assert emf["HandlerErrors"] == 1
+        assert emf["YouTubeErrors"] == 1
+
+    @pytest.mark.parametrize(
+        "response, expected_errors",
+        [
+            ({"statusCode": 400}, 0),
+            ({"statusCode": 503}, 1),
+            ({"batchItemFailures": []}, 0),
+            ({"batchItemFailures": [{"itemIdentifier": "message-1"}]}, 1),
+        ],
+    )
+    def test_timed_handler_response(self, capsys, response, expected_errors):
+        """レスポンスが失敗を表すかどうかのテスト"""
+        from stage_metrics import timed_handler
+
+        # When: レスポンスを返すハンドラーを呼び出す
+        timed_handler(lambda _event, _context: response)({}, None)
+
+        # Then: 5xx・失敗したメッセージがある場合のみ失敗として出力する
+        assert _read_emf(capsys)["HandlerErrors"] == expected_errors
+
+    @patch.dict(os.environ, {"AWS_LAMBDA_FUNCTION_NAME": "test-function"})
+    def test_timed_handler_put_metric(self, capsys):
+        """呼び出し中のput_metricのメトリクスを同じ1行で出力するテスト"""
+        # Given: ディメンションを指定しないメトリクスを2回、指定するメトリクスを1回出力するハンドラー
+        from metrics_utils import put_metric
+        from stage_metrics import timed_handler
+
+        @timed_handler
+        def handler(_event, _context):
+            put_metric("YouTubeApiCallsSaved", 1)
+            put_metric("YouTubeApiCallsSaved", 1)
+            put_metric("NotificationSinkFailed", 1, dimensions={"Sink": "webhook"})
+            return {"statusCode": 200}
+
+        # When: ハンドラーを呼び出す
+        handler({}, None)
+
+        # Then: ディメンションを指定した行とステージの行のみを出力し、
+        # ディメンションを指定しないメトリクスは関数名のみのディメンションで値のリストとして出力する
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0])["Sink"] == "webhook"
+        emf = json.loads(lines[1])
+        assert emf["_aws"]["CloudWatchMetrics"][1] == {
+            "Namespace": "YTLiveMetaData",
+            "Dimensions": [["FunctionName"]],
+            "Metrics": [{"Name": "YouTubeApiCallsSaved", "Unit": "Count"}],
+        }
+        assert emf["YouTubeApiCallsSaved"] == [1, 1]
+        assert emf["FunctionName"] == "test-function"
+
+        # When: ハンドラーの終了後にメトリクスを出力する
+        put_metric("YouTubeApiCallsSaved", 1)
+
+        # Then: メトリクスごとに1行で出力する
+        assert json.loads(capsys.readouterr().out)["YouTubeApiCallsSaved"] == 1
+
+    def test_stage_outside_handler(self, capsys):
+        """ハンドラーの呼び出し中でない場合は記録しないテスト"""
+        from stage_metrics import stage
+
+        # When: ハンドラーの外でステージを実行する
+        with stage("Parse"):
+            pass
+
+        # Then: 何も出力しない
+        assert capsys.readouterr().out == ""
+
+    def test_timed_handler_disabled(self, capsys):
+        """メトリクスの出力が無効の場合のテスト"""
+        from stage_metrics import timed_handler
+
+        with patch("stage_metrics.STAGE_METRICS_ENABLED", False):
+            # When: ハンドラーを呼び出す
+            timed_handler(lambda _event, _context: {"statusCode": 200})({}, None)
+
+        # Then: 何も出力しない
+        assert capsys.readouterr().out == ""
+
+
+class TestInstrumentClient:
+    """instrument_client関数のテスト"""
+
+    @patch.dict(
+        os.environ,
+        {
+            "AWS_ACCESS_KEY_ID": "testing",
+            "AWS_SECRET_ACCESS_KEY": "testing",
+            "AWS_DEFAULT_REGION": "ap-northeast-1",
+        },
+    )
+    def test_instrument_client(self, capsys):
+        """boto3のAPI呼び出しをサービス名のステージとして記録するテスト"""
+        # Given: 1回目は成功し、2回目はエラーを返すSNSクライアント
+        import boto3
+        from botocore.stub import Stubber
+        from stage_metrics import instrument_client, timed_handler
+
+        client = instrument_client(boto3.client("sns"))
+        stubber = Stubber(client)
+        stubber.add_response("publish", {"MessageId": "message-1"})
+        stubber.add_client_error("publish", "InternalError", http_status_code=500)
+
+        @timed_handler
+        def handler(_event, _context):
+            client.publish(PhoneNumber="+818012345678", Message="message")
+            with pytest.raises(client.exceptions.ClientError):
+                client.publish(PhoneNumber="+818012345678", Message="message")
+            return {"statusCode": 200}
+
+        # When: ハンドラーを呼び出す
+        with stubber:
+            handler({}, None)
+
+        # Then: 2回の呼び出しと1回の失敗をSNSのステージとして出力する
+        emf = _read_emf(capsys)
+        assert emf["StageCalls"] == {"SNS": 2}
+        assert emf["SNSErrors"] == 1
+        assert emf["SNSDuration"] >= 0
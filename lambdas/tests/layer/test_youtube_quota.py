@@ -0,0 +1,219 @@
+"""youtube_quotaのユニットテスト"""
+
+from unittest.mock import patch
+
+import pytest
+
+# pylint: disable=import-outside-toplevel,import-error
+
+
+def _updated(units_used):
+    """UpdateItem(ReturnValues=UPDATED_NEW)のレスポンスを生成する"""
+    return {"Attributes": {"units_used": {"N": str(units_used)}}}
+
+
+class TestTokenBucket:
+    """TokenBucketクラスのテスト"""
+
+    def test_try_acquire(self):
+        """トークンの消費と補充のテスト"""
+        # Given: 1秒あたり2個、上限3個のトークンバケット
+        from youtube_quota import TokenBucket
+
+        with patch("youtube_quota.time.monotonic") as mock_monotonic:
+            mock_monotonic.return_value = 100.0
+            bucket = TokenBucket(rate_per_second=2, capacity=3)
+
+            # When: 上限まで消費し、0.5秒後に再度消費する
+            acquired = [bucket.try_acquire() for _ in range(4)]
+            mock_monotonic.return_value = 100.5
+            refilled = bucket.try_acquire()
+            exhausted = bucket.try_acquire()
+
+            # Then: 上限を超えると消費できず、経過時間に応じて補充される
+            assert acquired == [True, True, True, False]
+            assert refilled is True
+            assert exhausted is False
+
+    def test_try_acquire_capacity(self):
+        """補充するトークンが上限を超えないテスト"""
+        # Given: 1秒あたり1個、上限2個のトークンバケット
+        from youtube_quota import TokenBucket
+
+        with patch("youtube_quota.time.monotonic") as mock_monotonic:
+            mock_monotonic.return_value = 100.0
+            bucket = TokenBucket(rate_per_second=1, capacity=2)
+
+            # When: 十分な時間が経過した後に消費する
+            mock_monotonic.return_value = 1000.0
+            acquired = [bucket.try_acquire() for _ in range(3)]
+
+            # Then: 上限の2個のみ消費できる
+            assert acquired == [True, True, False]
+
+
+class TestQuotaTracker:
+    """QuotaTrackerクラスのテスト"""
+
+    def _create(self, **kwargs):
+        """テスト用のQuotaTrackerを生成する"""
+        from youtube_quota import QuotaTracker
+
+        params = {
+            "table_name": "test-table",
+            "daily_units": 100,
+            "reserve_units": 10,
+            "sync_units": 5,
+            "sync_interval_seconds": 60,
+        }
+        params.update(kwargs)
+        return QuotaTracker(**params)
+
+    def test_acquire_batches_sync(self):
+        """コンテナ内の消費量をまとめて反映するテスト"""
+        # Given: 5ユニットごとに反映する
+        with patch("youtube_quota.get_client") as mock_get_client:
+            mock_update_item = mock_get_client.return_value.update_item
+            mock_update_item.return_value = _updated(12)
+            tracker = self._create()
+
+            with patch("youtube_quota.put_metric") as mock_put_metric:
+                # When: 5ユニット消費する
+                for _ in range(4):
+                    tracker.acquire()
+                calls_before_sync = mock_update_item.call_count
+                tracker.acquire()
+
+                # Then: 5ユニット目で条件なしに加算し、全コンテナの消費量を取得する
+                assert calls_before_sync == 0
+                mock_update_item.assert_called_once()
+                kwargs = mock_update_item.call_args[1]
+                assert kwargs["TableName"] == "test-table"
+                assert kwargs["Key"]["video_id"]["S"].startswith("quota#")
+                assert kwargs["UpdateExpression"] == (
+                    "ADD units_used :units SET #ttl = :ttl"
+                )
+                assert kwargs["ExpressionAttributeValues"][":units"] == {"N": "5"}
+                assert "ConditionExpression" not in kwargs
+                assert tracker.shared_units == 12
+                assert tracker.pending_units == 0
+                mock_put_metric.assert_called_once_with("YouTubeQuotaUsed", 12)
+
+    def test_acquire_sync_interval(self):
+        """一定時間ごとに反映するテスト"""
+        # Given: 60秒ごとに反映する
+        with patch("youtube_quota.get_client") as mock_get_client:
+            mock_update_item = mock_get_client.return_value.update_item
+            mock_update_item.return_value = _updated(1)
+            with patch("youtube_quota.time.monotonic") as mock_monotonic:
+                mock_monotonic.return_value = 100.0
+                tracker = self._create()
+
+                # When: 60秒後に1ユニット消費する
+                mock_monotonic.return_value = 160.0
+                with patch("youtube_quota.put_metric"):
+                    tracker.acquire()
+
+                # Then: 消費量が少なくても反映する
+                mock_update_item.assert_called_once()
+
+    def test_acquire_strict_near_budget(self):
+        """残りが予約分を下回る場合に条件付きで反映するテスト"""
+        # Given: 全コンテナの消費量が予約分の直前(90ユニット)
+        with patch("youtube_quota.get_client") as mock_get_client:
+            mock_update_item = mock_get_client.return_value.update_item
+            mock_update_item.return_value = _updated(91)
+            tracker = self._create()
+            tracker.shared_units = 90
+
+            # When: 1ユニット消費する
+            with patch("youtube_quota.put_metric"):
+                tracker.acquire()
+
+            # Then: 予算を超えないように条件付きで反映する
+            kwargs = mock_update_item.call_args[1]
+            assert kwargs["ConditionExpression"] == (
+                "attribute_not_exists(units_used) OR units_used <= :max_units_used"
+            )
+            assert kwargs["ExpressionAttributeValues"][":max_units_used"] == {"N": "99"}
+
+    def test_acquire_strict_conditional_check_failed(self):
+        """他のコンテナの消費により予算を使い切っている場合のテスト"""
+        # Given: 条件付きの反映が条件を満たさない
+        from youtube_quota import QuotaExceededError
+
+        error = Exception("conditional check failed")
+        error.response = {"Error": {"Code": "ConditionalCheckFailedException"}}
+        with patch("youtube_quota.get_client") as mock_get_client:
+            mock_update_item = mock_get_client.return_value.update_item
+            mock_update_item.side_effect = error
+            tracker = self._create()
+            tracker.shared_units = 95
+
+            # When/Then: QuotaExceededErrorが送出され、以降はDynamoDBを参照せずに拒否する
+            with pytest.raises(QuotaExceededError):
+                tracker.acquire()
+            with pytest.raises(QuotaExceededError):
+                tracker.acquire()
+            assert mock_update_item.call_count == 1
+
+    def test_acquire_low_priority(self):
+        """優先度の低い呼び出しは予約分を使用しないテスト"""
+        # Given: 全コンテナの消費量が予約分に達している(90ユニット)
+        from youtube_quota import QuotaExceededError
+
+        with patch("youtube_quota.get_client") as mock_get_client:
+            mock_get_client.return_value.update_item.return_value = _updated(91)
+            tracker = self._create()
+            tracker.shared_units = 90
+
+            # When/Then: 優先度の低い呼び出しのみ拒否される
+            with pytest.raises(QuotaExceededError):
+                tracker.acquire(low_priority=True)
+            with patch("youtube_quota.put_metric"):
+                tracker.acquire()
+
+    def test_acquire_sync_failure(self):
+        """DynamoDBへの反映に失敗した場合のテスト"""
+        # Given: UpdateItemが失敗する
+        with patch("youtube_quota.get_client") as mock_get_client:
+            mock_update_item = mock_get_client.return_value.update_item
+            mock_update_item.side_effect = Exception("error")
+            tracker = self._create(sync_units=1)
+
+            # When: 1ユニット消費する
+            tracker.acquire()
+
+            # Then: 呼び出しを許可し、次回の反映時に再度反映する
+            assert tracker.pending_units == 1
+
+    def test_acquire_rate_limited(self):
+        """呼び出し頻度の上限を超えた場合のテスト"""
+        # Given: 上限1個のトークンバケット
+        from youtube_quota import RateLimitedError, TokenBucket
+
+        tracker = self._create(
+            daily_units=0, bucket=TokenBucket(rate_per_second=0, capacity=1)
+        )
+
+        # When/Then: 2回目の呼び出しでRateLimitedErrorが送出される
+        tracker.acquire()
+        with pytest.raises(RateLimitedError):
+            tracker.acquire()
+
+    def test_acquire_day_rollover(self):
+        """日付が変わった場合に消費量をリセットするテスト"""
+        # Given: 前日に予算を使い切っている
+        with patch("youtube_quota._quota_day") as mock_quota_day:
+            mock_quota_day.return_value = "2024-01-01"
+            tracker = self._create()
+            tracker.shared_units = 100
+
+            # When: 日付が変わった後に消費する
+            mock_quota_day.return_value = "2024-01-02"
+            tracker.acquire()
+
+            # Then: 当日の消費量として記録される
+            assert tracker.day == "2024-01-02"
+            assert tracker.shared_units == 0
+            assert tracker.pending_units == 1
@@ -2,12 +2,13 @@
 
 import hashlib
 import hmac
+import json
 import os
-from unittest.mock import Mock, patch
+from unittest.mock import DEFAULT, Mock, call, patch
 
 import pytest
 
-# pylint: disable=import-outside-toplevel,too-few-public-methods
+# pylint: disable=import-outside-toplevel,too-few-public-methods,too-many-lines
 
 
 @patch.dict(
@@ -16,6 +17,44 @@ import pytest
         "DYNAMODB_TABLE": "test-dynamodb-table",
         "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
         "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
+        "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
+    },
+)
+class TestGetRawBody:
+    """get_raw_body関数のテスト"""
+
+    def test_get_raw_body_text(self):
+        """テキストの本文を取得するテスト"""
+        # Given/When/Then: UTF-8のバイト列が返る
+        from lambdas.post_notify.app import get_raw_body
+
+        assert get_raw_body({"body": "テスト"}) == "テスト".encode("utf-8")
+
+    def test_get_raw_body_base64(self):
+        """Base64エンコードされた本文を取得するテスト"""
+        # Given/When/Then: デコードしたバイト列が返る
+        from lambdas.post_notify.app import get_raw_body
+
+        assert get_raw_body({"body": "PGZlZWQvPg==", "isBase64Encoded": True}) == (
+            b"<feed/>"
+        )
+
+    def test_get_raw_body_none(self):
+        """本文がない場合のテスト"""
+        # Given/When/Then: 空のバイト列が返る
+        from lambdas.post_notify.app import get_raw_body
+
+        assert get_raw_body({"body": None}) == b""
+
+
+@patch.dict(
+    os.environ,
+    {
+        "DYNAMODB_TABLE": "test-dynamodb-table",
+        "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
+        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
         "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
     },
 )
@@ -36,8 +75,10 @@ class TestVerifyHmacSignature:
         """サポートされていない署名メソッドの場合のテスト"""
         from lambdas.post_notify.app import verify_hmac_signature
 
-        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
-            mock_get_param.return_value = "test_secret"
+        with patch(
+            "lambdas.post_notify.app.get_current_hmac_secret"
+        ) as mock_get_current:
+            mock_get_current.return_value = "test_secret"
 
             event = {
                 "headers": {"X-Hub-Signature": "md5=test_signature"},
@@ -47,22 +88,29 @@ class TestVerifyHmacSignature:
             result = verify_hmac_signature(event)
 
             assert result == "Unsupported signature method: md5"
+            mock_get_current.assert_not_called()
 
     def test_verify_hmac_signature_verification_failed(self):
         """HMAC署名検証が失敗した場合のテスト"""
         from lambdas.post_notify.app import verify_hmac_signature
 
-        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
-            mock_get_param.return_value = "test_secret"
+        with patch(
+            "lambdas.post_notify.app.get_current_hmac_secret"
+        ) as mock_get_current:
+            mock_get_current.return_value = "test_secret"
+            with patch(
+                "lambdas.post_notify.app.get_previous_hmac_secret"
+            ) as mock_get_previous:
+                mock_get_previous.return_value = None
 
-            event = {
-                "headers": {"X-Hub-Signature": "sha1=invalid_signature"},
-                "body": "test_body",
-            }
+                event = {
+                    "headers": {"X-Hub-Signature": "sha1=invalid_signature"},
+                    "body": "test_body",
+                }
 
-            result = verify_hmac_signature(event)
+                result = verify_hmac_signature(event)
 
-            assert result == "HMAC signature verification failed"
+                assert result == "HMAC signature verification failed"
 
     def test_verify_hmac_signature_success(self):
         """HMAC署名検証が成功した場合のテスト"""
@@ -74,17 +122,23 @@ class TestVerifyHmacSignature:
             test_secret.encode("utf-8"), test_body.encode("utf-8"), hashlib.sha1
         ).hexdigest()
 
-        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
-            mock_get_param.return_value = test_secret
-
-            event = {
-                "headers": {"X-Hub-Signature": f"sha1={expected_signature}"},
-                "body": test_body,
-            }
+        with patch(
+            "lambdas.post_notify.app.get_current_hmac_secret"
+        ) as mock_get_current:
+            mock_get_current.return_value = test_secret
+            with patch(
+                "lambdas.post_notify.app.get_previous_hmac_secret"
+            ) as mock_get_previous:
+                event = {
+                    "headers": {"X-Hub-Signature": f"sha1={expected_signature}"},
+                    "body": test_body,
+                }
 
-            result = verify_hmac_signature(event)
+                result = verify_hmac_signature(event)
 
-            assert result is None
+                assert result is None
+                # 現在のHMACシークレットで検証できた場合は旧シークレットを取得しない
+                mock_get_previous.assert_not_called()
 
     def test_verify_hmac_signature_case_insensitive_header(self):
         """ヘッダー名が大文字小文字を区別しない場合のテスト"""
@@ -96,8 +150,10 @@ class TestVerifyHmacSignature:
             test_secret.encode("utf-8"), test_body.encode("utf-8"), hashlib.sha256
         ).hexdigest()
 
-        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
-            mock_get_param.return_value = test_secret
+        with patch(
+            "lambdas.post_notify.app.get_current_hmac_secret"
+        ) as mock_get_current:
+            mock_get_current.return_value = test_secret
 
             event = {
                 "headers": {"x-hub-signature": f"sha256={expected_signature}"},
@@ -108,6 +164,136 @@ class TestVerifyHmacSignature:
 
             assert result is None
 
+    def test_verify_hmac_signature_previous_secret(self):
+        """ローテーション前のHMACシークレットで署名されている場合のテスト"""
+        # Given: Hubがローテーション前のHMACシークレットで署名している
+        from lambdas.post_notify.app import verify_hmac_signature
+
+        expected_signature = hmac.new(
+            b"previous_secret", b"test_body", hashlib.sha1
+        ).hexdigest()
+
+        with patch(
+            "lambdas.post_notify.app.get_current_hmac_secret"
+        ) as mock_get_current:
+            mock_get_current.return_value = "current_secret"
+            with patch(
+                "lambdas.post_notify.app.get_previous_hmac_secret"
+            ) as mock_get_previous:
+                mock_get_previous.return_value = "previous_secret"
+                event = {
+                    "headers": {"X-Hub-Signature": f"sha1={expected_signature}"},
+                    "body": "test_body",
+                }
+
+                # When: 署名を検証する
+                result = verify_hmac_signature(event)
+
+                # Then: ローテーション前のHMACシークレットで検証に成功する
+                assert result is None
+                mock_get_previous.assert_called_once_with(
+                    "test-hmac-previous-secret-param", None
+                )
+
+    def test_verify_hmac_signature_refreshes_rotated_secret(self):
+        """キャッシュ済のHMACシークレットがローテーション前のものである場合のテスト"""
+        # Given: キャッシュは古いHMACシークレットで、Hubは新しいHMACシークレットで署名している
+        from lambdas.post_notify.app import verify_hmac_signature
+
+        expected_signature = hmac.new(
+            b"new_secret", b"test_body", hashlib.sha1
+        ).hexdigest()
+
+        with patch(
+            "lambdas.post_notify.app.get_current_hmac_secret"
+        ) as mock_get_current:
+            mock_get_current.side_effect = ["old_secret", "new_secret"]
+            with patch(
+                "lambdas.post_notify.app.get_previous_hmac_secret"
+            ) as mock_get_previous:
+                mock_get_previous.return_value = None
+                event = {
+                    "headers": {"X-Hub-Signature": f"sha1={expected_signature}"},
+                    "body": "test_body",
+                }
+
+                # When: 署名を検証する
+                result = verify_hmac_signature(event)
+
+                # Then: 再取得間隔を指定して再取得したHMACシークレットで検証に成功する
+                assert result is None
+                assert [c[0] for c in mock_get_current.call_args_list] == [
+                    ("test-hmac-secret-param", None),
+                    ("test-hmac-secret-param", 30),
+                ]
+
+    def test_verify_hmac_signature_no_secret(self):
+        """HMACシークレットが存在しない場合のテスト"""
+        # Given: 現在・ローテーション前のHMACシークレットがいずれも存在しない
+        from lambdas.post_notify.app import verify_hmac_signature
+
+        with patch(
+            "lambdas.post_notify.app.get_current_hmac_secret"
+        ) as mock_get_current:
+            mock_get_current.return_value = None
+            with patch(
+                "lambdas.post_notify.app.get_previous_hmac_secret"
+            ) as mock_get_previous:
+                mock_get_previous.return_value = None
+                event = {
+                    "headers": {"X-Hub-Signature": "sha1=any_signature"},
+                    "body": "test_body",
+                }
+
+                # When: 署名を検証する
+                result = verify_hmac_signature(event)
+
+                # Then: 検証に失敗する
+                assert result == "HMAC signature verification failed"
+
+
+@patch.dict(
+    os.environ,
+    {
+        "DYNAMODB_TABLE": "test-dynamodb-table",
+        "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
+        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
+        "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
+    },
+)
+class TestGetKeyedHmac:
+    """get_keyed_hmac関数のテスト"""
+
+    def test_get_keyed_hmac_cached(self):
+        """同じHMACシークレットとアルゴリズムで再取得する場合のテスト"""
+        # Given: 取得済のHMACオブジェクト
+        from lambdas.post_notify.app import get_keyed_hmac
+
+        first = get_keyed_hmac("cached_secret", "sha256")
+
+        # When: 同じHMACシークレットとアルゴリズムで再取得する
+        second = get_keyed_hmac("cached_secret", "sha256")
+
+        # Then: 同じHMACオブジェクトが返る
+        assert first is second
+
+    def test_get_keyed_hmac_digest(self):
+        """取得したHMACオブジェクトで計算したHMACのテスト"""
+        # Given: HMACオブジェクト
+        from lambdas.post_notify.app import get_keyed_hmac
+
+        mac = get_keyed_hmac("digest_secret", "sha512").copy()
+
+        # When: メッセージを入力する
+        mac.update(b"test_body")
+
+        # Then: hmac.newで計算した値と一致する
+        assert (
+            mac.hexdigest()
+            == hmac.new(b"digest_secret", b"test_body", hashlib.sha512).hexdigest()
+        )
+
 
 @patch.dict(
     os.environ,
@@ -115,6 +301,7 @@ class TestVerifyHmacSignature:
         "DYNAMODB_TABLE": "test-dynamodb-table",
         "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
         "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
         "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
     },
 )
@@ -125,7 +312,7 @@ class TestParseWebsubXml:
         """XMLの解析が成功した場合のテスト"""
         from lambdas.post_notify.app import parse_websub_xml
 
-        xml_content = """<?xml version="1.0" encoding="UTF-8"?>
+        xml_content = b"""<?xml version="1.0" encoding="UTF-8"?>
         <feed xmlns="http://www.w3.org/2005/Atom"
               xmlns:yt="http://www.youtube.com/xml/schemas/2015">
             <entry>
@@ -141,13 +328,72 @@ class TestParseWebsubXml:
             "title": "Test Video Title",
             "url": "https://www.youtube.com/watch?v=test_video_id",
         }
-        assert result == expected
+        assert result == ([expected], [])
+
+    def test_parse_websub_xml_multiple_entries(self):
+        """複数のentryを含むXMLの解析テスト"""
+        # Given: 3つのentryのうち、2つのビデオIDが重複するXML
+        from lambdas.post_notify.app import parse_websub_xml
+
+        xml_content = b"""<?xml version="1.0" encoding="UTF-8"?>
+        <feed xmlns="http://www.w3.org/2005/Atom"
+              xmlns:yt="http://www.youtube.com/xml/schemas/2015">
+            <entry>
+                <yt:videoId>video_a</yt:videoId>
+                <title>Title A</title>
+            </entry>
+            <entry>
+                <yt:videoId>video_b</yt:videoId>
+                <title>Title B</title>
+            </entry>
+            <entry>
+                <yt:videoId>video_a</yt:videoId>
+                <title>Title A (old)</title>
+            </entry>
+        </feed>"""
+
+        # When: 解析する
+        result = parse_websub_xml(xml_content)
+
+        # Then: ビデオIDごとに最初のentryが返る
+        assert result[0] == [
+            {
+                "video_id": "video_a",
+                "title": "Title A",
+                "url": "https://www.youtube.com/watch?v=video_a",
+            },
+            {
+                "video_id": "video_b",
+                "title": "Title B",
+                "url": "https://www.youtube.com/watch?v=video_b",
+            },
+        ]
+
+    def test_parse_websub_xml_deleted_entry(self):
+        """削除・非公開にされた動画の通知の解析テスト"""
+        # Given: at:deleted-entryのみを含むXML
+        from lambdas.post_notify.app import parse_websub_xml
+
+        xml_content = b"""<?xml version="1.0" encoding="UTF-8"?>
+        <feed xmlns:at="http://purl.org/atompub/tombstones/1.0"
+              xmlns="http://www.w3.org/2005/Atom">
+            <at:deleted-entry ref="yt:video:test_video_id"
+                              when="2025-01-01T00:00:00+00:00">
+                <link href="https://www.youtube.com/watch?v=test_video_id"/>
+            </at:deleted-entry>
+        </feed>"""
+
+        # When: 解析する
+        result = parse_websub_xml(xml_content)
+
+        # Then: entryはなく、削除されたビデオIDが返る
+        assert result == ([], ["test_video_id"])
 
     def test_parse_websub_xml_no_entry(self):
         """XMLにentryが存在しない場合のテスト"""
         from lambdas.post_notify.app import parse_websub_xml
 
-        xml_content = """<?xml version="1.0" encoding="UTF-8"?>
+        xml_content = b"""<?xml version="1.0" encoding="UTF-8"?>
         <feed xmlns="http://www.w3.org/2005/Atom"
               xmlns:yt="http://www.youtube.com/xml/schemas/2015">
         </feed>"""
@@ -159,7 +405,7 @@ class TestParseWebsubXml:
         """XMLにvideoIdが存在しない場合のテスト"""
         from lambdas.post_notify.app import parse_websub_xml
 
-        xml_content = """<?xml version="1.0" encoding="UTF-8"?>
+        xml_content = b"""<?xml version="1.0" encoding="UTF-8"?>
         <feed xmlns="http://www.w3.org/2005/Atom"
               xmlns:yt="http://www.youtube.com/xml/schemas/2015">
             <entry>
@@ -174,7 +420,7 @@ class TestParseWebsubXml:
         """XMLにtitleが存在しない場合のテスト"""
         from lambdas.post_notify.app import parse_websub_xml
 
-        xml_content = """<?xml version="1.0" encoding="UTF-8"?>
+        xml_content = b"""<?xml version="1.0" encoding="UTF-8"?>
         <feed xmlns="http://www.w3.org/2005/Atom"
               xmlns:yt="http://www.youtube.com/xml/schemas/2015">
             <entry>
@@ -185,6 +431,86 @@ class TestParseWebsubXml:
         with pytest.raises(ValueError, match="No title found in XML"):
             parse_websub_xml(xml_content)
 
+    def test_parse_websub_xml_channel_id(self):
+        """entryにチャンネルIDが含まれる場合のテスト"""
+        # Given: yt:channelIdを含むXML
+        from lambdas.post_notify.app import parse_websub_xml
+
+        xml_content = b"""<?xml version="1.0" encoding="UTF-8"?>
+        <feed xmlns="http://www.w3.org/2005/Atom"
+              xmlns:yt="http://www.youtube.com/xml/schemas/2015">
+            <entry>
+                <yt:videoId>test_video_id</yt:videoId>
+                <yt:channelId>test_channel_id</yt:channelId>
+                <title>Test Video Title</title>
+            </entry>
+        </feed>"""
+
+        # When: 解析する
+        result = parse_websub_xml(xml_content)
+
+        # Then: チャンネルIDを含む解析結果が返る
+        assert result[0] == [
+            {
+                "video_id": "test_video_id",
+                "title": "Test Video Title",
+                "url": "https://www.youtube.com/watch?v=test_video_id",
+                "channel_id": "test_channel_id",
+            }
+        ]
+
+
+@patch.dict(
+    os.environ,
+    {
+        "DYNAMODB_TABLE": "test-dynamodb-table",
+        "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
+        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
+        "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
+    },
+)
+class TestFilterMonitoredChannels:
+    """filter_monitored_channels関数のテスト"""
+
+    VIDEO_DATA_LIST = [
+        {"video_id": "video_a", "channel_id": "channel_a"},
+        {"video_id": "video_b", "channel_id": "channel_b"},
+        {"video_id": "video_c", "channel_id": "channel_c"},
+        {"video_id": "video_d"},
+    ]
+
+    def test_filter_monitored_channels_parameter(self):
+        """単一チャンネルの構成の場合のテスト"""
+        # Given: parameterバックエンド
+        from lambdas.post_notify.app import filter_monitored_channels
+
+        with patch("lambdas.post_notify.app.get_channel_registry") as mock_registry:
+            # When: 除外する
+            result = filter_monitored_channels(self.VIDEO_DATA_LIST)
+
+            # Then: レジストリを参照せずにすべて返る
+            assert result == self.VIDEO_DATA_LIST
+            mock_registry.assert_not_called()
+
+    @patch("lambdas.post_notify.app.CHANNEL_REGISTRY_BACKEND", "dynamodb")
+    def test_filter_monitored_channels_registry(self):
+        """レジストリで監視するチャンネルのみ返すテスト"""
+        # Given: channel_aは監視する、channel_bは監視しない、channel_cは未登録
+        from channel_registry import Channel, LocalChannelRegistry
+        from lambdas.post_notify.app import filter_monitored_channels
+
+        with patch("lambdas.post_notify.app.get_channel_registry") as mock_registry:
+            mock_registry.return_value = LocalChannelRegistry(
+                [Channel("channel_a"), Channel("channel_b", enabled=False)]
+            )
+
+            # When: 除外する
+            result = filter_monitored_channels(self.VIDEO_DATA_LIST)
+
+            # Then: 監視するチャンネルの動画のみ返り、チャンネルIDがない動画は除外される
+            assert result == [{"video_id": "video_a", "channel_id": "channel_a"}]
+
 
 @patch.dict(
     os.environ,
@@ -192,12 +518,21 @@ class TestParseWebsubXml:
         "DYNAMODB_TABLE": "test-dynamodb-table",
         "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
         "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
         "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
     },
 )
+@patch("lambdas.post_notify.app._youtube_quota", Mock())
 class TestCheckIfLiveStreaming:
     """check_if_live_streaming関数のテスト"""
 
+    def setup_method(self):
+        """ライブ配信判定の結果・videos.listのレスポンスのキャッシュを破棄する"""
+        from lambdas.post_notify.app import _video_status_cache, _videos_etag_cache
+
+        _video_status_cache.clear()
+        _videos_etag_cache.clear()
+
     def test_check_if_live_streaming_live_stream_with_thumbnail(self):
         """ライブ配信中でサムネイルがある場合のテスト"""
         from lambdas.post_notify.app import check_if_live_streaming
@@ -206,6 +541,7 @@ class TestCheckIfLiveStreaming:
         mock_response.json.return_value = {
             "items": [
                 {
+                    "id": "test_video_id",
                     "snippet": {
                         "liveBroadcastContent": "live",
                         "thumbnails": {
@@ -213,7 +549,7 @@ class TestCheckIfLiveStreaming:
                             "medium": {"url": "https://example.com/medium.jpg"},
                             "default": {"url": "https://example.com/default.jpg"},
                         },
-                    }
+                    },
                 }
             ]
         }
@@ -221,12 +557,12 @@ class TestCheckIfLiveStreaming:
 
         with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
             mock_get_param.return_value = "test_api_key"
-            with patch("lambdas.post_notify.app.requests.get") as mock_get:
+            with patch("lambdas.post_notify.app.http_get") as mock_get:
                 mock_get.return_value = mock_response
 
-                result = check_if_live_streaming("test_video_id")
+                result = check_if_live_streaming(["test_video_id"])
 
-                assert result == "https://example.com/high.jpg"
+                assert result == {"test_video_id": "https://example.com/high.jpg"}
 
     def test_check_if_live_streaming_live_stream_without_thumbnail(self):
         """ライブ配信中でサムネイルがない場合のテスト"""
@@ -234,18 +570,20 @@ class TestCheckIfLiveStreaming:
 
         mock_response = Mock()
         mock_response.json.return_value = {
-            "items": [{"snippet": {"liveBroadcastContent": "live"}}]
+            "items": [
+                {"id": "test_video_id", "snippet": {"liveBroadcastContent": "live"}}
+            ]
         }
         mock_response.raise_for_status.return_value = None
 
         with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
             mock_get_param.return_value = "test_api_key"
-            with patch("lambdas.post_notify.app.requests.get") as mock_get:
+            with patch("lambdas.post_notify.app.http_get") as mock_get:
                 mock_get.return_value = mock_response
 
-                result = check_if_live_streaming("test_video_id")
+                result = check_if_live_streaming(["test_video_id"])
 
-                assert result == ""
+                assert result == {"test_video_id": ""}
 
     def test_check_if_live_streaming_not_live(self):
         """ライブ配信中でない場合のテスト"""
@@ -253,18 +591,20 @@ class TestCheckIfLiveStreaming:
 
         mock_response = Mock()
         mock_response.json.return_value = {
-            "items": [{"snippet": {"liveBroadcastContent": "none"}}]
+            "items": [
+                {"id": "test_video_id", "snippet": {"liveBroadcastContent": "none"}}
+            ]
         }
         mock_response.raise_for_status.return_value = None
 
         with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
             mock_get_param.return_value = "test_api_key"
-            with patch("lambdas.post_notify.app.requests.get") as mock_get:
+            with patch("lambdas.post_notify.app.http_get") as mock_get:
                 mock_get.return_value = mock_response
 
-                result = check_if_live_streaming("test_video_id")
+                result = check_if_live_streaming(["test_video_id"])
 
-                assert result is None
+                assert result == {"test_video_id": None}
 
     def test_check_if_live_streaming_video_not_found(self):
         """動画が見つからない場合のテスト"""
@@ -276,152 +616,1302 @@ class TestCheckIfLiveStreaming:
 
         with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
             mock_get_param.return_value = "test_api_key"
-            with patch("lambdas.post_notify.app.requests.get") as mock_get:
+            with patch("lambdas.post_notify.app.http_get") as mock_get:
                 mock_get.return_value = mock_response
 
                 with pytest.raises(ValueError, match="Video not found"):
-                    check_if_live_streaming("test_video_id")
+                    check_if_live_streaming(["test_video_id"])
 
     def test_check_if_live_streaming_snippet_not_found(self):
         """snippetが見つからない場合のテスト"""
         from lambdas.post_notify.app import check_if_live_streaming
 
         mock_response = Mock()
-        mock_response.json.return_value = {"items": [{}]}
+        mock_response.json.return_value = {"items": [{"id": "test_video_id"}]}
         mock_response.raise_for_status.return_value = None
 
         with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
             mock_get_param.return_value = "test_api_key"
-            with patch("lambdas.post_notify.app.requests.get") as mock_get:
+            with patch("lambdas.post_notify.app.http_get") as mock_get:
                 mock_get.return_value = mock_response
 
                 with pytest.raises(ValueError, match="snippet not found"):
-                    check_if_live_streaming("test_video_id")
+                    check_if_live_streaming(["test_video_id"])
 
     def test_check_if_live_streaming_live_broadcast_content_not_found(self):
         """liveBroadcastContentが見つからない場合のテスト"""
         from lambdas.post_notify.app import check_if_live_streaming
 
         mock_response = Mock()
-        mock_response.json.return_value = {"items": [{"snippet": {}}]}
+        mock_response.json.return_value = {
+            "items": [{"id": "test_video_id", "snippet": {}}]
+        }
         mock_response.raise_for_status.return_value = None
 
         with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
             mock_get_param.return_value = "test_api_key"
-            with patch("lambdas.post_notify.app.requests.get") as mock_get:
+            with patch("lambdas.post_notify.app.http_get") as mock_get:
                 mock_get.return_value = mock_response
 
                 with pytest.raises(ValueError, match="liveBroadcastContent not found"):
-                    check_if_live_streaming("test_video_id")
+                    check_if_live_streaming(["test_video_id"])
 
+    def test_check_if_live_streaming_batch(self):
+        """複数のビデオIDをまとめて判定するテスト"""
+        # Given: 60件のビデオIDのうち、video_0のみライブ配信中で、video_59は存在しない
+        from lambdas.post_notify.app import check_if_live_streaming
 
-@patch.dict(
-    os.environ,
-    {
-        "DYNAMODB_TABLE": "test-dynamodb-table",
-        "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
-        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
-        "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
-    },
-)
-class TestCheckIfNotified:
-    """check_if_notified関数のテスト"""
+        video_ids = [f"video_{i}" for i in range(60)]
+        first_response = Mock()
+        first_response.json.return_value = {
+            "items": [
+                {
+                    "id": video_id,
+                    "snippet": {
+                        "liveBroadcastContent": (
+                            "live" if video_id == "video_0" else "none"
+                        )
+                    },
+                }
+                for video_id in video_ids[:50]
+            ]
+        }
+        second_response = Mock()
+        second_response.json.return_value = {
+            "items": [
+                {"id": video_id, "snippet": {"liveBroadcastContent": "none"}}
+                for video_id in video_ids[50:59]
+            ]
+        }
 
-    def test_check_if_notified_not_notified(self):
-        """通知されていない場合のテスト"""
-        from lambdas.post_notify.app import check_if_notified
+        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "test_api_key"
+            with patch("lambdas.post_notify.app.http_get") as mock_get:
+                mock_get.side_effect = [first_response, second_response]
 
-        with patch("lambdas.post_notify.app.dynamodb_client") as mock_dynamodb_client:
-            mock_dynamodb_client.get_item.return_value = {}
+                # When: まとめて判定する
+                result = check_if_live_streaming(video_ids)
 
-            result = check_if_notified("test_video_id")
+                # Then: 50件ずつ2回のvideos.listで判定し、存在しない動画はNoneとなる
+                assert mock_get.call_count == 2
+                assert mock_get.call_args_list[0][1]["params"]["id"] == ",".join(
+                    video_ids[:50]
+                )
+                assert mock_get.call_args_list[1][1]["params"]["id"] == ",".join(
+                    video_ids[50:]
+                )
+                assert result["video_0"] == ""
+                assert result["video_1"] is None
+                assert result["video_59"] is None
+                assert len(result) == 60
+
+    def test_check_if_live_streaming_upcoming(self):
+        """ライブ配信予定の動画の開始予定日時を取得するテスト"""
+        # Given: ライブ配信予定の動画と、開始予定日時のない動画
+        from lambdas.post_notify.app import check_if_live_streaming
 
-            assert result is False
-            mock_dynamodb_client.get_item.assert_called_once_with(
-                TableName="test-dynamodb-table",
-                Key={"video_id": {"S": "test_video_id"}},
-                ConsistentRead=True,
-            )
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "items": [
+                {
+                    "id": "video_a",
+                    "snippet": {"liveBroadcastContent": "upcoming"},
+                    "liveStreamingDetails": {
+                        "scheduledStartTime": "2009-02-13T23:31:30Z"
+                    },
+                },
+                {"id": "video_b", "snippet": {"liveBroadcastContent": "upcoming"}},
+            ]
+        }
 
-    def test_check_if_notified_already_notified(self):
-        """すでに通知済みの場合のテスト"""
-        from lambdas.post_notify.app import check_if_notified
+        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "test_api_key"
+            with patch("lambdas.post_notify.app.http_get") as mock_get:
+                mock_get.return_value = mock_response
 
-        with patch("lambdas.post_notify.app.dynamodb_client") as mock_dynamodb_client:
-            mock_dynamodb_client.get_item.return_value = {
-                "Item": {"is_notified": {"BOOL": True}}
-            }
+                # When: 開始予定日時の格納先を指定して判定する
+                scheduled_start_times = {}
+                result = check_if_live_streaming(
+                    ["video_a", "video_b"], scheduled_start_times=scheduled_start_times
+                )
 
-            result = check_if_notified("test_video_id")
+                # Then: liveStreamingDetailsも取得し、開始予定日時を格納する
+                assert result == {"video_a": None, "video_b": None}
+                assert scheduled_start_times == {"video_a": 1234567890}
+                assert (
+                    mock_get.call_args[1]["params"]["part"]
+                    == "snippet,liveStreamingDetails"
+                )
 
-            assert result is True
-            mock_dynamodb_client.get_item.assert_called_once_with(
-                TableName="test-dynamodb-table",
-                Key={"video_id": {"S": "test_video_id"}},
-                ConsistentRead=True,
-            )
+    def test_check_if_live_streaming_without_scheduled_start_times(self):
+        """開始予定日時の格納先を指定しない場合のテスト"""
+        # Given: ライブ配信予定の動画
+        from lambdas.post_notify.app import check_if_live_streaming
 
-    def test_check_if_notified_is_notified_false(self):
-        """is_notifiedがFalseの場合のテスト"""
-        from lambdas.post_notify.app import check_if_notified
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "items": [
+                {"id": "video_a", "snippet": {"liveBroadcastContent": "upcoming"}}
+            ]
+        }
 
-        with patch("lambdas.post_notify.app.dynamodb_client") as mock_dynamodb_client:
-            mock_dynamodb_client.get_item.return_value = {
-                "Item": {"is_notified": {"BOOL": False}}
-            }
+        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "test_api_key"
+            with patch("lambdas.post_notify.app.http_get") as mock_get:
+                mock_get.return_value = mock_response
 
-            result = check_if_notified("test_video_id")
+                # When: 判定する
+                result = check_if_live_streaming(["video_a"])
 
-            assert result is False
+                # Then: snippetのみを取得する
+                assert result == {"video_a": None}
+                assert mock_get.call_args[1]["params"]["part"] == "snippet"
 
+    def test_check_if_live_streaming_cache(self):
+        """ライブ配信判定の結果をキャッシュするテスト"""
+        # Given: video_aはライブ配信中、video_bはライブ配信予定、video_cは存在しない
+        from lambdas.post_notify.app import _video_status_cache, check_if_live_streaming
 
-@patch.dict(
-    os.environ,
-    {
-        "DYNAMODB_TABLE": "test-dynamodb-table",
-        "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
-        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
-        "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
-    },
-)
-class TestRecordNotified:
-    """record_notified関数のテスト"""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "items": [
+                {"id": "video_a", "snippet": {"liveBroadcastContent": "live"}},
+                {
+                    "id": "video_b",
+                    "snippet": {"liveBroadcastContent": "upcoming"},
+                    "liveStreamingDetails": {
+                        "scheduledStartTime": "2009-02-13T23:31:30Z"
+                    },
+                },
+            ]
+        }
+        video_ids = ["video_a", "video_b", "video_c"]
 
-    def test_record_notified_success(self):
-        """記録が成功した場合のテスト"""
-        from lambdas.post_notify.app import record_notified
+        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "test_api_key"
+            with patch("lambdas.post_notify.app.put_metrics") as mock_put_metrics:
+                with patch("lambdas.post_notify.app.http_get") as mock_get:
+                    mock_get.return_value = mock_response
+
+                    # When: 同じ動画を2回判定する
+                    first = check_if_live_streaming(video_ids, scheduled_start_times={})
+                    scheduled_start_times = {}
+                    second = check_if_live_streaming(
+                        video_ids, scheduled_start_times=scheduled_start_times
+                    )
+
+                    # Then: 2回目はAPIを実行せず、キャッシュの判定結果を返す
+                    assert mock_get.call_count == 1
+                    assert (
+                        first
+                        == second
+                        == {
+                            "video_a": "",
+                            "video_b": None,
+                            "video_c": None,
+                        }
+                    )
+                    assert scheduled_start_times == {"video_b": 1234567890}
+                    assert mock_put_metrics.call_args_list == [
+                        call(
+                            {
+                                "VideoStatusCacheHits": (0, "Count"),
+                                "VideoStatusCacheMisses": (3, "Count"),
+                            }
+                        ),
+                        call(
+                            {
+                                "VideoStatusCacheHits": (3, "Count"),
+                                "VideoStatusCacheMisses": (0, "Count"),
+                            }
+                        ),
+                    ]
+                    assert _video_status_cache.stats() == {
+                        "entries": 3,
+                        "hits": 3,
+                        "misses": 3,
+                    }
 
-        with patch("lambdas.post_notify.app.dynamodb_client") as mock_dynamodb_client:
-            with patch("lambdas.post_notify.app.time.time") as mock_time:
-                mock_time.return_value = 1234567890
+    def test_check_if_live_streaming_cache_ttl(self):
+        """判定結果ごとのキャッシュ有効期間のテスト"""
+        # Given: ライブ配信予定の有効期間は15秒、ライブ配信以外は300秒
+        from lambdas.post_notify.app import check_if_live_streaming
 
-                record_notified(
-                    "test_video_id",
-                    "test_title",
-                    "https://example.com/video",
-                    "https://example.com/thumbnail.jpg",
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "items": [
+                {"id": "video_a", "snippet": {"liveBroadcastContent": "upcoming"}},
+                {"id": "video_b", "snippet": {"liveBroadcastContent": "none"}},
+            ]
+        }
+
+        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "test_api_key"
+            with patch("lambdas.post_notify.app.http_get") as mock_get:
+                mock_get.return_value = mock_response
+                with patch("lru_ttl_cache.time.monotonic") as mock_monotonic:
+                    mock_monotonic.return_value = 100.0
+                    check_if_live_streaming(["video_a", "video_b"])
+
+                    # When: 20秒後に再度判定する
+                    mock_monotonic.return_value = 120.0
+                    check_if_live_streaming(["video_a", "video_b"])
+
+                    # Then: 有効期間切れのvideo_aのみAPIで判定する
+                    assert mock_get.call_count == 2
+                    assert mock_get.call_args[1]["params"]["id"] == "video_a"
+
+    @patch("lambdas.post_notify.app._video_status_cache.max_entries", 0)
+    def test_check_if_live_streaming_cache_disabled(self):
+        """キャッシュしない設定のテスト"""
+        # Given: エントリー数の上限が0
+        from lambdas.post_notify.app import check_if_live_streaming
+
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "items": [{"id": "video_a", "snippet": {"liveBroadcastContent": "none"}}]
+        }
+
+        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "test_api_key"
+            with patch("lambdas.post_notify.app.http_get") as mock_get:
+                mock_get.return_value = mock_response
+
+                # When: 同じ動画を2回判定する
+                check_if_live_streaming(["video_a"])
+                check_if_live_streaming(["video_a"])
+
+                # Then: 毎回APIで判定する
+                assert mock_get.call_count == 2
+
+    def test_check_if_live_streaming_fields(self):
+        """ライブ配信判定に使用するフィールドのみを取得するテスト"""
+        # Given: 該当する動画がなく、fieldsを指定したレスポンスにitemsが含まれない
+        from lambdas.post_notify.app import check_if_live_streaming
+
+        mock_response = Mock(status_code=200, headers={})
+        mock_response.json.return_value = {"pageInfo": {"totalResults": 0}}
+
+        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "test_api_key"
+            with patch("lambdas.post_notify.app.http_get") as mock_get:
+                mock_get.return_value = mock_response
+
+                # When: 開始予定日時を含めて判定する
+                result = check_if_live_streaming(["video_a"], scheduled_start_times={})
+
+                # Then: fieldsを指定し、ライブ配信中でないとみなす
+                assert mock_get.call_args[1]["params"]["fields"] == (
+                    "pageInfo/totalResults,"
+                    "items(id,snippet(liveBroadcastContent,"
+                    "thumbnails(high/url,medium/url,default/url)),"
+                    "liveStreamingDetails/scheduledStartTime)"
                 )
+                assert mock_get.call_args[1]["headers"] == {}
+                assert result == {"video_a": None}
+
+    def test_check_if_live_streaming_not_modified(self):
+        """ETagが一致する場合にキャッシュしたレスポンスを使用するテスト"""
+        # Given: 1回目はETagとともにレスポンスを返し、2回目は304を返す
+        from lambdas.post_notify.app import _video_status_cache, check_if_live_streaming
+
+        first_response = Mock(status_code=200, headers={"ETag": '"etag_a"'})
+        first_response.json.return_value = {
+            "pageInfo": {"totalResults": 1},
+            "items": [
+                {
+                    "id": "video_a",
+                    "snippet": {
+                        "liveBroadcastContent": "live",
+                        "thumbnails": {"high": {"url": "https://example.com/a.jpg"}},
+                    },
+                }
+            ],
+        }
+        not_modified_response = Mock(status_code=304, headers={"ETag": '"etag_a"'})
+
+        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "test_api_key"
+            with patch("lambdas.post_notify.app.http_get") as mock_get:
+                mock_get.side_effect = [first_response, not_modified_response]
+                with patch("lambdas.post_notify.app.put_metric") as mock_put_metric:
+                    check_if_live_streaming(["video_a"])
+
+                    # When: ライブ配信判定の結果のキャッシュの有効期間切れ後に再度判定する
+                    _video_status_cache.clear()
+                    result = check_if_live_streaming(["video_a"])
+
+                    # Then: If-None-Matchを送信し、キャッシュしたレスポンスで判定する
+                    assert mock_get.call_args_list[0][1]["headers"] == {}
+                    assert mock_get.call_args_list[1][1]["headers"] == {
+                        "If-None-Match": '"etag_a"'
+                    }
+                    not_modified_response.json.assert_not_called()
+                    assert result == {"video_a": "https://example.com/a.jpg"}
+                    mock_put_metric.assert_called_once_with("YouTubeNotModified", 1)
+
+    def test_check_if_live_streaming_multiple_ids_not_cached(self):
+        """複数件のレスポンスはETagとともにキャッシュしないテスト"""
+        # Given: 2件の動画のレスポンスをETagとともに返す
+        from lambdas.post_notify.app import (
+            _video_status_cache,
+            _videos_etag_cache,
+            check_if_live_streaming,
+        )
+
+        mock_response = Mock(status_code=200, headers={"ETag": '"etag_ab"'})
+        mock_response.json.return_value = {"pageInfo": {"totalResults": 0}}
+
+        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "test_api_key"
+            with patch("lambdas.post_notify.app.http_get") as mock_get:
+                mock_get.return_value = mock_response
+                check_if_live_streaming(["video_a", "video_b"])
+
+                # When: ライブ配信判定の結果のキャッシュの有効期間切れ後に再度判定する
+                _video_status_cache.clear()
+                check_if_live_streaming(["video_a", "video_b"])
+
+                # Then: If-None-Matchを送信せず、レスポンスをキャッシュしない
+                assert mock_get.call_args_list[1][1]["headers"] == {}
+                assert _videos_etag_cache.stats()["entries"] == 0
+
+    def test_check_if_live_streaming_acquires_quota(self):
+        """videos.listの呼び出しごとにクオーターを消費するテスト"""
+        # Given: 51件の動画(videos.listを2回呼び出す)
+        from lambdas.post_notify.app import check_if_live_streaming
+
+        mock_response = Mock()
+        mock_response.json.return_value = {"items": []}
+
+        with patch("lambdas.post_notify.app._youtube_quota") as mock_quota:
+            with patch("lambdas.post_notify.app.get_parameter_value") as mock_param:
+                mock_param.return_value = "test_api_key"
+                with patch("lambdas.post_notify.app.http_get") as mock_get:
+                    mock_get.return_value = mock_response
+
+                    # When: 優先度の低い判定を行う
+                    check_if_live_streaming(
+                        [f"video_{i}" for i in range(51)], low_priority=True
+                    )
+
+                    # Then: 呼び出しごとに1ユニットずつ消費する
+                    assert mock_get.call_count == 2
+                    assert mock_quota.acquire.call_args_list == [
+                        call(1, low_priority=True),
+                        call(1, low_priority=True),
+                    ]
+
+    @patch.dict(os.environ, {"CIRCUIT_BREAKER_YOUTUBE_FAILURE_THRESHOLD": "1"})
+    def test_check_if_live_streaming_circuit_open(self):
+        """YouTube Data API v3の障害時にサーキットブレーカーをオープンにするテスト"""
+        # Given: YouTube Data API v3が503を返す
+        from circuit_breaker import CircuitOpenError, reset_circuit_breakers
+        from lambdas.post_notify.app import check_if_live_streaming
+
+        error = Exception("503 Server Error")
+        error.response = Mock(status_code=503)
+        mock_response = Mock()
+        mock_response.raise_for_status.side_effect = error
+
+        reset_circuit_breakers()
+        try:
+            with patch("lambdas.post_notify.app.get_parameter_value") as mock_param:
+                mock_param.return_value = "test_api_key"
+                with patch("lambdas.post_notify.app.http_get") as mock_get:
+                    mock_get.return_value = mock_response
+
+                    # When: 2回判定する
+                    with pytest.raises(Exception, match="503"):
+                        check_if_live_streaming(["video_a"])
+                    with pytest.raises(CircuitOpenError):
+                        check_if_live_streaming(["video_b"])
+
+                    # Then: 2回目はAPIを実行せずに即座に失敗する
+                    assert mock_get.call_count == 1
+        finally:
+            reset_circuit_breakers()
+
+    def test_check_if_live_streaming_quota_exceeded(self):
+        """クオーターの予算を超える場合のテスト"""
+        # Given: クオーターの予算を超える
+        from lambdas.post_notify.app import check_if_live_streaming
+        from youtube_quota import QuotaExceededError
+
+        with patch("lambdas.post_notify.app._youtube_quota") as mock_quota:
+            mock_quota.acquire.side_effect = QuotaExceededError("exceeded")
+            with patch("lambdas.post_notify.app.http_get") as mock_get:
+                # When/Then: QuotaExceededErrorが送出され、APIを実行しない
+                with pytest.raises(QuotaExceededError):
+                    check_if_live_streaming(["video_a"])
+                mock_get.assert_not_called()
+
+
+@patch.dict(
+    os.environ,
+    {
+        "DYNAMODB_TABLE": "test-dynamodb-table",
+        "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
+        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
+        "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
+    },
+)
+class TestCheckIfNotified:
+    """check_if_notified関数のテスト"""
+
+    def setup_method(self):
+        """各テストの前にSMS通知を送信した動画のキャッシュを破棄する"""
+        from lambdas.post_notify.app import _notified_video_cache
+
+        _notified_video_cache.clear()
+
+    def test_check_if_notified_cache_hit(self):
+        """ウォームコンテナ内でSMS通知を送信した動画の場合のテスト"""
+        # Given: SMS通知を送信した動画のキャッシュ
+        from lambdas.post_notify.app import _notified_video_cache, check_if_notified
+
+        _notified_video_cache.put("test_video_id", True, 60)
+
+        with patch("aws_clients.get_client") as mock_get_client:
+            # When: 通知済かどうかを判定する
+            result = check_if_notified("test_video_id")
+
+            # Then: DynamoDBを参照せずに通知済と判定する
+            assert result is True
+            mock_get_client.return_value.get_item.assert_not_called()
+
+    def test_check_if_notified_not_notified(self):
+        """通知されていない場合のテスト"""
+        from lambdas.post_notify.app import check_if_notified
+
+        with patch("aws_clients.get_client") as mock_get_client:
+            mock_dynamodb_client = mock_get_client.return_value
+            mock_dynamodb_client.get_item.return_value = {}
+
+            result = check_if_notified("test_video_id")
+
+            assert result is False
+            mock_get_client.assert_called_once_with("dynamodb")
+            mock_dynamodb_client.get_item.assert_called_once_with(
+                TableName="test-dynamodb-table",
+                Key={"video_id": {"S": "test_video_id"}},
+                ConsistentRead=True,
+            )
+
+    def test_check_if_notified_circuit_open(self):
+        """DynamoDBのサーキットブレーカーがオープンの場合のテスト"""
+        # Given: DynamoDBのサーキットブレーカーがオープン
+        from circuit_breaker import CircuitBreaker, CircuitOpenError
+        from lambdas.post_notify.app import check_if_notified
+
+        breaker = CircuitBreaker("dynamodb", failure_threshold=1, recovery_seconds=30)
+        breaker.state, breaker.opened_at = "open", float("inf")
+        with patch("aws_clients.get_circuit_breaker") as mock_get_breaker:
+            mock_get_breaker.return_value = breaker
+            with patch("aws_clients.get_client") as mock_get_client:
+                # When/Then: GetItemを実行せずにCircuitOpenErrorが送出される
+                with pytest.raises(CircuitOpenError):
+                    check_if_notified("test_video_id")
+                mock_get_breaker.assert_called_once_with("dynamodb")
+                mock_get_client.return_value.get_item.assert_not_called()
+
+    def test_check_if_notified_already_notified(self):
+        """すでに通知済みの場合のテスト"""
+        from lambdas.post_notify.app import check_if_notified
+
+        with patch("aws_clients.get_client") as mock_get_client:
+            mock_dynamodb_client = mock_get_client.return_value
+            mock_dynamodb_client.get_item.return_value = {
+                "Item": {"is_notified": {"BOOL": True}}
+            }
+
+            result = check_if_notified("test_video_id")
+
+            assert result is True
+            mock_dynamodb_client.get_item.assert_called_once_with(
+                TableName="test-dynamodb-table",
+                Key={"video_id": {"S": "test_video_id"}},
+                ConsistentRead=True,
+            )
+
+    def test_check_if_notified_is_notified_false(self):
+        """is_notifiedがFalseの場合のテスト"""
+        from lambdas.post_notify.app import check_if_notified
+
+        with patch("aws_clients.get_client") as mock_get_client:
+            mock_dynamodb_client = mock_get_client.return_value
+            mock_dynamodb_client.get_item.return_value = {
+                "Item": {"is_notified": {"BOOL": False}}
+            }
+
+            result = check_if_notified("test_video_id")
+
+            assert result is False
+
+
+@patch.dict(
+    os.environ,
+    {
+        "DYNAMODB_TABLE": "test-dynamodb-table",
+        "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
+        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
+        "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
+    },
+)
+class TestReleaseClaim:
+    """release_claim関数のテスト"""
+
+    def test_release_claim_success(self):
+        """クレーム・通知済の記録を取り消すテスト"""
+        # Given: DynamoDBクライアント
+        from lambdas.post_notify.app import release_claim
+
+        with patch("aws_clients.get_client") as mock_get_client:
+            # When: 取り消す
+            release_claim("test_video_id")
+
+            # Then: is_notifiedをFalseに更新し、通知時刻を削除する
+            mock_get_client.return_value.update_item.assert_called_once_with(
+                TableName="test-dynamodb-table",
+                Key={"video_id": {"S": "test_video_id"}},
+                UpdateExpression=(
+                    "SET is_notified = :is_notified REMOVE notified_timestamp"
+                ),
+                ExpressionAttributeValues={":is_notified": {"BOOL": False}},
+            )
+
+
+@patch.dict(
+    os.environ,
+    {
+        "DYNAMODB_TABLE": "test-dynamodb-table",
+        "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
+        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
+        "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
+    },
+)
+class TestClaimVideo:
+    """claim_video関数のテスト"""
+
+    def test_claim_video_success(self):
+        """クレームを獲得し、通知済として記録するテスト"""
+        # Given: 再判定の対象として記録済の項目に対して、条件付き書き込みが成功する
+        from lambdas.post_notify.app import claim_video
+
+        with patch("aws_clients.get_client") as mock_get_client:
+            mock_dynamodb_client = mock_get_client.return_value
+            mock_dynamodb_client.update_item.return_value = {
+                "Attributes": {"recheck_status": {"S": "upcoming"}}
+            }
+            with patch("lambdas.post_notify.app.time.time") as mock_time:
+                mock_time.return_value = 1234567890
+                with patch("lambdas.post_notify.app.ITEM_TTL_SECONDS", 2592000):
+                    # When: クレームを獲得する
+                    result = claim_video(
+                        "test_video_id",
+                        "test_title",
+                        "https://example.com/thumbnail.jpg",
+                    )
+
+                    # Then: 未通知の場合のみ、動画URLは保存せずに通知済として記録し、
+                    # 獲得前の項目の属性が返る
+                    assert result == {"recheck_status": {"S": "upcoming"}}
+                    mock_dynamodb_client.update_item.assert_called_once_with(
+                        TableName="test-dynamodb-table",
+                        Key={"video_id": {"S": "test_video_id"}},
+                        UpdateExpression=(
+                            "SET notified_timestamp = :notified_timestamp, "
+                            "is_notified = :is_notified, "
+                            "title = :title, "
+                            "#ttl = :ttl, "
+                            "thumbnail_url = :thumbnail_url"
+                        ),
+                        ConditionExpression=(
+                            "attribute_not_exists(is_notified) OR is_notified = :false"
+                        ),
+                        ExpressionAttributeNames={"#ttl": "ttl"},
+                        ExpressionAttributeValues={
+                            ":notified_timestamp": {"N": "1234567890"},
+                            ":is_notified": {"BOOL": True},
+                            ":title": {"S": "test_title"},
+                            ":ttl": {"N": "1237159890"},
+                            ":false": {"BOOL": False},
+                            ":thumbnail_url": {
+                                "S": "https://example.com/thumbnail.jpg"
+                            },
+                        },
+                        ReturnValues="ALL_OLD",
+                    )
+
+    def test_claim_video_new_item_without_thumbnail(self):
+        """項目が存在せず、サムネイル画像URLを取得できなかった場合のテスト"""
+        # Given: 獲得前の項目が存在しない
+        from lambdas.post_notify.app import claim_video
+
+        with patch("aws_clients.get_client") as mock_get_client:
+            mock_get_client.return_value.update_item.return_value = {}
+
+            # When: クレームを獲得する
+            result = claim_video("test_video_id", "test_title", "")
+
+            # Then: 空の属性が返り、サムネイル画像URLは保存しない
+            assert result == {}
+            kwargs = mock_get_client.return_value.update_item.call_args[1]
+            assert "thumbnail_url" not in kwargs["UpdateExpression"]
+            assert ":thumbnail_url" not in kwargs["ExpressionAttributeValues"]
+
+    def test_claim_video_conditional_check_failed(self):
+        """通知済または他の実行が獲得済の場合のテスト"""
+        # Given: 条件付き書き込みの条件を満たさない
+        from botocore.exceptions import ClientError
+
+        from lambdas.post_notify.app import claim_video
+
+        with patch("aws_clients.get_client") as mock_get_client:
+            mock_get_client.return_value.update_item.side_effect = ClientError(
+                {"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem"
+            )
+
+            # When/Then: Noneが返る
+            assert claim_video("test_video_id", "test_title", "") is None
+
+    def test_claim_video_error(self):
+        """条件付き書き込み以外のエラーの場合のテスト"""
+        # Given: スロットリングされる
+        from botocore.exceptions import ClientError
+
+        from lambdas.post_notify.app import claim_video
+
+        with patch("aws_clients.get_client") as mock_get_client:
+            mock_get_client.return_value.update_item.side_effect = ClientError(
+                {"Error": {"Code": "ProvisionedThroughputExceededException"}},
+                "UpdateItem",
+            )
+
+            # When/Then: 例外が送出される
+            with pytest.raises(ClientError):
+                claim_video("test_video_id", "test_title", "")
+
 
-                mock_dynamodb_client.update_item.assert_called_once_with(
+@patch.dict(
+    os.environ,
+    {
+        "DYNAMODB_TABLE": "test-dynamodb-table",
+        "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
+        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
+        "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
+    },
+)
+class TestRecordDeleted:
+    """record_deleted関数・record_deleted_videos関数のテスト"""
+
+    def test_record_deleted_success(self):
+        """通知済の動画を削除済として記録するテスト"""
+        # Given: DynamoDBクライアント
+        from lambdas.post_notify.app import record_deleted
+
+        with patch("aws_clients.get_client") as mock_get_client:
+            with patch("lambdas.post_notify.app.time.time") as mock_time:
+                mock_time.return_value = 1234567890
+
+                # When: 記録する
+                record_deleted("test_video_id")
+
+                # Then: 項目が存在する場合のみ削除日時を記録する
+                mock_get_client.return_value.update_item.assert_called_once_with(
+                    TableName="test-dynamodb-table",
+                    Key={"video_id": {"S": "test_video_id"}},
+                    UpdateExpression="SET deleted_timestamp = :deleted_timestamp",
+                    ConditionExpression="attribute_exists(video_id)",
+                    ExpressionAttributeValues={
+                        ":deleted_timestamp": {"N": "1234567890"}
+                    },
+                )
+
+    def test_record_deleted_not_notified(self):
+        """通知していない動画の場合のテスト"""
+        # Given: 項目が存在せず、条件付き書き込みが失敗する
+        from botocore.exceptions import ClientError
+
+        from lambdas.post_notify.app import record_deleted
+
+        with patch("aws_clients.get_client") as mock_get_client:
+            mock_get_client.return_value.update_item.side_effect = ClientError(
+                {"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem"
+            )
+
+            # When/Then: 例外を送出しない
+            record_deleted("test_video_id")
+
+    def test_record_deleted_videos_failure(self):
+        """記録に失敗しても処理を継続するテスト"""
+        # Given: 1件目の記録が失敗する
+        from lambdas.post_notify.app import record_deleted_videos
+
+        with patch("lambdas.post_notify.app.record_deleted") as mock_record_deleted:
+            mock_record_deleted.side_effect = [Exception("DynamoDB error"), None]
+
+            # When: 2件を記録する
+            record_deleted_videos(["video_a", "video_b"])
+
+            # Then: 例外を送出せず、2件目も記録する
+            assert mock_record_deleted.call_count == 2
+
+
+@patch.dict(
+    os.environ,
+    {
+        "DYNAMODB_TABLE": "test-dynamodb-table",
+        "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
+        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
+        "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
+    },
+)
+class TestScheduleRecheck:
+    """schedule_recheck関数・cancel_recheck関数・get_due_upcoming_videos関数のテスト"""
+
+    video_data = {
+        "video_id": "test_video_id",
+        "title": "Test Title",
+        "url": "https://example.com/video",
+    }
+
+    @pytest.mark.parametrize(
+        "scheduled_start_time, expected_next_check_at",
+        [
+            # 開始予定日時の1時間前: 開始予定日時の60秒前に再判定する
+            (1234571490, "1234571430"),
+            # 開始予定日時の30秒前: 60秒後に再判定する
+            (1234567920, "1234567950"),
+            # 開始予定日時の10分後: 60秒後に再判定する
+            (1234567290, "1234567950"),
+        ],
+    )
+    @patch("lambdas.post_notify.app.ITEM_TTL_SECONDS", 2592000)
+    def test_schedule_recheck_success(
+        self, scheduled_start_time, expected_next_check_at
+    ):
+        """次回の再判定日時を記録するテスト"""
+        # Given: 現在日時と開始予定日時
+        from lambdas.post_notify.app import schedule_recheck
+
+        with patch("aws_clients.get_client") as mock_get_client:
+            with patch("lambdas.post_notify.app.time.time") as mock_time:
+                mock_time.return_value = 1234567890
+
+                # When: 記録する
+                schedule_recheck(dict(self.video_data), scheduled_start_time)
+
+                # Then: 未通知の場合のみ、次回の再判定日時とともに記録する
+                mock_get_client.return_value.update_item.assert_called_once_with(
                     TableName="test-dynamodb-table",
                     Key={"video_id": {"S": "test_video_id"}},
                     UpdateExpression=(
-                        "SET notified_timestamp = :notified_timestamp, "
-                        "is_notified = :is_notified, "
-                        "title = :title, "
-                        "#url = :url, "
-                        "thumbnail_url = :thumbnail_url"
+                        "SET title = :title, "
+                        "scheduled_start_time = :scheduled_start_time, "
+                        "next_check_at = :next_check_at, "
+                        "recheck_status = :recheck_status, "
+                        "#ttl = :ttl"
+                    ),
+                    ConditionExpression=(
+                        "attribute_not_exists(is_notified) OR is_notified = :false"
                     ),
-                    ExpressionAttributeNames={"#url": "url"},
+                    ExpressionAttributeNames={"#ttl": "ttl"},
                     ExpressionAttributeValues={
-                        ":notified_timestamp": {"N": "1234567890"},
-                        ":is_notified": {"BOOL": True},
-                        ":title": {"S": "test_title"},
-                        ":url": {"S": "https://example.com/video"},
-                        ":thumbnail_url": {"S": "https://example.com/thumbnail.jpg"},
+                        ":title": {"S": "Test Title"},
+                        ":scheduled_start_time": {"N": str(scheduled_start_time)},
+                        ":next_check_at": {"N": expected_next_check_at},
+                        ":recheck_status": {"S": "upcoming"},
+                        ":ttl": {"N": "1237159890"},
+                        ":false": {"BOOL": False},
                     },
                 )
 
+    def test_schedule_recheck_window_expired(self):
+        """開始予定日時から一定時間を過ぎた場合のテスト"""
+        # Given: 開始予定日時の1時間後
+        from lambdas.post_notify.app import schedule_recheck
+
+        with patch("lambdas.post_notify.app.cancel_recheck") as mock_cancel_recheck:
+            with patch("aws_clients.get_client") as mock_get_client:
+                with patch("lambdas.post_notify.app.time.time") as mock_time:
+                    mock_time.return_value = 1234567890
+
+                    # When: 記録する
+                    schedule_recheck(dict(self.video_data), 1234564290)
+
+                    # Then: 再判定を打ち切る
+                    mock_cancel_recheck.assert_called_once_with("test_video_id")
+                    mock_get_client.return_value.update_item.assert_not_called()
+
+    def test_schedule_recheck_already_notified(self):
+        """通知済の動画の場合のテスト"""
+        # Given: 条件付き書き込みの条件を満たさない
+        from botocore.exceptions import ClientError
+
+        from lambdas.post_notify.app import schedule_recheck
+
+        with patch("aws_clients.get_client") as mock_get_client:
+            mock_get_client.return_value.update_item.side_effect = ClientError(
+                {"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem"
+            )
+            with patch("lambdas.post_notify.app.time.time") as mock_time:
+                mock_time.return_value = 1234567890
+
+                # When/Then: 例外は送出されない
+                schedule_recheck(dict(self.video_data), 1234571490)
+
+    def test_cancel_recheck_success(self):
+        """再判定の対象から除外するテスト"""
+        # Given/When: 除外する
+        from lambdas.post_notify.app import cancel_recheck
+
+        with patch("aws_clients.get_client") as mock_get_client:
+            cancel_recheck("test_video_id")
+
+            # Then: 項目が存在する場合のみ再判定用の属性を削除する
+            mock_get_client.return_value.update_item.assert_called_once_with(
+                TableName="test-dynamodb-table",
+                Key={"video_id": {"S": "test_video_id"}},
+                UpdateExpression=(
+                    "REMOVE recheck_status, next_check_at, scheduled_start_time"
+                ),
+                ConditionExpression="attribute_exists(video_id)",
+            )
+
+    def test_get_due_upcoming_videos_success(self):
+        """再判定日時を過ぎた動画を取得するテスト"""
+        # Given: インデックスから1件の項目を取得できる
+        from lambdas.post_notify.app import get_due_upcoming_videos
+
+        with patch("aws_clients.get_client") as mock_get_client:
+            mock_get_client.return_value.query.return_value = {
+                "Items": [
+                    {
+                        "video_id": {"S": "test_video_id"},
+                        "title": {"S": "Test Title"},
+                        "next_check_at": {"N": "1234567800"},
+                    }
+                ]
+            }
+
+            # When: 取得する
+            result = get_due_upcoming_videos(1234567890)
+
+            # Then: videos.listの上限件数までインデックスから取得し、動画URLを生成する
+            assert result == [
+                {
+                    "video_id": "test_video_id",
+                    "title": "Test Title",
+                    "url": "https://www.youtube.com/watch?v=test_video_id",
+                }
+            ]
+            mock_get_client.return_value.query.assert_called_once_with(
+                TableName="test-dynamodb-table",
+                IndexName="recheck-index",
+                KeyConditionExpression=(
+                    "recheck_status = :recheck_status AND next_check_at <= :now"
+                ),
+                ExpressionAttributeValues={
+                    ":recheck_status": {"S": "upcoming"},
+                    ":now": {"N": "1234567890"},
+                },
+                Limit=50,
+            )
+
+
+@patch.dict(
+    os.environ,
+    {
+        "DYNAMODB_TABLE": "test-dynamodb-table",
+        "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
+        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
+        "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
+    },
+)
+class TestSendSmsNotification:
+    """send_sms_notification関数のテスト"""
+
+    def test_send_sms_notification_with_thumbnail(self):
+        """サムネイルありでSMS通知を送信した場合のテスト"""
+        from lambdas.post_notify.app import send_sms_notification
+
+        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "+1234567890"
+            with patch("aws_clients.get_client") as mock_get_client:
+                mock_sns_client = mock_get_client.return_value
+                send_sms_notification(
+                    "Test Title",
+                    "https://example.com/video",
+                    "https://example.com/thumbnail.jpg",
+                )
+                mock_sns_client.publish.assert_called_once_with(
+                    PhoneNumber="+1234567890",
+                    Message=(
+                        "Test Title"
+                        "\n\n"
+                        "https://example.com/video"
+                        "\n\n"
+                        "https://example.com/thumbnail.jpg"
+                    ),
+                )
+
+    def test_send_sms_notification_without_thumbnail(self):
+        """サムネイルなしでSMS通知を送信した場合のテスト"""
+        from lambdas.post_notify.app import send_sms_notification
+
+        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "+1234567890"
+            with patch("aws_clients.get_client") as mock_get_client:
+                mock_sns_client = mock_get_client.return_value
+                send_sms_notification("Test Title", "https://example.com/video", "")
+                mock_sns_client.publish.assert_called_once_with(
+                    PhoneNumber="+1234567890",
+                    Message=("Test Title\n\nhttps://example.com/video"),
+                )
+
+    def test_send_sms_notification_multiple_recipients(self):
+        """複数の電話番号にSMS通知を送信した場合のテスト"""
+        # Given: カンマ区切りの2つの電話番号
+        from lambdas.post_notify.app import send_sms_notification
+
+        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "+1234567890, +1987654321"
+            with patch("aws_clients.get_client") as mock_get_client:
+                mock_sns_client = mock_get_client.return_value
+
+                # When: SMS通知を送信する
+                send_sms_notification("Test Title", "https://example.com/video", "")
+
+                # Then: それぞれの電話番号に同じメッセージを送信する
+                assert sorted(
+                    c[1]["PhoneNumber"] for c in mock_sns_client.publish.call_args_list
+                ) == ["+1234567890", "+1987654321"]
+                assert {
+                    c[1]["Message"] for c in mock_sns_client.publish.call_args_list
+                } == {"Test Title\n\nhttps://example.com/video"}
+
+    @patch.dict(os.environ, {"NOTIFICATION_SINKS": "memory"})
+    def test_send_sms_notification_additional_sink(self):
+        """追加の通知先にもSMSと並行して通知するテスト"""
+        # Given: メモリの通知先を追加する
+        from lambdas.post_notify.app import (
+            get_notification_dispatcher,
+            send_sms_notification,
+        )
+        from notification_sinks import InMemorySink, register_notification_sink
+
+        memory_sink = InMemorySink()
+        register_notification_sink("memory", memory_sink)
+        get_notification_dispatcher.cache_clear()
+        try:
+            with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
+                mock_get_param.return_value = "+1234567890"
+                with patch("aws_clients.get_client") as mock_get_client:
+                    # When: SMS通知を送信する
+                    send_sms_notification(
+                        "Test Title",
+                        "https://example.com/video",
+                        "https://example.com/thumbnail.jpg",
+                    )
+
+                    # Then: SMSと同じ内容が構造化して追加の通知先に届く
+                    mock_get_client.return_value.publish.assert_called_once()
+                    assert len(memory_sink.notifications) == 1
+                    assert memory_sink.notifications[0].data == {
+                        "title": "Test Title",
+                        "url": "https://example.com/video",
+                        "thumbnail_url": "https://example.com/thumbnail.jpg",
+                    }
+        finally:
+            register_notification_sink("memory", None)
+            get_notification_dispatcher.cache_clear()
+
+    def test_send_sms_notification_all_failed(self):
+        """すべての電話番号への送信に失敗した場合のテスト"""
+        # Given: すべての送信が失敗する
+        from lambdas.post_notify.app import send_sms_notification
+
+        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "+1234567890,+1987654321"
+            with patch("aws_clients.get_client") as mock_get_client:
+                mock_get_client.return_value.publish.side_effect = Exception(
+                    "SNS error"
+                )
+                with patch("sms_fanout.put_metric"):
+                    # When/Then: Hubが再送するように例外が送出される
+                    with pytest.raises(Exception, match="SNS error"):
+                        send_sms_notification(
+                            "Test Title", "https://example.com/video", ""
+                        )
+
+
+class TestClaimAndNotify:
+    """claim_and_notify関数のテスト"""
+
+    video_data = {
+        "video_id": "test_video_id",
+        "title": "Test Title",
+        "url": "https://example.com/video",
+    }
+
+    def setup_method(self):
+        """通知済のキャッシュをクリアする"""
+        from lambdas.post_notify.app import _notified_video_cache
+
+        _notified_video_cache.clear()
+
+    def _patch_stages(self):
+        """クレームの獲得・SMS通知で実行する処理をまとめてモックする"""
+        return patch.multiple(
+            "lambdas.post_notify.app",
+            claim_video=DEFAULT,
+            send_sms_notification=DEFAULT,
+            release_claim=DEFAULT,
+            cancel_recheck=DEFAULT,
+        )
+
+    def test_claim_and_notify_success(self):
+        """クレームを獲得してSMS通知を送信するテスト"""
+        # Given: 再判定の対象でなかった未通知の動画
+        from lambdas.post_notify.app import _notified_video_cache, claim_and_notify
+
+        with self._patch_stages() as mocks:
+            mocks["claim_video"].return_value = {}
+
+            # When: クレームを獲得してSMS通知を送信する
+            claim_and_notify(dict(self.video_data), "https://example.com/t.jpg")
+
+            # Then: SMS通知を送信し、通知済をキャッシュし、再判定の除外は行わない
+            mocks["send_sms_notification"].assert_called_once_with(
+                "Test Title", "https://example.com/video", "https://example.com/t.jpg"
+            )
+            mocks["release_claim"].assert_not_called()
+            mocks["cancel_recheck"].assert_not_called()
+            assert _notified_video_cache.get("test_video_id") is True
+
+    def test_claim_and_notify_cancel_recheck(self):
+        """再判定の対象だった動画をSMS通知の後に除外するテスト"""
+        # Given: 再判定の対象として記録されていた動画
+        from lambdas.post_notify.app import claim_and_notify
+
+        with self._patch_stages() as mocks:
+            mocks["claim_video"].return_value = {"recheck_status": {"S": "upcoming"}}
+
+            # When: クレームを獲得してSMS通知を送信する
+            claim_and_notify(dict(self.video_data), "")
+
+            # Then: SMS通知の後に再判定の対象から除外する
+            mocks["send_sms_notification"].assert_called_once()
+            mocks["cancel_recheck"].assert_called_once_with("test_video_id")
+
+    def test_claim_and_notify_cancel_recheck_failed(self):
+        """SMS通知の成功後に再判定の除外に失敗した場合のテスト"""
+        # Given: 再判定の対象からの除外が失敗する
+        from lambdas.post_notify.app import claim_and_notify
+
+        with self._patch_stages() as mocks:
+            mocks["claim_video"].return_value = {"recheck_status": {"S": "upcoming"}}
+            mocks["cancel_recheck"].side_effect = Exception("DynamoDB error")
+
+            # When: クレームを獲得してSMS通知を送信する
+            claim_and_notify(dict(self.video_data), "")
+
+            # Then: 通知済の記録は残るため、例外を送出せずクレームも解放しない
+            mocks["send_sms_notification"].assert_called_once()
+            mocks["release_claim"].assert_not_called()
+
+    def test_claim_and_notify_sms_failed(self):
+        """SMS通知に失敗した場合にクレームを解放するテスト"""
+        # Given: SMS通知が失敗する
+        from lambdas.post_notify.app import _notified_video_cache, claim_and_notify
+
+        with self._patch_stages() as mocks:
+            mocks["claim_video"].return_value = {"recheck_status": {"S": "upcoming"}}
+            mocks["send_sms_notification"].side_effect = Exception("SNS error")
+
+            # When/Then: 例外が送出され、クレームを解放し、通知済をキャッシュしない
+            with pytest.raises(Exception, match="SNS error"):
+                claim_and_notify(dict(self.video_data), "")
+            mocks["release_claim"].assert_called_once_with("test_video_id")
+            mocks["cancel_recheck"].assert_not_called()
+            assert _notified_video_cache.get("test_video_id") is None
+
+    def test_claim_and_notify_claim_failed(self):
+        """クレームを獲得できない場合のテスト"""
+        # Given: 通知済または他の実行がSMS通知中の動画
+        from lambdas.post_notify.app import claim_and_notify
+
+        with self._patch_stages() as mocks:
+            mocks["claim_video"].return_value = None
+
+            # When: クレームを獲得してSMS通知を送信する
+            claim_and_notify(dict(self.video_data), "")
+
+            # Then: SMS通知を送信せず、プッシュ通知では再判定の対象から除外しない
+            mocks["send_sms_notification"].assert_not_called()
+            mocks["cancel_recheck"].assert_not_called()
+
+
+@patch.dict(
+    os.environ,
+    {
+        "DYNAMODB_TABLE": "test-dynamodb-table",
+        "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
+        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
+        "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
+    },
+)
+class TestNotifySequentially:
+    """notify_sequentially関数のテスト"""
+
+    video_data_list = [
+        {"video_id": "video_a", "title": "Title A", "url": "https://example.com/a"},
+        {"video_id": "video_b", "title": "Title B", "url": "https://example.com/b"},
+        {"video_id": "video_c", "title": "Title C", "url": "https://example.com/c"},
+    ]
+
+    def _patch_stages(self):
+        """順に実行する処理をまとめてモックする"""
+        return patch.multiple(
+            "lambdas.post_notify.app",
+            check_if_notified=DEFAULT,
+            check_if_live_streaming=DEFAULT,
+            claim_video=DEFAULT,
+            send_sms_notification=DEFAULT,
+            release_claim=DEFAULT,
+            cancel_recheck=DEFAULT,
+            put_metric=DEFAULT,
+            schedule_recheck=DEFAULT,
+        )
+
+    def test_notify_sequentially_multiple_entries(self):
+        """複数のentryを通知するテスト"""
+        # Given: video_aは通知済、video_bはライブ配信中、video_cはライブ配信中でない
+        from lambdas.post_notify.app import notify_sequentially
+
+        with self._patch_stages() as mocks:
+            mocks["check_if_notified"].side_effect = lambda video_id: (
+                video_id == "video_a"
+            )
+            mocks["check_if_live_streaming"].return_value = {
+                "video_b": "https://example.com/b.jpg",
+                "video_c": None,
+            }
+
+            # When: 順に実行する
+            notify_sequentially([dict(v) for v in self.video_data_list])
+
+            # Then: 未通知のentryのみ1回でライブ配信判定し、video_bのみ通知する
+            mocks["check_if_live_streaming"].assert_called_once_with(
+                ["video_b", "video_c"], scheduled_start_times={}
+            )
+            mocks["send_sms_notification"].assert_called_once_with(
+                "Title B", "https://example.com/b", "https://example.com/b.jpg"
+            )
+            mocks["claim_video"].assert_called_once_with(
+                "video_b", "Title B", "https://example.com/b.jpg"
+            )
+            mocks["put_metric"].assert_not_called()
+
+    def test_notify_sequentially_claim_failed(self):
+        """クレームを獲得できない場合のテスト"""
+        # Given: 他の実行がクレームを獲得済のライブ配信
+        from lambdas.post_notify.app import notify_sequentially
+
+        with self._patch_stages() as mocks:
+            mocks["check_if_notified"].return_value = False
+            mocks["check_if_live_streaming"].return_value = {"video_a": ""}
+            mocks["claim_video"].return_value = None
+
+            # When: 順に実行する
+            notify_sequentially([dict(self.video_data_list[0])])
+
+            # Then: SMS通知を送信しない
+            mocks["claim_video"].assert_called_once_with("video_a", "Title A", "")
+            mocks["send_sms_notification"].assert_not_called()
+
+    def test_notify_sequentially_sms_failed(self):
+        """SMS通知に失敗した場合にクレームを解放するテスト"""
+        # Given: クレームを獲得し、SMS通知が失敗する
+        from lambdas.post_notify.app import notify_sequentially
+
+        with self._patch_stages() as mocks:
+            mocks["check_if_notified"].return_value = False
+            mocks["check_if_live_streaming"].return_value = {"video_a": ""}
+            mocks["claim_video"].return_value = {}
+            mocks["send_sms_notification"].side_effect = Exception("SNS error")
+
+            # When/Then: 例外が送出され、クレームが解放される
+            with pytest.raises(Exception, match="SNS error"):
+                notify_sequentially([dict(self.video_data_list[0])])
+            mocks["release_claim"].assert_called_once_with("video_a")
+            mocks["cancel_recheck"].assert_not_called()
+
+    def test_notify_sequentially_all_notified(self):
+        """すべてのentryが通知済の場合のテスト"""
+        # Given: すべてのentryが通知済
+        from lambdas.post_notify.app import notify_sequentially
+
+        with self._patch_stages() as mocks:
+            mocks["check_if_notified"].return_value = True
+
+            # When: 順に実行する
+            notify_sequentially([dict(v) for v in self.video_data_list])
+
+            # Then: APIを実行せず、省略した呼び出しを1回として記録する
+            mocks["check_if_live_streaming"].assert_not_called()
+            mocks["send_sms_notification"].assert_not_called()
+            mocks["put_metric"].assert_called_once_with("YouTubeApiCallsSaved", 1)
+
+    def test_notify_sequentially_upcoming(self):
+        """ライブ配信予定のentryを再判定の対象として記録するテスト"""
+        # Given: video_aはライブ配信予定、video_bはライブ配信中でない
+        from lambdas.post_notify.app import notify_sequentially
+
+        def check_if_live_streaming(video_ids, scheduled_start_times):
+            scheduled_start_times["video_a"] = 1234567890
+            return {video_id: None for video_id in video_ids}
+
+        with self._patch_stages() as mocks:
+            mocks["check_if_notified"].return_value = False
+            mocks["check_if_live_streaming"].side_effect = check_if_live_streaming
+
+            # When: 順に実行する
+            notify_sequentially([dict(v) for v in self.video_data_list[:2]])
+
+            # Then: video_aのみ再判定の対象として記録し、SMS通知は行わない
+            mocks["schedule_recheck"].assert_called_once_with(
+                self.video_data_list[0], 1234567890
+            )
+            mocks["send_sms_notification"].assert_not_called()
+
+    @patch("lambdas.post_notify.app.RECHECK_UPCOMING", False)
+    def test_notify_sequentially_recheck_upcoming_disabled(self):
+        """ライブ配信予定の動画を再判定しない設定のテスト"""
+        # Given: 再判定しない設定
+        from lambdas.post_notify.app import notify_sequentially
+
+        with self._patch_stages() as mocks:
+            mocks["check_if_notified"].return_value = False
+            mocks["check_if_live_streaming"].return_value = {"video_a": None}
+
+            # When: 順に実行する
+            notify_sequentially([dict(self.video_data_list[0])])
+
+            # Then: 開始予定日時を取得しない
+            mocks["check_if_live_streaming"].assert_called_once_with(
+                ["video_a"], scheduled_start_times=None
+            )
+            mocks["schedule_recheck"].assert_not_called()
+
 
 @patch.dict(
     os.environ,
@@ -429,47 +1919,171 @@ class TestRecordNotified:
         "DYNAMODB_TABLE": "test-dynamodb-table",
         "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
         "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
         "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
     },
 )
-class TestSendSmsNotification:
-    """send_sms_notification関数のテスト"""
+class TestNotifyConcurrently:
+    """notify_concurrently関数のテスト"""
+
+    video_data = {
+        "video_id": "test_video_id",
+        "title": "Test Title",
+        "url": "https://example.com/video",
+    }
+
+    def _patch_stages(self):
+        """並行実行する処理をまとめてモックする"""
+        return patch.multiple(
+            "lambdas.post_notify.app",
+            check_if_notified=DEFAULT,
+            check_if_live_streaming=DEFAULT,
+            get_parameter_value=DEFAULT,
+            send_sms_notification=DEFAULT,
+            release_claim=DEFAULT,
+            claim_video=DEFAULT,
+            cancel_recheck=DEFAULT,
+            schedule_recheck=DEFAULT,
+        )
+
+    def test_notify_concurrently_success(self):
+        """通知済でないライブ配信を通知するテスト"""
+        # Given: 通知済でないライブ配信
+        from lambdas.post_notify.app import notify_concurrently
+
+        with self._patch_stages() as mocks:
+            mocks["check_if_notified"].return_value = False
+            mocks["check_if_live_streaming"].return_value = {
+                "test_video_id": "https://example.com/t.jpg"
+            }
 
-    def test_send_sms_notification_with_thumbnail(self):
-        """サムネイルありでSMS通知を送信した場合のテスト"""
-        from lambdas.post_notify.app import send_sms_notification
+            # When: 並行実行する
+            notify_concurrently([dict(self.video_data)])
 
-        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
-            mock_get_param.return_value = "+1234567890"
-            with patch("lambdas.post_notify.app.sns_client") as mock_sns_client:
-                send_sms_notification(
-                    "Test Title",
-                    "https://example.com/video",
-                    "https://example.com/thumbnail.jpg",
-                )
-                mock_sns_client.publish.assert_called_once_with(
-                    PhoneNumber="+1234567890",
-                    Message=(
-                        "Test Title"
-                        "\n\n"
-                        "https://example.com/video"
-                        "\n\n"
-                        "https://example.com/thumbnail.jpg"
-                    ),
-                )
+            # Then: クレームの獲得(通知済記録)とSMS通知がそれぞれ1回行われる
+            mocks["get_parameter_value"].assert_called_once_with(
+                "test-phone-number-param"
+            )
+            mocks["claim_video"].assert_called_once_with(
+                "test_video_id", "Test Title", "https://example.com/t.jpg"
+            )
+            mocks["send_sms_notification"].assert_called_once_with(
+                "Test Title", "https://example.com/video", "https://example.com/t.jpg"
+            )
+            mocks["release_claim"].assert_not_called()
 
-    def test_send_sms_notification_without_thumbnail(self):
-        """サムネイルなしでSMS通知を送信した場合のテスト"""
-        from lambdas.post_notify.app import send_sms_notification
+    def test_notify_concurrently_already_notified(self):
+        """通知済の場合はライブ配信判定の例外を無視するテスト"""
+        # Given: 通知済で、ライブ配信判定が例外を送出する
+        from lambdas.post_notify.app import notify_concurrently
 
-        with patch("lambdas.post_notify.app.get_parameter_value") as mock_get_param:
-            mock_get_param.return_value = "+1234567890"
-            with patch("lambdas.post_notify.app.sns_client") as mock_sns_client:
-                send_sms_notification("Test Title", "https://example.com/video", "")
-                mock_sns_client.publish.assert_called_once_with(
-                    PhoneNumber="+1234567890",
-                    Message=("Test Title\n\nhttps://example.com/video"),
-                )
+        with self._patch_stages() as mocks:
+            mocks["check_if_notified"].return_value = True
+            mocks["check_if_live_streaming"].side_effect = Exception("API error")
+
+            # When: 並行実行する
+            notify_concurrently([dict(self.video_data)])
+
+            # Then: SMS通知を送信しない
+            mocks["send_sms_notification"].assert_not_called()
+            mocks["claim_video"].assert_not_called()
+
+    def test_notify_concurrently_not_live_stream(self):
+        """ライブ配信でない場合のテスト"""
+        # Given: 通知済でなく、ライブ配信でもない
+        from lambdas.post_notify.app import notify_concurrently
+
+        with self._patch_stages() as mocks:
+            mocks["check_if_notified"].return_value = False
+            mocks["check_if_live_streaming"].return_value = {"test_video_id": None}
+
+            # When: 並行実行する
+            notify_concurrently([dict(self.video_data)])
+
+            # Then: SMS通知を送信しない
+            mocks["send_sms_notification"].assert_not_called()
+            mocks["claim_video"].assert_not_called()
+
+    def test_notify_concurrently_live_check_failed(self):
+        """通知済でなく、ライブ配信判定が失敗した場合のテスト"""
+        # Given: 通知済でなく、ライブ配信判定が例外を送出する
+        from lambdas.post_notify.app import notify_concurrently
+
+        with self._patch_stages() as mocks:
+            mocks["check_if_notified"].return_value = False
+            mocks["check_if_live_streaming"].side_effect = Exception("API error")
+
+            # When/Then: 例外が送出され、SMS通知を送信しない
+            with pytest.raises(Exception, match="API error"):
+                notify_concurrently([dict(self.video_data)])
+            mocks["send_sms_notification"].assert_not_called()
+
+    def test_notify_concurrently_sms_failed(self):
+        """SMS通知に失敗した場合にクレームを解放するテスト"""
+        # Given: クレームを獲得し、SMS通知が失敗する
+        from lambdas.post_notify.app import notify_concurrently
+
+        with self._patch_stages() as mocks:
+            mocks["check_if_notified"].return_value = False
+            mocks["check_if_live_streaming"].return_value = {"test_video_id": ""}
+            mocks["send_sms_notification"].side_effect = Exception("SNS error")
+
+            # When/Then: 例外が送出され、クレームが解放される
+            with pytest.raises(Exception, match="SNS error"):
+                notify_concurrently([dict(self.video_data)])
+            mocks["release_claim"].assert_called_once_with("test_video_id")
+
+    def test_notify_concurrently_multiple_entries(self):
+        """複数のentryを並行実行で通知するテスト"""
+        # Given: video_aは通知済、video_bはライブ配信中
+        from lambdas.post_notify.app import notify_concurrently
+
+        with self._patch_stages() as mocks:
+            mocks["check_if_notified"].side_effect = lambda video_id: (
+                video_id == "video_a"
+            )
+            mocks["check_if_live_streaming"].return_value = {
+                "video_a": "https://example.com/a.jpg",
+                "video_b": "https://example.com/b.jpg",
+            }
+
+            # When: 並行実行する
+            notify_concurrently(
+                [
+                    {"video_id": "video_a", "title": "A", "url": "https://a"},
+                    {"video_id": "video_b", "title": "B", "url": "https://b"},
+                ]
+            )
+
+            # Then: 1回でライブ配信判定し、未通知のvideo_bのみ通知する
+            mocks["check_if_live_streaming"].assert_called_once_with(
+                ["video_a", "video_b"], scheduled_start_times={}
+            )
+            mocks["send_sms_notification"].assert_called_once_with(
+                "B", "https://b", "https://example.com/b.jpg"
+            )
+
+    def test_notify_concurrently_upcoming(self):
+        """ライブ配信予定のentryを再判定の対象として記録するテスト"""
+        # Given: ライブ配信予定
+        from lambdas.post_notify.app import notify_concurrently
+
+        def check_if_live_streaming(video_ids, scheduled_start_times):
+            scheduled_start_times["test_video_id"] = 1234567890
+            return {video_id: None for video_id in video_ids}
+
+        with self._patch_stages() as mocks:
+            mocks["check_if_notified"].return_value = False
+            mocks["check_if_live_streaming"].side_effect = check_if_live_streaming
+
+            # When: 並行実行する
+            notify_concurrently([dict(self.video_data)])
+
+            # Then: 再判定の対象として記録し、クレームは獲得しない
+            mocks["schedule_recheck"].assert_called_once_with(
+                self.video_data, 1234567890
+            )
+            mocks["claim_video"].assert_not_called()
 
 
 @patch.dict(
@@ -478,9 +2092,12 @@ class TestSendSmsNotification:
         "DYNAMODB_TABLE": "test-dynamodb-table",
         "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
         "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
         "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
     },
 )
+@patch("lambdas.post_notify.app.prefetch_parameters", Mock())
+@patch("lambdas.post_notify.app.claim_video", Mock(return_value={}))
 class TestLambdaHandler:
     """lambda_handler関数のテスト"""
 
@@ -488,7 +2105,7 @@ class TestLambdaHandler:
         """Lambda関数ハンドラーの成功実行テスト"""
         from lambdas.post_notify.app import lambda_handler
 
-        with patch("lambdas.post_notify.app.record_notified"):
+        with patch("lambdas.post_notify.app.cancel_recheck"):
             with patch("lambdas.post_notify.app.send_sms_notification"):
                 with patch(
                     "lambdas.post_notify.app.check_if_notified"
@@ -497,15 +2114,22 @@ class TestLambdaHandler:
                     with patch(
                         "lambdas.post_notify.app.check_if_live_streaming"
                     ) as mock_check_live:
-                        mock_check_live.return_value = "https://example.com/thumb.jpg"
+                        mock_check_live.return_value = {
+                            "test_video_id": "https://example.com/thumb.jpg"
+                        }
                         with patch(
                             "lambdas.post_notify.app.parse_websub_xml"
                         ) as mock_parse_xml:
-                            mock_parse_xml.return_value = {
-                                "video_id": "test_video_id",
-                                "title": "Test Title",
-                                "url": "https://example.com/video",
-                            }
+                            mock_parse_xml.return_value = (
+                                [
+                                    {
+                                        "video_id": "test_video_id",
+                                        "title": "Test Title",
+                                        "url": "https://example.com/video",
+                                    }
+                                ],
+                                [],
+                            )
                             with patch(
                                 "lambdas.post_notify.app.verify_hmac_signature"
                             ) as mock_verify:
@@ -516,6 +2140,55 @@ class TestLambdaHandler:
 
                                 assert result == {"statusCode": 200, "body": "OK"}
 
+    def test_lambda_handler_prefetch_parameters(self):
+        """HMAC署名検証に失敗した場合は、HMACシークレットのみを取得するテスト"""
+        # Given: HMAC署名検証が失敗する
+        from lambdas.post_notify.app import lambda_handler
+
+        with patch("lambdas.post_notify.app.prefetch_parameters") as mock_prefetch:
+            with patch(
+                "lambdas.post_notify.app.verify_hmac_signature"
+            ) as mock_verify_hmac:
+                mock_verify_hmac.return_value = "Verification failed"
+
+                # When: ハンドラーを実行する
+                lambda_handler({"body": "test_xml"}, None)
+
+                # Then: HMACシークレットのパラメータのみがまとめて取得される
+                mock_prefetch.assert_called_once_with(
+                    ["test-hmac-secret-param", "test-hmac-previous-secret-param"]
+                )
+
+    def test_lambda_handler_prefetch_parameters_after_verification(self):
+        """HMAC署名検証に成功した後に、通知に使用するパラメータを取得するテスト"""
+        # Given: HMAC署名検証が成功する
+        from lambdas.post_notify.app import lambda_handler
+
+        with patch("lambdas.post_notify.app.prefetch_parameters") as mock_prefetch:
+            with patch(
+                "lambdas.post_notify.app.verify_hmac_signature"
+            ) as mock_verify_hmac:
+                with (
+                    patch("lambdas.post_notify.app.parse_websub_xml") as mock_parse_xml,
+                    patch("lambdas.post_notify.app.notify_sequentially"),
+                ):
+                    mock_verify_hmac.return_value = None
+                    mock_parse_xml.return_value = ([{"video_id": "test_video_id"}], [])
+
+                    # When: ハンドラーを実行する
+                    lambda_handler({"body": "test_xml"}, None)
+
+                    # Then: HMACシークレット、通知に使用するパラメータの順にまとめて取得される
+                    assert mock_prefetch.call_args_list == [
+                        call(
+                            [
+                                "test-hmac-secret-param",
+                                "test-hmac-previous-secret-param",
+                            ]
+                        ),
+                        call(["test-youtube-api-key-param", "test-phone-number-param"]),
+                    ]
+
     def test_lambda_handler_hmac_verification_failed(self):
         """HMAC検証が失敗した場合のテスト"""
         from lambdas.post_notify.app import lambda_handler
@@ -532,25 +2205,34 @@ class TestLambdaHandler:
         """ライブ配信でない場合のテスト"""
         from lambdas.post_notify.app import lambda_handler
 
-        with patch(
-            "lambdas.post_notify.app.check_if_live_streaming"
-        ) as mock_check_live:
-            mock_check_live.return_value = None
-            with patch("lambdas.post_notify.app.parse_websub_xml") as mock_parse_xml:
-                mock_parse_xml.return_value = {
-                    "video_id": "test_video_id",
-                    "title": "Test Title",
-                    "url": "https://example.com/video",
-                }
+        with patch("lambdas.post_notify.app.check_if_notified") as mock_check_notified:
+            mock_check_notified.return_value = False
+            with patch(
+                "lambdas.post_notify.app.check_if_live_streaming"
+            ) as mock_check_live:
+                mock_check_live.return_value = {"test_video_id": None}
                 with patch(
-                    "lambdas.post_notify.app.verify_hmac_signature"
-                ) as mock_verify:
-                    mock_verify.return_value = None
+                    "lambdas.post_notify.app.parse_websub_xml"
+                ) as mock_parse_xml:
+                    mock_parse_xml.return_value = (
+                        [
+                            {
+                                "video_id": "test_video_id",
+                                "title": "Test Title",
+                                "url": "https://example.com/video",
+                            }
+                        ],
+                        [],
+                    )
+                    with patch(
+                        "lambdas.post_notify.app.verify_hmac_signature"
+                    ) as mock_verify:
+                        mock_verify.return_value = None
 
-                    event = {"body": "test_xml"}
-                    result = lambda_handler(event, None)
+                        event = {"body": "test_xml"}
+                        result = lambda_handler(event, None)
 
-                    assert result == {"statusCode": 200, "body": "OK"}
+                        assert result == {"statusCode": 200, "body": "OK"}
 
     def test_lambda_handler_already_notified(self):
         """すでに通知済みの場合のテスト"""
@@ -561,15 +2243,22 @@ class TestLambdaHandler:
             with patch(
                 "lambdas.post_notify.app.check_if_live_streaming"
             ) as mock_check_live:
-                mock_check_live.return_value = "https://example.com/thumb.jpg"
+                mock_check_live.return_value = {
+                    "test_video_id": "https://example.com/thumb.jpg"
+                }
                 with patch(
                     "lambdas.post_notify.app.parse_websub_xml"
                 ) as mock_parse_xml:
-                    mock_parse_xml.return_value = {
-                        "video_id": "test_video_id",
-                        "title": "Test Title",
-                        "url": "https://example.com/video",
-                    }
+                    mock_parse_xml.return_value = (
+                        [
+                            {
+                                "video_id": "test_video_id",
+                                "title": "Test Title",
+                                "url": "https://example.com/video",
+                            }
+                        ],
+                        [],
+                    )
                     with patch(
                         "lambdas.post_notify.app.verify_hmac_signature"
                     ) as mock_verify:
@@ -580,6 +2269,355 @@ class TestLambdaHandler:
 
                         assert result == {"statusCode": 200, "body": "OK"}
 
+    def test_lambda_handler_already_notified_skips_live_check(self):
+        """通知済の場合にYouTube Data API v3を実行しないテスト"""
+        # Given: 通知済の動画へのプッシュ通知
+        from lambdas.post_notify.app import lambda_handler
+
+        with patch("lambdas.post_notify.app.put_metric") as mock_put_metric:
+            with patch(
+                "lambdas.post_notify.app.check_if_notified"
+            ) as mock_check_notified:
+                mock_check_notified.return_value = True
+                with patch(
+                    "lambdas.post_notify.app.check_if_live_streaming"
+                ) as mock_check_live:
+                    with patch(
+                        "lambdas.post_notify.app.parse_websub_xml"
+                    ) as mock_parse_xml:
+                        mock_parse_xml.return_value = (
+                            [
+                                {
+                                    "video_id": "test_video_id",
+                                    "title": "Test Title",
+                                    "url": "https://example.com/video",
+                                }
+                            ],
+                            [],
+                        )
+                        with patch(
+                            "lambdas.post_notify.app.verify_hmac_signature"
+                        ) as mock_verify:
+                            mock_verify.return_value = None
+
+                            # When: ハンドラーを実行する
+                            result = lambda_handler({"body": "test_xml"}, None)
+
+                            # Then: APIを実行せずに正常終了し、省略した呼び出しを記録する
+                            assert result == {"statusCode": 200, "body": "OK"}
+                            mock_check_notified.assert_called_once_with("test_video_id")
+                            mock_check_live.assert_not_called()
+                            mock_put_metric.assert_called_once_with(
+                                "YouTubeApiCallsSaved", 1
+                            )
+
+    @patch("lambdas.post_notify.app.CHECK_NOTIFIED_BEFORE_LIVE_CHECK", False)
+    def test_lambda_handler_check_notified_after_live_check(self):
+        """通知済判定をYouTube Data API v3の実行後に行う設定のテスト"""
+        # Given: ライブ配信でない動画へのプッシュ通知
+        from lambdas.post_notify.app import lambda_handler
+
+        with patch("lambdas.post_notify.app.put_metric") as mock_put_metric:
+            with patch(
+                "lambdas.post_notify.app.check_if_notified"
+            ) as mock_check_notified:
+                with patch(
+                    "lambdas.post_notify.app.check_if_live_streaming"
+                ) as mock_check_live:
+                    mock_check_live.return_value = {"test_video_id": None}
+                    with patch(
+                        "lambdas.post_notify.app.parse_websub_xml"
+                    ) as mock_parse_xml:
+                        mock_parse_xml.return_value = (
+                            [
+                                {
+                                    "video_id": "test_video_id",
+                                    "title": "Test Title",
+                                    "url": "https://example.com/video",
+                                }
+                            ],
+                            [],
+                        )
+                        with patch(
+                            "lambdas.post_notify.app.verify_hmac_signature"
+                        ) as mock_verify:
+                            mock_verify.return_value = None
+
+                            # When: ハンドラーを実行する
+                            result = lambda_handler({"body": "test_xml"}, None)
+
+                            # Then: APIを実行し、DynamoDBは参照しない
+                            assert result == {"statusCode": 200, "body": "OK"}
+                            mock_check_live.assert_called_once_with(
+                                ["test_video_id"], scheduled_start_times={}
+                            )
+                            mock_check_notified.assert_not_called()
+                            mock_put_metric.assert_not_called()
+
+    @patch("lambdas.post_notify.app.CONCURRENT_STAGES", True)
+    def test_lambda_handler_concurrent_stages(self):
+        """独立したI/O処理を並行実行する設定のテスト"""
+        # Given: 並行実行する設定
+        from lambdas.post_notify.app import lambda_handler
+
+        with patch(
+            "lambdas.post_notify.app.notify_concurrently"
+        ) as mock_notify_concurrently:
+            with patch(
+                "lambdas.post_notify.app.notify_sequentially"
+            ) as mock_notify_sequentially:
+                with patch(
+                    "lambdas.post_notify.app.parse_websub_xml"
+                ) as mock_parse_xml:
+                    mock_parse_xml.return_value = ([{"video_id": "test_video_id"}], [])
+                    with patch(
+                        "lambdas.post_notify.app.verify_hmac_signature"
+                    ) as mock_verify:
+                        mock_verify.return_value = None
+
+                        # When: ハンドラーを実行する
+                        result = lambda_handler({"body": "test_xml"}, None)
+
+                        # Then: 並行実行で処理される
+                        assert result == {"statusCode": 200, "body": "OK"}
+                        mock_notify_concurrently.assert_called_once_with(
+                            [{"video_id": "test_video_id"}]
+                        )
+                        mock_notify_sequentially.assert_not_called()
+
+    def test_lambda_handler_stage_metrics(self, capsys):
+        """ステージごとの所要時間を1行のEMFで出力するテスト"""
+        # Given: 削除された動画のみのプッシュ通知
+        from lambdas.post_notify.app import lambda_handler
+
+        with patch("lambdas.post_notify.app.verify_hmac_signature") as mock_verify:
+            mock_verify.return_value = None
+            with patch("lambdas.post_notify.app.parse_websub_xml") as mock_parse_xml:
+                mock_parse_xml.return_value = ([], ["deleted_video_id"])
+
+                # When: ハンドラーを実行する
+                lambda_handler({"body": "test_xml"}, None)
+
+                # Then: HMAC署名検証・XMLデータの解析のステージが1行で出力される
+                emf_lines = [
+                    json.loads(line)
+                    for line in capsys.readouterr().out.splitlines()
+                    if '"HandlerDuration"' in line
+                ]
+                assert len(emf_lines) == 1
+                assert emf_lines[0]["Handler"] == "lambda_handler"
+                assert emf_lines[0]["StageCalls"] == {"HMAC": 1, "Parse": 1}
+                assert emf_lines[0]["HandlerErrors"] == 0
+
+    def test_lambda_handler_deleted_entry(self):
+        """削除・非公開にされた動画の通知のテスト"""
+        # Given: at:deleted-entryのみのプッシュ通知
+        from lambdas.post_notify.app import lambda_handler
+
+        from ssm_utils import invalidate_parameter_cache, prefetch_parameters
+
+        invalidate_parameter_cache()
+        mock_backend = Mock()
+        mock_backend.get_parameters.return_value = {}
+        with (
+            patch(
+                "lambdas.post_notify.app.record_deleted_videos"
+            ) as mock_record_deleted_videos,
+            patch("lambdas.post_notify.app.prefetch_parameters", prefetch_parameters),
+            patch("ssm_utils.get_parameter_backend", Mock(return_value=mock_backend)),
+        ):
+            with patch(
+                "lambdas.post_notify.app.notify_sequentially"
+            ) as mock_notify_sequentially:
+                with patch(
+                    "lambdas.post_notify.app.parse_websub_xml"
+                ) as mock_parse_xml:
+                    mock_parse_xml.return_value = ([], ["test_video_id"])
+                    with patch(
+                        "lambdas.post_notify.app.verify_hmac_signature"
+                    ) as mock_verify:
+                        mock_verify.return_value = None
+
+                        # When: キャッシュが空の状態でハンドラーを実行する
+                        result = lambda_handler({"body": "test_xml"}, None)
+
+                        # Then: 以降の処理を行わずに正常終了し、
+                        # HMACシークレット以外のパラメータを取得しない
+                        assert result == {"statusCode": 200, "body": "OK"}
+                        mock_notify_sequentially.assert_not_called()
+                        mock_record_deleted_videos.assert_not_called()
+                        assert mock_backend.get_parameters.call_args_list == [
+                            call(
+                                [
+                                    "test-hmac-secret-param",
+                                    "test-hmac-previous-secret-param",
+                                ]
+                            )
+                        ]
+        invalidate_parameter_cache()
+
+    @patch("lambdas.post_notify.app.RECORD_DELETED_VIDEOS", True)
+    def test_lambda_handler_deleted_entry_recorded(self):
+        """削除・非公開にされた動画をDynamoDBに記録する設定のテスト"""
+        # Given: DynamoDBに記録する設定
+        from lambdas.post_notify.app import lambda_handler
+
+        with patch(
+            "lambdas.post_notify.app.record_deleted_videos"
+        ) as mock_record_deleted_videos:
+            with patch("lambdas.post_notify.app.parse_websub_xml") as mock_parse_xml:
+                mock_parse_xml.return_value = ([], ["test_video_id"])
+                with patch(
+                    "lambdas.post_notify.app.verify_hmac_signature"
+                ) as mock_verify:
+                    mock_verify.return_value = None
+
+                    # When: ハンドラーを実行する
+                    result = lambda_handler({"body": "test_xml"}, None)
+
+                    # Then: 削除された動画を記録して正常終了する
+                    assert result == {"statusCode": 200, "body": "OK"}
+                    mock_record_deleted_videos.assert_called_once_with(
+                        ["test_video_id"]
+                    )
+
+    @patch("lambdas.post_notify.app.ASYNC_PROCESSING", True)
+    def test_lambda_handler_async_processing(self):
+        """非同期処理時にキューに送信して即座に応答するテスト"""
+        # Given: 非同期処理の設定
+        from lambdas.post_notify.app import lambda_handler
+
+        with patch("lambdas.post_notify.app.prefetch_parameters") as mock_prefetch:
+            with patch(
+                "lambdas.post_notify.app.process_notification"
+            ) as mock_process_notification:
+                with patch(
+                    "lambdas.post_notify.app.get_notify_queue"
+                ) as mock_get_notify_queue:
+                    with patch(
+                        "lambdas.post_notify.app.verify_hmac_signature"
+                    ) as mock_verify:
+                        mock_verify.return_value = None
+
+                        # When: ハンドラーを実行する
+                        result = lambda_handler({"body": "test_xml"}, None)
+
+                        # Then: HMAC署名検証のパラメータのみを取得し、
+                        # 本文をキューに送信して202を返す
+                        assert result == {"statusCode": 202, "body": "Accepted"}
+                        mock_prefetch.assert_called_once_with(
+                            [
+                                "test-hmac-secret-param",
+                                "test-hmac-previous-secret-param",
+                            ]
+                        )
+                        mock_get_notify_queue.return_value.send.assert_called_once_with(
+                            b"test_xml"
+                        )
+                        mock_process_notification.assert_not_called()
+
+    @patch("lambdas.post_notify.app.ASYNC_PROCESSING", True)
+    def test_lambda_handler_async_processing_hmac_failed(self):
+        """非同期処理時にHMAC署名検証が失敗した場合のテスト"""
+        # Given: HMAC署名検証が失敗する
+        from lambdas.post_notify.app import lambda_handler
+
+        with patch("lambdas.post_notify.app.get_notify_queue") as mock_get_notify_queue:
+            with patch("lambdas.post_notify.app.verify_hmac_signature") as mock_verify:
+                mock_verify.return_value = "Verification failed"
+
+                # When: ハンドラーを実行する
+                result = lambda_handler({"body": "test_xml"}, None)
+
+                # Then: キューに送信せずに400を返す
+                assert result == {"statusCode": 400, "body": "Verification failed"}
+                mock_get_notify_queue.assert_not_called()
+
+    @patch("lambdas.post_notify.app.ASYNC_PROCESSING", True)
+    def test_lambda_handler_async_processing_send_failed(self):
+        """非同期処理時にキューへの送信に失敗した場合のテスト"""
+        # Given: キューへの送信が失敗する
+        from lambdas.post_notify.app import lambda_handler
+
+        with patch("lambdas.post_notify.app.get_notify_queue") as mock_get_notify_queue:
+            mock_get_notify_queue.return_value.send.side_effect = Exception("error")
+            with patch("lambdas.post_notify.app.verify_hmac_signature") as mock_verify:
+                mock_verify.return_value = None
+
+                # When: ハンドラーを実行する
+                result = lambda_handler({"body": "test_xml"}, None)
+
+                # Then: Hubが再送するように500を返す
+                assert result == {"statusCode": 500, "body": "Internal Server Error"}
+
+    def test_lambda_handler_quota_exceeded(self):
+        """クオーターの予算を使い切った場合のテスト"""
+        # Given: ライブ配信判定でクオーターの予算を超える
+        from lambdas.post_notify.app import lambda_handler
+        from youtube_quota import QuotaExceededError
+
+        with patch.multiple(
+            "lambdas.post_notify.app",
+            verify_hmac_signature=DEFAULT,
+            parse_websub_xml=DEFAULT,
+            notify_sequentially=DEFAULT,
+            put_metric=DEFAULT,
+        ) as mocks:
+            mocks["verify_hmac_signature"].return_value = None
+            mocks["parse_websub_xml"].return_value = ([{"video_id": "video_a"}], [])
+            mocks["notify_sequentially"].side_effect = QuotaExceededError("exceeded")
+
+            # When: ハンドラーを実行する
+            result = lambda_handler({"body": "test_xml"}, None)
+
+            # Then: Hubが再送しないように正常終了し、メトリクスを送信する
+            assert result == {"statusCode": 200, "body": "OK"}
+            mocks["put_metric"].assert_called_once_with("YouTubeQuotaDegraded", 1)
+
+    def test_lambda_handler_circuit_open(self):
+        """依存サービスのサーキットブレーカーがオープンの場合のテスト"""
+        # Given: ライブ配信判定でサーキットブレーカーがオープン
+        from circuit_breaker import CircuitOpenError
+        from lambdas.post_notify.app import lambda_handler
+
+        with patch.multiple(
+            "lambdas.post_notify.app",
+            verify_hmac_signature=DEFAULT,
+            parse_websub_xml=DEFAULT,
+            notify_sequentially=DEFAULT,
+        ) as mocks:
+            mocks["verify_hmac_signature"].return_value = None
+            mocks["parse_websub_xml"].return_value = ([{"video_id": "video_a"}], [])
+            mocks["notify_sequentially"].side_effect = CircuitOpenError("youtube")
+
+            # When: ハンドラーを実行する
+            result = lambda_handler({"body": "test_xml"}, None)
+
+            # Then: Hubに時間をおいて再送させる
+            assert result == {"statusCode": 503, "body": "Service Unavailable"}
+
+    def test_lambda_handler_rate_limited(self):
+        """呼び出し頻度の上限を超えた場合のテスト"""
+        # Given: ライブ配信判定で呼び出し頻度の上限を超える
+        from lambdas.post_notify.app import lambda_handler
+        from youtube_quota import RateLimitedError
+
+        with patch.multiple(
+            "lambdas.post_notify.app",
+            verify_hmac_signature=DEFAULT,
+            parse_websub_xml=DEFAULT,
+            notify_sequentially=DEFAULT,
+        ) as mocks:
+            mocks["verify_hmac_signature"].return_value = None
+            mocks["parse_websub_xml"].return_value = ([{"video_id": "video_a"}], [])
+            mocks["notify_sequentially"].side_effect = RateLimitedError("limited")
+
+            # When: ハンドラーを実行する
+            result = lambda_handler({"body": "test_xml"}, None)
+
+            # Then: Hubに再送させる
+            assert result == {"statusCode": 429, "body": "Too Many Requests"}
+
     def test_lambda_handler_exception(self):
         """例外が発生した場合のテスト"""
         from lambdas.post_notify.app import lambda_handler
@@ -591,3 +2629,272 @@ class TestLambdaHandler:
             result = lambda_handler(event, None)
 
             assert result == {"statusCode": 500, "body": "Internal Server Error"}
+
+
+@patch.dict(
+    os.environ,
+    {
+        "DYNAMODB_TABLE": "test-dynamodb-table",
+        "NOTIFY_QUEUE_BACKEND": "local",
+        "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
+        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
+        "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
+    },
+)
+@patch("lambdas.post_notify.app.prefetch_parameters", Mock())
+class TestQueueHandler:
+    """queue_handler関数のテスト"""
+
+    def test_queue_handler_success(self):
+        """キューのメッセージを処理するテスト"""
+        # Given: 2件のメッセージ
+        from lambdas.post_notify.app import queue_handler
+
+        event = {
+            "Records": [
+                {"messageId": "1", "body": "<feed>1</feed>"},
+                {"messageId": "2", "body": "<feed>2</feed>"},
+            ]
+        }
+        with patch(
+            "lambdas.post_notify.app.process_notification"
+        ) as mock_process_notification:
+            # When: ハンドラーを実行する
+            result = queue_handler(event, None)
+
+            # Then: すべてのメッセージの本文をバイト列で処理する
+            assert result == {"batchItemFailures": []}
+            assert [c.args for c in mock_process_notification.call_args_list] == [
+                (b"<feed>1</feed>",),
+                (b"<feed>2</feed>",),
+            ]
+
+    def test_queue_handler_partial_failure(self):
+        """一部のメッセージの処理に失敗した場合のテスト"""
+        # Given: 1件目のメッセージの処理が失敗する
+        from lambdas.post_notify.app import queue_handler
+
+        event = {
+            "Records": [
+                {"messageId": "1", "body": "<feed>1</feed>"},
+                {"messageId": "2", "body": "<feed>2</feed>"},
+            ]
+        }
+        with patch(
+            "lambdas.post_notify.app.process_notification"
+        ) as mock_process_notification:
+            mock_process_notification.side_effect = [Exception("error"), None]
+
+            # When: ハンドラーを実行する
+            result = queue_handler(event, None)
+
+            # Then: 失敗したメッセージのみを再試行させる
+            assert result == {"batchItemFailures": [{"itemIdentifier": "1"}]}
+            assert mock_process_notification.call_count == 2
+
+    def test_queue_handler_local_queue(self):
+        """プロセス内のキューを経由して非同期に処理するテスト"""
+        # Given: プロセス内のキューを使用する非同期処理の設定
+        from notify_queue import LocalNotifyQueue, register_notify_queue
+
+        from lambdas.post_notify.app import lambda_handler, queue_handler
+
+        queue = LocalNotifyQueue()
+        register_notify_queue("local", queue)
+        try:
+            with patch("lambdas.post_notify.app.ASYNC_PROCESSING", True):
+                with patch(
+                    "lambdas.post_notify.app.process_notification"
+                ) as mock_process_notification:
+                    with patch(
+                        "lambdas.post_notify.app.verify_hmac_signature"
+                    ) as mock_verify:
+                        mock_verify.return_value = None
+
+                        # When: プッシュ通知を受信し、キューのメッセージを処理する
+                        result = lambda_handler({"body": "<feed/>"}, None)
+                        mock_process_notification.assert_not_called()
+                        queue_result = queue_handler(queue.receive_event(), None)
+
+                        # Then: 受信時は即座に応答し、キューの処理で本文を処理する
+                        assert result == {"statusCode": 202, "body": "Accepted"}
+                        assert queue_result == {"batchItemFailures": []}
+                        mock_process_notification.assert_called_once_with(b"<feed/>")
+        finally:
+            register_notify_queue("local", None)
+
+
+@patch.dict(
+    os.environ,
+    {
+        "DYNAMODB_TABLE": "test-dynamodb-table",
+        "SMS_PHONE_NUMBER_PARAMETER_NAME": "test-phone-number-param",
+        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
+        "YOUTUBE_API_KEY_PARAMETER_NAME": "test-youtube-api-key-param",
+    },
+)
+class TestRecheckUpcomingVideos:
+    """recheck_upcoming_videos関数・recheck_handler関数のテスト"""
+
+    def _patch_stages(self):
+        """再判定で実行する処理をまとめてモックする"""
+        return patch.multiple(
+            "lambdas.post_notify.app",
+            get_due_upcoming_videos=DEFAULT,
+            check_if_live_streaming=DEFAULT,
+            cancel_recheck=DEFAULT,
+            schedule_recheck=DEFAULT,
+            claim_video=DEFAULT,
+            send_sms_notification=DEFAULT,
+            release_claim=DEFAULT,
+        )
+
+    def test_recheck_upcoming_videos_success(self):
+        """再判定日時を過ぎた動画を再判定するテスト"""
+        # Given: video_aはライブ配信中、video_bは引き続きライブ配信予定、
+        # video_cはライブ配信予定でなくなった
+        from lambdas.post_notify.app import recheck_upcoming_videos
+
+        def check_if_live_streaming(video_ids, scheduled_start_times, low_priority):
+            assert low_priority
+            scheduled_start_times["video_b"] = 1234567890
+            return {"video_a": "https://a.jpg", "video_b": None, "video_c": None}
+
+        with self._patch_stages() as mocks:
+            mocks["get_due_upcoming_videos"].return_value = [
+                {"video_id": "video_a", "title": "A", "url": "https://a"},
+                {"video_id": "video_b", "title": "B", "url": "https://b"},
+                {"video_id": "video_c", "title": "C", "url": "https://c"},
+            ]
+            mocks["check_if_live_streaming"].side_effect = check_if_live_streaming
+            mocks["claim_video"].return_value = {"recheck_status": {"S": "upcoming"}}
+
+            # When: 再判定する
+            result = recheck_upcoming_videos()
+
+            # Then: video_aを通知して再判定の対象から除外し、
+            # video_bの再判定日時を更新し、video_cを除外する
+            assert result == 3
+            mocks["send_sms_notification"].assert_called_once_with(
+                "A", "https://a", "https://a.jpg"
+            )
+            mocks["schedule_recheck"].assert_called_once_with(
+                {"video_id": "video_b", "title": "B", "url": "https://b"}, 1234567890
+            )
+            assert sorted(
+                c.args[0] for c in mocks["cancel_recheck"].call_args_list
+            ) == [
+                "video_a",
+                "video_c",
+            ]
+
+    def test_recheck_upcoming_videos_already_notified(self):
+        """再判定の対象のまま通知済の動画を再判定の対象から除外するテスト"""
+        # Given: 通知した実行で再判定の対象からの除外に失敗し、ライブ配信中のまま残った動画
+        from lambdas.post_notify.app import recheck_upcoming_videos
+
+        with self._patch_stages() as mocks:
+            mocks["get_due_upcoming_videos"].return_value = [
+                {"video_id": "video_a", "title": "A", "url": "https://a"},
+                {"video_id": "video_b", "title": "B", "url": "https://b"},
+            ]
+            mocks["check_if_live_streaming"].return_value = {
+                "video_a": "https://a.jpg",
+                "video_b": "https://b.jpg",
+            }
+            mocks["claim_video"].return_value = None
+            mocks["cancel_recheck"].side_effect = [Exception("DynamoDB error"), None]
+
+            # When: 再判定する
+            result = recheck_upcoming_videos()
+
+            # Then: クレームを獲得できない動画はSMS通知せずに再判定の対象から除外し、
+            # 除外に失敗しても残りの動画の再判定を続ける
+            assert result == 2
+            mocks["send_sms_notification"].assert_not_called()
+            assert [c.args[0] for c in mocks["cancel_recheck"].call_args_list] == [
+                "video_a",
+                "video_b",
+            ]
+
+    def test_recheck_upcoming_videos_quota_degraded(self):
+        """クオーターの残りが少ない場合に再判定を見送るテスト"""
+        # Given: 優先度の低い判定がクオーターの予約分に達している
+        from lambdas.post_notify.app import recheck_upcoming_videos
+        from youtube_quota import QuotaExceededError
+
+        with self._patch_stages() as mocks:
+            mocks["get_due_upcoming_videos"].return_value = [
+                {"video_id": "video_a", "title": "A", "url": "https://a"},
+            ]
+            mocks["check_if_live_streaming"].side_effect = QuotaExceededError("low")
+            with patch("lambdas.post_notify.app.put_metric") as mock_put_metric:
+                # When: 再判定する
+                result = recheck_upcoming_videos()
+
+                # Then: 再判定日時を更新せずに次回以降に見送る
+                assert result == 0
+                mocks["schedule_recheck"].assert_not_called()
+                mocks["cancel_recheck"].assert_not_called()
+                mocks["send_sms_notification"].assert_not_called()
+                mock_put_metric.assert_called_once_with("YouTubeQuotaDegraded", 1)
+
+    def test_recheck_upcoming_videos_nothing_due(self):
+        """再判定日時を過ぎた動画がない場合のテスト"""
+        # Given: 再判定日時を過ぎた動画がない
+        from lambdas.post_notify.app import recheck_upcoming_videos
+
+        with self._patch_stages() as mocks:
+            mocks["get_due_upcoming_videos"].return_value = []
+
+            # When: 再判定する
+            result = recheck_upcoming_videos()
+
+            # Then: YouTube Data API v3を実行しない
+            assert result == 0
+            mocks["check_if_live_streaming"].assert_not_called()
+
+    @patch("lambdas.post_notify.app.prefetch_parameters", Mock())
+    def test_recheck_handler_success(self):
+        """再判定のLambda関数ハンドラーの成功実行テスト"""
+        from lambdas.post_notify.app import recheck_handler
+
+        with patch(
+            "lambdas.post_notify.app.recheck_upcoming_videos"
+        ) as mock_recheck_upcoming_videos:
+            mock_recheck_upcoming_videos.return_value = 1
+
+            assert recheck_handler({}, None) == {"statusCode": 200, "body": "OK"}
+
+    @patch("lambdas.post_notify.app.prefetch_parameters", Mock())
+    @patch("lambdas.post_notify.app.prefetch_parameters", Mock())
+    def test_recheck_handler_circuit_open(self):
+        """依存サービスのサーキットブレーカーがオープンの場合のテスト"""
+        from circuit_breaker import CircuitOpenError
+        from lambdas.post_notify.app import recheck_handler
+
+        with patch(
+            "lambdas.post_notify.app.recheck_upcoming_videos"
+        ) as mock_recheck_upcoming_videos:
+            mock_recheck_upcoming_videos.side_effect = CircuitOpenError("dynamodb")
+
+            assert recheck_handler({}, None) == {
+                "statusCode": 503,
+                "body": "Service Unavailable",
+            }
+
+    def test_recheck_handler_exception(self):
+        """再判定で例外が発生した場合のテスト"""
+        from lambdas.post_notify.app import recheck_handler
+
+        with patch(
+            "lambdas.post_notify.app.recheck_upcoming_videos"
+        ) as mock_recheck_upcoming_videos:
+            mock_recheck_upcoming_videos.side_effect = Exception("error")
+
+            assert recheck_handler({}, None) == {
+                "statusCode": 500,
+                "body": "Internal Server Error",
+            }
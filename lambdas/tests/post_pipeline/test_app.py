@@ -70,7 +70,8 @@ class TestSendFailureSms:
 
         with patch("lambdas.post_pipeline.app.get_parameter_value") as mock_get_param:
             mock_get_param.return_value = "+818098765432"
-            with patch("lambdas.post_pipeline.app.sns_client") as mock_sns_client:
+            with patch("lambdas.post_pipeline.app.get_client") as mock_get_client:
+                mock_sns_client = mock_get_client.return_value
                 # When: SMS通知を送信する
                 send_failure_sms("Test failure message")
 
@@ -80,6 +81,25 @@ class TestSendFailureSms:
                     Message="Test failure message",
                 )
 
+    def test_send_failure_sms_multiple_recipients(self):
+        """複数の電話番号に送信する場合のテスト"""
+        # Given: カンマ区切りの2つの電話番号のうち、1つへの送信が失敗する
+        from lambdas.post_pipeline.app import send_failure_sms
+
+        with patch("lambdas.post_pipeline.app.get_parameter_value") as mock_get_param:
+            mock_get_param.return_value = "+818011112222,+818033334444"
+            with patch("lambdas.post_pipeline.app.get_client") as mock_get_client:
+                mock_sns_client = mock_get_client.return_value
+                mock_sns_client.publish.side_effect = [Exception("SNS error"), None]
+                with patch("sms_fanout.put_metric"):
+                    # When: SMS通知を送信する
+                    send_failure_sms("Test failure message")
+
+                # Then: 失敗した電話番号があっても、すべての電話番号に送信する
+                assert sorted(
+                    c[1]["PhoneNumber"] for c in mock_sns_client.publish.call_args_list
+                ) == ["+818011112222", "+818033334444"]
+
     def test_send_failure_sms_ssm_failure(self):
         """SSM取得が失敗した場合のテスト"""
         # Given: SSM取得が例外を送出する
@@ -0,0 +1,53 @@
+"""scripts/replay_benchmark.pyのスモークテスト"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# リポジトリのルートディレクトリ
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+# レイテンシーを0とした場合に、ステージの所要時間の中央値がほぼ0とみなせる上限(ミリ秒)
+# スタブHTTPサーバーでNagleアルゴリズムと遅延ACKが重なると約40ミリ秒となるため、それより十分小さくする
+MAX_STAGE_P50_MS = 15
+
+
+class TestReplayBenchmark:  # pylint: disable=too-few-public-methods
+    """replay_benchmark.pyのテスト"""
+
+    def test_replay_zero_latency(self, tmp_path):
+        """レイテンシーを0としてリプレイした場合に、ステージの所要時間がほぼ0となるテスト"""
+        # Given: スタブHTTPサーバー・フェイクのAWSのレイテンシーを0とする
+        output: Path = tmp_path / "report.json"
+
+        # When: 少数のイベントをリプレイする
+        # ハンドラーのモジュール・環境変数を書き換えるため、別のプロセスで実行する
+        subprocess.run(
+            [
+                sys.executable,
+                str(REPO_ROOT / "scripts" / "replay_benchmark.py"),
+                "--events",
+                "60",
+                "--warmup",
+                "5",
+                "--http-latency-ms",
+                "0",
+                "--aws-latency-ms",
+                "0",
+                "--output",
+                str(output),
+            ],
+            cwd=REPO_ROOT,
+            check=True,
+            capture_output=True,
+            timeout=120,
+        )
+
+        # Then: すべてのハンドラーがエラーなく実行され、ステージの所要時間の中央値がほぼ0となる
+        report = json.loads(output.read_text(encoding="utf-8"))
+        assert report["handlers"]["post_notify.lambda_handler"]["stages"]["YouTube"]
+        for handler_name, summary in report["handlers"].items():
+            assert summary["errors"] == 0, handler_name
+            for stage_name, stage in summary["stages"].items():
+                assert stage["p50"] < MAX_STAGE_P50_MS, (handler_name, stage_name)
@@ -1,6 +1,8 @@
 """Google PubSubHubbubのサブスクリプションを再登録するユニットテスト"""
 
+import json
 import os
+import time
 from unittest.mock import Mock, patch
 
 import pytest
@@ -15,7 +17,9 @@ import requests
         "PUBSUBHUBBUB_HUB_URL": "https://pubsubhubbub.appspot.com/",
         "LEASE_SECONDS": "828000",
         "HMAC_SECRET_LENGTH": "32",
+        "HMAC_SECRET_OVERLAP_SECONDS": "3600",
         "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
         "YOUTUBE_CHANNEL_ID_PARAMETER_NAME": "test-channel-id-param",
         "WEBSUB_CALLBACK_URL_PARAMETER_NAME": "test-callback-url-param",
     },
@@ -27,7 +31,7 @@ class TestSubscribeToPubsubhubbub:
         """PubSubHubbubへのサブスクリプション成功テスト"""
         from lambdas.websub.app import subscribe_to_pubsubhubbub
 
-        with patch("lambdas.websub.app.requests.post") as mock_requests_post:
+        with patch("lambdas.websub.app.http_post") as mock_requests_post:
             mock_response = Mock()
             mock_response.status_code = 202
             mock_response.text = "Accepted"
@@ -49,7 +53,7 @@ class TestSubscribeToPubsubhubbub:
         """PubSubHubbubへのサブスクリプション失敗テスト"""
         from lambdas.websub.app import subscribe_to_pubsubhubbub
 
-        with patch("lambdas.websub.app.requests.post") as mock_requests_post:
+        with patch("lambdas.websub.app.http_post") as mock_requests_post:
             mock_response = Mock()
             mock_response.status_code = 400
             mock_response.text = "Bad Request"
@@ -66,7 +70,7 @@ class TestSubscribeToPubsubhubbub:
         """サブスクリプションリクエストの正しいデータ形式テスト"""
         from lambdas.websub.app import subscribe_to_pubsubhubbub
 
-        with patch("lambdas.websub.app.requests.post") as mock_requests_post:
+        with patch("lambdas.websub.app.http_post") as mock_requests_post:
             mock_response = Mock()
             mock_response.status_code = 202
             mock_response.text = "Accepted"
@@ -91,7 +95,7 @@ class TestSubscribeToPubsubhubbub:
         """サブスクリプションリクエストの正しいヘッダーテスト"""
         from lambdas.websub.app import subscribe_to_pubsubhubbub
 
-        with patch("lambdas.websub.app.requests.post") as mock_requests_post:
+        with patch("lambdas.websub.app.http_post") as mock_requests_post:
             mock_response = Mock()
             mock_response.status_code = 202
             mock_response.text = "Accepted"
@@ -109,11 +113,30 @@ class TestSubscribeToPubsubhubbub:
             assert headers["Content-Type"] == "application/x-www-form-urlencoded"
             assert headers["User-Agent"] == "YTLiveMetaData-WebSub/1.0"
 
+    def test_subscribe_to_pubsubhubbub_lease_seconds(self):
+        """チャンネルごとのサブスクリプションの有効期間を指定するテスト"""
+        # Given: 有効期間432000秒を指定する
+        from lambdas.websub.app import subscribe_to_pubsubhubbub
+
+        with patch("lambdas.websub.app.http_post") as mock_requests_post:
+            mock_requests_post.return_value = Mock(status_code=202, text="Accepted")
+
+            # When: サブスクリプションを登録する
+            subscribe_to_pubsubhubbub(
+                channel_id="test_channel_id",
+                callback_url="https://example.com/callback",
+                hmac_secret="test_secret",
+                lease_seconds=432000,
+            )
+
+            # Then: 指定した有効期間で登録する
+            assert "hub.lease_seconds=432000" in mock_requests_post.call_args[1]["data"]
+
     def test_subscribe_to_pubsubhubbub_429_retry_success(self):
         """429スロットリングエラー後の再試行成功テスト"""
         from lambdas.websub.app import subscribe_to_pubsubhubbub
 
-        with patch("lambdas.websub.app.requests.post") as mock_requests_post:
+        with patch("lambdas.websub.app.http_post") as mock_requests_post:
             with patch("lambdas.websub.app.time.sleep") as mock_sleep:
                 # 最初の呼び出しは429、2回目の呼び出しは202を返す
                 mock_response_429 = Mock()
@@ -132,7 +155,7 @@ class TestSubscribeToPubsubhubbub:
                     hmac_secret="test_secret",
                 )
 
-                # requests.postが2回呼び出されることを検証
+                # http_postが2回呼び出されることを検証
                 assert mock_requests_post.call_count == 2
                 # sleepが1秒遅延（BASE_DELAY * 2^0）で1回呼び出されることを検証
                 mock_sleep.assert_called_once_with(1.0)
@@ -141,7 +164,7 @@ class TestSubscribeToPubsubhubbub:
         """429エラーの最大再試行回数超過後の失敗テスト"""
         from lambdas.websub.app import subscribe_to_pubsubhubbub
 
-        with patch("lambdas.websub.app.requests.post") as mock_requests_post:
+        with patch("lambdas.websub.app.http_post") as mock_requests_post:
             with patch("lambdas.websub.app.time.sleep") as mock_sleep:
                 # 常に429を返す
                 mock_response = Mock()
@@ -158,7 +181,7 @@ class TestSubscribeToPubsubhubbub:
                         hmac_secret="test_secret",
                     )
 
-                # requests.postが6回（初回 + 5回再試行）呼び出されることを検証
+                # http_postが6回（初回 + 5回再試行）呼び出されることを検証
                 assert mock_requests_post.call_count == 6
                 # sleepが指数バックオフで5回呼び出されることを検証
                 assert mock_sleep.call_count == 5
@@ -170,7 +193,7 @@ class TestSubscribeToPubsubhubbub:
         """ネットワークエラーの即座の失敗テスト（再試行なし）"""
         from lambdas.websub.app import subscribe_to_pubsubhubbub
 
-        with patch("lambdas.websub.app.requests.post") as mock_requests_post:
+        with patch("lambdas.websub.app.http_post") as mock_requests_post:
             with patch("lambdas.websub.app.time.sleep") as mock_sleep:
                 # ネットワークエラーは再試行すべきでない
                 mock_requests_post.side_effect = requests.exceptions.ConnectionError(
@@ -184,7 +207,7 @@ class TestSubscribeToPubsubhubbub:
                         hmac_secret="test_secret",
                     )
 
-                # requests.postが1回のみ（再試行なし）呼び出されることを検証
+                # http_postが1回のみ（再試行なし）呼び出されることを検証
                 assert mock_requests_post.call_count == 1
                 # sleepが呼び出されないことを検証
                 mock_sleep.assert_not_called()
@@ -193,7 +216,7 @@ class TestSubscribeToPubsubhubbub:
         """再試行不可能なエラーの即座の失敗テスト（429、ネットワーク以外）"""
         from lambdas.websub.app import subscribe_to_pubsubhubbub
 
-        with patch("lambdas.websub.app.requests.post") as mock_requests_post:
+        with patch("lambdas.websub.app.http_post") as mock_requests_post:
             with patch("lambdas.websub.app.time.sleep") as mock_sleep:
                 # 500エラー（再試行不可能）を返す
                 mock_response = Mock()
@@ -210,7 +233,7 @@ class TestSubscribeToPubsubhubbub:
                         hmac_secret="test_secret",
                     )
 
-                # requests.postが1回のみ（再試行なし）呼び出されることを検証
+                # http_postが1回のみ（再試行なし）呼び出されることを検証
                 assert mock_requests_post.call_count == 1
                 # sleepが呼び出されないことを検証
                 mock_sleep.assert_not_called()
@@ -222,11 +245,17 @@ class TestSubscribeToPubsubhubbub:
         "PUBSUBHUBBUB_HUB_URL": "https://pubsubhubbub.appspot.com/",
         "LEASE_SECONDS": "828000",
         "HMAC_SECRET_LENGTH": "32",
+        "HMAC_SECRET_OVERLAP_SECONDS": "3600",
         "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
         "YOUTUBE_CHANNEL_ID_PARAMETER_NAME": "test-channel-id-param",
         "WEBSUB_CALLBACK_URL_PARAMETER_NAME": "test-callback-url-param",
     },
 )
+@patch("lambdas.websub.app.prefetch_parameters", Mock())
+@patch("lambdas.websub.app.get_current_hmac_secret", Mock(return_value=None))
+@patch("lambdas.websub.app.get_previous_hmac_secret", Mock(return_value=None))
+@patch("lambdas.websub.app.put_parameter_value", Mock())
 class TestLambdaHandler:
     """lambda_handler関数のテスト"""
 
@@ -236,7 +265,9 @@ class TestLambdaHandler:
 
         with patch("lambdas.websub.app.subscribe_to_pubsubhubbub") as mock_subscribe:
             with patch("lambdas.websub.app.secrets.token_hex") as mock_token_hex:
-                with patch("lambdas.websub.app.ssm_client") as mock_ssm_client:
+                with patch(
+                    "lambdas.websub.app.put_parameter_value"
+                ) as mock_put_parameter:
                     with patch(
                         "lambdas.websub.app.get_parameter_value"
                     ) as mock_get_parameter:
@@ -259,13 +290,11 @@ class TestLambdaHandler:
                             channel_id="test_channel_id",
                             callback_url="https://example.com/callback",
                             hmac_secret="test_secret_hex",
+                            lease_seconds=None,
                         )
                         # HMACシークレットがParameter Storeに保存されることを検証
-                        mock_ssm_client.put_parameter.assert_called_once_with(
-                            Name="test-hmac-secret-param",
-                            Value="test_secret_hex",
-                            Type="SecureString",
-                            Overwrite=True,
+                        mock_put_parameter.assert_called_once_with(
+                            "test-hmac-secret-param", "test_secret_hex"
                         )
 
     def test_lambda_handler_get_parameter_exception(self):
@@ -306,7 +335,7 @@ class TestLambdaHandler:
 
     def test_lambda_handler_subscribe_exception(self):
         """subscribe_to_pubsubhubbubで例外が発生した場合のLambda関数ハンドラーテスト"""
-        from lambdas.websub.app import lambda_handler
+        from lambdas.websub.app import SubscriptionError, lambda_handler
 
         with patch("lambdas.websub.app.subscribe_to_pubsubhubbub") as mock_subscribe:
             with patch("lambdas.websub.app.secrets.token_hex") as mock_token_hex:
@@ -322,18 +351,19 @@ class TestLambdaHandler:
 
                     event = {}
 
-                    result = lambda_handler(event, None)
-
-                    assert result["statusCode"] == 500
-                    assert result["body"] == "Internal server error"
+                    # 非同期呼び出しで再試行されるように例外が送出される
+                    with pytest.raises(SubscriptionError):
+                        lambda_handler(event, None)
 
     def test_lambda_handler_ssm_put_parameter_exception(self):
-        """ssm_client.put_parameterで例外が発生した場合のLambda関数ハンドラーテスト"""
+        """put_parameter_valueで例外が発生した場合のLambda関数ハンドラーテスト"""
         from lambdas.websub.app import lambda_handler
 
         with patch("lambdas.websub.app.subscribe_to_pubsubhubbub") as mock_subscribe:
             with patch("lambdas.websub.app.secrets.token_hex") as mock_token_hex:
-                with patch("lambdas.websub.app.ssm_client") as mock_ssm_client:
+                with patch(
+                    "lambdas.websub.app.put_parameter_value"
+                ) as mock_put_parameter:
                     with patch(
                         "lambdas.websub.app.get_parameter_value"
                     ) as mock_get_parameter:
@@ -342,7 +372,7 @@ class TestLambdaHandler:
                             "https://example.com/callback",
                         ]
                         mock_token_hex.return_value = "test_secret_hex"
-                        mock_ssm_client.put_parameter.side_effect = Exception(
+                        mock_put_parameter.side_effect = Exception(
                             "SSM parameter store error"
                         )
 
@@ -352,8 +382,8 @@ class TestLambdaHandler:
 
                         assert result["statusCode"] == 500
                         assert result["body"] == "Internal server error"
-                        # subscribe_to_pubsubhubbub は成功している必要がある
-                        mock_subscribe.assert_called_once()
+                        # HMACシークレットを保存できない場合はサブスクリプションを登録しない
+                        mock_subscribe.assert_not_called()
 
     def test_lambda_handler_parameter_order(self):
         """Lambda関数ハンドラーでのパラメータ取得順序テスト"""
@@ -361,7 +391,7 @@ class TestLambdaHandler:
 
         with patch("lambdas.websub.app.subscribe_to_pubsubhubbub"):
             with patch("lambdas.websub.app.secrets.token_hex") as mock_token_hex:
-                with patch("lambdas.websub.app.ssm_client"):
+                with patch("lambdas.websub.app.put_parameter_value"):
                     with patch(
                         "lambdas.websub.app.get_parameter_value"
                     ) as mock_get_parameter:
@@ -384,3 +414,347 @@ class TestLambdaHandler:
                             call[0] for call in mock_get_parameter.call_args_list
                         ]
                         assert actual_calls == expected_calls
+
+    def test_lambda_handler_subscribe_exception_restores_secret(self):
+        """サブスクリプション登録失敗時にHMACシークレットを元に戻すテスト"""
+        # Given: ローテーション前のHMACシークレットが存在し、サブスクリプション登録が失敗する
+        from lambdas.websub.app import SubscriptionError, lambda_handler
+
+        with patch("lambdas.websub.app.subscribe_to_pubsubhubbub") as mock_subscribe:
+            with patch("lambdas.websub.app.secrets.token_hex") as mock_token_hex:
+                with patch("lambdas.websub.app.rotate_hmac_secret") as mock_rotate:
+                    with patch(
+                        "lambdas.websub.app.put_parameter_value"
+                    ) as mock_put_parameter:
+                        with patch(
+                            "lambdas.websub.app.get_parameter_value"
+                        ) as mock_get_parameter:
+                            mock_get_parameter.side_effect = [
+                                "test_channel_id",
+                                "https://example.com/callback",
+                            ]
+                            mock_token_hex.return_value = "test_secret_hex"
+                            mock_rotate.return_value = "old_secret_hex"
+                            mock_subscribe.side_effect = Exception(
+                                "Subscription failed"
+                            )
+
+                            # When/Then: 例外が送出され、元のHMACシークレットが保存される
+                            with pytest.raises(SubscriptionError):
+                                lambda_handler({}, None)
+                            mock_rotate.assert_called_once_with(
+                                "test_secret_hex", 828000
+                            )
+                            assert mock_put_parameter.call_args_list[0][0] == (
+                                "test-hmac-secret-param",
+                                "old_secret_hex",
+                            )
+                            # 再試行でローテーションし直すよう、ローテーション前の
+                            # HMACシークレットを失効させる
+                            assert (
+                                mock_put_parameter.call_args_list[1][0][0]
+                                == "test-hmac-previous-secret-param"
+                            )
+
+
+@patch.dict(
+    os.environ,
+    {
+        "PUBSUBHUBBUB_HUB_URL": "https://pubsubhubbub.appspot.com/",
+        "LEASE_SECONDS": "828000",
+        "HMAC_SECRET_LENGTH": "32",
+        "HMAC_SECRET_OVERLAP_SECONDS": "3600",
+        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
+        "WEBSUB_CALLBACK_URL_PARAMETER_NAME": "test-callback-url-param",
+    },
+)
+@patch("lambdas.websub.app.CHANNEL_REGISTRY_BACKEND", "dynamodb")
+@patch("lambdas.websub.app.prefetch_parameters", Mock())
+@patch(
+    "lambdas.websub.app.get_parameter_value",
+    Mock(return_value="https://example.com/callback"),
+)
+@patch("lambdas.websub.app.secrets.token_hex", Mock(return_value="test_secret_hex"))
+@patch("lambdas.websub.app.get_previous_hmac_secret", Mock(return_value=None))
+class TestLambdaHandlerMultipleChannels:
+    """複数のチャンネルを監視する場合のlambda_handler関数のテスト"""
+
+    def _registry(self):
+        """監視する2チャンネルと監視しない1チャンネルを登録したレジストリを生成する"""
+        from channel_registry import Channel, LocalChannelRegistry
+
+        return LocalChannelRegistry(
+            [
+                Channel("channel_a"),
+                Channel("channel_b", lease_seconds=432000),
+                Channel("channel_c", enabled=False),
+            ]
+        )
+
+    def test_lambda_handler_subscribes_enabled_channels(self):
+        """監視するチャンネルのみを登録するテスト"""
+        # Given: 監視する2チャンネルと監視しない1チャンネル
+        from lambdas.websub.app import lambda_handler
+
+        with patch("lambdas.websub.app.get_channel_registry") as mock_get_registry:
+            mock_get_registry.return_value = self._registry()
+            with patch("lambdas.websub.app.rotate_hmac_secret") as mock_rotate:
+                mock_rotate.return_value = None
+                with patch(
+                    "lambdas.websub.app.subscribe_to_pubsubhubbub"
+                ) as mock_subscribe:
+                    # When: ハンドラーを実行する
+                    result = lambda_handler({}, None)
+
+                    # Then: 同じHMACシークレットで、チャンネルごとの有効期間で登録する
+                    assert result["statusCode"] == 200
+                    mock_rotate.assert_called_once_with("test_secret_hex", 828000)
+                    subscribed = {
+                        c[1]["channel_id"]: c[1]["lease_seconds"]
+                        for c in mock_subscribe.call_args_list
+                    }
+                    assert subscribed == {"channel_a": None, "channel_b": 432000}
+                    assert {
+                        c[1]["hmac_secret"] for c in mock_subscribe.call_args_list
+                    } == {"test_secret_hex"}
+
+    def test_lambda_handler_partial_failure_keeps_secret(self):
+        """一部のチャンネルの登録に失敗した場合のテスト"""
+        # Given: channel_aの登録のみ失敗する
+        from lambdas.websub.app import SubscriptionError, lambda_handler
+
+        def subscribe(channel_id, **_kwargs):
+            if channel_id == "channel_a":
+                raise Exception("Subscription failed")
+
+        with patch("lambdas.websub.app.get_channel_registry") as mock_get_registry:
+            mock_get_registry.return_value = self._registry()
+            with patch("lambdas.websub.app.rotate_hmac_secret") as mock_rotate:
+                mock_rotate.return_value = "old_secret_hex"
+                with patch(
+                    "lambdas.websub.app.subscribe_to_pubsubhubbub"
+                ) as mock_subscribe:
+                    mock_subscribe.side_effect = subscribe
+                    with patch(
+                        "lambdas.websub.app.put_parameter_value"
+                    ) as mock_put_parameter:
+                        # When/Then: 非同期呼び出しで再試行されるように例外が送出されるが、
+                        # 新しいHMACシークレットを維持する
+                        with pytest.raises(SubscriptionError, match="1/2"):
+                            lambda_handler({}, None)
+                        assert mock_subscribe.call_count == 2
+                        mock_put_parameter.assert_not_called()
+
+    def test_lambda_handler_all_failed_restores_secret(self):
+        """すべてのチャンネルの登録に失敗した場合のテスト"""
+        # Given: すべての登録が失敗する
+        from lambdas.websub.app import SubscriptionError, lambda_handler
+
+        with patch("lambdas.websub.app.get_channel_registry") as mock_get_registry:
+            mock_get_registry.return_value = self._registry()
+            with patch("lambdas.websub.app.rotate_hmac_secret") as mock_rotate:
+                mock_rotate.return_value = "old_secret_hex"
+                with patch(
+                    "lambdas.websub.app.subscribe_to_pubsubhubbub"
+                ) as mock_subscribe:
+                    mock_subscribe.side_effect = Exception("Subscription failed")
+                    with patch(
+                        "lambdas.websub.app.put_parameter_value"
+                    ) as mock_put_parameter:
+                        # When/Then: 例外が送出され、元のHMACシークレットが保存される
+                        with pytest.raises(SubscriptionError, match="2/2"):
+                            lambda_handler({}, None)
+                        assert [c[0][0] for c in mock_put_parameter.call_args_list] == [
+                            "test-hmac-secret-param",
+                            "test-hmac-previous-secret-param",
+                        ]
+                        assert mock_put_parameter.call_args_list[0][0][1] == (
+                            "old_secret_hex"
+                        )
+
+    def test_lambda_handler_no_channel(self):
+        """監視するチャンネルが存在しない場合のテスト"""
+        # Given: 登録されたチャンネルが存在しない
+        from channel_registry import LocalChannelRegistry
+        from lambdas.websub.app import lambda_handler
+
+        with patch("lambdas.websub.app.get_channel_registry") as mock_get_registry:
+            mock_get_registry.return_value = LocalChannelRegistry([])
+            with patch("lambdas.websub.app.rotate_hmac_secret") as mock_rotate:
+                # When: ハンドラーを実行する
+                result = lambda_handler({}, None)
+
+                # Then: HMACシークレットをローテーションせずに正常終了する
+                assert result["statusCode"] == 200
+                mock_rotate.assert_not_called()
+
+
+@patch.dict(
+    os.environ,
+    {
+        "PUBSUBHUBBUB_HUB_URL": "https://pubsubhubbub.appspot.com/",
+        "LEASE_SECONDS": "828000",
+        "HMAC_SECRET_LENGTH": "32",
+        "HMAC_SECRET_OVERLAP_SECONDS": "3600",
+        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
+        "WEBSUB_CALLBACK_URL_PARAMETER_NAME": "test-callback-url-param",
+    },
+)
+@patch("lambdas.websub.app.CHANNEL_REGISTRY_BACKEND", "dynamodb")
+@patch("lambdas.websub.app.prefetch_parameters", Mock())
+@patch(
+    "lambdas.websub.app.get_parameter_value",
+    Mock(return_value="https://example.com/callback"),
+)
+class TestLambdaHandlerRetry:
+    """一部のチャンネルの登録に失敗し、非同期呼び出しで再試行される場合のテスト"""
+
+    def _run(self, store, failing_channel_ids):
+        """
+        Parameter Storeを辞書で置き換えてハンドラーを実行する
+
+        Returns:
+            tuple: (SubscriptionErrorが送出されたか, 登録に使用したHMACシークレット)
+        """
+        from channel_registry import Channel, LocalChannelRegistry
+        from lambdas.websub.app import SubscriptionError, lambda_handler
+        from parameter_backends import ParameterNotFoundError
+
+        def get_parameter(name, *_args):
+            if name not in store:
+                raise ParameterNotFoundError(name)
+            return store[name]
+
+        def put_parameter(name, value):
+            store[name] = value
+
+        def subscribe(channel_id, **_kwargs):
+            if channel_id in failing_channel_ids:
+                raise Exception("Subscription failed")
+
+        registry = LocalChannelRegistry([Channel("channel_a"), Channel("channel_b")])
+        with (
+            patch(
+                "lambdas.websub.app.get_channel_registry", Mock(return_value=registry)
+            ),
+            patch("hmac_secret_utils.get_parameter_value", side_effect=get_parameter),
+            patch("lambdas.websub.app.put_parameter_value", side_effect=put_parameter),
+            patch(
+                "lambdas.websub.app.subscribe_to_pubsubhubbub", side_effect=subscribe
+            ) as mock_subscribe,
+        ):
+            try:
+                lambda_handler({}, None)
+                raised = False
+            except SubscriptionError:
+                raised = True
+        return raised, {c[1]["hmac_secret"] for c in mock_subscribe.call_args_list}
+
+    def test_lambda_handler_retry_reuses_rotated_secret(self):
+        """再試行ではローテーションせず、元のHMACシークレットを有効なまま再登録するテスト"""
+        # Given: 元のHMACシークレットで登録済みで、channel_bの登録が失敗する
+        store = {"test-hmac-secret-param": "original_secret"}
+        with patch(
+            "lambdas.websub.app.secrets.token_hex",
+            side_effect=["new_secret", "newer_secret"],
+        ) as mock_token_hex:
+            # When: 初回の実行と再試行で、channel_bの登録が失敗する
+            first = self._run(store, {"channel_b"})
+            second = self._run(store, {"channel_b"})
+
+            # Then: 再試行ではローテーションせず、同じHMACシークレットで再登録する
+            assert first == (True, {"new_secret"})
+            assert second == (True, {"new_secret"})
+            assert mock_token_hex.call_count == 1
+            assert store["test-hmac-secret-param"] == "new_secret"
+            # channel_bはHubがサブスクリプションの有効期間の間、元のHMACシークレットで
+            # 署名し続けるため、並行利用期間ではなく有効期間の間有効にする
+            previous = json.loads(store["test-hmac-previous-secret-param"])
+            assert previous["secret"] == "original_secret"
+            assert previous["expires_at"] > time.time() + 800000
+
+            # When: 再試行ですべてのチャンネルの登録に成功する
+            third = self._run(store, set())
+
+            # Then: 元のHMACシークレットを並行利用期間の間のみ有効にする
+            assert third == (False, {"new_secret"})
+            assert mock_token_hex.call_count == 1
+            previous = json.loads(store["test-hmac-previous-secret-param"])
+            assert previous["secret"] == "original_secret"
+            assert previous["expires_at"] <= time.time() + 3600
+
+
+@patch.dict(
+    os.environ,
+    {
+        "PUBSUBHUBBUB_HUB_URL": "https://pubsubhubbub.appspot.com/",
+        "LEASE_SECONDS": "828000",
+        "HMAC_SECRET_LENGTH": "32",
+        "HMAC_SECRET_OVERLAP_SECONDS": "3600",
+        "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "test-hmac-secret-param",
+        "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": "test-hmac-previous-secret-param",
+        "YOUTUBE_CHANNEL_ID_PARAMETER_NAME": "test-channel-id-param",
+        "WEBSUB_CALLBACK_URL_PARAMETER_NAME": "test-callback-url-param",
+    },
+)
+class TestRotateHmacSecret:
+    """rotate_hmac_secret関数のテスト"""
+
+    def test_rotate_hmac_secret_with_previous(self):
+        """現在のHMACシークレットが存在する場合のテスト"""
+        # Given: 現在のHMACシークレットが存在する
+        from lambdas.websub.app import rotate_hmac_secret
+
+        with patch("lambdas.websub.app.get_current_hmac_secret") as mock_get_current:
+            with patch("lambdas.websub.app.put_parameter_value") as mock_put:
+                with patch("lambdas.websub.app.time.time") as mock_time:
+                    mock_get_current.return_value = "old_secret"
+                    mock_time.return_value = 1000
+
+                    # When: ローテーションする
+                    result = rotate_hmac_secret("new_secret", 3600)
+
+                    # Then: 旧シークレットを期限付きで退避してから新シークレットを保存する
+                    assert result == "old_secret"
+                    mock_get_current.assert_called_once_with(
+                        "test-hmac-secret-param", ttl_seconds=0
+                    )
+                    assert [c[0] for c in mock_put.call_args_list] == [
+                        (
+                            "test-hmac-previous-secret-param",
+                            '{"secret": "old_secret", "expires_at": 4600}',
+                        ),
+                        ("test-hmac-secret-param", "new_secret"),
+                    ]
+
+    def test_rotate_hmac_secret_first_time(self):
+        """現在のHMACシークレットが存在しない場合のテスト"""
+        # Given: 初回実行で現在のHMACシークレットが存在しない
+        from lambdas.websub.app import rotate_hmac_secret
+
+        with patch("lambdas.websub.app.get_current_hmac_secret") as mock_get_current:
+            with patch("lambdas.websub.app.put_parameter_value") as mock_put:
+                mock_get_current.return_value = None
+
+                # When: ローテーションする
+                result = rotate_hmac_secret("new_secret", 3600)
+
+                # Then: 新シークレットのみ保存する
+                assert result is None
+                mock_put.assert_called_once_with("test-hmac-secret-param", "new_secret")
+
+    def test_rotate_hmac_secret_get_failure(self):
+        """現在のHMACシークレットの取得に失敗した場合のテスト"""
+        # Given: 現在のHMACシークレットの取得が例外を送出する
+        from lambdas.websub.app import rotate_hmac_secret
+
+        with patch("lambdas.websub.app.get_current_hmac_secret") as mock_get_current:
+            with patch("lambdas.websub.app.put_parameter_value") as mock_put:
+                mock_get_current.side_effect = Exception("SSM error")
+
+                # When/Then: 例外が伝播し、何も保存しない
+                with pytest.raises(Exception, match="SSM error"):
+                    rotate_hmac_secret("new_secret", 3600)
+                mock_put.assert_not_called()
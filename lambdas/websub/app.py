@@ -6,33 +6,55 @@ import secrets
 import time
 import traceback
 import urllib.parse
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
 
-import boto3
-import requests
-from ssm_utils import get_parameter_value
+from channel_registry import Channel, build_topic_url, get_channel_registry
+from hmac_secret_utils import (
+    encode_previous_hmac_secret,
+    get_current_hmac_secret,
+    get_previous_hmac_secret,
+)
+from http_session import get_http_timeout, http_post
+from ssm_utils import get_parameter_value, prefetch_parameters, put_parameter_value
+from stage_metrics import stage, timed_handler
 
 PUBSUBHUBBUB_HUB_URL = os.environ["PUBSUBHUBBUB_HUB_URL"]
 LEASE_SECONDS = int(os.environ["LEASE_SECONDS"])
 HMAC_SECRET_LENGTH = int(os.environ["HMAC_SECRET_LENGTH"])
+HMAC_SECRET_OVERLAP_SECONDS = int(os.environ["HMAC_SECRET_OVERLAP_SECONDS"])
 WEBSUB_HMAC_SECRET_PARAMETER_NAME = os.environ["WEBSUB_HMAC_SECRET_PARAMETER_NAME"]
-YOUTUBE_CHANNEL_ID_PARAMETER_NAME = os.environ["YOUTUBE_CHANNEL_ID_PARAMETER_NAME"]
+WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME = os.environ[
+    "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME"
+]
+YOUTUBE_CHANNEL_ID_PARAMETER_NAME = os.environ.get(
+    "YOUTUBE_CHANNEL_ID_PARAMETER_NAME", ""
+)
 WEBSUB_CALLBACK_URL_PARAMETER_NAME = os.environ["WEBSUB_CALLBACK_URL_PARAMETER_NAME"]
 
+# 監視するチャンネルのレジストリのバックエンド(channel_registry参照)
+CHANNEL_REGISTRY_BACKEND = os.environ.get("CHANNEL_REGISTRY_BACKEND", "parameter")
+
+# 複数のチャンネルのサブスクリプションを同時に登録する上限
+WEBSUB_SUBSCRIBE_CONCURRENCY = int(os.environ.get("WEBSUB_SUBSCRIBE_CONCURRENCY", "8"))
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-ssm_client = boto3.client("ssm")
-
 # 再試行設定
 MAX_RETRIES = 5
 BASE_DELAY = 1.0  # 初回待機時間（秒）
 
 
+class SubscriptionError(Exception):
+    """1件以上のチャンネルのサブスクリプションの登録に失敗した場合の例外"""
+
+
 def subscribe_to_pubsubhubbub(
     channel_id: str,
     callback_url: str,
     hmac_secret: str,
+    lease_seconds: int | None = None,
 ) -> None:
     """
     Google PubSubHubbub Hub にサブスクリプションを登録する
@@ -41,6 +63,8 @@ def subscribe_to_pubsubhubbub(
         channel_id (str): チャンネルID
         callback_url (str): コールバックURL
         hmac_secret (str): HMACシークレット
+        lease_seconds (int | None): サブスクリプションの有効期間(秒)、
+                                    Noneの場合は環境変数LEASE_SECONDSの値
 
     Raises:
         Exception: 指数バックオフでの最大再試行回数を超えた場合、またはスロットルエラー以外のエラーが発生した場合
@@ -49,11 +73,11 @@ def subscribe_to_pubsubhubbub(
     data: str = urllib.parse.urlencode(
         {
             "hub.callback": callback_url,
-            "hub.topic": f"https://www.youtube.com/xml/feeds/videos.xml?channel_id={channel_id}",
+            "hub.topic": build_topic_url(channel_id),
             "hub.verify": "async",
             "hub.mode": "subscribe",
             "hub.secret": hmac_secret,
-            "hub.lease_seconds": str(LEASE_SECONDS),
+            "hub.lease_seconds": str(lease_seconds or LEASE_SECONDS),
         }
     )
     headers: Dict[str, str] = {
@@ -62,13 +86,15 @@ def subscribe_to_pubsubhubbub(
     }
 
     # 指数バックオフで再試行
+    # ウォームコンテナ間で共有するHTTPセッションで接続を再利用する
     for attempt in range(MAX_RETRIES + 1):
-        response = requests.post(
-            url=PUBSUBHUBBUB_HUB_URL,
-            data=data,
-            headers=headers,
-            timeout=30,
-        )
+        with stage("Hub"):
+            response = http_post(
+                url=PUBSUBHUBBUB_HUB_URL,
+                data=data,
+                headers=headers,
+                timeout=get_http_timeout(30),
+            )
 
         logger.info("Response status code: %d", response.status_code)
         logger.info("Response text: %s", response.text)
@@ -114,9 +140,102 @@ def subscribe_to_pubsubhubbub(
         )
 
 
+def rotate_hmac_secret(hmac_secret: str, expires_in: int) -> str | None:
+    """
+    HMACシークレットをローテーションする
+    Hubが新旧どちらのHMACシークレットで署名しても検証できるよう、現在のHMACシークレットを
+    並行利用期間の期限とともにローテーション前のHMACシークレットとして退避してから、
+    新しいHMACシークレットを保存する
+
+    Args:
+        hmac_secret (str): 新しいHMACシークレット
+        expires_in (int): ローテーション前のHMACシークレットの並行利用期間(秒)
+
+    Returns:
+        str | None: ローテーション前のHMACシークレット、存在しない場合はNone
+    """
+    previous_secret: str | None = get_current_hmac_secret(
+        WEBSUB_HMAC_SECRET_PARAMETER_NAME, ttl_seconds=0
+    )
+    if previous_secret is not None:
+        put_previous_hmac_secret(previous_secret, expires_in)
+    put_parameter_value(WEBSUB_HMAC_SECRET_PARAMETER_NAME, hmac_secret)
+    return previous_secret
+
+
+def put_previous_hmac_secret(previous_secret: str, expires_in: int) -> None:
+    """
+    ローテーション前のHMACシークレットを、並行利用期間の期限とともに保存する
+
+    Args:
+        previous_secret (str): ローテーション前のHMACシークレット
+        expires_in (int): 現在からの並行利用期間(秒)、0の場合は直ちに失効させる
+    """
+    put_parameter_value(
+        WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME,
+        encode_previous_hmac_secret(previous_secret, int(time.time()) + expires_in),
+    )
+
+
+def list_channels() -> List[Channel]:
+    """
+    サブスクリプションを登録する、監視するチャンネルを取得する
+    単一チャンネルの構成(parameterバックエンド)では、コールバックURLとまとめて取得した
+    パラメータのチャンネルIDを使用する
+
+    Returns:
+        List[Channel]: 監視する(enabled=True)チャンネル
+    """
+    if CHANNEL_REGISTRY_BACKEND == "parameter":
+        return [Channel(get_parameter_value(YOUTUBE_CHANNEL_ID_PARAMETER_NAME))]
+    return [
+        channel for channel in get_channel_registry().list_channels() if channel.enabled
+    ]
+
+
+def subscribe_channels(
+    channels: List[Channel], callback_url: str, hmac_secret: str
+) -> List[str]:
+    """
+    複数のチャンネルのサブスクリプションを、同時実行数を制限して並行に登録する
+
+    Args:
+        channels (List[Channel]): チャンネル
+        callback_url (str): コールバックURL
+        hmac_secret (str): HMACシークレット
+
+    Returns:
+        List[str]: 登録に失敗したチャンネルID
+    """
+
+    def subscribe(channel: Channel) -> str | None:
+        try:
+            subscribe_to_pubsubhubbub(
+                channel_id=channel.channel_id,
+                callback_url=callback_url,
+                hmac_secret=hmac_secret,
+                lease_seconds=channel.lease_seconds,
+            )
+        except Exception:
+            logger.error(
+                "Subscription failed for channel %s: %s",
+                channel.channel_id,
+                traceback.format_exc(),
+            )
+            return channel.channel_id
+        return None
+
+    max_workers: int = max(1, min(WEBSUB_SUBSCRIBE_CONCURRENCY, len(channels)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results: List[str | None] = list(executor.map(subscribe, channels))
+    return [channel_id for channel_id in results if channel_id is not None]
+
+
+@timed_handler
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Google PubSubHubbubのサブスクリプションを再登録するLambda関数のハンドラー
+    監視するすべてのチャンネルに、同じHMACシークレットでサブスクリプションを登録する
 
     Args:
         event (dict): イベント
@@ -124,35 +243,88 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
     Returns:
         dict: レスポンス
+
+    Raises:
+        SubscriptionError: 1件以上のチャンネルのサブスクリプションの登録に失敗した場合
     """
     try:
-        # Parameter StoreからチャンネルID・コールバックURLを取得
-        channel_id: str = get_parameter_value(YOUTUBE_CHANNEL_ID_PARAMETER_NAME)
+        # Parameter StoreからチャンネルID・コールバックURLをまとめて取得
+        parameter_names: List[str] = [WEBSUB_CALLBACK_URL_PARAMETER_NAME]
+        if CHANNEL_REGISTRY_BACKEND == "parameter":
+            parameter_names.insert(0, YOUTUBE_CHANNEL_ID_PARAMETER_NAME)
+        prefetch_parameters(parameter_names)
+        channels: List[Channel] = list_channels()
         callback_url: str = get_parameter_value(WEBSUB_CALLBACK_URL_PARAMETER_NAME)
+        if not channels:
+            logger.warning("No channel to subscribe")
+            return {
+                "statusCode": 200,
+                "body": "OK",
+            }
 
-        # 新しいHMACシークレットを生成
-        hmac_secret: str = secrets.token_hex(HMAC_SECRET_LENGTH)
+        # 登録に失敗したチャンネルは、Hubがサブスクリプションの有効期間の間、
+        # 元のHMACシークレットで署名し続けるため、すべてのチャンネルの登録に成功するまで
+        # ローテーション前のHMACシークレットを有効期間の間有効にする
+        lease_seconds: int = max(
+            [LEASE_SECONDS]
+            + [channel.lease_seconds for channel in channels if channel.lease_seconds]
+        )
 
-        # Google PubSubHubbub Hubにサブスクリプションを登録
-        subscribe_to_pubsubhubbub(
-            channel_id=channel_id,
-            callback_url=callback_url,
-            hmac_secret=hmac_secret,
+        # 前回のローテーションで登録に失敗したチャンネルがあり、ローテーション前の
+        # HMACシークレットが有効な場合は、再試行のたびにローテーションして登録に失敗した
+        # チャンネルのHMACシークレットを上書きしないよう、現在のHMACシークレットで再登録する
+        previous_secret: str | None = get_previous_hmac_secret(
+            WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME, ttl_seconds=0
         )
+        hmac_secret: str | None = None
+        if previous_secret is not None:
+            hmac_secret = get_current_hmac_secret(
+                WEBSUB_HMAC_SECRET_PARAMETER_NAME, ttl_seconds=0
+            )
+        rotated: bool = hmac_secret is None
+        if hmac_secret is None:
+            # 新しいHMACシークレットを生成し、Hubが新しいHMACシークレットで署名を始める前に
+            # Parameter Storeに保存
+            hmac_secret = secrets.token_hex(HMAC_SECRET_LENGTH)
+            previous_secret = rotate_hmac_secret(hmac_secret, lease_seconds)
 
-        # 生成したHMACシークレットをParameter Storeに保存
-        ssm_client.put_parameter(
-            Name=WEBSUB_HMAC_SECRET_PARAMETER_NAME,
-            Value=hmac_secret,
-            Type="SecureString",
-            Overwrite=True,
+        # Google PubSubHubbub Hubにすべてのチャンネルのサブスクリプションを登録
+        failed_channel_ids: List[str] = subscribe_channels(
+            channels, callback_url, hmac_secret
         )
+        if failed_channel_ids:
+            # ローテーションしたHMACシークレットですべて失敗した場合は、
+            # Hubが引き続き元のHMACシークレットで署名するため、元に戻す
+            # 一部のみ失敗した場合は、ローテーション前のHMACシークレットを有効なまま、
+            # 新しいHMACシークレットを維持して再試行で再登録する
+            if (
+                rotated
+                and len(failed_channel_ids) == len(channels)
+                and previous_secret is not None
+            ):
+                put_parameter_value(WEBSUB_HMAC_SECRET_PARAMETER_NAME, previous_secret)
+                put_previous_hmac_secret(previous_secret, 0)
+            raise SubscriptionError(
+                f"Subscription failed for {len(failed_channel_ids)}/{len(channels)} "
+                f"channels: {failed_channel_ids}"
+            )
+
+        # すべてのチャンネルの登録に成功した後は、元のHMACシークレットで署名済みの
+        # プッシュ通知を検証できるよう、並行利用期間の間のみ有効にする
+        if previous_secret is not None:
+            put_previous_hmac_secret(previous_secret, HMAC_SECRET_OVERLAP_SECONDS)
 
         return {
             "statusCode": 200,
             "body": "OK",
         }
 
+    except SubscriptionError:
+        # スケジュールによる非同期呼び出しは、エラーレスポンスを返しても再試行しないため、
+        # 例外を送出して失敗したチャンネルを含むすべてのチャンネルを同じHMACシークレットで再登録させる
+        logger.error(traceback.format_exc())
+        raise
+
     except Exception:
         logger.error(traceback.format_exc())
         return {
@@ -0,0 +1,323 @@
+"""Lambda関数ハンドラーのインポート時間・メモリ使用量を計測するスクリプト
+
+各ハンドラーモジュールを新しいPythonインタープリターでインポートし、コールドスタート時の
+モジュールごとのインポート時間(`-X importtime`)とメモリ割り当て量(`tracemalloc`)を
+JSON形式で出力する
+環境変数・AWSの認証情報はスタブ値を使用し、インポート中のネットワーク通信は禁止するため、
+認証情報・ネットワークがない環境でも実行できる
+予算ファイルを指定した場合は、予算を超えたハンドラーがあれば終了コード1で終了する
+
+Usage:
+    uv run python scripts/import_profile.py [--repeat 5] [--output report.json]
+        [--budget scripts/import_budget.json]
+        [--baseline baseline.json --max-regression-percent 20]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LAYER_PATH = REPO_ROOT / "lambdas" / "layer" / "python"
+
+# インポート時に参照される環境変数のスタブ値
+STUB_ENVIRONMENT: Dict[str, str] = {
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_DEFAULT_REGION": "ap-northeast-1",
+    "AWS_EC2_METADATA_DISABLED": "true",
+    "AWS_LAMBDA_FUNCTION_NAME": "import-profile",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "DYNAMODB_TABLE": "ytlivemetadata-dynamodb",
+    "HMAC_SECRET_LENGTH": "32",
+    "HMAC_SECRET_OVERLAP_SECONDS": "3600",
+    "LEASE_SECONDS": "828000",
+    "PUBSUBHUBBUB_HUB_URL": "https://pubsubhubbub.appspot.com/",
+    "SMS_PHONE_NUMBER_PARAMETER_NAME": "/ytlivemetadata/phone_number",
+    "WEBSUB_CALLBACK_URL_PARAMETER_NAME": "/ytlivemetadata/websub_callback_url",
+    "WEBSUB_HMAC_PREVIOUS_SECRET_PARAMETER_NAME": (
+        "/ytlivemetadata/websub_hmac_secret_previous"
+    ),
+    "WEBSUB_HMAC_SECRET_PARAMETER_NAME": "/ytlivemetadata/websub_hmac_secret",
+    "YOUTUBE_API_KEY_PARAMETER_NAME": "/ytlivemetadata/youtube_api_key",
+    "YOUTUBE_CHANNEL_ID_PARAMETER_NAME": "/ytlivemetadata/youtube_channel_id",
+}
+
+HANDLERS: List[str] = ["get_notify", "post_notify", "post_pipeline", "websub"]
+
+# インポートされたかどうかを報告する重いモジュール
+HEAVY_MODULES: List[str] = ["boto3", "botocore", "requests", "urllib3"]
+
+# レポートに出力するモジュール数の上限
+TOP_MODULES = 15
+
+# インポート中のネットワーク通信を禁止する監査フック
+# socketモジュールをインポートせずに禁止するため、監査イベントで検知する
+_DENY_NETWORK = """
+import sys
+
+def _deny_network(event, args):
+    if event in ("socket.connect", "socket.getaddrinfo", "socket.gethostbyname"):
+        raise RuntimeError(f"Network access during import: {event} {args!r}")
+
+sys.addaudithook(_deny_network)
+"""
+
+# tracemallocでハンドラーモジュールのインポート中のメモリ割り当て量を計測する
+# 割り当てたコードのファイルごとに集計し、モジュール名に対応付けて標準出力に出力する
+_MEASURE_MEMORY = """
+import json
+import tracemalloc
+
+tracemalloc.start()
+import app
+current, peak = tracemalloc.get_traced_memory()
+snapshot = tracemalloc.take_snapshot()
+tracemalloc.stop()
+modules = {
+    getattr(module, "__file__", None): name for name, module in list(sys.modules.items())
+}
+modules_bytes = {}
+for stat in snapshot.statistics("filename"):
+    name = modules.get(stat.traceback[0].filename, stat.traceback[0].filename)
+    modules_bytes[name] = modules_bytes.get(name, 0) + stat.size
+print(json.dumps({"current": current, "peak": peak, "modules": modules_bytes}))
+"""
+
+
+def run_handler(handler: str, options: List[str], code: str) -> str:
+    """
+    新しいPythonインタープリターで、スタブの環境変数とともにハンドラーのコードを実行する
+
+    Args:
+        handler (str): ハンドラー名(lambdas配下のディレクトリ名)
+        options (List[str]): インタープリターのオプション(例: -X importtime)
+        code (str): 実行するコード
+
+    Returns:
+        str: 標準出力と標準エラー出力を連結した出力
+    """
+    env: Dict[str, str] = {
+        **os.environ,
+        **STUB_ENVIRONMENT,
+        "PYTHONPATH": os.pathsep.join(
+            [str(REPO_ROOT / "lambdas" / handler), str(LAYER_PATH)]
+        ),
+    }
+    result = subprocess.run(
+        [sys.executable, *options, "-c", _DENY_NETWORK + code],
+        env=env,
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to import {handler}:\n{result.stderr}")
+    return result.stdout + result.stderr
+
+
+def profile_import(handler: str) -> Dict[str, Any]:
+    """
+    新しいPythonインタープリターでハンドラーモジュールをインポートし、インポート時間を計測する
+
+    Args:
+        handler (str): ハンドラー名(lambdas配下のディレクトリ名)
+
+    Returns:
+        dict: ハンドラーモジュールのインポート時間(ミリ秒)、インタープリター起動を含む
+              合計インポート時間(ミリ秒)、トップレベルのインポートごとの累積時間(ミリ秒)、
+              ハンドラーモジュールがインポートしたモジュールごとのインポート時間
+              (ミリ秒、配下のモジュールを除く)、インポートされた重いモジュール
+    """
+    output: str = run_handler(handler, ["-X", "importtime"], "import app")
+
+    # 出力形式: "import time: self [us] | cumulative | imported package"
+    # インデントのないパッケージがトップレベルのインポートであり、
+    # その配下のモジュールはトップレベルのインポートの行より前に出力される
+    top_level: Dict[str, float] = {}
+    imported: set[str] = set()
+    pending: Dict[str, float] = {}
+    modules: Dict[str, float] = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative, package = line[len("import time:") :].split("|")
+        imported.add(package.strip())
+        pending[package.strip()] = int(self_us) / 1000
+        if not package.startswith("  "):
+            top_level[package.strip()] = int(cumulative) / 1000
+            if package.strip() == "app":
+                modules = pending
+            pending = {}
+
+    return {
+        "app_ms": round(top_level["app"], 1),
+        "total_ms": round(sum(top_level.values()), 1),
+        "top_level_ms": _top(top_level, 10),
+        "modules_ms": _top(modules, TOP_MODULES),
+        "heavy_modules": [name for name in HEAVY_MODULES if name in imported],
+    }
+
+
+def profile_memory(handler: str) -> Dict[str, Any]:
+    """
+    新しいPythonインタープリターでハンドラーモジュールをインポートし、
+    インポート中のメモリ割り当て量をtracemallocで計測する
+    tracemallocはインポート時間を増加させるため、インポート時間とは別に計測する
+
+    Args:
+        handler (str): ハンドラー名(lambdas配下のディレクトリ名)
+
+    Returns:
+        dict: インポート後に保持しているメモリ量(KiB)、ピーク時のメモリ量(KiB)、
+              割り当てたモジュールごとの保持しているメモリ量(KiB)
+    """
+    output: Dict[str, Any] = json.loads(
+        run_handler(handler, [], _MEASURE_MEMORY).splitlines()[-1]
+    )
+    return {
+        "current_kib": round(output["current"] / 1024, 1),
+        "peak_kib": round(output["peak"] / 1024, 1),
+        "modules_kib": _top(
+            {name: size / 1024 for name, size in output["modules"].items()},
+            TOP_MODULES,
+        ),
+    }
+
+
+def check_budget(
+    report: Dict[str, Any], budget: Dict[str, Any], baseline: Dict[str, Any] | None
+) -> List[str]:
+    """
+    計測結果が予算・ベースラインからの増加率の上限を超えていないか検証する
+
+    Args:
+        report (Dict[str, Any]): 計測結果のレポート
+        budget (Dict[str, Any]): 予算(defaultと、handlersのハンドラーごとの上書き)
+        baseline (Dict[str, Any] | None): 比較するベースラインのレポート
+
+    Returns:
+        List[str]: 予算を超えた項目のメッセージ、超えていない場合は空リスト
+    """
+    violations: List[str] = []
+    max_regression_percent: float | None = budget.get("max_regression_percent")
+    for handler, result in report["handlers"].items():
+        limits: Dict[str, Any] = {
+            **budget.get("default", {}),
+            **budget.get("handlers", {}).get(handler, {}),
+        }
+        for key, value in (
+            ("median_app_ms", result["median_app_ms"]),
+            ("peak_kib", result["memory"]["peak_kib"]),
+        ):
+            if key in limits and value > limits[key]:
+                violations.append(f"{handler}: {key} {value} > {limits[key]}")
+        for name in result["heavy_modules"]:
+            if name in limits.get("forbidden_modules", []):
+                violations.append(f"{handler}: {name} is imported at cold start")
+
+        previous: Dict[str, Any] | None = (
+            (baseline or {}).get("handlers", {}).get(handler)
+        )
+        if previous is None or max_regression_percent is None:
+            continue
+        for key, value, previous_value in (
+            ("median_app_ms", result["median_app_ms"], previous["median_app_ms"]),
+            (
+                "peak_kib",
+                result["memory"]["peak_kib"],
+                previous["memory"]["peak_kib"],
+            ),
+        ):
+            limit: float = previous_value * (1 + max_regression_percent / 100)
+            if value > limit:
+                violations.append(
+                    f"{handler}: {key} {value} > baseline {previous_value}"
+                    f" + {max_regression_percent}%"
+                )
+    return violations
+
+
+def _top(values: Dict[str, float], limit: int) -> Dict[str, float]:
+    """
+    値の大きい順に上限数までの項目を小数点以下1桁に丸めて返す
+
+    Args:
+        values (Dict[str, float]): 名前 -> 値
+        limit (int): 項目数の上限
+
+    Returns:
+        Dict[str, float]: 値の大きい順の名前 -> 値
+    """
+    return {
+        name: round(value, 1)
+        for name, value in sorted(values.items(), key=lambda x: -x[1])[:limit]
+    }
+
+
+def main() -> None:
+    """各ハンドラーのインポート時間・メモリ使用量を計測し、JSON形式で出力する"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数")
+    parser.add_argument("--output", type=Path, help="JSONレポートの出力先")
+    parser.add_argument("--budget", type=Path, help="予算のJSONファイル")
+    parser.add_argument("--baseline", type=Path, help="比較するJSONレポート")
+    parser.add_argument(
+        "--max-regression-percent",
+        type=float,
+        help="ベースラインからの増加率の上限(%%)、予算ファイルの値を上書きする",
+    )
+    parser.add_argument(
+        "--handler", action="append", choices=HANDLERS, help="計測するハンドラー"
+    )
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"python": sys.version.split()[0], "handlers": {}}
+    for handler in args.handler or HANDLERS:
+        runs: List[Dict[str, Any]] = [
+            profile_import(handler) for _ in range(args.repeat)
+        ]
+        median_run: Dict[str, Any] = sorted(runs, key=lambda r: r["app_ms"])[
+            len(runs) // 2
+        ]
+        report["handlers"][handler] = {
+            "median_app_ms": median_run["app_ms"],
+            "stdev_app_ms": round(statistics.pstdev(r["app_ms"] for r in runs), 1),
+            "median_total_ms": median_run["total_ms"],
+            "top_level_ms": median_run["top_level_ms"],
+            "modules_ms": median_run["modules_ms"],
+            "heavy_modules": median_run["heavy_modules"],
+            "memory": profile_memory(handler),
+        }
+
+    output: str = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+    if args.budget is None and args.baseline is None:
+        return
+    budget: Dict[str, Any] = (
+        json.loads(args.budget.read_text(encoding="utf-8")) if args.budget else {}
+    )
+    if args.max_regression_percent is not None:
+        budget["max_regression_percent"] = args.max_regression_percent
+    elif args.baseline is not None:
+        budget.setdefault("max_regression_percent", 20)
+    baseline: Dict[str, Any] | None = (
+        json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else None
+    )
+    violations: List[str] = check_budget(report, budget, baseline)
+    for violation in violations:
+        print(f"Budget exceeded: {violation}", file=sys.stderr)
+    if violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
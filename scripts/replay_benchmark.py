@@ -0,0 +1,960 @@
+"""Lambda関数ハンドラーのリプレイベンチマーク
+
+実運用に近いイベントのコーパス(HMAC署名付きのプッシュ通知・サブスクリプション確認のGET・
+定期実行のスケジュールイベント・SQSイベント・CodePipelineのステージ失敗イベント)を
+各ハンドラーに順に入力し、ハンドラーごと・ステージごとのスループットとレイテンシー
+(p50/p95/p99)を計測する
+AWSはbotocoreのイベントフックでAPI呼び出しに応答するインメモリーのフェイクで、
+YouTube Data API v3・Google PubSubHubbub Hubはレイテンシーを設定できるローカルのスタブ
+HTTPサーバーで代替するため、認証情報・ネットワークがない環境でも実行できる
+ステージごとの所要時間は、各ハンドラーが出力するEMF(stage_metrics)から取得する
+
+Usage:
+    uv run python scripts/replay_benchmark.py [--events 300] [--seed 0]
+        [--http-latency-ms 20] [--aws-latency-ms 5] [--env CONCURRENT_STAGES=true]
+        [--corpus corpus.jsonl] [--save-corpus corpus.jsonl] [--output report.json]
+        [--baseline baseline.json --max-regression-percent 20]
+"""
+
+import argparse
+import base64
+import contextlib
+import functools
+import hashlib
+import hmac
+import importlib
+import io
+import json
+import logging
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from import_profile import LAYER_PATH, REPO_ROOT, STUB_ENVIRONMENT
+
+# ベンチマーク時に上書きする環境変数
+# YouTube Data API v3の呼び出し頻度・クオーターの制限で計測が打ち切られないようにする
+BENCHMARK_ENVIRONMENT: Dict[str, str] = {
+    "SSM_PARAMETER_BACKEND": "ssm",
+    "STAGE_METRICS_ENABLED": "true",
+    "YOUTUBE_API_BURST": "1000000",
+    "YOUTUBE_API_RATE_PER_SECOND": "1000000",
+    "YOUTUBE_QUOTA_DAILY_UNITS": "100000000",
+}
+
+# フェイクのParameter Storeに保存するパラメータの初期値
+INITIAL_PARAMETERS: Dict[str, str] = {
+    STUB_ENVIRONMENT["SMS_PHONE_NUMBER_PARAMETER_NAME"]: "+818000000001,+818000000002",
+    STUB_ENVIRONMENT[
+        "WEBSUB_CALLBACK_URL_PARAMETER_NAME"
+    ]: "https://example.com/callback",
+    STUB_ENVIRONMENT["WEBSUB_HMAC_SECRET_PARAMETER_NAME"]: "replay-hmac-secret",
+    STUB_ENVIRONMENT["YOUTUBE_API_KEY_PARAMETER_NAME"]: "replay-api-key",
+    STUB_ENVIRONMENT["YOUTUBE_CHANNEL_ID_PARAMETER_NAME"]: "UCreplaychannel",
+}
+
+# イベントの種類ごとの重み(ハンドラー名, 種類) -> 重み
+EVENT_WEIGHTS: Dict[Tuple[str, str], int] = {
+    ("post_notify.lambda_handler", "live"): 30,
+    ("post_notify.lambda_handler", "duplicate"): 15,
+    ("post_notify.lambda_handler", "upcoming"): 8,
+    ("post_notify.lambda_handler", "none"): 8,
+    ("post_notify.lambda_handler", "multiple"): 5,
+    ("post_notify.lambda_handler", "deleted"): 4,
+    ("post_notify.lambda_handler", "invalid_signature"): 3,
+    ("post_notify.queue_handler", "live"): 5,
+    ("post_notify.recheck_handler", "schedule"): 6,
+    ("get_notify.lambda_handler", "verify"): 8,
+    ("get_notify.lambda_handler", "invalid_topic"): 2,
+    ("websub.lambda_handler", "schedule"): 1,
+    ("post_pipeline.lambda_handler", "failed"): 5,
+}
+
+# ベースラインとの比較で増加を回帰とみなすレイテンシーの指標
+REGRESSION_METRICS: List[str] = ["p50", "p95", "p99"]
+
+ATOM_FEED = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" '
+    'xmlns:at="http://purl.org/atompub/tombstones/1.0" '
+    'xmlns="http://www.w3.org/2005/Atom">'
+    "{entries}</feed>"
+)
+ATOM_ENTRY = (
+    "<entry><id>yt:video:{video_id}</id><yt:videoId>{video_id}</yt:videoId>"
+    "<yt:channelId>{channel_id}</yt:channelId><title>Replay {video_id}</title>"
+    '<link rel="alternate" href="https://www.youtube.com/watch?v={video_id}"/>'
+    "<author><name>Replay Channel</name></author>"
+    "<published>2026-01-01T00:00:00+00:00</published>"
+    "<updated>2026-01-01T00:00:00+00:00</updated></entry>"
+)
+ATOM_DELETED_ENTRY = (
+    '<at:deleted-entry ref="yt:video:{video_id}" when="2026-01-01T00:00:00+00:00">'
+    '<link href="https://www.youtube.com/watch?v={video_id}"/></at:deleted-entry>'
+)
+
+
+class FakeAws:  # pylint: disable=too-few-public-methods
+    """
+    boto3のクライアントのAPI呼び出しにインメモリーで応答するSSM・DynamoDB・SNS・SQSのフェイク
+    botocore.stub.Stubberと同様にbefore-callイベントで応答するため、パラメータの検証・
+    シリアライズとstage_metricsの計測はそのまま実行される
+    """
+
+    def __init__(self, latency_seconds: float) -> None:
+        self.latency_seconds: float = latency_seconds
+        self.parameters: Dict[str, str] = dict(INITIAL_PARAMETERS)
+        # テーブル名 -> パーティションキーの値 -> 項目
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.published: List[Dict[str, Any]] = []
+        self.messages: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def install(self, get_client: Callable[[str], Any]) -> None:
+        """
+        各サービスのクライアントにフェイクを登録する
+
+        Args:
+            get_client (Callable[[str], Any]): aws_clients.get_client
+        """
+        for service_name in ("ssm", "dynamodb", "sns", "sqs"):
+            events: Any = get_client(service_name).meta.events
+            events.register("before-parameter-build", _save_params)
+            events.register_first(
+                "before-call", functools.partial(self._on_before_call, service_name)
+            )
+
+    def _on_before_call(
+        self, service_name: str, model: Any, context: Dict[str, Any], **_kwargs: Any
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """API呼び出しに応答する(HTTPレスポンス, 解析済のレスポンス)を返す"""
+        from botocore.awsrequest import (  # pylint: disable=import-outside-toplevel
+            AWSResponse,
+        )
+
+        time.sleep(self.latency_seconds)
+        params: Dict[str, Any] = context.pop("replay_params", {})
+        handler: Callable[[Dict[str, Any]], Dict[str, Any]] = getattr(
+            self, f"_{service_name}_{_snake_case(model.name)}"
+        )
+        try:
+            with self._lock:
+                parsed: Dict[str, Any] = handler(params)
+            status_code: int = 200
+        except FakeAwsError as e:
+            parsed = {"Error": {"Code": e.code, "Message": e.code}}
+            status_code = 400
+        parsed.setdefault("ResponseMetadata", {"HTTPStatusCode": status_code})
+        return AWSResponse(None, status_code, {}, None), parsed
+
+    def _ssm_get_parameter(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if params["Name"] not in self.parameters:
+            raise FakeAwsError("ParameterNotFound")
+        return {
+            "Parameter": {
+                "Name": params["Name"],
+                "Value": self.parameters[params["Name"]],
+            }
+        }
+
+    def _ssm_get_parameters(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "Parameters": [
+                {"Name": name, "Value": self.parameters[name]}
+                for name in params["Names"]
+                if name in self.parameters
+            ],
+            "InvalidParameters": [
+                name for name in params["Names"] if name not in self.parameters
+            ],
+        }
+
+    def _ssm_put_parameter(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.parameters[params["Name"]] = params["Value"]
+        return {"Version": 1}
+
+    def _dynamodb_get_item(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        item: Dict[str, Any] | None = self._table(params).get(_key(params))
+        return {"Item": dict(item)} if item is not None else {}
+
+    def _dynamodb_update_item(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        table: Dict[str, Dict[str, Any]] = self._table(params)
+        key: str = _key(params)
+        old_item: Dict[str, Any] | None = table.get(key)
+        item: Dict[str, Any] = dict(old_item or params["Key"])
+        names: Dict[str, str] = params.get("ExpressionAttributeNames", {})
+        values: Dict[str, Any] = params.get("ExpressionAttributeValues", {})
+        if "ConditionExpression" in params and not evaluate_condition(
+            params["ConditionExpression"], names, values, table.get(key, {})
+        ):
+            raise FakeAwsError("ConditionalCheckFailedException")
+        updated: List[str] = apply_update(
+            params["UpdateExpression"], names, values, item
+        )
+        table[key] = item
+        if params.get("ReturnValues") == "UPDATED_NEW":
+            return {"Attributes": {name: item[name] for name in updated}}
+        if params.get("ReturnValues") == "ALL_NEW":
+            return {"Attributes": dict(item)}
+        if params.get("ReturnValues") == "ALL_OLD" and old_item is not None:
+            return {"Attributes": dict(old_item)}
+        return {}
+
+    def _dynamodb_query(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        items: List[Dict[str, Any]] = [
+            dict(item)
+            for item in self._table(params).values()
+            if evaluate_condition(
+                params["KeyConditionExpression"],
+                params.get("ExpressionAttributeNames", {}),
+                params.get("ExpressionAttributeValues", {}),
+                item,
+            )
+        ][: params.get("Limit")]
+        return {"Items": items, "Count": len(items)}
+
+    def _dynamodb_scan(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        items: List[Dict[str, Any]] = [
+            dict(item) for item in self._table(params).values()
+        ]
+        return {"Items": items, "Count": len(items)}
+
+    def _sns_publish(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.published.append(params)
+        return {"MessageId": str(uuid.uuid4())}
+
+    def _sqs_send_message(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.messages.append(params)
+        return {
+            "MessageId": str(uuid.uuid4()),
+            "MD5OfMessageBody": hashlib.md5(
+                params["MessageBody"].encode("utf-8"), usedforsecurity=False
+            ).hexdigest(),
+        }
+
+    def _table(self, params: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """テーブル名のテーブルを返す(存在しない場合は作成する)"""
+        return self.tables.setdefault(params["TableName"], {})
+
+
+class FakeAwsError(Exception):
+    """フェイクのAPI呼び出しがエラーレスポンスを返す場合の例外"""
+
+    def __init__(self, code: str) -> None:
+        super().__init__(code)
+        self.code: str = code
+
+
+def _save_params(params: Dict[str, Any], context: Dict[str, Any], **_kwargs) -> None:
+    """シリアライズ前のAPI呼び出しのパラメータをリクエストコンテキストに保存する"""
+    context["replay_params"] = params
+
+
+def _snake_case(name: str) -> str:
+    """APIのオペレーション名(例: GetItem)をメソッド名(例: get_item)に変換する"""
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def _key(params: Dict[str, Any]) -> str:
+    """DynamoDBのキーを、テーブル内の項目を識別する文字列に変換する"""
+    return json.dumps(params["Key"], sort_keys=True)
+
+
+# DynamoDBの式のトークン(括弧・カンマ・比較演算子・属性名・プレースホルダー)
+_EXPRESSION_TOKEN = re.compile(r"\(|\)|,|<>|<=|>=|=|<|>|[#:]?[A-Za-z_][A-Za-z0-9_]*")
+
+
+def evaluate_condition(
+    expression: str,
+    names: Dict[str, str],
+    values: Dict[str, Any],
+    item: Dict[str, Any],
+) -> bool:
+    """
+    DynamoDBの条件式・キー条件式を項目に対して評価する
+    このリポジトリで使用するAND・OR・NOT・括弧・比較演算子と、
+    attribute_exists・attribute_not_existsのみに対応する
+
+    Args:
+        expression (str): 条件式
+        names (Dict[str, str]): ExpressionAttributeNames
+        values (Dict[str, Any]): ExpressionAttributeValues
+        item (Dict[str, Any]): 項目
+
+    Returns:
+        bool: 条件を満たす場合True
+    """
+    tokens: List[str] = _EXPRESSION_TOKEN.findall(expression)
+    position: int = 0
+
+    def take() -> str:
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def peek() -> str:
+        return tokens[position].upper() if position < len(tokens) else ""
+
+    def operand(token: str) -> Any:
+        if token.startswith(":"):
+            return _to_python(values[token])
+        return _to_python(item.get(names.get(token, token)))
+
+    def disjunction() -> bool:
+        result: bool = conjunction()
+        while peek() == "OR":
+            take()
+            result = conjunction() or result
+        return result
+
+    def conjunction() -> bool:
+        result: bool = factor()
+        while peek() == "AND":
+            take()
+            result = factor() and result
+        return result
+
+    def factor() -> bool:
+        token: str = take()
+        if token == "(":
+            result: bool = disjunction()
+            take()
+            return result
+        if token.upper() == "NOT":
+            return not factor()
+        if token in ("attribute_exists", "attribute_not_exists"):
+            take()
+            exists: bool = names.get(take(), tokens[position - 1]) in item
+            take()
+            return exists if token == "attribute_exists" else not exists
+        left: Any = operand(token)
+        operator: str = take()
+        right: Any = operand(take())
+        if operator == "<>":
+            return left != right
+        if left is None or right is None or type(left) is not type(right):
+            return False
+        return {
+            "=": left == right,
+            "<": left < right,
+            "<=": left <= right,
+            ">": left > right,
+            ">=": left >= right,
+        }[operator]
+
+    return disjunction()
+
+
+def apply_update(
+    expression: str,
+    names: Dict[str, str],
+    values: Dict[str, Any],
+    item: Dict[str, Any],
+) -> List[str]:
+    """
+    DynamoDBの更新式(SET・REMOVE・ADD)を項目に適用する
+
+    Args:
+        expression (str): 更新式
+        names (Dict[str, str]): ExpressionAttributeNames
+        values (Dict[str, Any]): ExpressionAttributeValues
+        item (Dict[str, Any]): 更新する項目
+
+    Returns:
+        List[str]: SET・ADDで更新した属性名
+    """
+    updated: List[str] = []
+    for keyword, body in re.findall(
+        r"(SET|REMOVE|ADD)\s+(.*?)(?=\s+(?:SET|REMOVE|ADD)\s+|$)", expression.strip()
+    ):
+        for action in body.split(","):
+            if keyword == "REMOVE":
+                item.pop(names.get(action.strip(), action.strip()), None)
+                continue
+            path, value = re.split(r"\s*=\s*|\s+", action.strip(), maxsplit=1)
+            name: str = names.get(path, path)
+            if keyword == "SET":
+                item[name] = values[value]
+            else:
+                total: float = float(item.get(name, {"N": "0"})["N"]) + float(
+                    values[value]["N"]
+                )
+                item[name] = {"N": f"{total:g}"}
+            updated.append(name)
+    return updated
+
+
+def _to_python(value: Dict[str, Any] | None) -> Any:
+    """DynamoDBの型付きの値をPythonの値に変換する"""
+    if value is None:
+        return None
+    if "N" in value:
+        return float(value["N"])
+    if "S" in value:
+        return value["S"]
+    if "BOOL" in value:
+        return value["BOOL"]
+    return json.dumps(value, sort_keys=True)
+
+
+class StubHttpServer:
+    """
+    YouTube Data API v3のvideos.list・Google PubSubHubbub Hub・Webhookに応答する
+    ローカルのスタブHTTPサーバー
+    ビデオIDの接頭辞(live-・upcoming-・none-)でライブ配信の状態を決め、
+    存在しない動画(missing-等)はレスポンスに含めない
+    """
+
+    def __init__(self, latency_seconds: float) -> None:
+        self.latency_seconds: float = latency_seconds
+        # Hubに登録されたトピックURL -> HMACシークレット
+        self.hub_secrets: Dict[str, str] = {}
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.server.daemon_threads = True
+        self.base_url: str = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self) -> "StubHttpServer":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *_args: Any) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler_class(self) -> type:
+        """スタブHTTPサーバーのリクエストハンドラーのクラスを生成する"""
+        stub: StubHttpServer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """スタブHTTPサーバーのリクエストハンドラー"""
+
+            protocol_version = "HTTP/1.1"
+            # ヘッダーと本文を別々に書き込むため、Nagleアルゴリズムとクライアントの遅延ACKにより
+            # keep-aliveの接続で応答ごとに約40ミリ秒の遅延が生じないようにTCP_NODELAYを設定する
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:  # pylint: disable=invalid-name
+                """videos.listに応答する"""
+                time.sleep(stub.latency_seconds)
+                url = urllib.parse.urlsplit(self.path)
+                query: Dict[str, str] = dict(urllib.parse.parse_qsl(url.query))
+                body: bytes = json.dumps(
+                    stub.videos_list(query.get("id", "").split(","))
+                ).encode("utf-8")
+                etag: str = f'"{hashlib.sha1(body, usedforsecurity=False).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self._respond(304, b"", {"ETag": etag})
+                    return
+                self._respond(
+                    200, body, {"Content-Type": "application/json", "ETag": etag}
+                )
+
+            def do_POST(self) -> None:  # pylint: disable=invalid-name
+                """Hubへのサブスクリプション登録・Webhookに応答する"""
+                time.sleep(stub.latency_seconds)
+                body: bytes = self.rfile.read(int(self.headers["Content-Length"]))
+                if self.path.startswith("/hub"):
+                    form: Dict[str, str] = dict(
+                        urllib.parse.parse_qsl(body.decode("utf-8"))
+                    )
+                    stub.hub_secrets[form["hub.topic"]] = form["hub.secret"]
+                    self._respond(202, b"")
+                    return
+                self._respond(204, b"")
+
+            def log_message(self, *_args: Any) -> None:
+                """アクセスログを出力しない"""
+
+            def _respond(
+                self, status: int, body: bytes, headers: Dict[str, str] | None = None
+            ) -> None:
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    @staticmethod
+    def videos_list(video_ids: List[str]) -> Dict[str, Any]:
+        """
+        ビデオIDの接頭辞からvideos.listのレスポンスを生成する
+
+        Args:
+            video_ids (List[str]): ビデオID
+
+        Returns:
+            Dict[str, Any]: videos.listのレスポンス
+        """
+        items: List[Dict[str, Any]] = []
+        for video_id in video_ids:
+            status: str = video_id.split("-", 1)[0]
+            if status not in ("live", "upcoming", "none"):
+                continue
+            item: Dict[str, Any] = {
+                "id": video_id,
+                "snippet": {
+                    "liveBroadcastContent": status,
+                    "thumbnails": {
+                        "high": {"url": f"https://i.ytimg.com/vi/{video_id}/hq.jpg"}
+                    },
+                },
+            }
+            if status == "upcoming":
+                start: datetime = datetime.now(timezone.utc) + timedelta(seconds=30)
+                item["liveStreamingDetails"] = {
+                    "scheduledStartTime": start.strftime("%Y-%m-%dT%H:%M:%SZ")
+                }
+            items.append(item)
+        return {"pageInfo": {"totalResults": len(items)}, "items": items}
+
+
+def build_corpus(events: int, seed: int) -> List[Dict[str, Any]]:
+    """
+    イベントの種類ごとの重みに従って、再現可能なイベントのコーパスを生成する
+    プッシュ通知の本文は署名せず、リプレイ時にHubに登録されたHMACシークレットで署名する
+
+    Args:
+        events (int): イベント数
+        seed (int): 乱数のシード
+
+    Returns:
+        List[Dict[str, Any]]: ハンドラー名・種類・イベントのリスト
+    """
+    rng = random.Random(seed)
+    kinds: List[Tuple[str, str]] = list(EVENT_WEIGHTS)
+    recent_video_ids: List[str] = []
+    corpus: List[Dict[str, Any]] = []
+    for sequence in range(events):
+        handler, kind = rng.choices(kinds, weights=list(EVENT_WEIGHTS.values()))[0]
+        video_id: str = f"{kind if kind in ('upcoming', 'none') else 'live'}-{sequence}"
+        if kind == "duplicate" and recent_video_ids:
+            video_id = rng.choice(recent_video_ids[-20:])
+        elif handler.startswith("post_notify") and kind in ("live", "duplicate"):
+            recent_video_ids.append(video_id)
+
+        event: Dict[str, Any] = {}
+        if handler == "post_notify.lambda_handler":
+            event = {"body": _build_feed(kind, video_id, sequence)}
+        elif handler == "post_notify.queue_handler":
+            event = {
+                "Records": [
+                    {
+                        "messageId": f"replay-{sequence}",
+                        "body": _build_feed(kind, video_id, sequence),
+                    }
+                ]
+            }
+        elif handler == "get_notify.lambda_handler":
+            channel_id: str = INITIAL_PARAMETERS[
+                STUB_ENVIRONMENT["YOUTUBE_CHANNEL_ID_PARAMETER_NAME"]
+            ]
+            event = {
+                "queryStringParameters": {
+                    "hub.mode": "subscribe",
+                    "hub.topic": (
+                        "https://www.youtube.com/xml/feeds/videos.xml?channel_id="
+                        f"{channel_id if kind == 'verify' else 'UCunknown'}"
+                    ),
+                    "hub.challenge": f"challenge-{sequence}",
+                    "hub.lease_seconds": STUB_ENVIRONMENT["LEASE_SECONDS"],
+                }
+            }
+        elif handler == "post_pipeline.lambda_handler":
+            event = {
+                "source": "aws.codepipeline",
+                "detail-type": "CodePipeline Stage Execution State Change",
+                "detail": {
+                    "pipeline": "ytlivemetadata-pipeline",
+                    "stage": rng.choice(["Source", "Build", "Deploy"]),
+                    "execution-id": str(uuid.UUID(int=rng.getrandbits(128))),
+                    "state": "FAILED",
+                },
+            }
+        else:
+            event = {"source": "aws.events", "detail-type": "Scheduled Event"}
+        corpus.append({"handler": handler, "kind": kind, "event": event})
+    return corpus
+
+
+def _build_feed(kind: str, video_id: str, sequence: int) -> str:
+    """イベントの種類に応じたプッシュ通知のAtomフィードを生成する"""
+    channel_id: str = INITIAL_PARAMETERS[
+        STUB_ENVIRONMENT["YOUTUBE_CHANNEL_ID_PARAMETER_NAME"]
+    ]
+    if kind == "deleted":
+        return ATOM_FEED.format(entries=ATOM_DELETED_ENTRY.format(video_id=video_id))
+    video_ids: List[str] = [video_id]
+    if kind == "multiple":
+        video_ids = [f"live-{sequence}", f"none-{sequence}", f"missing-{sequence}"]
+    return ATOM_FEED.format(
+        entries="".join(
+            ATOM_ENTRY.format(video_id=v, channel_id=channel_id) for v in video_ids
+        )
+    )
+
+
+class Replayer:
+    """コーパスのイベントを各ハンドラーに入力して計測する"""
+
+    def __init__(self, stub: StubHttpServer) -> None:
+        self.stub: StubHttpServer = stub
+        self.handlers: Dict[str, Callable[[Dict[str, Any], Any], Dict[str, Any]]] = {}
+        # ハンドラー名 -> 計測結果のリスト
+        self.samples: Dict[str, List[Dict[str, Any]]] = {}
+
+    def handler(self, name: str) -> Callable[[Dict[str, Any], Any], Dict[str, Any]]:
+        """ハンドラー名(例: post_notify.lambda_handler)のハンドラーを返す"""
+        if name not in self.handlers:
+            module_name, function_name = name.split(".")
+            module: Any = importlib.import_module(f"lambdas.{module_name}.app")
+            self.handlers[name] = getattr(module, function_name)
+        return self.handlers[name]
+
+    def replay(self, entry: Dict[str, Any], record: bool) -> None:
+        """
+        1つのイベントをハンドラーに入力し、レイテンシー・ステージごとの所要時間を記録する
+
+        Args:
+            entry (Dict[str, Any]): コーパスのイベント
+            record (bool): 計測結果を記録する場合True(ウォームアップ時はFalse)
+        """
+        handler: Callable[[Dict[str, Any], Any], Dict[str, Any]] = self.handler(
+            entry["handler"]
+        )
+        event: Dict[str, Any] = self._sign(entry)
+        output = io.StringIO()
+        status: str = "exception"
+        started_at: float = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            try:
+                response: Any = handler(event, None)
+                status = str(
+                    response.get("statusCode", "batch")
+                    if isinstance(response, dict)
+                    else "none"
+                )
+            except Exception:  # pylint: disable=broad-exception-caught
+                pass
+        latency_ms: float = (time.perf_counter() - started_at) * 1000
+        if not record:
+            return
+
+        stages: Dict[str, float] = {}
+        failed: bool = status == "exception"
+        for line in output.getvalue().splitlines():
+            if '"HandlerDuration"' not in line:
+                continue
+            emf: Dict[str, Any] = json.loads(line)
+            failed = failed or bool(emf["HandlerErrors"])
+            stages = {
+                stage_name: emf[f"{stage_name}Duration"]
+                for stage_name in emf.get("StageCalls", {})
+            }
+        self.samples.setdefault(entry["handler"], []).append(
+            {
+                "latency_ms": latency_ms,
+                "status": status,
+                "failed": failed,
+                "stages": stages,
+            }
+        )
+
+    def _sign(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """プッシュ通知の本文を、Hubに登録されたHMACシークレットで署名する"""
+        if entry["handler"] != "post_notify.lambda_handler":
+            return entry["event"]
+        body: bytes = entry["event"]["body"].encode("utf-8")
+        secret: str = next(
+            iter(self.stub.hub_secrets.values()),
+            INITIAL_PARAMETERS[STUB_ENVIRONMENT["WEBSUB_HMAC_SECRET_PARAMETER_NAME"]],
+        )
+        if entry["kind"] == "invalid_signature":
+            secret = "invalid-secret"
+        signature: str = hmac.new(secret.encode(), body, hashlib.sha1).hexdigest()
+        return {
+            "headers": {"X-Hub-Signature": f"sha1={signature}"},
+            "body": base64.b64encode(body).decode("ascii"),
+            "isBase64Encoded": True,
+        }
+
+
+def summarize(samples: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    ハンドラーごとの計測結果を、スループット・レイテンシーのパーセンタイルに集計する
+
+    Args:
+        samples (Dict[str, List[Dict[str, Any]]]): ハンドラー名 -> 計測結果のリスト
+
+    Returns:
+        Dict[str, Any]: ハンドラー名 -> 集計結果
+    """
+    handlers: Dict[str, Any] = {}
+    for name, handler_samples in sorted(samples.items()):
+        latencies: List[float] = [sample["latency_ms"] for sample in handler_samples]
+        status_codes: Dict[str, int] = {}
+        stage_durations: Dict[str, List[float]] = {}
+        for sample in handler_samples:
+            status_codes[sample["status"]] = status_codes.get(sample["status"], 0) + 1
+            for stage_name, duration_ms in sample["stages"].items():
+                stage_durations.setdefault(stage_name, []).append(duration_ms)
+        handlers[name] = {
+            "count": len(handler_samples),
+            "errors": sum(sample["failed"] for sample in handler_samples),
+            "status_codes": dict(sorted(status_codes.items())),
+            "throughput_per_second": round(len(latencies) / (sum(latencies) / 1000), 1),
+            "latency_ms": _percentiles(latencies),
+            "stages": {
+                stage_name: {"count": len(durations), **_percentiles(durations)}
+                for stage_name, durations in sorted(stage_durations.items())
+            },
+        }
+    return handlers
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    """最近接順位法でp50/p95/p99・最大値を求める"""
+    ordered: List[float] = sorted(values)
+    return {
+        **{
+            f"p{p}": round(ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)], 3)
+            for p in (50, 95, 99)
+        },
+        "max": round(ordered[-1], 3),
+    }
+
+
+def diff_reports(
+    baseline: Dict[str, Any], report: Dict[str, Any], max_regression_percent: float
+) -> Tuple[List[str], List[str]]:
+    """
+    ベースラインと計測結果のハンドラーごと・ステージごとのレイテンシーを比較する
+
+    Args:
+        baseline (Dict[str, Any]): ベースラインのレポート
+        report (Dict[str, Any]): 計測結果のレポート
+        max_regression_percent (float): 回帰とみなす増加率(%)
+
+    Returns:
+        Tuple[List[str], List[str]]: 比較結果の行、回帰とみなした項目のメッセージ
+    """
+    lines: List[str] = [
+        f"{'handler / stage':<56} {'metric':>10} {'baseline':>10} {'current':>10} {'change':>8}"
+    ]
+    regressions: List[str] = []
+
+    def compare(
+        label: str, metric: str, before: float, after: float, higher_is_worse: bool
+    ) -> None:
+        change: float = (after - before) / before * 100 if before else 0.0
+        lines.append(
+            f"{label:<56} {metric:>10} {before:>10.2f} {after:>10.2f} {change:>+7.1f}%"
+        )
+        if (change if higher_is_worse else -change) > max_regression_percent:
+            regressions.append(f"{label} {metric}: {before:.2f} -> {after:.2f}")
+
+    for name, result in report["handlers"].items():
+        previous: Dict[str, Any] | None = baseline["handlers"].get(name)
+        if previous is None:
+            continue
+        compare(
+            name,
+            "ops/s",
+            previous["throughput_per_second"],
+            result["throughput_per_second"],
+            False,
+        )
+        for metric in REGRESSION_METRICS:
+            compare(
+                name,
+                metric,
+                previous["latency_ms"][metric],
+                result["latency_ms"][metric],
+                True,
+            )
+        for stage_name, stage in result["stages"].items():
+            if stage_name in previous["stages"]:
+                for metric in REGRESSION_METRICS:
+                    compare(
+                        f"{name} / {stage_name}",
+                        metric,
+                        previous["stages"][stage_name][metric],
+                        stage[metric],
+                        True,
+                    )
+    return lines, regressions
+
+
+def parse_args() -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=300, help="生成するイベント数")
+    parser.add_argument("--seed", type=int, default=0, help="コーパスの乱数のシード")
+    parser.add_argument(
+        "--warmup", type=int, default=20, help="計測しない先頭のイベント数"
+    )
+    parser.add_argument(
+        "--http-latency-ms",
+        type=float,
+        default=20,
+        help="スタブHTTPサーバーのレイテンシー(ミリ秒)",
+    )
+    parser.add_argument(
+        "--aws-latency-ms",
+        type=float,
+        default=5,
+        help="フェイクのAWSのAPI呼び出しのレイテンシー(ミリ秒)",
+    )
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="ハンドラーの環境変数(例: CONCURRENT_STAGES=true)",
+    )
+    parser.add_argument("--corpus", type=Path, help="リプレイするコーパス(JSON Lines)")
+    parser.add_argument("--save-corpus", type=Path, help="生成したコーパスの保存先")
+    parser.add_argument("--output", type=Path, help="JSONレポートの出力先")
+    parser.add_argument("--baseline", type=Path, help="比較するJSONレポート")
+    parser.add_argument(
+        "--max-regression-percent",
+        type=float,
+        default=20,
+        help="ベースラインからの回帰とみなす増加率(%%)",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="ハンドラーのログを出力する"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """コーパスを各ハンドラーにリプレイし、集計結果をJSON形式で出力する"""
+    args: argparse.Namespace = parse_args()
+    overrides: Dict[str, str] = dict(item.split("=", 1) for item in args.env)
+
+    if args.corpus:
+        corpus: List[Dict[str, Any]] = [
+            json.loads(line)
+            for line in args.corpus.read_text(encoding="utf-8").splitlines()
+            if line.strip()
+        ]
+    else:
+        corpus = build_corpus(args.events, args.seed)
+    if args.save_corpus:
+        args.save_corpus.write_text(
+            "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in corpus),
+            encoding="utf-8",
+        )
+
+    with StubHttpServer(args.http_latency_ms / 1000) as stub:
+        # ハンドラーのモジュールは環境変数をインポート時に参照するため、インポート前に設定する
+        os.environ.update(
+            {
+                **STUB_ENVIRONMENT,
+                **BENCHMARK_ENVIRONMENT,
+                "PUBSUBHUBBUB_HUB_URL": f"{stub.base_url}/hub",
+                **overrides,
+            }
+        )
+        sys.path[:0] = [str(REPO_ROOT), str(LAYER_PATH)]
+        if not args.verbose:
+            logging.getLogger().addHandler(logging.NullHandler())
+
+        # pylint: disable=import-outside-toplevel,import-error
+        from aws_clients import get_client
+        from http_session import get_http_session
+
+        FakeAws(args.aws_latency_ms / 1000).install(get_client)
+        _route_youtube_to(get_http_session(), stub.base_url)
+
+        replayer = Replayer(stub)
+        started_at: float = time.perf_counter()
+        for index, entry in enumerate(corpus):
+            replayer.replay(entry, record=index >= args.warmup)
+        duration_seconds: float = time.perf_counter() - started_at
+
+    report: Dict[str, Any] = {
+        "python": sys.version.split()[0],
+        "config": {
+            "events": len(corpus),
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "http_latency_ms": args.http_latency_ms,
+            "aws_latency_ms": args.aws_latency_ms,
+            "env": overrides,
+        },
+        "total": {
+            "events": max(len(corpus) - args.warmup, 0),
+            "duration_seconds": round(duration_seconds, 3),
+            "throughput_per_second": round(len(corpus) / duration_seconds, 1),
+        },
+        "handlers": summarize(replayer.samples),
+    }
+    if args.output:
+        args.output.write_text(
+            json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+        )
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.baseline is not None:
+        check_baseline(args.baseline, report, args.max_regression_percent)
+
+
+def check_baseline(
+    baseline_path: Path, report: Dict[str, Any], max_regression_percent: float
+) -> None:
+    """
+    ベースラインとの比較結果を標準エラー出力に書き込み、回帰がある場合は終了コード1で終了する
+
+    Args:
+        baseline_path (Path): ベースラインのレポートのパス
+        report (Dict[str, Any]): 計測結果のレポート
+        max_regression_percent (float): 回帰とみなす増加率(%)
+    """
+    lines, regressions = diff_reports(
+        json.loads(baseline_path.read_text(encoding="utf-8")),
+        report,
+        max_regression_percent,
+    )
+    print("\n".join(lines), file=sys.stderr)
+    for regression in regressions:
+        print(f"Regression: {regression}", file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+
+
+def _route_youtube_to(session: Any, base_url: str) -> None:
+    """
+    HTTPセッションのYouTube Data API v3へのリクエストを、スタブHTTPサーバーに転送する
+    HTTPセッション・接続の再利用はそのまま計測する
+
+    Args:
+        session (Any): http_sessionのrequestsのセッション
+        base_url (str): スタブHTTPサーバーのURL
+    """
+    from requests.adapters import HTTPAdapter  # pylint: disable=import-outside-toplevel
+
+    class RoutingAdapter(HTTPAdapter):
+        """URLのホストをスタブHTTPサーバーに置き換えて送信するアダプター"""
+
+        def send(self, request: Any, *args: Any, **kwargs: Any) -> Any:
+            request.url = request.url.replace("https://www.googleapis.com", base_url, 1)
+            return super().send(request, *args, **kwargs)
+
+    session.mount("https://www.googleapis.com/", RoutingAdapter())
+
+
+if __name__ == "__main__":
+    main()